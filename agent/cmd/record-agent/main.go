@@ -251,6 +251,10 @@ func buildRouter(ingestor *ingest.Ingestor, h *health.Health, cfg *config.Config
 // eventsHandler handles POST /v1/events.
 func eventsHandler(ingestor *ingest.Ingestor, cfg *config.Config, log *slog.Logger) http.HandlerFunc {
 	return func(w http.ResponseWriter, r *http.Request) {
+		// Advertise the body encodings we accept; the SDK compresses batches
+		// only for agents that send this header.
+		w.Header().Set("Accept-Encoding", ingest.SupportedEncodings)
+
 		req, err := ingest.DecodeRequestFromHTTP(r, w, cfg.MaxBatchBytes)
 		if err != nil {
 			var tooLarge *ingest.BodyTooLargeError
@@ -258,6 +262,11 @@ func eventsHandler(ingestor *ingest.Ingestor, cfg *config.Config, log *slog.Logg
 				writeJSONError(w, http.StatusRequestEntityTooLarge, "request body too large")
 				return
 			}
+			var unsupported *ingest.UnsupportedEncodingError
+			if errors.As(err, &unsupported) {
+				writeJSONError(w, http.StatusUnsupportedMediaType, err.Error())
+				return
+			}
 			writeJSONError(w, http.StatusBadRequest, err.Error())
 			return
 		}
@@ -1,13 +1,21 @@
 package ingest
 
 import (
+	"compress/gzip"
+	"compress/zlib"
 	"encoding/json"
 	"errors"
 	"fmt"
 	"io"
 	"net/http"
+	"strings"
 )
 
+// SupportedEncodings is the Accept-Encoding value advertised on ingest
+// responses: the request Content-Encodings DecodeRequestFromHTTP accepts.
+// Clients send compressed bodies only to agents that advertise them.
+const SupportedEncodings = "gzip, deflate"
+
 // ErrInvalidJSON is returned when the request body cannot be decoded as valid JSON.
 var ErrInvalidJSON = errors.New("invalid JSON")
 
@@ -20,6 +28,16 @@ func (e *BodyTooLargeError) Error() string {
 	return fmt.Sprintf("request body exceeds limit of %d bytes", e.Max)
 }
 
+// UnsupportedEncodingError is returned when the request body uses a
+// Content-Encoding the decoder cannot decompress.
+type UnsupportedEncodingError struct {
+	Encoding string
+}
+
+func (e *UnsupportedEncodingError) Error() string {
+	return fmt.Sprintf("unsupported Content-Encoding %q", e.Encoding)
+}
+
 // DecodeRequest decodes an IngestRequest from r, rejecting unknown top-level
 // fields and validating the result.
 func DecodeRequest(r io.Reader) (IngestRequest, error) {
@@ -37,9 +55,16 @@ func DecodeRequest(r io.Reader) (IngestRequest, error) {
 
 // DecodeRequestFromHTTP reads and decodes an IngestRequest from an HTTP request,
 // enforcing maxBodyBytes. Returns BodyTooLargeError if the body exceeds the limit.
+// A gzip or deflate Content-Encoding is decompressed, and maxBodyBytes also
+// bounds the decompressed body; other encodings return UnsupportedEncodingError.
 func DecodeRequestFromHTTP(r *http.Request, w http.ResponseWriter, maxBodyBytes int64) (IngestRequest, error) {
 	r.Body = http.MaxBytesReader(w, r.Body, maxBodyBytes)
-	req, err := DecodeRequest(r.Body)
+	body, err := decodedBody(r, w, maxBodyBytes)
+	if err != nil {
+		return IngestRequest{}, err
+	}
+	defer body.Close()
+	req, err := DecodeRequest(body)
 	if err != nil {
 		var maxBytesErr *http.MaxBytesError
 		if errors.As(err, &maxBytesErr) {
@@ -49,3 +74,31 @@ func DecodeRequestFromHTTP(r *http.Request, w http.ResponseWriter, maxBodyBytes
 	}
 	return req, nil
 }
+
+// decodedBody returns r.Body, wrapped in a decompressor for its Content-Encoding.
+func decodedBody(r *http.Request, w http.ResponseWriter, maxBodyBytes int64) (io.ReadCloser, error) {
+	encoding := strings.ToLower(strings.TrimSpace(r.Header.Get("Content-Encoding")))
+	var (
+		body io.ReadCloser
+		err  error
+	)
+	switch encoding {
+	case "", "identity":
+		return r.Body, nil
+	case "gzip", "x-gzip":
+		body, err = gzip.NewReader(r.Body)
+	case "deflate":
+		body, err = zlib.NewReader(r.Body)
+	default:
+		return nil, &UnsupportedEncodingError{Encoding: encoding}
+	}
+	if err != nil {
+		var maxBytesErr *http.MaxBytesError
+		if errors.As(err, &maxBytesErr) {
+			return nil, &BodyTooLargeError{Max: maxBodyBytes}
+		}
+		return nil, fmt.Errorf("%w: %s body: %s", ErrInvalidJSON, encoding, err)
+	}
+	// Bound the decompressed size too, so a small body cannot expand without limit.
+	return http.MaxBytesReader(w, body, maxBodyBytes), nil
+}
@@ -1,6 +1,9 @@
 package ingest
 
 import (
+	"bytes"
+	"compress/gzip"
+	"compress/zlib"
 	"errors"
 	"fmt"
 	"io"
@@ -209,6 +212,82 @@ func TestDecodeRequestFromHTTP_InvalidJSONReturnsErrInvalidJSON(t *testing.T) {
 	}
 }
 
+// --- DecodeRequestFromHTTP: Content-Encoding ---
+
+// compressed returns s compressed with the given Content-Encoding.
+func compressed(t *testing.T, encoding, s string) *bytes.Buffer {
+	t.Helper()
+	var buf bytes.Buffer
+	var zw io.WriteCloser
+	if encoding == "gzip" {
+		zw = gzip.NewWriter(&buf)
+	} else {
+		zw = zlib.NewWriter(&buf)
+	}
+	if _, err := zw.Write([]byte(s)); err != nil {
+		t.Fatal(err)
+	}
+	if err := zw.Close(); err != nil {
+		t.Fatal(err)
+	}
+	return &buf
+}
+
+func TestDecodeRequestFromHTTP_CompressedBodiesAreDecoded(t *testing.T) {
+	for _, encoding := range []string{"gzip", "deflate"} {
+		r := httptest.NewRequest(http.MethodPost, "/ingest", compressed(t, encoding, validJSON))
+		r.Header.Set("Content-Encoding", encoding)
+		w := httptest.NewRecorder()
+
+		req, err := DecodeRequestFromHTTP(r, w, 1024*1024)
+		if err != nil {
+			t.Fatalf("%s: DecodeRequestFromHTTP() error = %v, want nil", encoding, err)
+		}
+		if len(req.Events) != 1 {
+			t.Errorf("%s: len(Events) = %d, want 1", encoding, len(req.Events))
+		}
+	}
+}
+
+func TestDecodeRequestFromHTTP_UnsupportedEncodingIsRejected(t *testing.T) {
+	r := httptest.NewRequest(http.MethodPost, "/ingest", reader(validJSON))
+	r.Header.Set("Content-Encoding", "br")
+	w := httptest.NewRecorder()
+
+	_, err := DecodeRequestFromHTTP(r, w, 1024*1024)
+	var unsupported *UnsupportedEncodingError
+	if !errors.As(err, &unsupported) {
+		t.Fatalf("errors.As(err, *UnsupportedEncodingError) = false, got %v", err)
+	}
+	if unsupported.Encoding != "br" {
+		t.Errorf("Encoding = %q, want br", unsupported.Encoding)
+	}
+}
+
+func TestDecodeRequestFromHTTP_CorruptCompressedBodyIsRejected(t *testing.T) {
+	r := httptest.NewRequest(http.MethodPost, "/ingest", reader(validJSON))
+	r.Header.Set("Content-Encoding", "gzip")
+	w := httptest.NewRecorder()
+
+	if _, err := DecodeRequestFromHTTP(r, w, 1024*1024); !errors.Is(err, ErrInvalidJSON) {
+		t.Errorf("errors.Is(err, ErrInvalidJSON) = false, got %v", err)
+	}
+}
+
+func TestDecodeRequestFromHTTP_DecompressedSizeIsLimited(t *testing.T) {
+	// Compresses to far less than the limit but expands well past it.
+	body := strings.Repeat(" ", 100000) + validJSON
+	buf := compressed(t, "gzip", body)
+	limit := int64(buf.Len() + 100)
+	r := httptest.NewRequest(http.MethodPost, "/ingest", buf)
+	r.Header.Set("Content-Encoding", "gzip")
+	w := httptest.NewRecorder()
+
+	if _, err := DecodeRequestFromHTTP(r, w, limit); err == nil {
+		t.Fatal("DecodeRequestFromHTTP() returned nil for oversized decompressed body, want error")
+	}
+}
+
 // --- ErrInvalidJSON wrapping ---
 
 func TestDecodeRequest_ErrorWrapsErrInvalidJSON(t *testing.T) {
@@ -0,0 +1,124 @@
+"""
+Benchmark: batch throughput from AgentHttpClient to a local agent.
+
+Posts batches of events to an in-process LocalAgentServer as fast as one
+sender can, the way the SenderWorker does, and reports batches per second,
+the TCP connections the agent saw and the body bytes sent per batch.  The
+baseline is the previous client, which opened a connection with
+urllib.request.urlopen for every batch.  The compressed runs send sim_db
+style events (repeated SQL text and rows) with gzip and deflate bodies.
+
+Usage::
+
+    python benchmarks/bench_agent_client.py [--batches 2000] [--events 100]
+
+Stdlib only.
+"""
+
+import argparse
+import functools
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.fixture.schema import FixtureEvent  # noqa: E402
+from sim_sdk.sink.agent_client import AgentHttpClient  # noqa: E402
+from sim_sdk.sink.envelope import (  # noqa: E402
+    BatchRequest,
+    BatchResponse,
+    EventEnvelope,
+    fixture_to_envelope,
+)
+from sim_sdk.sink.local_agent import LocalAgentServer  # noqa: E402
+from sim_sdk.sink.sender_metrics import SenderMetrics  # noqa: E402
+
+
+class UrlopenClient:
+    """The client before keep-alive: one urlopen() per batch."""
+
+    def __init__(self, agent_url: str, timeout_s: float = 5.0, metrics: Any = None):
+        self._endpoint = f"{agent_url.rstrip('/')}/v1/events"
+        self._timeout_s = timeout_s
+
+    def post_batch(self, envelopes: List[EventEnvelope]) -> BatchResponse:
+        req = urllib.request.Request(
+            self._endpoint,
+            data=BatchRequest(envelopes=envelopes).serialize(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self._timeout_s) as resp:
+            return BatchResponse.from_wire(json.loads(resp.read().decode("utf-8")))
+
+    def close(self) -> None:
+        pass
+
+
+def small_event(i: int) -> FixtureEvent:
+    return FixtureEvent(qualname="q", input={"user_id": i}, output={"ok": True})
+
+
+def db_event(i: int) -> FixtureEvent:
+    rows = [{"id": r, "email": f"user{r}@example.com", "status": "active",
+             "created_at": "2026-01-01T00:00:00Z"} for r in range(20)]
+    return FixtureEvent(
+        qualname="orders.load_users", event_type="Stub",
+        input={"sql": "SELECT id, email, status, created_at FROM users "
+                      "WHERE org_id = %s ORDER BY id", "params": [i]},
+        output=rows,
+    )
+
+
+def run(label: str, factory: Any, make_event: Any, batches: int, events: int) -> None:
+    envelopes = [fixture_to_envelope(make_event(i)) for i in range(events)]
+    with LocalAgentServer() as agent:
+        metrics = SenderMetrics()
+        client = factory(agent.url, metrics=metrics)
+        # The first response advertises the agent's encodings
+        client.post_batch(envelopes)
+        warm_bytes = agent.bytes_received
+        start = time.perf_counter()
+        for _ in range(batches):
+            client.post_batch(envelopes)
+        elapsed = time.perf_counter() - start
+        client.close()
+        assert agent.events == (batches + 1) * events
+        snap = metrics.snapshot()
+        sent = (agent.bytes_received - warm_bytes) / batches
+        compress_us = snap["compress_ms"] * 1e3 / max(snap["compressed_batches"], 1)
+        print(f"{label:22s} {batches / elapsed:7.0f} batches/s  "
+              f"{agent.connections:5d} connections  "
+              f"{sent / 1024:8.1f} KiB/batch  "
+              f"ratio {snap['compression_ratio']:5.1f}  "
+              f"compress {compress_us:6.0f} us/batch")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batches", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=100,
+                        help="events per batch")
+    args = parser.parse_args()
+
+    print("small events")
+    run("urlopen", UrlopenClient, small_event, args.batches, args.events)
+    run("AgentHttpClient", AgentHttpClient, small_event, args.batches, args.events)
+
+    print("sim_db events")
+    db_batches = max(args.batches // 4, 1)
+    run("uncompressed", AgentHttpClient, db_event, db_batches, args.events)
+    for encoding in ("gzip", "deflate"):
+        for level in (1, 6):
+            factory = functools.partial(
+                AgentHttpClient, compression=encoding, compression_level=level,
+            )
+            run(f"{encoding} level {level}", factory, db_event, db_batches, args.events)
+
+
+if __name__ == "__main__":
+    main()
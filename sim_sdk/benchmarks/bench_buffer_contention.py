@@ -0,0 +1,144 @@
+"""
+Benchmark: the sink buffer under 64 producer threads with a full buffer.
+
+Producer threads append small events as fast as they can while a consumer
+thread drains it once per flush interval, as the SenderWorker does.
+The byte budget is set low enough that nearly every append has to drop
+an event, which is when the buffer lock is most contended.  Reports
+appends per second and the slowest drain for each drop policy, for the
+InMemoryBuffer alone and behind the per-thread ShardedBuffer that
+AgentSink uses.  The baseline is the previous list-backed buffer, whose
+DROP_OLDEST and DROP_RANDOM pop from the front or middle of the list
+(O(n) under the lock), and whose drain() copies the list.
+
+Usage::
+
+    python benchmarks/bench_buffer_contention.py [--threads 64] [--events 5000]
+
+Stdlib only.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.fixture.schema import FixtureEvent  # noqa: E402
+from sim_sdk.sink.in_memory_buffer import (  # noqa: E402
+    DropPolicy,
+    InMemoryBuffer,
+    estimate_event_size,
+)
+from sim_sdk.sink.sharded_buffer import ShardedBuffer  # noqa: E402
+
+
+class ListBuffer:
+    """The list-backed buffer before O(1) drops, with the same accounting."""
+
+    def __init__(self, max_buffer_bytes: int, drop_policy: DropPolicy):
+        self._lock = threading.Lock()
+        self.buffer: List[Any] = []
+        self._sizes: List[int] = []
+        self._bytes = 0
+        self.max_buffer_bytes = max_buffer_bytes
+        self.drop_policy = drop_policy
+
+    def append(self, event: Any) -> int:
+        size = estimate_event_size(event)
+        with self._lock:
+            dropped = 0
+            while self.buffer and self._bytes + size > self.max_buffer_bytes:
+                if self.drop_policy == DropPolicy.DROP_OLDEST:
+                    index = 0
+                elif self.drop_policy == DropPolicy.DROP_NEWEST:
+                    index = len(self.buffer) - 1
+                else:
+                    index = random.randint(0, len(self.buffer) - 1)
+                del self.buffer[index]
+                self._bytes -= self._sizes.pop(index)
+                dropped += 1
+            self.buffer.append(event)
+            self._sizes.append(size)
+            self._bytes += size
+            return dropped
+
+    def drain(self) -> List[Any]:
+        with self._lock:
+            batch = list(self.buffer)
+            self.buffer.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            return batch
+
+
+def sharded(max_buffer_bytes: int, policy: DropPolicy) -> ShardedBuffer:
+    return ShardedBuffer(InMemoryBuffer(max_buffer_bytes, policy))
+
+
+BUFFERS = [("ListBuffer", ListBuffer), ("InMemoryBuffer", InMemoryBuffer),
+           ("ShardedBuffer", sharded)]
+
+
+def run(label: str, factory: Any, policy: DropPolicy, threads: int, events: int,
+        capacity: int, interval_s: float) -> None:
+    event = FixtureEvent(qualname="q", input={"user_id": 1}, output={"ok": True})
+    buf = factory(estimate_event_size(event) * capacity, policy)
+    start_gate = threading.Barrier(threads + 1)
+    done = threading.Event()
+    worst_drain = [0.0]
+
+    def produce() -> None:
+        start_gate.wait()
+        append = buf.append
+        for _ in range(events):
+            append(event)
+
+    def consume() -> None:
+        while not done.is_set():
+            time.sleep(interval_s)
+            t0 = time.perf_counter()
+            buf.drain()
+            worst_drain[0] = max(worst_drain[0], time.perf_counter() - t0)
+
+    producers = [threading.Thread(target=produce) for _ in range(threads)]
+    consumer = threading.Thread(target=consume)
+    for t in producers:
+        t.start()
+    consumer.start()
+    start_gate.wait()
+    t0 = time.perf_counter()
+    for t in producers:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    done.set()
+    consumer.join()
+
+    total = threads * events
+    print(f"{label:15s} {policy.value:12s} "
+          f"{total / elapsed / 1000:8.1f} k appends/s   "
+          f"worst drain {worst_drain[0] * 1e3:6.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=50_000,
+                        help="events that fit in the byte budget")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between drains")
+    args = parser.parse_args()
+
+    for policy in (DropPolicy.DROP_OLDEST, DropPolicy.DROP_NEWEST, DropPolicy.DROP_RANDOM):
+        for label, factory in BUFFERS:
+            run(label, factory, policy, args.threads, args.events, args.capacity,
+                args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: single-pass canonical_encode vs. the two-pass record path.
+
+The two-pass path is what @sim_trace did before canonical_encode existed:
+``_make_serializable(value)`` followed by ``fingerprint()`` of the result,
+which re-walks the converted copy through ``json.dumps``.
+
+Usage::
+
+    python benchmarks/bench_canonical_encode.py [--depth 6] [--width 3]
+
+Stdlib only.  Timings are the best of several interleaved repeats, so the
+numbers are comparable on a noisy machine.
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.canonical import canonical_encode, fingerprint  # noqa: E402
+from sim_sdk.trace import _make_serializable  # noqa: E402
+
+
+def _leaf(i: int) -> Dict[str, Any]:
+    return {
+        "sku": f"SKU-{i:05d}",
+        "qty": i % 7,
+        "price": Decimal("19.99"),
+        "updated_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "tags": ("promo", "bulk"),
+        "active": True,
+        "note": None,
+    }
+
+
+def nested_payload(depth: int, width: int, _counter: List[int] = [0]) -> Any:
+    """Build a request-shaped tree ``depth`` levels deep, ``width`` wide."""
+    if depth == 0:
+        _counter[0] += 1
+        return _leaf(_counter[0])
+    return {
+        "meta": {"level": depth, "label": f"node-{depth}"},
+        "children": [nested_payload(depth - 1, width) for _ in range(width)],
+    }
+
+
+def flat_rows(n: int) -> List[Dict[str, Any]]:
+    """DB-result-shaped payload: a list of flat row dicts."""
+    return [{"id": i, "name": f"row-{i}", "price": i * 1.25, "ok": i % 2 == 0}
+            for i in range(n)]
+
+
+def two_pass(value: Any) -> Tuple[Any, str]:
+    data = _make_serializable(value)
+    return data, fingerprint(data)
+
+
+def best_ms(fn: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=1)) / number * 1000
+
+
+def run(label: str, value: Any, number: int, repeats: int) -> None:
+    assert two_pass(value)[1] == canonical_encode(value)[1], "fingerprint mismatch"
+    old, new = [], []
+    for _ in range(repeats):
+        old.append(best_ms(lambda: two_pass(value), number))
+        new.append(best_ms(lambda: canonical_encode(value), number))
+    o, n = min(old), min(new)
+    print(f"{label:<32} two-pass {o:9.3f} ms   single-pass {n:9.3f} ms   "
+          f"speedup {o / n:5.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=9)
+    args = parser.parse_args()
+
+    for depth in range(2, args.depth + 1, 2):
+        payload = {"request": nested_payload(depth, args.width)}
+        number = max(1, 2000 // (args.width ** depth))
+        run(f"nested depth={depth} width={args.width}", payload, number, args.repeats)
+
+    run("flat rows n=5000", flat_rows(5000), 3, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
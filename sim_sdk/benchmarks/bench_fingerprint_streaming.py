@@ -0,0 +1,84 @@
+"""
+Benchmark: streaming fingerprint() vs. hashing the full canonical string.
+
+Reports wall time and tracemalloc peak for DB-result-shaped payloads.  The
+baseline is what fingerprint() did before streaming: build
+``canonicalize_json(obj)``, encode it to UTF-8, then hash it.
+
+Usage::
+
+    python benchmarks/bench_fingerprint_streaming.py [--rows 50000]
+
+Stdlib only.
+"""
+
+import argparse
+import hashlib
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.canonical import canonicalize_json, fingerprint  # noqa: E402
+
+
+def full_string_fingerprint(obj: Any) -> str:
+    return hashlib.sha256(canonicalize_json(obj).encode("utf-8")).hexdigest()
+
+
+def db_rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "sku": f"SKU-{i:06d}",
+            "name": "Premium Widget with a reasonably long product name",
+            "price": round(i * 0.37, 2),
+            "in_stock": i % 3 != 0,
+        }
+        for i in range(n)
+    ]
+
+
+def peak_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def best_ms(fn: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # label -> (payload, calls per timing sample)
+    payloads = {
+        f"rows list n={args.rows}": (db_rows(args.rows), 3),
+        f"{{'rows': ...}} n={args.rows}": (
+            {"rows": db_rows(args.rows), "count": args.rows}, 3,
+        ),
+        "small dict": ({"sql": "SELECT 1", "params": [1, 2, 3]}, 10_000),
+    }
+    for label, (obj, number) in payloads.items():
+        assert fingerprint(obj) == full_string_fingerprint(obj), "digest mismatch"
+        t_old = best_ms(lambda: full_string_fingerprint(obj), number, args.repeat)
+        t_new = best_ms(lambda: fingerprint(obj), number, args.repeat)
+        m_old = peak_kib(lambda: full_string_fingerprint(obj))
+        m_new = peak_kib(lambda: fingerprint(obj))
+        print(f"{label:<28} full-string {t_old:9.3f} ms {m_old:10.1f} KiB peak   "
+              f"streaming {t_new:9.3f} ms {m_new:10.1f} KiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: allocations and time per recorded event, from emit to wire dict.
+
+Records a small @sim_trace call into an in-memory sink, then turns every
+event into an EventEnvelope and the batch into its wire dict, as the
+SenderWorker does.  Reports tracemalloc blocks and bytes allocated per
+event (measured separately for the request-thread part and the sender
+part), the retained size of one event, and wall time per event.
+
+Usage::
+
+    python benchmarks/bench_fixture_event.py [--events 20000]
+
+Stdlib only.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context  # noqa: E402
+from sim_sdk.sink.envelope import BatchRequest, fixture_to_envelope  # noqa: E402
+from sim_sdk.trace import sim_trace  # noqa: E402
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+
+    def emit(self, event: Any) -> None:
+        self.events.append(event)
+
+
+@sim_trace(name="pricing.quote")
+def quote(user_id, region):
+    return user_id
+
+
+def measure(fn: Callable[[], Any], n: int) -> Tuple[float, float, Any]:
+    """(blocks per event, bytes per event, result) still allocated after fn."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    return blocks / n, size / n, result
+
+
+def deep_size(event: Any) -> int:
+    size = sys.getsizeof(event)
+    attrs = getattr(event, "__dict__", None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+        values = attrs.values()
+    else:
+        values = [getattr(event, s, None) for s in type(event).__slots__]
+    return size + sum(sys.getsizeof(v) for v in values if isinstance(v, str))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20_000)
+    args = parser.parse_args()
+    n = args.events
+
+    sink = ListSink()
+    set_context(SimContext(mode=SimMode.RECORD, run_id="bench", sink=sink))
+    try:
+        def record() -> List[Any]:
+            for i in range(n):
+                quote(i, "eu")
+            return sink.events
+
+        blocks, size, events = measure(record, n)
+        print(f"record  {blocks:6.1f} blocks/event  {size:8.1f} bytes/event (retained)")
+
+        def to_wire() -> Any:
+            envelopes = [fixture_to_envelope(e, service="bench") for e in events]
+            return BatchRequest(envelopes=envelopes).to_wire()
+
+        blocks, size, _ = measure(to_wire, n)
+        print(f"wire    {blocks:6.1f} blocks/event  {size:8.1f} bytes/event")
+        print(f"event   {deep_size(events[0]):6d} bytes (object + attribute storage + strings)")
+
+        sink.events = []
+        start = time.perf_counter()
+        record()
+        record_us = (time.perf_counter() - start) / n * 1e6
+        start = time.perf_counter()
+        to_wire()
+        wire_us = (time.perf_counter() - start) / n * 1e6
+        print(f"time    record {record_us:6.2f} us/event  wire {wire_us:6.2f} us/event")
+    finally:
+        clear_context()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark: cost of the SDK primitives in off mode.
+
+Compares an undecorated call with @sim_trace decorated while the process
+mode is OFF (the trampoline), a decorated closure (the wrapper's process
+check), and the context path the SDK takes once the process mode is on but
+the current context is off.  Also times ``with sim_db(...)`` and
+``with sim_capture(...)`` blocks against a bare ``with nullcontext(...)``.
+
+Usage::
+
+    python benchmarks/bench_off_mode.py [--calls 200000]
+
+Stdlib only.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.capture import sim_capture  # noqa: E402
+from sim_sdk.context import (  # noqa: E402
+    SimContext,
+    SimMode,
+    clear_context,
+    set_context,
+    set_process_mode,
+)
+from sim_sdk.db import sim_db  # noqa: E402
+from sim_sdk.trace import sim_trace  # noqa: E402
+
+
+def quote(user_id, items, *, currency="USD"):
+    return user_id
+
+
+async def aquote(user_id, items):
+    return user_id
+
+
+def make_closure() -> Callable:
+    scale = 2
+
+    def scaled(user_id, items, *, currency="USD"):
+        return user_id * scale
+
+    return scaled
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return []
+
+
+DB = FakeDB()
+
+
+def with_sim_db() -> Any:
+    with sim_db(DB, name="pg") as db:
+        return db
+
+
+def with_nullcontext() -> Any:
+    with nullcontext(DB) as db:
+        return db
+
+
+def with_sim_capture() -> Any:
+    with sim_capture("tax") as cap:
+        cap.set_result(1)
+        return cap.result
+
+
+def per_call_ns(fn: Callable, args: tuple, kwargs: dict, calls: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            fn(*args, **kwargs)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / calls
+
+
+def async_per_call_ns(fn: Callable, args: tuple, calls: int, repeat: int) -> float:
+    async def drive() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                await fn(*args)
+            best = min(best, time.perf_counter_ns() - start)
+        return best
+
+    return asyncio.run(drive()) / calls
+
+
+def line(label: str, ns: float, base: float) -> None:
+    print(f"{label:<34} {ns:7.1f} ns/call  ({ns / base:4.2f}x undecorated)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run = (args.calls, args.repeat)
+    call_args, call_kwargs = (7, ["a", "b"]), {"currency": "EUR"}
+
+    set_process_mode(SimMode.OFF)
+    clear_context()
+    traced = sim_trace(quote)
+    closure = make_closure()
+    traced_closure = sim_trace(closure)
+    traced_async = sim_trace(aquote)
+
+    base = per_call_ns(quote, call_args, call_kwargs, *run)
+    line("undecorated", base, base)
+    line("@sim_trace, process off", per_call_ns(traced, call_args, call_kwargs, *run), base)
+    closure_base = per_call_ns(closure, call_args, call_kwargs, *run)
+    line("@sim_trace closure, process off",
+         per_call_ns(traced_closure, call_args, call_kwargs, *run), closure_base)
+
+    async_base = async_per_call_ns(aquote, call_args, *run)
+    line("async undecorated", async_base, async_base)
+    line("async @sim_trace, process off",
+         async_per_call_ns(traced_async, call_args, *run), async_base)
+
+    null_base = per_call_ns(with_nullcontext, (), {}, *run)
+    line("with nullcontext(db)", null_base, null_base)
+    line("with sim_db(db), process off", per_call_ns(with_sim_db, (), {}, *run), null_base)
+    line("with sim_capture, process off", per_call_ns(with_sim_capture, (), {}, *run), null_base)
+
+    # Process on, current context off: the per-call context lookup path
+    set_process_mode(SimMode.RECORD)
+    set_context(SimContext(mode=SimMode.OFF))
+    try:
+        line("@sim_trace, off context", per_call_ns(traced, call_args, call_kwargs, *run), base)
+        line("with sim_db(db), off context", per_call_ns(with_sim_db, (), {}, *run), null_base)
+    finally:
+        set_process_mode(SimMode.OFF)
+        clear_context()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: fallback SQL normalizers.
+
+Compares the single-pass tokenizer (``_normalize_sql_basic``) with the
+previous multi-pass regex normalizer and, when installed, the sqlparse
+path.  All calls bypass the normalization cache so every sample pays the
+full normalization cost.
+
+Usage::
+
+    python benchmarks/bench_sql_normalize.py [--repeat 5]
+
+Stdlib only (sqlparse is measured only if importable).
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.canonical import (  # noqa: E402
+    HAS_SQLPARSE,
+    _normalize_sql_basic,
+    _normalize_sql_regex,
+    _normalize_sql_with_parser,
+)
+
+QUERIES: Dict[str, str] = {
+    "point lookup": "select * from users where id = $1",
+    "insert": (
+        "INSERT INTO quotes (quote_id, user_id, subtotal, tax, total) "
+        "VALUES (?, ?, ?, ?, ?)"
+    ),
+    "report": """
+        SELECT u.id, u.name, COUNT(o.id) AS order_count -- per user
+        FROM users u
+        LEFT JOIN orders o ON u.id = o.user_id
+        WHERE u.active = true AND o.created_at >= %s
+        GROUP BY u.id, u.name
+        HAVING count(o.id) > 1
+        ORDER BY order_count DESC
+        LIMIT 10
+    """,
+    "in-list x200": "SELECT sku, name, price FROM products WHERE sku IN ("
+    + ", ".join(["%s"] * 200) + ")",
+}
+
+
+def best_us(fn: Callable[[], str], number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    impls = {
+        "tokenizer": _normalize_sql_basic,
+        "regex": _normalize_sql_regex,
+    }
+    if HAS_SQLPARSE:
+        impls["sqlparse"] = _normalize_sql_with_parser
+    else:
+        print("sqlparse not installed; skipping the parser path")
+
+    for label, query in QUERIES.items():
+        cells = []
+        for name, fn in impls.items():
+            t = best_us(lambda: fn(query, True), args.number, args.repeat)
+            cells.append(f"{name} {t:9.1f} us")
+        print(f"{label:<14} ({len(query):5d} chars)  " + "   ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: peak memory of one long-running @sim_trace call.
+
+Runs a traced batch function issuing many sim_db queries into a sink that
+drops events once "sent", so the only thing growing is the trace's own
+collected stubs.  Reports tracemalloc peak memory and wall time for
+several query counts, with the default stub budget and with spilling
+disabled.
+
+Usage::
+
+    python benchmarks/bench_stub_arena.py [--budget 1048576]
+
+Stdlib only.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context  # noqa: E402
+from sim_sdk.db import sim_db  # noqa: E402
+from sim_sdk.trace import sim_trace  # noqa: E402
+
+ROWS = 20
+
+
+class DropSink:
+    """Keeps only the root event, as if everything else had been sent."""
+
+    def __init__(self) -> None:
+        self.last: Any = None
+
+    def emit(self, event: Any) -> None:
+        self.last = event
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return [{"id": params[0] * ROWS + i, "status": "done", "note": "ok" * 20}
+                for i in range(ROWS)]
+
+
+@sim_trace(name="jobs.batch")
+def batch(n):
+    with sim_db(FakeDB(), name="pg") as db:
+        for i in range(n):
+            db.query("SELECT * FROM jobs WHERE batch = %s", [i])
+    return n
+
+
+def run(n: int, budget: Optional[int]) -> None:
+    sink = DropSink()
+    set_context(SimContext(
+        mode=SimMode.RECORD, run_id="bench", sink=sink, stub_budget_bytes=budget,
+    ))
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        batch(n)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        label = "off" if budget is None else f"{budget // 1024}KiB"
+        print(f"queries={n:6d}  budget={label:>8}  peak {peak / 2**20:7.1f} MiB  "
+              f"{elapsed / n * 1e6:7.1f} us/query")
+    finally:
+        clear_context()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=int, default=1 << 20)
+    args = parser.parse_args()
+
+    for n in (1_000, 5_000, 20_000):
+        run(n, None)
+        run(n, args.budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: per-call overhead of @sim_trace sync and async wrappers.
+
+Runs small functions with different signature shapes in record mode (events
+go to a sink that drops them) and reports the wrapper's cost per call, i.e.
+decorated time minus the undecorated baseline.  Also compares argument
+binding alone: per-call inspect.signature() against the binder that
+@sim_trace builds once at decoration time.
+
+Usage::
+
+    python benchmarks/bench_trace_overhead.py [--calls 20000]
+
+Stdlib only.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context  # noqa: E402
+from sim_sdk.sampling import SamplingPolicy  # noqa: E402
+from sim_sdk.trace import _bind_raw, _make_binder, sim_trace  # noqa: E402
+
+
+class NullSink:
+    def __init__(self, defer_serialization: bool = False):
+        self.defer_serialization = defer_serialization
+
+    def emit(self, event: Any) -> None:
+        pass
+
+
+def positional(a, b, c):
+    return a
+
+
+def with_defaults(a, b=2, *, scale=1.0, label="x"):
+    return a
+
+
+def keyword_only(*, user_id, region, currency="USD"):
+    return user_id
+
+
+def variadic(a, *rest, **extra):
+    return a
+
+
+async def async_positional(a, b, c):
+    return a
+
+
+def report(rows):
+    return {"count": len(rows), "rows": rows}
+
+
+ROWS = [{"id": i, "name": f"user{i}", "score": i * 0.5, "tags": ["a", "b"]} for i in range(500)]
+
+
+# label -> (function, args, kwargs)
+CASES: Dict[str, Tuple[Callable, tuple, dict]] = {
+    "positional call": (positional, (1, "two", 3.0), {}),
+    "defaults, partial": (with_defaults, (1,), {"label": "y"}),
+    "keyword-only call": (keyword_only, (), {"user_id": 7, "region": "eu"}),
+    "*args/**kwargs": (variadic, (1, 2, 3), {"k": "v"}),
+}
+
+
+def per_call_us(fn: Callable, args: tuple, kwargs: dict, calls: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def async_per_call_us(fn: Callable, args: tuple, calls: int, repeat: int) -> float:
+    async def drive() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(calls):
+                await fn(*args)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    return asyncio.run(drive()) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, (fn, call_args, call_kwargs) in CASES.items():
+        binder = _make_binder(fn)
+        per_call = per_call_us(_bind_raw, (fn, call_args, call_kwargs), {}, args.calls, args.repeat)
+        precomputed = per_call_us(binder, (call_args, call_kwargs), {}, args.calls, args.repeat)
+        print(f"bind  {label:<20} per-call signature {per_call:6.2f} us"
+              f"  precomputed {precomputed:6.2f} us  ({per_call / precomputed:4.1f}x)")
+
+    set_context(SimContext(mode=SimMode.RECORD, run_id="bench", sink=NullSink()))
+    try:
+        for label, (fn, call_args, call_kwargs) in CASES.items():
+            traced = sim_trace(fn)
+            base = per_call_us(fn, call_args, call_kwargs, args.calls, args.repeat)
+            wrapped = per_call_us(traced, call_args, call_kwargs, args.calls, args.repeat)
+            print(f"sync  {label:<20} overhead {wrapped - base:7.2f} us/call")
+
+        base = async_per_call_us(async_positional, (1, "two", 3.0), args.calls, args.repeat)
+        wrapped = async_per_call_us(
+            sim_trace(async_positional), (1, "two", 3.0), args.calls, args.repeat,
+        )
+        print(f"async {'positional call':<20} overhead {wrapped - base:7.2f} us/call")
+
+        set_context(SimContext(
+            mode=SimMode.RECORD, run_id="bench", sink=NullSink(),
+            sampling=SamplingPolicy(rate=0.0),
+        ))
+        fn, call_args, call_kwargs = CASES["positional call"]
+        base = per_call_us(fn, call_args, call_kwargs, args.calls, args.repeat)
+        wrapped = per_call_us(sim_trace(fn), call_args, call_kwargs, args.calls, args.repeat)
+        print(f"sync  {'sampled out':<20} overhead {wrapped - base:7.2f} us/call")
+
+        traced = sim_trace(report)
+        calls = max(1, args.calls // 50)
+        base = per_call_us(report, (ROWS,), {}, calls, args.repeat)
+        for defer in (False, True):
+            set_context(SimContext(
+                mode=SimMode.RECORD, run_id="bench", sink=NullSink(defer),
+            ))
+            wrapped = per_call_us(traced, (ROWS,), {}, calls, args.repeat)
+            label = "500 rows, deferred" if defer else "500 rows, eager"
+            print(f"sync  {label:<20} overhead {wrapped - base:7.2f} us/call")
+    finally:
+        clear_context()
+
+
+if __name__ == "__main__":
+    main()
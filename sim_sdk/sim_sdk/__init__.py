@@ -9,24 +9,49 @@ This is a framework-agnostic library that provides:
 Zero dependencies on web frameworks, HTTP libraries, or database drivers.
 """
 
-from .context import SimContext, SimMode, get_context, set_context, clear_context, init_sim, init_context
+from .context import (
+    SimContext,
+    SimMode,
+    get_context,
+    set_context,
+    clear_context,
+    init_sim,
+    init_context,
+    get_process_mode,
+    set_process_mode,
+)
+from .sampling import SamplingPolicy
+from .budget import OverheadBudget, RecordLevel
 from .errors import SimStubMissError
 from .trace import sim_trace
-from .stub_store import StubStore
+from .stub_store import StubStore, StubStoreCache, get_stub_store_cache
 from .replay_context import ReplayContext, get_replay_context, set_replay_context, clear_replay_context
 from .capture import sim_capture, CaptureHandle
 from .db import sim_db, SimWriteBlockedError, DBProxy
 from .http import sim_http, HTTPProxy, FakeResponse, HTTPError, normalize_url
 from .canonical import (
+    canonical_encode,
     canonicalize_json,
     fingerprint,
     fingerprint_short,
     normalize_sql,
     fingerprint_sql,
+    configure_sql_cache,
+    sql_cache_info,
+    set_fingerprint_algorithm,
+    get_fingerprint_algorithm,
 )
+from .serialization import register_serializer, unregister_serializer, configure_protobuf
 from .config import SimConfig, load_config
 from .redaction import redact, pseudonymize, create_redactor, create_pseudonymizer
-from .sink import RecordSink, AgentSink, AgentHttpClient, SenderMetrics
+from .sink import (
+    RecordSink,
+    AgentSink,
+    AgentHttpClient,
+    SenderMetrics,
+    OverheadMetrics,
+    get_overhead_metrics,
+)
 from .fixture import FixtureEvent
 
 __version__ = "0.1.0"
@@ -40,10 +65,17 @@ __all__ = [
     "clear_context",
     "init_sim",
     "init_context",
+    "get_process_mode",
+    "set_process_mode",
+    "SamplingPolicy",
+    "OverheadBudget",
+    "RecordLevel",
     # Primitives
     "sim_trace",
     "SimStubMissError",
     "StubStore",
+    "StubStoreCache",
+    "get_stub_store_cache",
     "sim_capture",
     "CaptureHandle",
     "sim_db",
@@ -55,11 +87,19 @@ __all__ = [
     "HTTPError",
     "normalize_url",
     # Canonicalization & Fingerprinting
+    "canonical_encode",
     "canonicalize_json",
     "fingerprint",
     "fingerprint_short",
     "normalize_sql",
     "fingerprint_sql",
+    "configure_sql_cache",
+    "sql_cache_info",
+    "set_fingerprint_algorithm",
+    "get_fingerprint_algorithm",
+    "register_serializer",
+    "unregister_serializer",
+    "configure_protobuf",
     # Configuration
     "SimConfig",
     "load_config",
@@ -73,6 +113,8 @@ __all__ = [
     "AgentSink",
     "AgentHttpClient",
     "SenderMetrics",
+    "OverheadMetrics",
+    "get_overhead_metrics",
     # Fixtures
     "FixtureEvent",
 ]
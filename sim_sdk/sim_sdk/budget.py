@@ -0,0 +1,237 @@
+"""
+Overhead budget: a circuit breaker that degrades recording under load.
+
+An OverheadBudget watches the SDK overhead of root @sim_trace calls (the
+wrapper itself plus every nested @sim_trace, sim_db, sim_http and
+sim_capture) and the sink's queue pressure.  Every ``window`` root calls it
+compares the window against the budget:
+
+- ``max_fraction``: total overhead / total root-call time (e.g. 0.02 = 2%)
+- ``max_p99_us``: p99 of per-call overhead in microseconds
+- ``max_queue_fill``: ``sink.queue_pressure()`` (0.0–1.0) at window end
+
+A window over any limit steps recording down one level::
+
+    FULL → SAMPLED → FINGERPRINT_ONLY → OFF
+
+- FULL: record everything (subject to any SamplingPolicy).
+- SAMPLED: record ``sampled_rate`` of root calls; the rest run as off.
+- FINGERPRINT_ONLY: root calls emit a "Metadata" FixtureEvent carrying
+  only input/output fingerprints, duration and error; nested primitives
+  run as off and no payloads or stubs are kept.
+- OFF: root calls run as off.
+
+Recovery has hysteresis: a level is raised one step only after
+``recover_windows`` consecutive windows in which every measure is below
+``recover_ratio`` times its limit.  Calls that were not recorded count as
+zero overhead, so windows keep closing at OFF and the budget probes back up.
+
+Level changes are logged and counted in the process-wide OverheadMetrics
+(``budget.step_down``, ``budget.step_up`` and ``budget.<from>-><to>``);
+``stats()`` returns the current level and counters.
+
+Usage::
+
+    budget = OverheadBudget(max_fraction=0.02, max_p99_us=500)
+    init_sim(mode=SimMode.RECORD, sink=sink, budget=budget)
+
+One budget is meant to be shared by all contexts of a process; it is
+thread-safe.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: enum, logging, math, random, threading, typing
+"""
+
+import logging
+import math
+import random
+import threading
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from .sink.overhead_metrics import get_overhead_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RecordLevel(Enum):
+    """How much of a root @sim_trace call is recorded, from most to least."""
+    FULL = "full"
+    SAMPLED = "sampled"
+    FINGERPRINT_ONLY = "fingerprint_only"
+    OFF = "off"
+
+
+_LEVELS = list(RecordLevel)
+
+
+def _queue_pressure(sink: Any) -> float:
+    """Fill ratio reported by the sink, or 0.0 if it does not report one."""
+    pressure = getattr(sink, "queue_pressure", None)
+    if not callable(pressure):
+        return 0.0
+    value = pressure()
+    # Sinks are duck-typed; ignore anything that is not a number.
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+class OverheadBudget:
+    """Step recording down when SDK overhead exceeds a budget.
+
+    Args:
+        max_fraction: Largest acceptable overhead / root-call time, or None.
+        max_p99_us: Largest acceptable p99 overhead per root call in
+            microseconds, or None.
+        max_queue_fill: Largest acceptable sink queue pressure, or None.
+        window: Root calls per evaluation window.
+        recover_windows: Consecutive healthy windows before stepping up.
+        recover_ratio: A window is healthy when every measure is below
+            this fraction of its limit.
+        sampled_rate: Share of root calls recorded at the SAMPLED level.
+
+    Raises:
+        ValueError: If a limit is not positive, window or recover_windows
+            is below 1, or a ratio is outside 0.0–1.0.
+    """
+
+    def __init__(
+        self,
+        max_fraction: Optional[float] = 0.02,
+        max_p99_us: Optional[float] = 500.0,
+        max_queue_fill: Optional[float] = 0.8,
+        window: int = 100,
+        recover_windows: int = 3,
+        recover_ratio: float = 0.5,
+        sampled_rate: float = 0.1,
+    ):
+        for label, limit in (
+            ("max_fraction", max_fraction),
+            ("max_p99_us", max_p99_us),
+            ("max_queue_fill", max_queue_fill),
+        ):
+            if limit is not None and limit <= 0:
+                raise ValueError(f"{label} must be > 0, got {limit}")
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        if recover_windows < 1:
+            raise ValueError(f"recover_windows must be >= 1, got {recover_windows}")
+        for label, ratio in (("recover_ratio", recover_ratio), ("sampled_rate", sampled_rate)):
+            if not 0.0 <= ratio <= 1.0:
+                raise ValueError(f"{label} must be between 0.0 and 1.0, got {ratio}")
+
+        self.max_fraction = max_fraction
+        self.max_p99_ns = None if max_p99_us is None else max_p99_us * 1000
+        self.max_queue_fill = max_queue_fill
+        self.window = window
+        self.recover_windows = recover_windows
+        self.recover_ratio = recover_ratio
+        self.sampled_rate = sampled_rate
+        self._random = random.random
+        self._lock = threading.Lock()
+        self._level = RecordLevel.FULL
+        self._samples: List[int] = []
+        self._elapsed_ns = 0
+        self._healthy = 0
+        self._step_downs = 0
+        self._step_ups = 0
+
+    @property
+    def level(self) -> RecordLevel:
+        """The current recording level."""
+        return self._level
+
+    def decide(self, sink: Any = None) -> RecordLevel:
+        """Level for one root call: FULL, FINGERPRINT_ONLY or OFF.
+
+        SAMPLED resolves to FULL or OFF.  A call decided OFF is observed
+        here as zero overhead; the caller observes every other call.
+        """
+        level = self._level
+        if level is RecordLevel.SAMPLED:
+            level = RecordLevel.FULL if self._random() < self.sampled_rate else RecordLevel.OFF
+        if level is RecordLevel.OFF:
+            self.observe(0, 0, sink)
+        return level
+
+    def observe(self, overhead_ns: int, elapsed_ns: int, sink: Any = None) -> None:
+        """Add one root call to the window; evaluate the window when full.
+
+        Args:
+            overhead_ns: SDK time spent on the call, nested primitives included.
+            elapsed_ns: Wall time of the call, overhead included.
+            sink: The context's sink, polled for queue pressure at window end.
+        """
+        with self._lock:
+            self._samples.append(overhead_ns)
+            self._elapsed_ns += elapsed_ns
+            if len(self._samples) < self.window:
+                return
+            samples, elapsed = self._samples, self._elapsed_ns
+            self._samples, self._elapsed_ns = [], 0
+        self._evaluate(samples, elapsed, _queue_pressure(sink))
+
+    def stats(self) -> Dict[str, Any]:
+        """Current level and number of level changes so far."""
+        return {
+            "level": self._level.value,
+            "step_downs": self._step_downs,
+            "step_ups": self._step_ups,
+        }
+
+    def reset(self) -> None:
+        """Return to FULL and forget the current window and counters."""
+        with self._lock:
+            self._level = RecordLevel.FULL
+            self._samples = []
+            self._elapsed_ns = 0
+            self._healthy = 0
+            self._step_downs = 0
+            self._step_ups = 0
+
+    def _evaluate(self, samples: List[int], elapsed_ns: int, pressure: float) -> None:
+        total = sum(samples)
+        fraction = total / elapsed_ns if elapsed_ns else 0.0
+        p99 = sorted(samples)[math.ceil(0.99 * len(samples)) - 1]
+
+        over = []
+        healthy = True
+        for label, value, limit in (
+            ("overhead fraction", fraction, self.max_fraction),
+            ("p99 overhead ns", p99, self.max_p99_ns),
+            ("queue pressure", pressure, self.max_queue_fill),
+        ):
+            if limit is None:
+                continue
+            if value > limit:
+                over.append(f"{label} {value:.4g} > {limit:.4g}")
+            if value >= limit * self.recover_ratio:
+                healthy = False
+
+        with self._lock:
+            index = _LEVELS.index(self._level)
+            if over:
+                self._healthy = 0
+                if index + 1 < len(_LEVELS):
+                    self._change(_LEVELS[index + 1], "; ".join(over))
+            elif healthy:
+                self._healthy += 1
+                if self._healthy >= self.recover_windows and index > 0:
+                    self._healthy = 0
+                    self._change(_LEVELS[index - 1], "recovered")
+            else:
+                self._healthy = 0
+
+    def _change(self, new: RecordLevel, reason: str) -> None:
+        """Switch levels and report it; callers hold the lock."""
+        old = self._level
+        self._level = new
+        stepped_down = _LEVELS.index(new) > _LEVELS.index(old)
+        if stepped_down:
+            self._step_downs += 1
+            logger.warning("sim overhead budget: %s -> %s (%s)", old.value, new.value, reason)
+        else:
+            self._step_ups += 1
+            logger.info("sim overhead budget: %s -> %s (%s)", old.value, new.value, reason)
+        metrics = get_overhead_metrics()
+        metrics.increment("budget.step_down" if stepped_down else "budget.step_up")
+        metrics.increment(f"budget.{old.value}->{new.value}")
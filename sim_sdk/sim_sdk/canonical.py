@@ -7,23 +7,47 @@ for generating stable fixture identifiers.
 Supports serialization of:
 - Standard JSON types
 - Datetime objects
-- Protobuf messages (optional, requires protobuf package)
+- Protobuf messages (optional, requires protobuf package; hashed from
+  their deterministic binary encoding)
 - Avro records (optional, requires fastavro package)
+- NumPy arrays and buffer-protocol objects (hashed via the raw buffer)
 """
 
+import array
+import base64
+import datetime
+import functools
 import json
 import hashlib
-from typing import Any, Dict, List, Optional
+import os
+import re
+from json.encoder import encode_basestring as _encode_str
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .serialization import (
+    HAS_NUMPY,
+    HAS_PROTOBUF,
+    PROTOBUF_TAG,
+    ProtobufMessage,
+    TypeDispatcher,
+    _buffer_to_serializable,
+    _dict_to_serializable,
+    _identity,
+    _ndarray_to_serializable,
+    _np,
+    _protobuf_to_serializable,
+    _sequence_to_serializable,
+    buffer_parts,
+    protobuf_bytes,
+    value_handler,
+)
 
-# Optional dependencies for structured data formats
 try:
-    from google.protobuf.message import Message as ProtobufMessage
-    from google.protobuf.json_format import MessageToDict
-    HAS_PROTOBUF = True
-except ImportError:
-    HAS_PROTOBUF = False
-    ProtobufMessage = None
+    from json.encoder import c_make_encoder as _c_make_encoder
+except ImportError:  # pragma: no cover - pure-Python json build
+    _c_make_encoder = None
 
+# Optional dependencies for structured data formats
 try:
     import fastavro
     HAS_AVRO = True
@@ -36,6 +60,13 @@ try:
 except ImportError:
     HAS_SQLPARSE = False
 
+# Optional fast non-cryptographic hash for fingerprints
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
 
 def canonicalize_json(obj: Any) -> str:
     """
@@ -65,16 +96,75 @@ def fingerprint(obj: Any) -> str:
     """
     Generate a content-based fingerprint (hash) of an object.
     
-    Uses SHA-256 hash of the canonical JSON representation.
+    Hashes the canonical JSON representation with the active fingerprint
+    algorithm (SHA-256 unless changed via set_fingerprint_algorithm).  The
+    canonical JSON is fed to the hash incrementally, so large payloads are
+    never held as one complete string; the digest is byte-identical to
+    hashing ``canonicalize_json(obj)``.
     
     Args:
         obj: Python object to fingerprint
         
     Returns:
-        Hexadecimal hash string (64 characters)
+        Hexadecimal hash string (64 characters for SHA-256)
+    """
+    if _c_make_encoder is None or not _worth_streaming(obj):
+        canonical = canonicalize_json(obj)
+        return _new_hash(canonical.encode('utf-8')).hexdigest()
+
+    writer = _HashWriter()
+    encode = _c_make_encoder(
+        {}, _default_serializer, _encode_str, None, ':', ',', True, False, True,
+    )
+    _stream_canonical(obj, writer, encode, 0)
+    return writer.hexdigest()
+
+
+def canonical_encode(obj: Any) -> Tuple[Any, str]:
     """
-    canonical = canonicalize_json(obj)
-    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    Convert, canonicalize and fingerprint an object in a single traversal.
+
+    Produces the same serializable value as ``trace._make_serializable`` and
+    the same hash as ``fingerprint()`` of that value, but walks the object
+    graph once: each node is converted and its canonical JSON emitted in the
+    same step, instead of building the converted copy and then re-walking it
+    through ``json.dumps``.
+
+    Args:
+        obj: Python object to encode
+
+    Returns:
+        Tuple of (serializable copy of obj, hex digest as from fingerprint())
+    """
+    writer = _HashWriter()
+    value = _encode_node(obj, writer, {})
+    return value, writer.hexdigest()
+
+
+def canonical_fingerprint(obj: Any, algorithm: str) -> str:
+    """
+    The fingerprint canonical_encode() gives obj, hashed with *algorithm*.
+
+    Lets fingerprints recorded under another algorithm be checked against
+    their recorded input without switching the process-wide one.
+
+    Raises:
+        ValueError: If the algorithm is unknown or its package is missing.
+    """
+    factory = _HASH_FACTORIES.get(algorithm)
+    if factory is None:
+        raise ValueError(f"Unknown fingerprint algorithm {algorithm!r}")
+    writer = _HashWriter(factory)
+    _encode_node(obj, writer, {})
+    return writer.hexdigest()
+
+
+def canonical_encode_sized(obj: Any) -> Tuple[Any, str, int]:
+    """canonical_encode() that also returns the canonical JSON size in bytes."""
+    writer = _HashWriter()
+    value = _encode_node(obj, writer, {})
+    digest = writer.hexdigest()
+    return value, digest, writer.size
 
 
 def fingerprint_short(obj: Any, length: int = 16) -> str:
@@ -118,7 +208,14 @@ def normalize_sql(query: str, strip_comments: bool = True) -> str:
     """
     if not query or not isinstance(query, str):
         return query
-    
+
+    if len(query) <= _SQL_CACHE_MAX_QUERY_CHARS:
+        return _sql_cache(query, strip_comments)[0]
+    return _normalize_sql_uncached(query, strip_comments)
+
+
+def _normalize_sql_uncached(query: str, strip_comments: bool) -> str:
+    """Dispatch to the sqlparse or basic normalizer without caching."""
     if HAS_SQLPARSE:
         # Use sqlparse for robust SQL normalization
         return _normalize_sql_with_parser(query, strip_comments)
@@ -127,6 +224,128 @@ def normalize_sql(query: str, strip_comments: bool = True) -> str:
         return _normalize_sql_basic(query, strip_comments)
 
 
+# ---------------------------------------------------------------------------
+# Fingerprint hash algorithm
+# ---------------------------------------------------------------------------
+
+DEFAULT_FINGERPRINT_ALGORITHM = "sha256"
+
+
+def _blake2b_128(data: bytes = b"") -> Any:
+    return hashlib.blake2b(data, digest_size=16)
+
+
+# name → factory(data=b"") returning a hashlib-style object
+_HASH_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b-128": _blake2b_128,
+}
+if HAS_XXHASH:
+    _HASH_FACTORIES["xxh3-128"] = xxhash.xxh3_128
+
+_fingerprint_algorithm = DEFAULT_FINGERPRINT_ALGORITHM
+_new_hash: Callable[..., Any] = hashlib.sha256
+
+
+def set_fingerprint_algorithm(name: str) -> None:
+    """
+    Select the hash used by every fingerprint the SDK computes.
+
+    Fingerprints are stub lookup keys, not security boundaries, so a cheaper
+    hash is fine.  The chosen name is stamped into each FixtureEvent
+    (``fingerprint_algorithm``) and StubStore re-keys stubs recorded with a
+    different algorithm at load time, so fixtures recorded before a switch
+    keep replaying.
+
+    This is process-wide; call it once at startup, before recording or
+    replaying.
+
+    Args:
+        name: ``"sha256"`` (default), ``"blake2b-128"`` (stdlib, 32 hex
+            chars) or ``"xxh3-128"`` (requires the optional ``xxhash``
+            package).
+
+    Raises:
+        ValueError: If the algorithm is unknown or its package is missing.
+    """
+    global _fingerprint_algorithm, _new_hash
+    factory = _HASH_FACTORIES.get(name)
+    if factory is None:
+        hint = " (install the xxhash package)" if name == "xxh3-128" else ""
+        raise ValueError(
+            f"Unknown fingerprint algorithm {name!r}{hint}; "
+            f"available: {', '.join(sorted(_HASH_FACTORIES))}"
+        )
+    _fingerprint_algorithm = name
+    _new_hash = factory
+    # Cached SQL fingerprints were computed with the previous hash.
+    _sql_cache.cache_clear()
+
+
+def get_fingerprint_algorithm() -> str:
+    """Return the name of the active fingerprint algorithm."""
+    return _fingerprint_algorithm
+
+
+# ---------------------------------------------------------------------------
+# SQL normalization cache
+# ---------------------------------------------------------------------------
+
+_SQL_CACHE_DEFAULT_ENTRIES = 2048
+# Longer statements (bulk INSERTs with inlined values, generated IN lists)
+# are almost never repeated verbatim; caching them would only pin memory.
+_SQL_CACHE_MAX_QUERY_CHARS = 8192
+
+
+def _sql_cache_entry(query: str, strip_comments: bool) -> Tuple[str, str]:
+    """Compute (normalized_sql, fingerprint) for one raw statement."""
+    normalized = _normalize_sql_uncached(query, strip_comments)
+    return normalized, fingerprint(normalized)
+
+
+_sql_cache = functools.lru_cache(maxsize=_SQL_CACHE_DEFAULT_ENTRIES)(_sql_cache_entry)
+
+if os.environ.get("SIM_FINGERPRINT_ALGORITHM"):
+    set_fingerprint_algorithm(os.environ["SIM_FINGERPRINT_ALGORITHM"])
+
+
+def configure_sql_cache(max_entries: int = _SQL_CACHE_DEFAULT_ENTRIES) -> None:
+    """
+    Resize the SQL normalization cache, discarding its contents and counters.
+
+    The cache is keyed on the raw SQL text (plus ``strip_comments``) and
+    holds both the normalized statement and its fingerprint, so a repeated
+    statement skips sqlparse / the regex normalizer and the hash entirely.
+
+    Args:
+        max_entries: Maximum number of cached statements (LRU eviction).
+            0 disables caching.
+    """
+    global _sql_cache
+    if max_entries < 0:
+        raise ValueError("max_entries must be >= 0")
+    _sql_cache = functools.lru_cache(maxsize=max_entries)(_sql_cache_entry)
+
+
+def sql_cache_info() -> Dict[str, Any]:
+    """
+    Return SQL normalization cache counters.
+
+    Returns:
+        Dict with ``hits``, ``misses``, ``size``, ``max_size`` and
+        ``hit_rate`` (0.0 when the cache has not been queried yet).
+    """
+    info = _sql_cache.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
 def _normalize_sql_with_parser(query: str, strip_comments: bool) -> str:
     """
     Normalize SQL using sqlparse library.
@@ -161,65 +380,123 @@ def _normalize_sql_with_parser(query: str, strip_comments: bool) -> str:
     return normalized.strip()
 
 
+# Keywords uppercased by the fallback normalizer. Matching is on whole
+# identifier-like words, so ``user_id`` or ``orders`` are never touched.
+_SQL_KEYWORDS = frozenset([
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'LIKE',
+    'INSERT', 'INTO', 'VALUES', 'UPDATE', 'SET', 'DELETE',
+    'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'ON', 'AS',
+    'ORDER', 'BY', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
+    'CREATE', 'TABLE', 'DROP', 'ALTER', 'ADD', 'COLUMN',
+    'PRIMARY', 'KEY', 'FOREIGN', 'REFERENCES', 'INDEX',
+    'DISTINCT', 'COUNT', 'SUM', 'AVG', 'MAX', 'MIN',
+    'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'NULL', 'IS',
+])
+
+# One alternation covering every token class the fallback normalizer cares
+# about. Literals and quoted identifiers are matched as a whole (including
+# doubled-quote escapes and Postgres dollar quoting) so nothing inside them
+# is rewritten; an unterminated literal or comment runs to the end of input.
+_SQL_TOKEN_RE = re.compile(
+    r"""
+      (?P<word>\w+)
+    | (?P<ws>\s+)
+    | (?P<op>[=<>])
+    | (?P<line_comment>--[^\n]*)
+    | (?P<block_comment>/\*.*?(?:\*/|\Z))
+    | (?P<literal>
+          '[^']*(?:''[^']*)*'?
+        | "[^"]*(?:""[^"]*)*"?
+        | `[^`]*`?
+        | \$(?P<dollar_tag>(?:[^\W\d]\w*)?)\$.*?(?:\$(?P=dollar_tag)\$|\Z)
+      )
+    | (?P<other>[^\w\s=<>'"`$/-]+|.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
 def _normalize_sql_basic(query: str, strip_comments: bool) -> str:
     """
     Basic SQL normalization without sqlparse.
-    
-    Less robust but handles common cases:
+
+    A single scan over the query with one compiled tokenizer:
     - Collapses whitespace
-    - Normalizes spacing around operators
+    - Puts single spaces around ``=``, ``<`` and ``>``
     - Uppercases SQL keywords
-    - Optionally removes comments
-    
+    - Optionally removes comments (kept comments only have whitespace collapsed)
+    - Leaves string literals and quoted identifiers untouched
+
+    For statements without literals or comments the output is identical to
+    the previous regex-based normalizer (see ``_normalize_sql_regex``), so
+    existing fingerprints stay stable.
+
     Args:
         query: SQL query string
         strip_comments: Whether to remove comments
-        
+
     Returns:
         Normalized SQL string
     """
+    out: List[str] = []
+    append = out.append
+    keywords = _SQL_KEYWORDS
+    space = False
+
+    for match in _SQL_TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        if kind == 'ws':
+            space = True
+            continue
+        if kind == 'op':
+            if out:
+                append(' ')
+            append(match.group())
+            space = True
+            continue
+        if kind == 'line_comment' or kind == 'block_comment':
+            if strip_comments:
+                continue
+            token = ' '.join(match.group().split())
+        elif kind == 'word':
+            token = match.group()
+            upper = token.upper()
+            if upper in keywords:
+                token = upper
+        else:
+            token = match.group()
+        if space and out:
+            append(' ')
+        append(token)
+        space = False
+
+    return ''.join(out)
+
+
+def _normalize_sql_regex(query: str, strip_comments: bool) -> str:
+    """
+    Previous multi-pass regex fallback normalizer.
+
+    Kept as the reference implementation for the equivalence tests and the
+    SQL normalization benchmark; not used on any runtime path.
+    """
     import re
-    
-    # Remove SQL comments if requested
+
     if strip_comments:
-        # Remove single-line comments (-- ...)
         query = re.sub(r'--[^\n]*', '', query)
-        # Remove multi-line comments (/* ... */)
         query = re.sub(r'/\*.*?\*/', '', query, flags=re.DOTALL)
-    
-    # Collapse multiple whitespace (including newlines) into single space
+
     query = re.sub(r'\s+', ' ', query)
-    
-    # Normalize spacing around common operators
-    # Add space around =, <, >, !=, <=, >=
-    operators = ['=', '!=', '<=', '>=', '<', '>']
-    for op in operators:
-        # Remove existing spaces around operator
+
+    for op in ['=', '!=', '<=', '>=', '<', '>']:
         query = re.sub(r'\s*' + re.escape(op) + r'\s*', op, query)
-        # Add consistent spacing
         query = query.replace(op, f' {op} ')
-    
-    # Clean up any double spaces created
+
     query = re.sub(r'\s+', ' ', query)
-    
-    # Uppercase common SQL keywords
-    keywords = [
-        'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'LIKE',
-        'INSERT', 'INTO', 'VALUES', 'UPDATE', 'SET', 'DELETE',
-        'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'ON', 'AS',
-        'ORDER', 'BY', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
-        'CREATE', 'TABLE', 'DROP', 'ALTER', 'ADD', 'COLUMN',
-        'PRIMARY', 'KEY', 'FOREIGN', 'REFERENCES', 'INDEX',
-        'DISTINCT', 'COUNT', 'SUM', 'AVG', 'MAX', 'MIN',
-        'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'NULL', 'IS',
-    ]
-    
-    # Build regex pattern for word boundaries
-    for keyword in keywords:
-        # Use word boundaries to avoid replacing parts of identifiers
-        pattern = r'\b' + keyword + r'\b'
-        query = re.sub(pattern, keyword, query, flags=re.IGNORECASE)
-    
+
+    for keyword in _SQL_KEYWORDS:
+        query = re.sub(r'\b' + keyword + r'\b', keyword, query, flags=re.IGNORECASE)
+
     return query.strip()
 
 
@@ -243,21 +520,295 @@ def fingerprint_sql(query: str, strip_comments: bool = True) -> str:
         >>> fingerprint_sql(q1) == fingerprint_sql(q2)
         True
     """
+    if query and isinstance(query, str) and len(query) <= _SQL_CACHE_MAX_QUERY_CHARS:
+        return _sql_cache(query, strip_comments)[1]
     normalized = normalize_sql(query, strip_comments=strip_comments)
     return fingerprint(normalized)
 
 
+# ---------------------------------------------------------------------------
+# Incremental hashing
+# ---------------------------------------------------------------------------
+
+# Pending chunks are joined and hashed once this many have accumulated.
+_FLUSH_CHUNKS = 4096
+# fingerprint() walks this many container levels in Python before handing
+# whole subtrees to the C encoder.
+_STREAM_MAX_DEPTH = 3
+# Number of sibling values C-encoded per call while streaming a container.
+_STREAM_BATCH = 256
+
+
+class _HashWriter:
+    """Collects canonical JSON chunks and feeds them to the hash in batches.
+
+    UTF-8 encoding is chunk-independent, so hashing the encoded chunks in
+    order gives the same digest as hashing the encoded full string.
+    """
+
+    __slots__ = ("new_hash", "_hash", "_parts", "write", "size")
+
+    def __init__(self, new_hash: Optional[Callable[..., Any]] = None) -> None:
+        # Hash factory, also used for the digests of buffers and messages
+        self.new_hash = _new_hash if new_hash is None else new_hash
+        self._hash = self.new_hash()
+        self._parts: List[str] = []
+        self.write = self._parts.append
+        # UTF-8 bytes hashed so far
+        self.size = 0
+
+    def maybe_flush(self) -> None:
+        if len(self._parts) >= _FLUSH_CHUNKS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            data = ''.join(self._parts).encode('utf-8')
+            self._hash.update(data)
+            self.size += len(data)
+            self._parts.clear()
+
+    def hexdigest(self) -> str:
+        self.flush()
+        return self._hash.hexdigest()
+
+
+def _is_large_container(value: Any) -> bool:
+    return isinstance(value, (dict, list, tuple)) and len(value) > _STREAM_BATCH
+
+
+def _worth_streaming(obj: Any) -> bool:
+    """True if obj or one of its direct members is a large container.
+
+    Small payloads are cheaper to encode in one C call than to stream.
+    """
+    if not isinstance(obj, (dict, list, tuple)):
+        return False
+    if len(obj) > _STREAM_BATCH:
+        return True
+    members = obj.values() if isinstance(obj, dict) else obj
+    return any(_is_large_container(m) for m in members)
+
+
+def _stream_canonical(
+    obj: Any, writer: _HashWriter, encode: Callable[[Any, int], Any], depth: int,
+) -> None:
+    """Write canonical JSON for ``obj`` to ``writer`` without building it whole.
+
+    Large containers (more than ``_STREAM_BATCH`` members) in the top
+    ``_STREAM_MAX_DEPTH`` levels are walked here; all other children are
+    C-encoded in batches of ``_STREAM_BATCH`` (a list slice or a sub-dict of
+    consecutive sorted items) with the encoder's outer brackets stripped, so
+    a list of many small rows costs one C call per batch, not per row.  This mirrors json.dumps exactly: dict items are sorted as
+    ``(key, value)`` pairs like the C encoder does, and key conversion and
+    the default hook are left to the same C encoder.
+    """
+    is_dict = isinstance(obj, dict)
+    if is_dict:
+        children: List[Any] = sorted(obj.items())
+        open_, close = '{', '}'
+    else:
+        children = list(obj)
+        open_, close = '[', ']'
+    if not children:
+        writer.write(open_ + close)
+        return
+
+    descend = depth + 1 < _STREAM_MAX_DEPTH
+    writer.write(open_)
+    first = True
+    batch: List[Any] = []
+
+    def flush_batch() -> None:
+        nonlocal first
+        chunk = ''.join(encode(dict(batch) if is_dict else batch, 0))
+        writer.write(chunk[1:-1] if first else ',' + chunk[1:-1])
+        writer.flush()
+        first = False
+        batch.clear()
+
+    for child in children:
+        value = child[1] if is_dict else child
+        if descend and _is_large_container(value):
+            if batch:
+                flush_batch()
+            if not first:
+                writer.write(',')
+            if is_dict:
+                # '{"<key>":null}' minus the braces and 'null': the C encoder
+                # converts the key exactly as it would inside the batch path.
+                writer.write(''.join(encode({child[0]: None}, 0))[1:-5])
+            _stream_canonical(value, writer, encode, depth + 1)
+            first = False
+        else:
+            batch.append(child)
+            if len(batch) >= _STREAM_BATCH:
+                flush_batch()
+    if batch:
+        flush_batch()
+    writer.write(close)
+
+
+# ---------------------------------------------------------------------------
+# Single-pass encoder internals
+# ---------------------------------------------------------------------------
+
+_INFINITY = float('inf')
+
+
+def _encode_float(value: float) -> str:
+    """Match json.dumps float output, including NaN/Infinity spellings."""
+    if value != value:
+        return 'NaN'
+    if value == _INFINITY:
+        return 'Infinity'
+    if value == -_INFINITY:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _encode_bool(value: bool) -> str:
+    return 'true' if value else 'false'
+
+
+def _encode_null(value: None) -> str:
+    return 'null'
+
+
+# Exact-type table for values that are emitted as-is (no conversion).
+_SCALAR_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    str: _encode_str,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: _encode_bool,
+    type(None): _encode_null,
+}
+
+_STR_ONLY = {str}
+
+
+def _encode_node(
+    value: Any, writer: _HashWriter, key_cache: Dict[str, str],
+) -> Any:
+    """Emit canonical JSON for ``value`` and return its serializable form.
+
+    ``key_cache`` maps dict keys to their encoded ``,"key":`` prefix so keys
+    that repeat across rows are escaped once per encode call.
+    """
+    vtype = type(value)
+    emit = writer.write
+    scalar = _SCALAR_ENCODERS.get
+
+    if vtype is dict:
+        out: Dict[str, Any] = dict(value)
+        if not out:
+            emit('{}')
+            return out
+        if {*map(type, out)} != _STR_ONLY:
+            out = {k if type(k) is str else str(k): v for k, v in value.items()}
+        emit('{')
+        first = True
+        # Overwrite in sorted order so the returned dict keeps insertion order
+        for k in sorted(out):
+            prefix = key_cache.get(k)
+            if prefix is None:
+                prefix = key_cache[k] = ',' + _encode_str(k) + ':'
+            if first:
+                emit(prefix[1:])
+                first = False
+            else:
+                emit(prefix)
+            v = out[k]
+            enc = scalar(type(v))
+            if enc is not None:
+                emit(enc(v))
+            else:
+                out[k] = _encode_node(v, writer, key_cache)
+        emit('}')
+        writer.maybe_flush()
+        return out
+
+    if vtype is list or vtype is tuple:
+        items = list(value)
+        if not items:
+            emit('[]')
+            return items
+        sep = '['
+        for i, v in enumerate(items):
+            enc = scalar(type(v))
+            if enc is not None:
+                emit(sep + enc(v))
+            else:
+                emit(sep)
+                items[i] = _encode_node(v, writer, key_cache)
+            sep = ','
+        emit(']')
+        writer.maybe_flush()
+        return items
+
+    enc = scalar(vtype)
+    if enc is not None:
+        emit(enc(value))
+        return value
+
+    return _encode_other(value, writer, key_cache)
+
+
+def _encode_other(
+    value: Any, writer: _HashWriter, key_cache: Dict[str, str],
+) -> Any:
+    """Slow path for subclasses and non-JSON types, via the value dispatcher."""
+    emit = writer.write
+    handler = value_handler(value)
+    # Exact bool/None never reach here, and bool cannot be subclassed.
+    if handler is _identity:
+        if isinstance(value, str):
+            emit(_encode_str(value))
+        elif isinstance(value, int):
+            emit(int.__repr__(value))
+        else:
+            emit(_encode_float(value))
+        return value
+    if handler is _dict_to_serializable:
+        return _encode_node(dict(value), writer, key_cache)
+    if handler is _sequence_to_serializable:
+        return _encode_node(list(value), writer, key_cache)
+    if handler is float:
+        converted = float(value)
+        emit(_encode_float(converted))
+        return converted
+    if handler is _ndarray_to_serializable or handler is _buffer_to_serializable:
+        hashed = _buffer_hash_form(value, writer.new_hash)
+        if hashed is not None:
+            # Fingerprint the raw buffer; the fixture keeps the compact copy.
+            _encode_node(hashed, writer, key_cache)
+            return handler(value)
+    if handler is _protobuf_to_serializable:
+        _encode_node(_protobuf_hash_form(value, writer.new_hash), writer, key_cache)
+        return handler(value)
+    custom = getattr(handler, 'custom', None)
+    converted = custom(value) if custom is not None else handler(value)
+    if type(converted) is str:
+        emit(_encode_str(converted))
+        return converted
+    return _encode_node(converted, writer, key_cache)
+
+
 def _default_serializer(obj: Any) -> Any:
     """
     Default serializer for objects that aren't JSON-serializable.
     
-    Handles:
+    Handles, after any serializer registered via register_serializer:
     - Datetime objects (ISO format)
-    - Protobuf messages (with default values included for determinism)
+    - Protobuf messages (type name and digest of the deterministic binary)
     - Avro records
+    - Bytes (base64) and sets (sorted)
+    - NumPy arrays and buffers (dtype/format, shape and raw-buffer digest)
     - Generic objects with __dict__
     - Iterables
     
+    The handler is resolved once per type and cached.
+    
     Args:
         obj: Object to serialize
         
@@ -267,46 +818,108 @@ def _default_serializer(obj: Any) -> Any:
     Raises:
         TypeError: If object cannot be serialized
     """
-    # Handle datetime objects
+    handler = _json_dispatcher.handlers.get(type(obj))
+    if handler is None:
+        handler = _json_dispatcher.lookup(obj)
+    return handler(obj)
+
+
+def _isoformat(obj: Any) -> str:
+    return obj.isoformat()
+
+
+def _protobuf_hash_form(
+    obj: Any, new_hash: Optional[Callable[..., Any]] = None,
+) -> Dict[str, Any]:
+    """Message type plus a digest of its deterministic binary encoding."""
+    if new_hash is None:
+        new_hash = _new_hash
+    return {PROTOBUF_TAG: {
+        "type": obj.DESCRIPTOR.full_name,
+        "digest": new_hash(protobuf_bytes(obj)).hexdigest(),
+    }}
+
+
+def _bytes_to_base64(obj: bytes) -> Dict[str, str]:
+    # Base64 encode for JSON compatibility
+    return {"__bytes__": base64.b64encode(obj).decode('ascii')}
+
+
+def _set_to_sorted_list(obj: Any) -> List[Any]:
+    # Sorted for determinism
+    return sorted(list(obj), key=lambda x: str(x))
+
+
+def _instance_dict(obj: Any) -> Dict[str, Any]:
+    return obj.__dict__
+
+
+def _buffer_hash_form(
+    obj: Any, new_hash: Optional[Callable[..., Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Header plus a digest of the raw bytes, hashed in place via the buffer protocol.
+
+    This is what arrays and buffers contribute to a fingerprint: hashing the
+    buffer directly avoids building (and re-hashing) the base64 text.
+    """
+    parts = buffer_parts(obj)
+    if parts is None:
+        return None
+    tag, header, raw = parts
+    if new_hash is None:
+        new_hash = _new_hash
+    header["digest"] = new_hash(raw).hexdigest()
+    return {tag: header}
+
+
+def _ndarray_hash_form(obj: Any) -> Any:
+    hashed = _buffer_hash_form(obj)
+    return obj.tolist() if hashed is None else hashed
+
+
+def _not_serializable(obj: Any) -> Any:
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable. "
+        f"Consider adding custom serialization logic."
+    )
+
+
+def _resolve_json_default(obj: Any) -> Callable[[Any], Any]:
+    """Built-in rules of the json default hook, in their original order."""
     if hasattr(obj, 'isoformat'):
-        return obj.isoformat()
-    
-    # Handle Protobuf messages
+        return _isoformat
     if HAS_PROTOBUF and isinstance(obj, ProtobufMessage):
-        return MessageToDict(
-            obj,
-            preserving_proto_field_name=True,
-            including_default_value_fields=True,  # Critical for determinism
-            use_integers_for_enums=False,  # Use enum names for readability
-        )
-    
-    # Handle Avro records (fastavro specific types)
+        return _protobuf_hash_form
     if HAS_AVRO and hasattr(obj, '__class__') and hasattr(obj.__class__, '__avro_schema__'):
-        # Avro record - serialize with schema info
-        return _serialize_avro_record(obj)
-    
-    # Handle bytes (common in protobuf/avro)
+        return _serialize_avro_record
     if isinstance(obj, bytes):
-        # Base64 encode for JSON compatibility
-        import base64
-        return {"__bytes__": base64.b64encode(obj).decode('ascii')}
-    
-    # Handle sets (convert to sorted list for determinism)
+        return _bytes_to_base64
+    if isinstance(obj, (bytearray, memoryview, array.array)):
+        return _buffer_hash_form
+    if HAS_NUMPY and isinstance(obj, _np.ndarray):
+        return _ndarray_hash_form
     if isinstance(obj, set):
-        return sorted(list(obj), key=lambda x: str(x))
-    
-    # Handle generic objects with __dict__
+        return _set_to_sorted_list
     if hasattr(obj, '__dict__'):
-        return obj.__dict__
-    
-    # Handle iterables (excluding strings)
+        return _instance_dict
     if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes)):
-        return list(obj)
-    
-    raise TypeError(
-        f"Object of type {type(obj).__name__} is not JSON serializable. "
-        f"Consider adding custom serialization logic."
-    )
+        return list
+    return _not_serializable
+
+
+_json_dispatcher = TypeDispatcher(
+    {
+        bytes: _bytes_to_base64,
+        bytearray: _buffer_hash_form,
+        memoryview: _buffer_hash_form,
+        array.array: _buffer_hash_form,
+        set: _set_to_sorted_list,
+        datetime.datetime: _isoformat,
+        datetime.date: _isoformat,
+    },
+    _resolve_json_default,
+    lambda fn: fn,
+)
 
 
 def _serialize_avro_record(record: Any) -> Dict[str, Any]:
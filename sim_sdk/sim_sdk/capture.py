@@ -17,14 +17,17 @@ Supports both sync (`with`) and async (`async with`) context managers.
 
 import json
 import logging
-import uuid
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from . import context as _context
 from .context import SimContext, SimMode, get_context
+from .deferred import DeferredEvent, defers_serialization, snapshot
 from .errors import SimStubMissError
 from .fixture.schema import FixtureEvent
+from .sink.overhead_metrics import get_overhead_metrics
+from .stub_refs import encode_for_ref, stub_ref, uses_stub_refs
 from .trace import _make_serializable
 
 logger = logging.getLogger(__name__)
@@ -44,22 +47,37 @@ def _capture_key(label: str, ordinal: int) -> str:
     return f"__capture__/{safe_label}_{ordinal}.json"
 
 
-def _write_capture(label: str, ordinal: int, result: Any, ctx: SimContext) -> None:
-    """Persist a capture result to sink or stub_dir."""
-    key = _capture_key(label, ordinal)
-
+def _capture_event(
+    label: str, ordinal: int, result_data: Any, run_id: str,
+    recorded_ns: Optional[int] = None, result_fp: str = "",
+) -> FixtureEvent:
+    """Build the Stub FixtureEvent for a capture result."""
+    return FixtureEvent(
+        qualname=f"capture:{label}",
+        run_id=run_id,
+        recorded_ns=recorded_ns,
+        output=result_data,
+        output_fingerprint=result_fp,
+        ordinal=ordinal,
+        storage_key=_capture_key(label, ordinal),
+        event_type="Stub",
+    )
+
+
+def _write_capture(
+    label: str, ordinal: int, result_data: Any, ctx: SimContext, result_fp: str = "",
+) -> None:
+    """Persist an already-serialized capture result to sink or stub_dir."""
     if ctx.sink is not None:
-        event = FixtureEvent(
-            fixture_id=str(uuid.uuid4())[:8],
-            qualname=f"capture:{label}",
-            run_id=ctx.run_id,
-            recorded_at=datetime.now(timezone.utc).isoformat(),
-            output=_make_serializable(result),
-            ordinal=ordinal,
-            storage_key=key,
-            event_type="Stub",
-        )
+        t0 = time.perf_counter_ns()
+        event = _capture_event(label, ordinal, result_data, ctx.run_id, result_fp=result_fp)
+        t1 = time.perf_counter_ns()
         ctx.sink.emit(event)
+        t2 = time.perf_counter_ns()
+        overhead = get_overhead_metrics()
+        overhead.record(event.qualname, "serialize", t1 - t0)
+        overhead.record(event.qualname, "enqueue", t2 - t1)
+        ctx.overhead_ns += t2 - t0
         return
 
     if ctx.stub_dir is not None:
@@ -67,9 +85,9 @@ def _write_capture(label: str, ordinal: int, result: Any, ctx: SimContext) -> No
             "type": "capture",
             "label": label,
             "ordinal": ordinal,
-            "result": _make_serializable(result),
+            "result": result_data,
         }
-        filepath = ctx.stub_dir / key
+        filepath = ctx.stub_dir / _capture_key(label, ordinal)
         filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, default=str)
@@ -78,6 +96,40 @@ def _write_capture(label: str, ordinal: int, result: Any, ctx: SimContext) -> No
     logger.debug("No sink or stub_dir — capture %r discarded", label)
 
 
+class _DeferredCapture(DeferredEvent):
+    """A capture result, serialized on resolve().
+
+    Capture ordinals are keyed by label, so they are taken on the request
+    thread as usual.
+    """
+
+    __slots__ = ("_label", "_ordinal", "_result", "_run_id")
+
+    def __init__(self, label: str, ordinal: int, result: Any, ctx: SimContext):
+        super().__init__(time.time_ns(), uses_stub_refs(ctx))
+        self._label = label
+        self._ordinal = ordinal
+        self._result = snapshot(result, ctx)
+        self._run_id = ctx.run_id
+
+    def _build(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        if self._stub_refs:
+            result_data, result_fp = encode_for_ref(self._result)
+        else:
+            result_data, result_fp = _make_serializable(self._result), ""
+        event = _capture_event(
+            self._label, self._ordinal, result_data, self._run_id,
+            recorded_ns=self._recorded_ns, result_fp=result_fp,
+        )
+        stub = {
+            "type": "capture",
+            "label": self._label,
+            "ordinal": self._ordinal,
+            "result": stub_ref(result_fp) if result_fp else result_data,
+        }
+        return event, stub
+
+
 def _read_capture(label: str, ordinal: int, stub_dir: Path) -> Optional[Dict[str, Any]]:
     """Read a recorded capture from stub_dir."""
     key = _capture_key(label, ordinal)
@@ -100,13 +152,15 @@ class CaptureHandle:
         result: The recorded value (replay) or the value set via set_result() (record).
     """
 
-    def __init__(self, label: str, ordinal: int, ctx: SimContext):
+    __slots__ = ("_label", "_ordinal", "_ctx", "_result", "_result_set", "replaying")
+
+    def __init__(self, label: str, ordinal: int, ctx: Optional[SimContext]):
         self._label = label
         self._ordinal = ordinal
         self._ctx = ctx
         self._result: Any = None
         self._result_set: bool = False
-        self.replaying: bool = ctx.is_replaying
+        self.replaying: bool = ctx is not None and ctx.is_replaying
 
         if self.replaying:
             self._load_recorded()
@@ -165,6 +219,8 @@ class sim_capture:
         label: Explicit string label for fingerprinting.
     """
 
+    __slots__ = ("_label", "_handle", "_ctx", "_ordinal")
+
     def __init__(self, label: str):
         self._label = label
         self._handle: Optional[CaptureHandle] = None
@@ -173,6 +229,10 @@ class sim_capture:
 
     def _setup(self) -> CaptureHandle:
         """Common setup for both sync and async entry."""
+        if _context._process_off:
+            # Process off — no context lookup, inert handle
+            return CaptureHandle(self._label, 0, None)
+
         self._ctx = get_context()
 
         if not self._ctx.is_active:
@@ -180,7 +240,7 @@ class sim_capture:
             return CaptureHandle(self._label, 0, self._ctx)
 
         # Get ordinal for this label within the current scope
-        self._ordinal = self._ctx.next_ordinal(f"capture:{self._label}")
+        self._ordinal = self._ctx.next_label_ordinal(f"capture:{self._label}")
         handle = CaptureHandle(self._label, self._ordinal, self._ctx)
         self._handle = handle
         return handle
@@ -197,18 +257,32 @@ class sim_capture:
                     self._label,
                 )
 
+            if defers_serialization(self._ctx):
+                pending = _DeferredCapture(
+                    self._label, self._ordinal, self._handle._result, self._ctx,
+                )
+                self._ctx.collected_stubs.append(pending)
+                self._ctx.sink.emit(pending)
+                return
+
+            # Serialize once; the parent's stub and the fixture share it, or
+            # the stub references the emitted fixture by content hash
+            refs = uses_stub_refs(self._ctx)
+            if refs:
+                result_data, result_fp = encode_for_ref(self._handle._result)
+            else:
+                result_data, result_fp = _make_serializable(self._handle._result), ""
+
             # Push to parent SimContext's collected_stubs
             self._ctx.collected_stubs.append({
                 "type": "capture",
                 "label": self._label,
                 "ordinal": self._ordinal,
-                "result": _make_serializable(self._handle._result),
+                "result": stub_ref(result_fp) if result_fp else result_data,
             })
 
             # Write to disk for future replay
-            _write_capture(
-                self._label, self._ordinal, self._handle._result, self._ctx,
-            )
+            _write_capture(self._label, self._ordinal, result_data, self._ctx, result_fp)
 
         elif self._ctx.is_replaying:
             # In replay, push recorded value to parent stubs
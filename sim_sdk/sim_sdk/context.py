@@ -9,15 +9,25 @@ Environment Variables:
     SIM_MODE: Operating mode (off, record, replay)
     SIM_RUN_ID: Unique identifier for this simulation run
     SIM_STUB_DIR: Directory for stub files
+
+Process mode: SIM_MODE is also read once at import into a process-level
+snapshot.  While it is OFF, @sim_trace, sim_db, sim_http and sim_capture
+skip the context lookup entirely.  init_sim() and set_process_mode() switch
+it at runtime, and installing a non-off context with set_context() switches
+it on, so an explicitly set context is always honoured.
 """
 
 import os
+import threading
 import uuid
+from collections import deque
 from contextvars import ContextVar, Token
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .stub_arena import DEFAULT_STUB_BUDGET_BYTES
 
 
 class SimMode(Enum):
@@ -39,9 +49,27 @@ class SimContext:
         request_id: Unique identifier for current request
         stub_dir: Directory where stubs are stored
         sink: Optional RecordSink for emitting fixtures
-        ordinal_counters: Track call order per fingerprint within a request
-        collected_stubs: Stubs collected from inner sim_capture/sim_db calls
+        ordinal_counters: Track call order per fingerprint within a request;
+            the one ordinal source for every record path, deferred or not
+        collected_stubs: Stubs collected from inner sim_capture/sim_db calls;
+            a StubArena of its own inside each @sim_trace call
         trace_depth: Current nesting depth of @sim_trace calls
+        sampling: Optional SamplingPolicy applied to root @sim_trace calls
+            in record mode
+        sampled_out: True while an unsampled root @sim_trace runs; nested
+            primitives then behave as in off mode
+        deferred_slots: OrdinalSlots of deferred @sim_trace, sim_db and
+            sim_http calls, queued at call entry and assigned from
+            ordinal_counters on resolve (see sim_sdk.deferred)
+        ordinal_lock: Serializes ordinal assignment between the request
+            thread and the sink's worker resolving deferred slots
+        budget: Optional OverheadBudget degrading root @sim_trace recording
+            when SDK overhead exceeds it
+        overhead_ns: SDK overhead accumulated by record-mode primitives,
+            read by the root @sim_trace to report to the budget
+        stub_budget_bytes: Estimated memory of the stubs one @sim_trace call
+            keeps in memory before spilling them to a temporary file
+            (None: never spill); see sim_sdk.stub_arena
     """
     mode: SimMode = SimMode.OFF
     run_id: str = ""
@@ -52,16 +80,49 @@ class SimContext:
     ordinal_counters: Dict[str, int] = field(default_factory=dict)
     collected_stubs: List[Dict[str, Any]] = field(default_factory=list)
     trace_depth: int = 0
+    sampling: Any = None  # Optional SamplingPolicy (typed as Any to avoid circular import)
+    sampled_out: bool = False
+    deferred_slots: Deque[Any] = field(default_factory=deque)
+    ordinal_lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False,
+    )
+    budget: Any = None  # Optional OverheadBudget (typed as Any to avoid circular import)
+    overhead_ns: int = 0
+    stub_budget_bytes: Optional[int] = DEFAULT_STUB_BUDGET_BYTES
 
     def next_ordinal(self, fingerprint: str) -> int:
-        """Get the next ordinal for a fingerprint and increment the counter."""
-        current = self.ordinal_counters.get(fingerprint, 0)
-        self.ordinal_counters[fingerprint] = current + 1
+        """Get the next ordinal for a fingerprint and increment the counter.
+
+        Deferred calls still waiting in ``deferred_slots`` began earlier, so
+        they are numbered first (computing their fingerprints here).  This
+        only happens when one request mixes deferred and eager recording,
+        e.g. after an overhead budget level change.
+        """
+        with self.ordinal_lock:
+            slots = self.deferred_slots
+            while slots:
+                slots.popleft().assign()
+            current = self.ordinal_counters.get(fingerprint, 0)
+            self.ordinal_counters[fingerprint] = current + 1
+            return current
+
+    def next_label_ordinal(self, key: str) -> int:
+        """next_ordinal() for a label key (``capture:<label>``).
+
+        No deferred slot produces a label key, so pending slots need not be
+        numbered first, and only this thread writes the key: no lock.
+        """
+        counters = self.ordinal_counters
+        current = counters.get(key, 0)
+        counters[key] = current + 1
         return current
 
     def reset_ordinals(self) -> None:
         """Reset ordinal counters (typically at start of new request)."""
-        self.ordinal_counters.clear()
+        # Rebound, not cleared: the sink may still be resolving the previous
+        # request's deferred slots against the old counters.
+        self.ordinal_counters = {}
+        self.deferred_slots = deque()
 
     def start_new_request(self) -> str:
         """Generate a new request ID and reset all per-request state.
@@ -73,20 +134,22 @@ class SimContext:
         return self.request_id
 
     def reset(self) -> None:
-        """Reset all per-request state: ordinals, stubs, and trace depth."""
-        self.ordinal_counters.clear()
+        """Reset all per-request state: ordinals, stubs, trace depth, sampling, overhead."""
+        self.reset_ordinals()
         self.collected_stubs.clear()
         self.trace_depth = 0
+        self.sampled_out = False
+        self.overhead_ns = 0
 
     @property
     def is_active(self) -> bool:
-        """Check if simulation is active (not off mode)."""
-        return self.mode != SimMode.OFF
+        """Check if simulation is active (not off mode, not sampled out)."""
+        return self.mode != SimMode.OFF and not self.sampled_out
 
     @property
     def is_recording(self) -> bool:
-        """Check if in record mode."""
-        return self.mode == SimMode.RECORD
+        """Check if in record mode and the current root trace is sampled."""
+        return self.mode == SimMode.RECORD and not self.sampled_out
 
     @property
     def is_replaying(self) -> bool:
@@ -103,6 +166,8 @@ class SimContext:
     @staticmethod
     def set_current(ctx: "SimContext") -> Token:
         """Set the current context and return a Token for later reset."""
+        if _process_off and ctx.mode is not SimMode.OFF:
+            set_process_mode(ctx.mode)
         return _context_var.set(ctx)
 
     @staticmethod
@@ -111,6 +176,51 @@ class SimContext:
         _context_var.reset(token)
 
 
+# ---------------------------------------------------------------------------
+# Process-level mode snapshot
+# ---------------------------------------------------------------------------
+
+def _mode_from_env() -> SimMode:
+    try:
+        return SimMode(os.environ.get("SIM_MODE", "off").lower())
+    except ValueError:
+        return SimMode.OFF
+
+
+_process_mode: SimMode = _mode_from_env()
+# Read directly by the off-mode fast paths (``context._process_off``)
+_process_off: bool = _process_mode is SimMode.OFF
+_mode_lock = threading.Lock()
+_mode_listeners: List[Callable[[SimMode], None]] = []
+
+
+def get_process_mode() -> SimMode:
+    """Return the process-level mode snapshot."""
+    return _process_mode
+
+
+def set_process_mode(mode: SimMode) -> None:
+    """Switch the process-level mode, re-targeting off-mode trampolines.
+
+    Per-task contexts are unaffected; while the process mode is OFF the
+    SDK primitives do not look at them.
+    """
+    global _process_mode, _process_off
+    with _mode_lock:
+        if mode is _process_mode:
+            return
+        _process_mode = mode
+        _process_off = mode is SimMode.OFF
+        for listener in _mode_listeners:
+            listener(mode)
+
+
+def _add_process_mode_listener(listener: Callable[[SimMode], None]) -> None:
+    """Call *listener* with the new mode on every process-mode switch."""
+    with _mode_lock:
+        _mode_listeners.append(listener)
+
+
 # ---------------------------------------------------------------------------
 # ContextVar — thread-safe + async-safe context storage
 # ---------------------------------------------------------------------------
@@ -135,7 +245,12 @@ def get_context() -> SimContext:
 
 
 def set_context(context: SimContext) -> None:
-    """Set the simulation context for the current thread/task."""
+    """Set the simulation context for the current thread/task.
+
+    A non-off context switches an OFF process mode on.
+    """
+    if _process_off and context.mode is not SimMode.OFF:
+        set_process_mode(context.mode)
     _context_var.set(context)
 
 
@@ -146,13 +261,10 @@ def clear_context() -> None:
 
 def _create_context_from_env() -> SimContext:
     """Create a SimContext from environment variables."""
-    mode_str = os.environ.get("SIM_MODE", "off").lower()
-    try:
-        mode = SimMode(mode_str)
-    except ValueError:
-        mode = SimMode.OFF
-
-    run_id = os.environ.get("SIM_RUN_ID", str(uuid.uuid4())[:8])
+    mode = _mode_from_env()
+    run_id = os.environ.get("SIM_RUN_ID")
+    if run_id is None:
+        run_id = str(uuid.uuid4())[:8]
     stub_dir_str = os.environ.get("SIM_STUB_DIR")
     stub_dir = Path(stub_dir_str) if stub_dir_str else None
 
@@ -168,18 +280,29 @@ def init_sim(
     run_id: Optional[str] = None,
     stub_dir: Optional[Path] = None,
     sink: Any = None,
+    sampling: Any = None,
+    budget: Any = None,
+    stub_budget_bytes: Optional[int] = DEFAULT_STUB_BUDGET_BYTES,
 ) -> SimContext:
     """
     Initialize simulation context at app startup.
 
     Falls back to environment variables for unspecified values:
     SIM_MODE (default: off), SIM_RUN_ID (default: random), SIM_STUB_DIR.
+    Also sets the process-level mode snapshot to the resulting mode.
 
     Args:
         mode: Simulation mode. Defaults to SIM_MODE env var.
         run_id: Unique run identifier. Defaults to SIM_RUN_ID env var.
         stub_dir: Directory for fixture files. Defaults to SIM_STUB_DIR env var.
         sink: Optional RecordSink for emitting fixtures during recording.
+        sampling: Optional SamplingPolicy deciding which root @sim_trace
+            calls are recorded.
+        budget: Optional OverheadBudget stepping recording down when SDK
+            overhead or sink queue pressure exceeds it.
+        stub_budget_bytes: Estimated memory of the stubs a @sim_trace call
+            keeps in memory before spilling them to a temporary file
+            (None: never spill).
     """
     env_context = _create_context_from_env()
 
@@ -188,8 +311,12 @@ def init_sim(
         run_id=run_id if run_id is not None else env_context.run_id,
         stub_dir=stub_dir if stub_dir is not None else env_context.stub_dir,
         sink=sink,
+        sampling=sampling,
+        budget=budget,
+        stub_budget_bytes=stub_budget_bytes,
     )
 
+    set_process_mode(context.mode)
     set_context(context)
     return context
 
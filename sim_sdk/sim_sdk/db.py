@@ -12,18 +12,28 @@ Fingerprint = normalize_sql(sql) + fingerprint(params) + ordinal.
 Write detection: INSERT/UPDATE/DELETE/DROP/ALTER/TRUNCATE → SimWriteBlockedError in replay.
 """
 
+import functools
 import json
 import logging
 import re
-import uuid
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from . import context as _context
 from .context import SimContext, SimMode, get_context
-from .canonical import normalize_sql, fingerprint, fingerprint_sql
+from .canonical import (
+    canonical_encode,
+    fingerprint,
+    fingerprint_sql,
+    get_fingerprint_algorithm,
+    normalize_sql,
+)
+from .deferred import DeferredEvent, OrdinalSlot, defers_serialization, snapshot
 from .fixture.schema import FixtureEvent
 from .replay_context import get_replay_context
+from .sink.overhead_metrics import get_overhead_metrics
+from .stub_refs import encode_for_ref, stub_ref, uses_stub_refs
 from .trace import _make_serializable
 
 logger = logging.getLogger(__name__)
@@ -87,45 +97,110 @@ def _db_fixture_key(name: str, sql_fp: str, params_fp: str, ordinal: int) -> str
     return f"__db__/{safe_name}_{sql_fp[:8]}_{params_fp[:8]}_{ordinal}.json"
 
 
+# Fingerprint used for queries without parameters; constant per algorithm,
+# so computed once for each.
+_NO_PARAMS_FPS: Dict[str, str] = {}
+
+
+def _no_params_fingerprint() -> str:
+    algorithm = get_fingerprint_algorithm()
+    fp = _NO_PARAMS_FPS.get(algorithm)
+    if fp is None:
+        fp = _NO_PARAMS_FPS[algorithm] = fingerprint("")
+    return fp
+
+
+def _encode_query(sql: str, params: Any) -> Tuple[Any, str, str]:
+    """Serialize a query's params and fingerprint the query in one pass.
+
+    The SQL fingerprint comes from the memoized fingerprint_sql(), so a
+    repeated statement is not re-normalized.  Params are encoded with
+    canonical_encode, which hashes array/buffer params in place; the
+    serialized copy is the one recorded, so params are walked only once.
+
+    Returns:
+        Tuple of (serialized_params, sql_fingerprint, params_fingerprint)
+    """
+    sql_fp = fingerprint_sql(sql)
+    if params is None:
+        return None, sql_fp, _no_params_fingerprint()
+    params_data, params_fp = canonical_encode(params)
+    return params_data, sql_fp, params_fp
+
+
+def _query_key(name: str, sql_fp: str, params_fp: str) -> str:
+    """Ordinal key of a query on the connection called *name*."""
+    return f"db:{name}:{sql_fp[:16]}:{params_fp[:16]}"
+
+
+def _encode_query_key(
+    name: str, sql: str, params: Any,
+) -> Tuple[Tuple[Any, str, str], str]:
+    """_encode_query() plus the ordinal key, for a deferred query's slot."""
+    encoded = _encode_query(sql, params)
+    return encoded, _query_key(name, encoded[1], encoded[2])
+
+
 def _compute_query_fingerprint(sql: str, params: Any) -> Tuple[str, str]:
     """Compute fingerprints for a SQL query and its parameters.
 
     Returns:
         Tuple of (sql_fingerprint, params_fingerprint)
     """
-    sql_fp = fingerprint_sql(sql)
-    params_data = _make_serializable(params) if params is not None else None
-    params_fp = fingerprint(params_data) if params_data is not None else fingerprint("")
+    _, sql_fp, params_fp = _encode_query(sql, params)
     return sql_fp, params_fp
 
 
+def _db_event(
+    name: str,
+    sql: str,
+    params_data: Any,
+    sql_fp: str,
+    params_fp: str,
+    ordinal: int,
+    result_data: Any,
+    run_id: str,
+    recorded_ns: Optional[int] = None,
+    result_fp: str = "",
+) -> FixtureEvent:
+    """Build the Stub FixtureEvent for a recorded DB query."""
+    return FixtureEvent(
+        qualname=f"db:{name}",
+        run_id=run_id,
+        recorded_ns=recorded_ns,
+        input={"sql": sql, "params": params_data},
+        input_fingerprint=f"{sql_fp[:16]}:{params_fp[:16]}",
+        output=result_data,
+        output_fingerprint=result_fp,
+        ordinal=ordinal,
+        storage_key=_db_fixture_key(name, sql_fp, params_fp, ordinal),
+        event_type="Stub",
+    )
+
+
 def _write_db_fixture(
     name: str,
     sql: str,
-    params: Any,
+    params_data: Any,
     sql_fp: str,
     params_fp: str,
     ordinal: int,
-    result: Any,
+    result_data: Any,
     ctx: SimContext,
+    result_fp: str = "",
 ) -> None:
-    """Persist a DB query fixture to sink or stub_dir."""
-    key = _db_fixture_key(name, sql_fp, params_fp, ordinal)
-
+    """Persist an already-serialized DB query fixture to sink or stub_dir."""
     if ctx.sink is not None:
-        event = FixtureEvent(
-            fixture_id=str(uuid.uuid4())[:8],
-            qualname=f"db:{name}",
-            run_id=ctx.run_id,
-            recorded_at=datetime.now(timezone.utc).isoformat(),
-            input={"sql": sql, "params": _make_serializable(params)},
-            input_fingerprint=f"{sql_fp[:16]}:{params_fp[:16]}",
-            output=_make_serializable(result),
-            ordinal=ordinal,
-            storage_key=key,
-            event_type="Stub",
+        t0 = time.perf_counter_ns()
+        event = _db_event(
+            name, sql, params_data, sql_fp, params_fp, ordinal, result_data, ctx.run_id,
+            result_fp=result_fp,
         )
+        t1 = time.perf_counter_ns()
         ctx.sink.emit(event)
+        overhead = get_overhead_metrics()
+        overhead.record(event.qualname, "serialize", t1 - t0)
+        overhead.record(event.qualname, "enqueue", time.perf_counter_ns() - t1)
         return
 
     if ctx.stub_dir is not None:
@@ -133,13 +208,13 @@ def _write_db_fixture(
             "type": "db_query",
             "name": name,
             "sql": sql,
-            "params": _make_serializable(params),
+            "params": params_data,
             "sql_fingerprint": sql_fp,
             "params_fingerprint": params_fp,
             "ordinal": ordinal,
-            "result": _make_serializable(result),
+            "result": result_data,
         }
-        filepath = ctx.stub_dir / key
+        filepath = ctx.stub_dir / _db_fixture_key(name, sql_fp, params_fp, ordinal)
         filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, default=str)
@@ -148,6 +223,47 @@ def _write_db_fixture(
     logger.debug("No sink or stub_dir — db fixture %r discarded", name)
 
 
+class _DeferredDbQuery(DeferredEvent):
+    """A recorded DB query, fingerprinted and serialized on resolve()."""
+
+    __slots__ = ("_name", "_sql", "_slot", "_params", "_result", "_run_id")
+
+    def __init__(
+        self, name: str, sql: str, slot: OrdinalSlot, params: Any, result: Any,
+        ctx: SimContext,
+    ):
+        super().__init__(time.time_ns(), uses_stub_refs(ctx))
+        self._name = name
+        self._sql = sql
+        self._slot = slot
+        # Encoded by the slot; kept here so buffers can measure it
+        self._params = params
+        self._result = snapshot(result, ctx)
+        self._run_id = ctx.run_id
+
+    def _build(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        name = self._name
+        (params_data, sql_fp, params_fp), _, ordinal = self._slot.resolve()
+        if self._stub_refs:
+            result_data, result_fp = encode_for_ref(self._result)
+        else:
+            result_data, result_fp = _make_serializable(self._result), ""
+        event = _db_event(
+            name, self._sql, params_data, sql_fp, params_fp,
+            ordinal, result_data, self._run_id,
+            recorded_ns=self._recorded_ns, result_fp=result_fp,
+        )
+        stub = {
+            "type": "db_query",
+            "name": name,
+            "sql": self._sql,
+            "ordinal": ordinal,
+            "result": stub_ref(result_fp) if result_fp else result_data,
+            "source": "record",
+        }
+        return event, stub
+
+
 # ---------------------------------------------------------------------------
 # DBProxy — intercepts .query() and .execute() calls
 # ---------------------------------------------------------------------------
@@ -192,18 +308,27 @@ class DBProxy:
         ctx = object.__getattribute__(self, "_ctx")
         name = object.__getattribute__(self, "_name")
         db_object = object.__getattribute__(self, "_db_object")
+        start_ns = time.perf_counter_ns()
+
+        if ctx.is_recording and defers_serialization(ctx):
+            return self._record_call_deferred(
+                method_name, sql, params, name, db_object, ctx, start_ns,
+                *args, **kwargs,
+            )
 
-        sql_fp, params_fp = _compute_query_fingerprint(sql, params)
+        params_data, sql_fp, params_fp = _encode_query(sql, params)
+        get_overhead_metrics().record(
+            f"db:{name}", "fingerprint", time.perf_counter_ns() - start_ns,
+        )
 
         if ctx.is_replaying:
             return self._replay_call(sql, params, sql_fp, params_fp, name)
 
         if ctx.is_recording:
-            combined_fp = f"db:{name}:{sql_fp[:16]}:{params_fp[:16]}"
-            ordinal = ctx.next_ordinal(combined_fp)
+            ordinal = ctx.next_ordinal(_query_key(name, sql_fp, params_fp))
             return self._record_call(
-                method_name, sql, params, sql_fp, params_fp, ordinal,
-                name, db_object, ctx, *args, **kwargs,
+                method_name, sql, params, params_data, sql_fp, params_fp, ordinal,
+                name, db_object, ctx, start_ns, *args, **kwargs,
             )
 
         # Off mode passthrough (sim_db yielding raw object handles this, but
@@ -242,20 +367,31 @@ class DBProxy:
         return rows
 
     def _record_call(
-        self, method_name: str, sql: str, params: Any,
+        self, method_name: str, sql: str, params: Any, params_data: Any,
         sql_fp: str, params_fp: str, ordinal: int, name: str,
-        db_object: Any, ctx: SimContext, *args: Any, **kwargs: Any,
+        db_object: Any, ctx: SimContext, start_ns: int, *args: Any, **kwargs: Any,
     ) -> Any:
         """Handle a DB call in record mode."""
         # Execute the real query
         real_method = getattr(db_object, method_name)
+        call_ns = time.perf_counter_ns()
         if params is not None:
             result = real_method(sql, params, *args, **kwargs)
         else:
             result = real_method(sql, *args, **kwargs)
+        return_ns = time.perf_counter_ns()
 
-        # Write fixture
-        _write_db_fixture(name, sql, params, sql_fp, params_fp, ordinal, result, ctx)
+        # Serialize once; the fixture and the outer @sim_trace's stub share
+        # it, or the stub references the emitted fixture by content hash
+        refs = uses_stub_refs(ctx)
+        if refs:
+            result_data, result_fp = encode_for_ref(result)
+        else:
+            result_data, result_fp = _make_serializable(result), ""
+        _write_db_fixture(
+            name, sql, params_data, sql_fp, params_fp, ordinal, result_data, ctx,
+            result_fp=result_fp,
+        )
 
         # Push to collected_stubs for outer @sim_trace
         ctx.collected_stubs.append({
@@ -263,7 +399,7 @@ class DBProxy:
             "name": name,
             "sql": sql,
             "ordinal": ordinal,
-            "result": _make_serializable(result),
+            "result": stub_ref(result_fp) if result_fp else result_data,
             "source": "record",
         })
 
@@ -271,6 +407,34 @@ class DBProxy:
         queries = object.__getattribute__(self, "_queries_captured")
         queries.append({"sql": sql, "params": params, "ordinal": ordinal})
 
+        elapsed_ns = (call_ns - start_ns) + (time.perf_counter_ns() - return_ns)
+        get_overhead_metrics().record(f"db:{name}", "intercept", elapsed_ns)
+        ctx.overhead_ns += elapsed_ns
+        return result
+
+    def _record_call_deferred(
+        self, method_name: str, sql: str, params: Any, name: str,
+        db_object: Any, ctx: SimContext, start_ns: int, *args: Any, **kwargs: Any,
+    ) -> Any:
+        """Record mode with a deferring sink: no hashing or serialization here."""
+        # Reserve the ordinal before the call, in call order
+        params = snapshot(params, ctx)
+        slot = OrdinalSlot(ctx, functools.partial(_encode_query_key, name, sql, params))
+        real_method = getattr(db_object, method_name)
+        call_ns = time.perf_counter_ns()
+        if params is not None:
+            result = real_method(sql, params, *args, **kwargs)
+        else:
+            result = real_method(sql, *args, **kwargs)
+        return_ns = time.perf_counter_ns()
+
+        pending = _DeferredDbQuery(name, sql, slot, params, result, ctx)
+        ctx.sink.emit(pending)
+        ctx.collected_stubs.append(pending)
+
+        elapsed_ns = (call_ns - start_ns) + (time.perf_counter_ns() - return_ns)
+        get_overhead_metrics().record(f"db:{name}", "intercept", elapsed_ns)
+        ctx.overhead_ns += elapsed_ns
         return result
 
 
@@ -299,6 +463,8 @@ class sim_db:
         name: Label for this DB connection (used in fixture file paths).
     """
 
+    __slots__ = ("_db_object", "_name", "_proxy", "_ctx")
+
     def __init__(self, db_object: Any, name: str = "db"):
         self._db_object = db_object
         self._name = name
@@ -307,6 +473,9 @@ class sim_db:
 
     def _setup(self) -> Any:
         """Common setup for both sync and async entry."""
+        if _context._process_off:
+            # Process off — no context lookup, original object unwrapped
+            return self._db_object
         self._ctx = get_context()
 
         if not self._ctx.is_active:
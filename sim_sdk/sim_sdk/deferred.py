@@ -0,0 +1,163 @@
+"""
+Deferred serialization of recorded events.
+
+By default every record-mode primitive serializes its inputs and outputs,
+computes fingerprints, generates a fixture id and formats a timestamp on
+the request thread before calling ``ctx.sink.emit``.  A sink that sets
+``defer_serialization`` (``AgentSink(defer_serialization=True)``) instead
+receives a DeferredEvent: a small object holding references to the raw
+values.  The sink's SenderWorker resolves it into a FixtureEvent on its own
+thread just before sending, so the request thread only binds arguments and
+takes a wall-clock reading.
+
+Consequences of deferring:
+
+- Values are serialized when the worker gets to them, so an application
+  that mutates an argument or return value after the call records the
+  mutated value.  With the sink's ``copy_mutable`` guard, top-level list,
+  dict, set and bytearray values are shallow-copied on the request thread.
+- Ordinals of @sim_trace, sim_db and sim_http events are keyed by
+  fingerprint, so they are assigned at resolution time.  Each call
+  reserves an OrdinalSlot when it begins, and slots are numbered in that
+  order from the request's ``SimContext.ordinal_counters``, the counters
+  eager recording uses too.  Ordinals therefore match eager recording and
+  replay whatever order events are resolved in, whether an event is
+  dropped unresolved, and when a request switches between deferred and
+  eager recording: a nested call is emitted before the call enclosing it,
+  but numbered after it.  sim_capture ordinals do not need a fingerprint
+  and are still taken on the request thread.
+- Stubs collected for an outer @sim_trace are DeferredEvents too; they are
+  resolved (at most once) when the outer event is.
+- A SamplingPolicy with ``first_unique`` needs input fingerprints up front,
+  so such contexts never defer.
+
+A DeferredEvent is resolved by a single thread (the sink's worker);
+ordinal assignment is serialized with the request thread by
+``SimContext.ordinal_lock``.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: abc, copy, typing
+"""
+
+import copy
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .fixture.schema import FixtureEvent
+
+_MUTABLE_TYPES = (list, dict, set, bytearray)
+
+
+class DeferredEvent(ABC):
+    """A recorded call whose serialization and hashing happen on resolve().
+
+    Subclasses capture raw references in ``__init__`` and implement
+    ``_build``, which returns the FixtureEvent and the stub dict that an
+    enclosing @sim_trace collects.  Both are built once and memoized.
+    """
+
+    __slots__ = ("_recorded_ns", "_stub_refs", "_resolved")
+
+    def __init__(self, recorded_ns: int, stub_refs: bool = False):
+        self._recorded_ns = recorded_ns
+        # Build the stub with content-hash references (see sim_sdk.stub_refs)
+        self._stub_refs = stub_refs
+        self._resolved: Optional[Tuple[FixtureEvent, Dict[str, Any]]] = None
+
+    def resolve(self) -> FixtureEvent:
+        """Serialize, fingerprint and stamp the event."""
+        return self._materialize()[0]
+
+    def stub(self) -> Dict[str, Any]:
+        """The stub dict an enclosing @sim_trace records for this call."""
+        return self._materialize()[1]
+
+    def _materialize(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        if self._resolved is None:
+            self._resolved = self._build()
+        return self._resolved
+
+    @abstractmethod
+    def _build(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        """Serialize the captured call into its event and stub dict."""
+
+
+class OrdinalSlot:
+    """An ordinal reserved on the request thread when a deferred call begins.
+
+    The slot joins the context's ``deferred_slots`` queue with a function
+    computing the call's encoded input and ordinal key.  resolve() assigns
+    ordinals to every slot queued before this one first, in queue order,
+    so the numbering follows call entry rather than emission or resolve
+    order.  Assignment happens under ``SimContext.ordinal_lock``, as does
+    every eager ``next_ordinal()``, which numbers pending slots first.
+    """
+
+    __slots__ = ("_queue", "_ordinals", "_lock", "_encode", "_result")
+
+    def __init__(self, ctx: Any, encode: Callable[[], Tuple[Any, str]]):
+        self._queue = ctx.deferred_slots
+        self._ordinals = ctx.ordinal_counters
+        self._lock = ctx.ordinal_lock
+        self._encode: Optional[Callable[[], Tuple[Any, str]]] = encode
+        self._result: Union[None, Tuple[Any, str, int], Exception] = None
+        self._queue.append(self)
+
+    def resolve(self) -> Tuple[Any, str, int]:
+        """Return (encoded input, ordinal key, ordinal)."""
+        if self._result is None:
+            queue = self._queue
+            with self._lock:
+                while self._result is None:
+                    queue.popleft().assign()
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result  # type: ignore[return-value]
+
+    def assign(self) -> None:
+        """Encode and number this slot; the caller holds the lock."""
+        encode, self._encode = self._encode, None
+        try:
+            encoded, key = encode()  # type: ignore[misc]
+        except Exception as exc:
+            # Raised again by this slot's own resolve(); takes no ordinal
+            self._result = exc
+            return
+        ordinal = self._ordinals.get(key, 0)
+        self._ordinals[key] = ordinal + 1
+        self._result = (encoded, key, ordinal)
+
+
+def _sink_flag(sink: Any, name: str) -> bool:
+    # Sinks are duck-typed; only an explicit True opts in.
+    return getattr(sink, name, False) is True
+
+
+def defers_serialization(ctx: Any) -> bool:
+    """True if record-mode events for *ctx* should be emitted as DeferredEvents."""
+    sink = ctx.sink
+    if sink is None or not _sink_flag(sink, "defer_serialization"):
+        return False
+    sampling = ctx.sampling
+    return sampling is None or not sampling.needs_fingerprint
+
+
+def snapshot(value: Any, ctx: Any) -> Any:
+    """Apply the sink's shallow-copy guard to a value kept for later serialization."""
+    if type(value) in _MUTABLE_TYPES and _sink_flag(ctx.sink, "copy_mutable"):
+        return copy.copy(value)
+    return value
+
+
+def snapshot_args(args: Dict[str, Any], ctx: Any) -> Dict[str, Any]:
+    """snapshot() applied to each bound argument."""
+    if not _sink_flag(ctx.sink, "copy_mutable"):
+        return args
+    return {
+        k: copy.copy(v) if type(v) in _MUTABLE_TYPES else v for k, v in args.items()
+    }
+
+
+def resolve_stubs(stubs: List[Any]) -> List[Dict[str, Any]]:
+    """Replace DeferredEvents in a collected-stubs list with their stub dicts."""
+    return [s.stub() if isinstance(s, DeferredEvent) else s for s in stubs]
@@ -2,35 +2,139 @@
 Fixture file schemas and data models.
 """
 
-from dataclasses import dataclass, field
+import itertools
+import os
+import time
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
-from datetime import datetime
+
+from ..canonical import get_fingerprint_algorithm
+
+
+# Fixture ids are "<process prefix>-<sequence>": unique per process without
+# a uuid4 per event.  A forked child draws a new prefix.
+_id_prefix = os.urandom(4).hex()
+_id_counter = itertools.count(1)
+
+
+def _reset_ids_after_fork() -> None:
+    global _id_prefix, _id_counter
+    _id_prefix = os.urandom(4).hex()
+    _id_counter = itertools.count(1)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_ids_after_fork)
+
+
+def format_timestamp_ns(ns: int) -> str:
+    """ISO-8601 UTC string for a ``time.time_ns()`` value (microsecond precision)."""
+    seconds, rest = divmod(ns, 1_000_000_000)
+    return (
+        datetime.fromtimestamp(seconds, timezone.utc)
+        .replace(microsecond=rest // 1000)
+        .isoformat()
+    )
 
 
-@dataclass
 class FixtureEvent:
     """A complete fixture event emitted by @sim_trace during recording.
 
     Contains the input args, return value, collected inner stubs,
     and metadata for a single traced function call.
+
+    Slotted and cheap to create: unless given explicitly, the fixture id is
+    a process-local sequence number and the timestamp an integer
+    (``recorded_ns``, from ``time.time_ns()``).  Both are formatted into
+    ``fixture_id`` / ``recorded_at`` strings the first time they are read,
+    normally by to_dict() on the sender thread.
     """
 
-    fixture_id: str
-    qualname: str
-    run_id: str
-    recorded_at: str
-    input: Dict[str, Any] = field(default_factory=dict)
-    input_fingerprint: str = ""
-    output: Any = None
-    output_fingerprint: str = ""
-    stubs: List[Dict[str, Any]] = field(default_factory=list)
-    duration_ms: float = 0.0
-    error: Optional[str] = None
-    ordinal: int = 0
-    storage_key: Optional[str] = None
-    event_type: str = "Metadata"
-
-    def to_dict(self) -> Dict[str, Any]:
+    __slots__ = (
+        "_fixture_id", "_seq", "qualname", "run_id", "_recorded_at", "recorded_ns",
+        "input", "input_fingerprint", "output", "output_fingerprint", "stubs",
+        "duration_ms", "error", "ordinal", "storage_key", "event_type",
+        "fingerprint_algorithm",
+    )
+
+    def __init__(
+        self,
+        fixture_id: Optional[str] = None,
+        qualname: str = "",
+        run_id: str = "",
+        recorded_at: Optional[str] = None,
+        input: Optional[Dict[str, Any]] = None,
+        input_fingerprint: str = "",
+        output: Any = None,
+        output_fingerprint: str = "",
+        stubs: Optional[List[Dict[str, Any]]] = None,
+        duration_ms: float = 0.0,
+        error: Optional[str] = None,
+        ordinal: int = 0,
+        storage_key: Optional[str] = None,
+        event_type: str = "Metadata",
+        fingerprint_algorithm: Optional[str] = None,
+        *,
+        recorded_ns: Optional[int] = None,
+    ):
+        self._fixture_id = fixture_id
+        self._seq = next(_id_counter) if fixture_id is None else 0
+        self.qualname = qualname
+        self.run_id = run_id
+        self._recorded_at = recorded_at
+        if recorded_ns is None and recorded_at is None:
+            recorded_ns = time.time_ns()
+        self.recorded_ns = recorded_ns
+        self.input = {} if input is None else input
+        self.input_fingerprint = input_fingerprint
+        self.output = output
+        self.output_fingerprint = output_fingerprint
+        self.stubs = [] if stubs is None else stubs
+        self.duration_ms = duration_ms
+        self.error = error
+        self.ordinal = ordinal
+        self.storage_key = storage_key
+        self.event_type = event_type
+        # Hash behind input/output fingerprints; StubStore re-keys on mismatch.
+        self.fingerprint_algorithm = (
+            get_fingerprint_algorithm() if fingerprint_algorithm is None
+            else fingerprint_algorithm
+        )
+
+    @property
+    def fixture_id(self) -> str:
+        fixture_id = self._fixture_id
+        if fixture_id is None:
+            fixture_id = self._fixture_id = f"{_id_prefix}-{self._seq:x}"
+        return fixture_id
+
+    @fixture_id.setter
+    def fixture_id(self, value: str) -> None:
+        self._fixture_id = value
+
+    @property
+    def recorded_at(self) -> str:
+        recorded_at = self._recorded_at
+        if recorded_at is None:
+            recorded_at = self._recorded_at = (
+                format_timestamp_ns(self.recorded_ns) if self.recorded_ns is not None else ""
+            )
+        return recorded_at
+
+    @recorded_at.setter
+    def recorded_at(self, value: str) -> None:
+        self._recorded_at = value
+
+    def to_dict(self, *, stream_stubs: bool = False) -> Dict[str, Any]:
+        """The event as a JSON-ready dict.
+
+        Stubs spilled to disk (SpilledStubs, see sim_sdk.stub_arena) are read
+        back into a list, unless *stream_stubs* is set: then the SpilledStubs
+        is left in place for BatchRequest to stream into the request body.
+        """
+        stubs = self.stubs
+        if not isinstance(stubs, list) and not stream_stubs:
+            stubs = list(stubs)
         return {
             "fixture_id": self.fixture_id,
             "qualname": self.qualname,
@@ -40,10 +144,24 @@ class FixtureEvent:
             "input_fingerprint": self.input_fingerprint,
             "output": self.output,
             "output_fingerprint": self.output_fingerprint,
-            "stubs": self.stubs,
+            "stubs": stubs,
             "duration_ms": self.duration_ms,
             "error": self.error,
             "ordinal": self.ordinal,
             "storage_key": self.storage_key,
             "event_type": self.event_type,
+            "fingerprint_algorithm": self.fingerprint_algorithm,
         }
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()  # type: ignore[attr-defined]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"FixtureEvent(fixture_id={self.fixture_id!r}, qualname={self.qualname!r}, "
+            f"event_type={self.event_type!r}, ordinal={self.ordinal!r})"
+        )
@@ -11,20 +11,23 @@ Off mode: complete passthrough, zero overhead.
 Fingerprint = normalize_url(url) + fingerprint(body) + fingerprint(stable_headers) + ordinal.
 """
 
+import functools
 import hashlib
 import json
 import logging
-import uuid
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urlencode, parse_qs, urlunparse
 
+from . import context as _context
 from .context import SimContext, SimMode, get_context
-from .canonical import fingerprint
+from .canonical import canonical_encode, fingerprint
+from .deferred import DeferredEvent, OrdinalSlot, defers_serialization, snapshot
 from .fixture.schema import FixtureEvent
 from .replay_context import get_replay_context
-from .trace import _make_serializable
+from .sink.overhead_metrics import get_overhead_metrics
+from .stub_refs import encode_for_ref, stub_ref, uses_stub_refs
 
 logger = logging.getLogger(__name__)
 
@@ -157,25 +160,27 @@ def _extract_stable_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]
 # HTTP fingerprinting
 # ---------------------------------------------------------------------------
 
-def _compute_http_fingerprint(
+def _encode_http_request(
     method: str,
     url: str,
     body: Any,
     headers: Optional[Dict[str, str]],
-) -> Tuple[str, str, str]:
-    """Compute fingerprints for an HTTP request.
+) -> Tuple[Any, str, str, str]:
+    """Serialize an HTTP request body and fingerprint the request in one pass.
+
+    The body is encoded with canonical_encode, so the serialized copy that
+    gets recorded and its fingerprint come from a single walk.
 
     Returns:
-        Tuple of (method_url_fp, body_fp, headers_fp)
+        Tuple of (serialized_body, method_url_fp, body_fp, headers_fp)
     """
     normalized = normalize_url(url)
     method_url_fp = fingerprint(f"{method.upper()}:{normalized}")
 
     if body is not None:
-        body_data = _make_serializable(body)
-        body_fp = fingerprint(body_data)
+        body_data, body_fp = canonical_encode(body)
     else:
-        body_fp = fingerprint("")
+        body_data, body_fp = None, fingerprint("")
 
     stable = _extract_stable_headers(headers)
     if stable:
@@ -183,7 +188,36 @@ def _compute_http_fingerprint(
     else:
         headers_fp = fingerprint("")
 
-    return method_url_fp, body_fp, headers_fp
+    return body_data, method_url_fp, body_fp, headers_fp
+
+
+def _request_key(
+    name: str, method: str, url_fp: str, body_fp: str, headers_fp: str,
+) -> str:
+    """Ordinal key of a request on the client called *name*."""
+    return f"http:{name}:{method}:{url_fp[:16]}:{body_fp[:16]}:{headers_fp[:16]}"
+
+
+def _encode_request_key(
+    name: str, method: str, url: str, body: Any, headers: Optional[Dict[str, str]],
+) -> Tuple[Tuple[Any, str, str, str], str]:
+    """_encode_http_request() plus the ordinal key, for a deferred request's slot."""
+    encoded = _encode_http_request(method, url, body, headers)
+    return encoded, _request_key(name, method, *encoded[1:])
+
+
+def _compute_http_fingerprint(
+    method: str,
+    url: str,
+    body: Any,
+    headers: Optional[Dict[str, str]],
+) -> Tuple[str, str, str]:
+    """Compute fingerprints for an HTTP request.
+
+    Returns:
+        Tuple of (method_url_fp, body_fp, headers_fp)
+    """
+    return _encode_http_request(method, url, body, headers)[1:]
 
 
 # ---------------------------------------------------------------------------
@@ -204,39 +238,65 @@ def _http_fixture_key(
     )
 
 
+def _http_event(
+    name: str,
+    method: str,
+    url: str,
+    body_data: Any,
+    url_fp: str,
+    body_fp: str,
+    headers_fp: str,
+    ordinal: int,
+    response_data: Dict[str, Any],
+    run_id: str,
+    recorded_ns: Optional[int] = None,
+    response_fp: str = "",
+) -> FixtureEvent:
+    """Build the Stub FixtureEvent for a recorded HTTP request."""
+    return FixtureEvent(
+        qualname=f"http:{name}",
+        run_id=run_id,
+        recorded_ns=recorded_ns,
+        input={
+            "method": method.upper(),
+            "url": url,
+            "body": body_data,
+        },
+        input_fingerprint=f"{url_fp[:16]}:{body_fp[:16]}",
+        output=response_data,
+        output_fingerprint=response_fp,
+        ordinal=ordinal,
+        storage_key=_http_fixture_key(name, method, url_fp, body_fp, headers_fp, ordinal),
+        event_type="Stub",
+    )
+
+
 def _write_http_fixture(
     name: str,
     method: str,
     url: str,
-    body: Any,
+    body_data: Any,
     url_fp: str,
     body_fp: str,
     headers_fp: str,
     ordinal: int,
     response_data: Dict[str, Any],
     ctx: SimContext,
+    response_fp: str = "",
 ) -> None:
-    """Persist an HTTP request fixture to sink or stub_dir."""
-    key = _http_fixture_key(name, method, url_fp, body_fp, headers_fp, ordinal)
-
+    """Persist an already-serialized HTTP request fixture to sink or stub_dir."""
     if ctx.sink is not None:
-        event = FixtureEvent(
-            fixture_id=str(uuid.uuid4())[:8],
-            qualname=f"http:{name}",
-            run_id=ctx.run_id,
-            recorded_at=datetime.now(timezone.utc).isoformat(),
-            input={
-                "method": method.upper(),
-                "url": url,
-                "body": _make_serializable(body),
-            },
-            input_fingerprint=f"{url_fp[:16]}:{body_fp[:16]}",
-            output=response_data,
-            ordinal=ordinal,
-            storage_key=key,
-            event_type="Stub",
+        t0 = time.perf_counter_ns()
+        event = _http_event(
+            name, method, url, body_data, url_fp, body_fp,
+            headers_fp, ordinal, response_data, ctx.run_id,
+            response_fp=response_fp,
         )
+        t1 = time.perf_counter_ns()
         ctx.sink.emit(event)
+        overhead = get_overhead_metrics()
+        overhead.record(event.qualname, "serialize", t1 - t0)
+        overhead.record(event.qualname, "enqueue", time.perf_counter_ns() - t1)
         return
 
     if ctx.stub_dir is not None:
@@ -245,13 +305,14 @@ def _write_http_fixture(
             "name": name,
             "method": method.upper(),
             "url": url,
-            "body": _make_serializable(body),
+            "body": body_data,
             "url_fingerprint": url_fp,
             "body_fingerprint": body_fp,
             "headers_fingerprint": headers_fp,
             "ordinal": ordinal,
             "response": response_data,
         }
+        key = _http_fixture_key(name, method, url_fp, body_fp, headers_fp, ordinal)
         filepath = ctx.stub_dir / key
         filepath.parent.mkdir(parents=True, exist_ok=True)
         with open(filepath, "w", encoding="utf-8") as f:
@@ -261,6 +322,61 @@ def _write_http_fixture(
     logger.debug("No sink or stub_dir — http fixture %r discarded", name)
 
 
+class _DeferredHttpRequest(DeferredEvent):
+    """A recorded HTTP request, fingerprinted and serialized on resolve().
+
+    The response is extracted on the request thread (the client may reuse
+    or close it); only hashing and body serialization are deferred.
+    """
+
+    __slots__ = (
+        "_name", "_method", "_url", "_slot", "_body", "_headers", "_response",
+        "_run_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        slot: OrdinalSlot,
+        body: Any,
+        headers: Optional[Dict[str, str]],
+        response_data: Dict[str, Any],
+        ctx: SimContext,
+    ):
+        super().__init__(time.time_ns(), uses_stub_refs(ctx))
+        self._name = name
+        self._method = method
+        self._url = url
+        self._slot = slot
+        # Encoded by the slot; kept here so buffers can measure them
+        self._body = body
+        self._headers = headers
+        self._response = response_data
+        self._run_id = ctx.run_id
+
+    def _build(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        name, method, url = self._name, self._method, self._url
+        (body_data, url_fp, body_fp, headers_fp), _, ordinal = self._slot.resolve()
+        response_fp = encode_for_ref(self._response)[1] if self._stub_refs else ""
+        event = _http_event(
+            name, method, url, body_data, url_fp, body_fp,
+            headers_fp, ordinal, self._response, self._run_id,
+            recorded_ns=self._recorded_ns, response_fp=response_fp,
+        )
+        stub = {
+            "type": "http_request",
+            "name": name,
+            "method": method,
+            "url": url,
+            "ordinal": ordinal,
+            "response": stub_ref(response_fp) if response_fp else self._response,
+            "source": "record",
+        }
+        return event, stub
+
+
 # ---------------------------------------------------------------------------
 # Response extraction — duck-typed
 # ---------------------------------------------------------------------------
@@ -380,6 +496,7 @@ class HTTPProxy:
         ctx = object.__getattribute__(self, "_ctx")
         name = object.__getattribute__(self, "_name")
         http_object = object.__getattribute__(self, "_http_object")
+        start_ns = time.perf_counter_ns()
 
         # Parse call arguments
         http_method, url, body, headers = _parse_call_args(method_name, args, kwargs)
@@ -388,16 +505,25 @@ class HTTPProxy:
             return self._replay_call(http_method, url, name, ctx)
 
         if ctx.is_recording:
-            url_fp, body_fp, headers_fp = _compute_http_fingerprint(
+            if defers_serialization(ctx):
+                return self._record_call_deferred(
+                    method_name, http_method, url, body, headers, name,
+                    http_object, ctx, args, kwargs, start_ns,
+                )
+            fp_start = time.perf_counter_ns()
+            body_data, url_fp, body_fp, headers_fp = _encode_http_request(
                 http_method, url, body, headers,
             )
-            combined_fp = (
-                f"http:{name}:{http_method}:{url_fp[:16]}:{body_fp[:16]}:{headers_fp[:16]}"
+            get_overhead_metrics().record(
+                f"http:{name}", "fingerprint", time.perf_counter_ns() - fp_start,
+            )
+            ordinal = ctx.next_ordinal(
+                _request_key(name, http_method, url_fp, body_fp, headers_fp)
             )
-            ordinal = ctx.next_ordinal(combined_fp)
             return self._record_call(
-                method_name, http_method, url, body, url_fp, body_fp,
+                method_name, http_method, url, body_data, url_fp, body_fp,
                 headers_fp, ordinal, name, http_object, ctx, args, kwargs,
+                start_ns,
             )
 
         # Should not reach here (off mode is handled by sim_http yielding raw object)
@@ -460,7 +586,7 @@ class HTTPProxy:
         method_name: str,
         http_method: str,
         url: str,
-        body: Any,
+        body_data: Any,
         url_fp: str,
         body_fp: str,
         headers_fp: str,
@@ -470,19 +596,23 @@ class HTTPProxy:
         ctx: SimContext,
         args: tuple,
         kwargs: dict,
+        start_ns: int,
     ) -> Any:
         """Handle an HTTP call in record mode."""
         # Execute the real request
         real_method = getattr(http_object, method_name)
+        call_ns = time.perf_counter_ns()
         real_response = real_method(*args, **kwargs)
+        return_ns = time.perf_counter_ns()
 
         # Extract response data
         response_data = _extract_response(real_response)
 
-        # Write fixture
+        # Write fixture; with stub refs the outer stub references it by hash
+        response_fp = encode_for_ref(response_data)[1] if uses_stub_refs(ctx) else ""
         _write_http_fixture(
-            name, http_method, url, body, url_fp, body_fp, headers_fp,
-            ordinal, response_data, ctx,
+            name, http_method, url, body_data, url_fp, body_fp, headers_fp,
+            ordinal, response_data, ctx, response_fp=response_fp,
         )
 
         # Push to collected_stubs for outer @sim_trace
@@ -492,10 +622,50 @@ class HTTPProxy:
             "method": http_method,
             "url": url,
             "ordinal": ordinal,
-            "response": response_data,
+            "response": stub_ref(response_fp) if response_fp else response_data,
             "source": "record",
         })
 
+        elapsed_ns = (call_ns - start_ns) + (time.perf_counter_ns() - return_ns)
+        get_overhead_metrics().record(f"http:{name}", "intercept", elapsed_ns)
+        ctx.overhead_ns += elapsed_ns
+        return real_response
+
+    def _record_call_deferred(
+        self,
+        method_name: str,
+        http_method: str,
+        url: str,
+        body: Any,
+        headers: Optional[Dict[str, str]],
+        name: str,
+        http_object: Any,
+        ctx: SimContext,
+        args: tuple,
+        kwargs: dict,
+        start_ns: int,
+    ) -> Any:
+        """Record mode with a deferring sink: no hashing or serialization here."""
+        # Reserve the ordinal before the call, in call order
+        body, headers = snapshot(body, ctx), snapshot(headers, ctx)
+        slot = OrdinalSlot(ctx, functools.partial(
+            _encode_request_key, name, http_method, url, body, headers,
+        ))
+        real_method = getattr(http_object, method_name)
+        call_ns = time.perf_counter_ns()
+        real_response = real_method(*args, **kwargs)
+        return_ns = time.perf_counter_ns()
+
+        pending = _DeferredHttpRequest(
+            name, http_method, url, slot, body, headers,
+            _extract_response(real_response), ctx,
+        )
+        ctx.sink.emit(pending)
+        ctx.collected_stubs.append(pending)
+
+        elapsed_ns = (call_ns - start_ns) + (time.perf_counter_ns() - return_ns)
+        get_overhead_metrics().record(f"http:{name}", "intercept", elapsed_ns)
+        ctx.overhead_ns += elapsed_ns
         return real_response
 
 
@@ -524,6 +694,8 @@ class sim_http:
         name: Label for this HTTP client (used in fixture file paths).
     """
 
+    __slots__ = ("_http_object", "_name", "_proxy", "_ctx")
+
     def __init__(self, http_object: Any, name: str = "http"):
         self._http_object = http_object
         self._name = name
@@ -532,6 +704,9 @@ class sim_http:
 
     def _setup(self) -> Any:
         """Common setup for both sync and async entry."""
+        if _context._process_off:
+            # Process off — no context lookup, original object unwrapped
+            return self._http_object
         self._ctx = get_context()
 
         if not self._ctx.is_active:
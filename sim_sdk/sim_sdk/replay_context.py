@@ -1,8 +1,9 @@
 """
 ReplayContext — per-request context manager for deterministic fixture replay.
 
-Loads a StubStore from a fixture file, maintains separate ordinal counters for
-DB, HTTP, and trace call types, and stores itself in a ContextVar so adapters
+Fetches an indexed StubStore from the process-wide StubStoreCache (so a
+fixture is parsed once, not once per request), maintains separate ordinal
+counters for DB, HTTP, and trace call types, and stores itself in a ContextVar so adapters
 can retrieve it without explicit argument threading.
 
 Usage (middleware):
@@ -29,7 +30,7 @@ from contextvars import ContextVar, Token
 from pathlib import Path
 from typing import Dict, Optional
 
-from .stub_store import StubStore
+from .stub_store import StubStore, StubStoreCache, get_stub_store_cache
 
 _log = logging.getLogger(__name__)
 
@@ -40,7 +41,11 @@ _sim_replay_context: ContextVar[Optional["ReplayContext"]] = ContextVar(
 
 class ReplayContext:
     """
-    Per-request replay state: loaded StubStore and per-type ordinal counters.
+    Per-request replay state: a shared StubStore and per-type ordinal counters.
+
+    The StubStore comes from a StubStoreCache and is shared with every other
+    request replaying the same fixture; only the ordinal counters belong to
+    this object.
 
     Maintains three independent ordinal sequences (db / http / trace) so that
     calls of different types do not interfere with each other's ordinal counts.
@@ -50,16 +55,26 @@ class ReplayContext:
         fixture_id: Logical name of the fixture (e.g. "calculate_quote").
             The file ``<fixture_dir>/<fixture_id>.json`` must exist.
         fixture_dir: Directory that contains fixture JSON files.
+        cache: StubStoreCache to load through.  Defaults to the process-wide
+            cache returned by get_stub_store_cache().
 
     Raises:
         FileNotFoundError: If the resolved fixture path does not exist.
         ValueError: If the fixture file is not valid JSON.
     """
 
-    def __init__(self, fixture_id: str, fixture_dir: str) -> None:
+    def __init__(
+        self,
+        fixture_id: str,
+        fixture_dir: str,
+        *,
+        cache: Optional[StubStoreCache] = None,
+    ) -> None:
         self.fixture_id = fixture_id
         path = Path(fixture_dir) / f"{fixture_id}.json"
-        self.stub_store: StubStore = StubStore.from_fixture(str(path))
+        if cache is None:
+            cache = get_stub_store_cache()
+        self.stub_store: StubStore = cache.get(str(path))
         self.db_ordinals: Dict[str, int] = defaultdict(int)
         self.http_ordinals: Dict[str, int] = defaultdict(int)
         self.trace_ordinals: Dict[str, int] = defaultdict(int)
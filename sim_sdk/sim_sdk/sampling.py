@@ -0,0 +1,175 @@
+"""
+Record-mode sampling for @sim_trace.
+
+A SamplingPolicy decides which root @sim_trace calls are recorded.  The
+decision is made before the call's arguments are bound, serialized or
+fingerprinted, so an unsampled call costs a few dict lookups.  Nested
+@sim_trace, sim_db, sim_http and sim_capture calls inherit the decision of
+their root trace: while an unsampled root runs, ``SimContext.sampled_out``
+is set and they behave as in off mode.  Replay is never sampled.
+
+Policies combine, in this order:
+
+- ``first_unique``: record only the first N distinct input fingerprints per
+  qualname.  Once N are seen the qualname is dropped before fingerprinting;
+  until then, repeats of an already recorded fingerprint are dropped right
+  after fingerprinting.
+- ``rate`` / ``rates``: probability of recording a call, globally or per
+  qualname.
+- ``max_per_second`` / ``caps``: token-bucket cap on recorded calls per
+  second for each qualname (bursts up to one second's worth).
+
+Usage::
+
+    policy = SamplingPolicy(rate=0.1, rates={"checkout": 1.0}, max_per_second=50)
+    init_sim(mode=SimMode.RECORD, sink=sink, sampling=policy)
+
+One policy is meant to be shared by all contexts of a process; it is
+thread-safe.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: random, threading, time, typing
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+
+class _TokenBucket:
+    """Refill-on-read token bucket; callers hold the policy lock."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, now: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class SamplingPolicy:
+    """Decide which root @sim_trace calls are recorded.
+
+    Args:
+        rate: Probability (0.0–1.0) of recording a call, for any qualname
+            without an entry in ``rates``.
+        rates: Per-qualname probabilities overriding ``rate``.
+        max_per_second: Cap on recorded calls per second for each qualname.
+        caps: Per-qualname caps overriding ``max_per_second``.
+        first_unique: Record only the first N distinct input fingerprints
+            per qualname.
+        clock: Monotonic time source for the token buckets.
+
+    Raises:
+        ValueError: If a rate is outside 0.0–1.0, a cap is not positive, or
+            first_unique is negative.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        rates: Optional[Dict[str, float]] = None,
+        max_per_second: Optional[float] = None,
+        caps: Optional[Dict[str, float]] = None,
+        first_unique: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = _check_rate(rate)
+        self.rates = {q: _check_rate(r) for q, r in (rates or {}).items()}
+        self.max_per_second = _check_cap(max_per_second)
+        self.caps = {q: _check_cap(c) for q, c in (caps or {}).items()}
+        if first_unique is not None and first_unique < 0:
+            raise ValueError(f"first_unique must be >= 0, got {first_unique}")
+        self.first_unique = first_unique
+        self._clock = clock
+        self._random = random.random
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._seen: Dict[str, Set[str]] = {}
+        self._sampled = 0
+        self._dropped = 0
+
+    @property
+    def needs_fingerprint(self) -> bool:
+        """True if admit() must be consulted once the input is fingerprinted."""
+        return self.first_unique is not None
+
+    def should_sample(self, qualname: str) -> bool:
+        """Decide, before any argument work, whether to record this call."""
+        if self.first_unique is not None:
+            seen = self._seen.get(qualname)
+            if seen is not None and len(seen) >= self.first_unique:
+                return self._drop()
+
+        rate = self.rates.get(qualname, self.rate)
+        if rate < 1.0 and (rate <= 0.0 or self._random() >= rate):
+            return self._drop()
+
+        cap = self.caps.get(qualname, self.max_per_second)
+        if cap is not None:
+            now = self._clock()
+            with self._lock:
+                bucket = self._buckets.get(qualname)
+                if bucket is None:
+                    bucket = self._buckets[qualname] = _TokenBucket(cap, now)
+                if not bucket.take(now):
+                    self._dropped += 1
+                    return False
+
+        if self.first_unique is None:
+            self._sampled += 1
+        return True
+
+    def admit(self, qualname: str, input_fp: str) -> bool:
+        """Second stage of first_unique: keep only unseen fingerprints."""
+        if self.first_unique is None:
+            return True
+        with self._lock:
+            seen = self._seen.setdefault(qualname, set())
+            if input_fp in seen or len(seen) >= self.first_unique:
+                self._dropped += 1
+                return False
+            seen.add(input_fp)
+            self._sampled += 1
+            return True
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of root calls recorded and dropped so far."""
+        return {"sampled": self._sampled, "dropped": self._dropped}
+
+    def reset(self) -> None:
+        """Forget token buckets, seen fingerprints and counters."""
+        with self._lock:
+            self._buckets.clear()
+            self._seen.clear()
+            self._sampled = 0
+            self._dropped = 0
+
+    def _drop(self) -> bool:
+        with self._lock:
+            self._dropped += 1
+        return False
+
+
+def _check_rate(rate: float) -> float:
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"sampling rate must be between 0.0 and 1.0, got {rate}")
+    return float(rate)
+
+
+def _check_cap(cap: Optional[float]) -> Optional[float]:
+    if cap is not None and cap <= 0:
+        raise ValueError(f"max_per_second must be > 0, got {cap}")
+    return cap
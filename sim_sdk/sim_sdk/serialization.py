@@ -0,0 +1,448 @@
+"""
+Type-dispatch serializer registry shared by every record and fingerprint path.
+
+Values are converted by looking up ``type(value)`` in an exact-type handler
+table.  Built-in JSON types have pre-populated entries; any other type is
+resolved once — custom serializers along the MRO first, then the built-in
+conversion rules — and the chosen handler is cached for that type, so later
+values of the same type cost a single dict lookup instead of a chain of
+``isinstance``/``hasattr`` probes.
+
+Two dispatchers use the registry:
+
+- the value converter below (``make_serializable``), used by @sim_trace,
+  sim_db, sim_http and sim_capture to build fixture payloads, and by
+  ``canonical_encode``;
+- the ``json.dumps`` default hook in ``canonical`` used by
+  ``canonicalize_json`` / ``fingerprint``.
+
+Custom serializers registered with ``register_serializer`` apply to both::
+
+    register_serializer(Money, lambda m: {"amount": str(m.amount), "ccy": m.ccy})
+
+NumPy arrays and buffer-protocol objects (bytearray, memoryview,
+array.array) are stored compactly as base64 of their raw bytes plus dtype /
+format and shape::
+
+    {"__ndarray__": {"dtype": "<f8", "shape": [2, 3], "data": "..."}}
+    {"__buffer__": {"format": "d", "shape": [4], "data": "..."}}
+
+Protobuf messages are stored as ``MessageToDict`` output, or — after
+``configure_protobuf(store_binary=True)`` — as their deterministic binary
+encoding plus the full message type name::
+
+    {"__protobuf__": {"type": "pkg.Quote", "data": "..."}}
+
+``restore_encoded`` (a ``json`` object hook) turns these encodings back into
+real arrays, memoryviews and messages on load.  For fingerprints,
+``canonical`` hashes the raw buffer / serialized message directly instead of
+the base64 text (see ``buffer_parts`` and ``protobuf_bytes``).
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: array, binascii, threading, typing (numpy, protobuf optional)
+"""
+
+import array
+import binascii
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Optional: NumPy arrays get a dtype-preserving encoding
+try:
+    import numpy as _np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    _np = None
+
+# Optional: protobuf messages
+try:
+    from google.protobuf import descriptor_pool as _descriptor_pool
+    from google.protobuf import message_factory as _message_factory
+    from google.protobuf.json_format import MessageToDict as _MessageToDict
+    from google.protobuf.message import Message as ProtobufMessage
+    HAS_PROTOBUF = True
+except ImportError:
+    HAS_PROTOBUF = False
+    ProtobufMessage = None
+
+Serializer = Callable[[Any], Any]
+
+# Encoded natively by json and by the single-pass encoder, so a custom
+# serializer for them could never be applied consistently.
+_JSON_NATIVE_TYPES = frozenset({str, int, float, bool, type(None), dict, list, tuple})
+
+# Above this many cached types, new resolutions are no longer cached (guards
+# against unbounded growth from dynamically created classes).
+_MAX_CACHED_TYPES = 4096
+
+_lock = threading.Lock()
+_custom: Dict[type, Serializer] = {}
+# type → custom serializer found along its MRO (None = no custom serializer)
+_custom_resolved: Dict[type, Optional[Serializer]] = {}
+_dispatchers: List["TypeDispatcher"] = []
+
+
+def register_serializer(cls: type, fn: Serializer) -> None:
+    """
+    Register a serializer for ``cls`` and its subclasses.
+
+    ``fn`` receives the value and returns a JSON-compatible replacement; the
+    result is converted further if it still contains non-JSON types.  A
+    serializer registered for a closer base class wins over one registered
+    for a more distant base.
+
+    Args:
+        cls: Type to serialize.
+        fn: Callable ``fn(value) -> Any``.
+
+    Raises:
+        TypeError: If ``cls`` is not a type or ``fn`` is not callable.
+        ValueError: If ``cls`` is a JSON-native type (str, int, float, bool,
+            None, dict, list, tuple).
+    """
+    if not isinstance(cls, type):
+        raise TypeError(f"register_serializer expects a type, got {cls!r}")
+    if not callable(fn):
+        raise TypeError(f"serializer for {cls.__name__} is not callable")
+    if cls in _JSON_NATIVE_TYPES:
+        raise ValueError(f"cannot override serialization of built-in {cls.__name__}")
+    with _lock:
+        _custom[cls] = fn
+        _invalidate_unlocked()
+
+
+def unregister_serializer(cls: type) -> None:
+    """Remove the serializer registered for ``cls`` (no-op if none)."""
+    with _lock:
+        if _custom.pop(cls, None) is not None:
+            _invalidate_unlocked()
+
+
+def get_serializer(cls: type) -> Optional[Serializer]:
+    """Return the custom serializer that applies to ``cls``, or None."""
+    try:
+        return _custom_resolved[cls]
+    except KeyError:
+        pass
+    found = None
+    for base in cls.__mro__:
+        found = _custom.get(base)
+        if found is not None:
+            break
+    if len(_custom_resolved) < _MAX_CACHED_TYPES:
+        _custom_resolved[cls] = found
+    return found
+
+
+def _invalidate_unlocked() -> None:
+    _custom_resolved.clear()
+    for dispatcher in _dispatchers:
+        dispatcher.reset()
+
+
+def _is_cacheable(cls: type) -> bool:
+    # Built-in rules probe the instance (hasattr); types answering attribute
+    # lookups dynamically may resolve differently per instance.
+    return getattr(cls, "__getattr__", None) is None
+
+
+class TypeDispatcher:
+    """Exact-type handler table with a per-type resolved cache.
+
+    Args:
+        builtins: Pre-populated ``type → handler`` entries.
+        resolve: ``resolve(value) -> handler`` for types without an entry
+            and without a custom serializer.
+        wrap_custom: Turns a custom serializer into a handler.
+    """
+
+    __slots__ = ("_builtins", "_resolve", "_wrap_custom", "handlers")
+
+    def __init__(
+        self,
+        builtins: Dict[type, Serializer],
+        resolve: Callable[[Any], Serializer],
+        wrap_custom: Callable[[Serializer], Serializer],
+    ) -> None:
+        self._builtins = dict(builtins)
+        self._resolve = resolve
+        self._wrap_custom = wrap_custom
+        self.handlers: Dict[type, Serializer] = {}
+        with _lock:
+            self.reset()
+            _dispatchers.append(self)
+
+    def reset(self) -> None:
+        """Drop resolved entries; built-ins without a custom override remain."""
+        # Swapped in one assignment so concurrent readers see old or new.
+        self.handlers = {
+            cls: handler for cls, handler in self._builtins.items()
+            if cls in _JSON_NATIVE_TYPES or get_serializer(cls) is None
+        }
+
+    def lookup(self, value: Any) -> Serializer:
+        """Return the handler for ``value``, resolving and caching on a miss."""
+        cls = type(value)
+        handler = self.handlers.get(cls)
+        if handler is not None:
+            return handler
+        custom = get_serializer(cls)
+        if custom is not None:
+            handler = self._wrap_custom(custom)
+        else:
+            handler = self._resolve(value)
+        handlers = self.handlers
+        if _is_cacheable(cls) and len(handlers) < _MAX_CACHED_TYPES:
+            handlers[cls] = handler
+        return handler
+
+
+# ---------------------------------------------------------------------------
+# Value conversion for fixture payloads
+# ---------------------------------------------------------------------------
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _bytes_to_hex(value: bytes) -> str:
+    return value.hex()
+
+
+def _dict_to_serializable(value: Dict[Any, Any]) -> Dict[str, Any]:
+    return {str(k): make_serializable(v) for k, v in value.items()}
+
+
+def _sequence_to_serializable(value: Any) -> List[Any]:
+    return [make_serializable(item) for item in value]
+
+
+def _isoformat(value: Any) -> str:
+    return value.isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Arrays and buffer-protocol objects
+# ---------------------------------------------------------------------------
+
+NDARRAY_TAG = "__ndarray__"
+BUFFER_TAG = "__buffer__"
+
+_BUFFER_TYPES = (bytearray, memoryview, array.array)
+
+
+def buffer_parts(value: Any) -> Optional[Tuple[str, Dict[str, Any], memoryview]]:
+    """Split an array or buffer into ``(tag, header, raw byte view)``.
+
+    The header holds the dtype (NumPy) or struct format (buffers) and the
+    shape.  The raw view is C-ordered bytes; it aliases the object's memory
+    whenever the object is already C-contiguous, so hashing or encoding it
+    copies nothing.  Returns None for arrays whose elements are Python
+    objects or structured records, which have no portable raw form.
+    """
+    if HAS_NUMPY and isinstance(value, _np.ndarray):
+        dtype = value.dtype
+        if dtype.hasobject or dtype.fields is not None:
+            return None
+        arr = _np.ascontiguousarray(value)
+        header = {"dtype": dtype.str, "shape": list(arr.shape)}
+        return NDARRAY_TAG, header, memoryview(arr.reshape(-1).view(_np.uint8))
+    view = memoryview(value)
+    header = {"format": view.format, "shape": list(view.shape)}
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes())
+    return BUFFER_TAG, header, view.cast("B")
+
+
+def _b64(raw: memoryview) -> str:
+    return binascii.b2a_base64(raw, newline=False).decode("ascii")
+
+
+def _ndarray_to_serializable(value: Any) -> Any:
+    parts = buffer_parts(value)
+    if parts is None:
+        return make_serializable(value.tolist())
+    tag, header, raw = parts
+    header["data"] = _b64(raw)
+    return {tag: header}
+
+
+def _buffer_to_serializable(value: Any) -> Dict[str, Any]:
+    tag, header, raw = buffer_parts(value)  # type: ignore[misc]
+    header["data"] = _b64(raw)
+    return {tag: header}
+
+
+# ---------------------------------------------------------------------------
+# Protobuf messages
+# ---------------------------------------------------------------------------
+
+PROTOBUF_TAG = "__protobuf__"
+
+# Tags whose presence makes a fixture need ``restore_encoded`` on load.
+ENCODED_TAGS = (NDARRAY_TAG, BUFFER_TAG, PROTOBUF_TAG)
+
+_protobuf_store_binary = False
+
+
+def configure_protobuf(store_binary: bool = False) -> None:
+    """
+    Choose how protobuf messages are stored in fixtures.
+
+    Fingerprints always hash the deterministic binary encoding; this only
+    affects the stored copy.
+
+    Args:
+        store_binary: Store ``SerializeToString(deterministic=True)`` bytes
+            with the message type name, so replay rebuilds the message
+            without a dict round-trip.  Default stores ``MessageToDict``
+            output, which is readable but slower and replays as a dict.
+    """
+    global _protobuf_store_binary
+    _protobuf_store_binary = bool(store_binary)
+
+
+def protobuf_bytes(message: Any) -> bytes:
+    """Deterministic wire encoding of a message (stable map ordering)."""
+    return message.SerializeToString(deterministic=True)
+
+
+def _protobuf_to_dict(message: Any) -> Dict[str, Any]:
+    try:
+        return _MessageToDict(
+            message,
+            preserving_proto_field_name=True,
+            including_default_value_fields=True,  # Critical for determinism
+            use_integers_for_enums=False,  # Use enum names for readability
+        )
+    except TypeError:
+        # protobuf >= 5.26 renamed including_default_value_fields.
+        return _MessageToDict(
+            message,
+            preserving_proto_field_name=True,
+            always_print_fields_with_no_presence=True,
+            use_integers_for_enums=False,
+        )
+
+
+def _protobuf_to_serializable(message: Any) -> Dict[str, Any]:
+    if not _protobuf_store_binary:
+        return _protobuf_to_dict(message)
+    return {PROTOBUF_TAG: {
+        "type": message.DESCRIPTOR.full_name,
+        "data": _b64(memoryview(protobuf_bytes(message))),
+    }}
+
+
+def _protobuf_class(full_name: str) -> Any:
+    descriptor = _descriptor_pool.Default().FindMessageTypeByName(full_name)
+    return _message_factory.GetMessageClass(descriptor)
+
+
+def restore_encoded(obj: Dict[str, Any]) -> Any:
+    """``json`` object hook rebuilding arrays, buffers and protobuf messages.
+
+    Restored arrays are read-only views over the decoded bytes, so a stub
+    shared between requests cannot be mutated by one of them.  Without the
+    optional package (or, for protobuf, when the message type is not
+    registered in this process) an encoding is left as its dict.
+    """
+    if len(obj) != 1:
+        return obj
+    payload = obj.get(NDARRAY_TAG)
+    if payload is not None:
+        if not HAS_NUMPY:
+            return obj
+        data = binascii.a2b_base64(payload["data"])
+        return _np.frombuffer(data, dtype=_np.dtype(payload["dtype"])).reshape(
+            payload["shape"]
+        )
+    payload = obj.get(BUFFER_TAG)
+    if payload is not None:
+        view = memoryview(binascii.a2b_base64(payload["data"]))
+        try:
+            return view.cast(payload["format"], payload["shape"])
+        except (TypeError, ValueError):
+            # Formats memoryview cannot cast to come back as plain bytes.
+            return view.tobytes()
+    payload = obj.get(PROTOBUF_TAG)
+    if payload is not None and HAS_PROTOBUF and "data" in payload:
+        try:
+            cls = _protobuf_class(payload["type"])
+        except KeyError:
+            return obj
+        return cls.FromString(binascii.a2b_base64(payload["data"]))
+    return obj
+
+
+def _resolve_value_handler(value: Any) -> Serializer:
+    """Built-in conversion rules, in the order they have always applied."""
+    if isinstance(value, (str, int, float, bool)):
+        return _identity
+    if isinstance(value, bytes):
+        return _bytes_to_hex
+    if isinstance(value, _BUFFER_TYPES):
+        return _buffer_to_serializable
+    if HAS_NUMPY and isinstance(value, _np.ndarray):
+        return _ndarray_to_serializable
+    if HAS_PROTOBUF and isinstance(value, ProtobufMessage):
+        return _protobuf_to_serializable
+    if isinstance(value, dict):
+        return _dict_to_serializable
+    if isinstance(value, (list, tuple)):
+        return _sequence_to_serializable
+    if hasattr(value, "isoformat"):
+        return _isoformat
+    if hasattr(value, "__float__"):
+        return float
+    return str
+
+
+def _wrap_value_serializer(fn: Serializer) -> Serializer:
+    def handler(value: Any) -> Any:
+        return make_serializable(fn(value))
+    handler.custom = fn  # type: ignore[attr-defined]
+    return handler
+
+
+_value_dispatcher = TypeDispatcher(
+    {
+        str: _identity,
+        int: _identity,
+        float: _identity,
+        bool: _identity,
+        type(None): _identity,
+        dict: _dict_to_serializable,
+        list: _sequence_to_serializable,
+        tuple: _sequence_to_serializable,
+        bytes: _bytes_to_hex,
+        bytearray: _buffer_to_serializable,
+        memoryview: _buffer_to_serializable,
+        array.array: _buffer_to_serializable,
+    },
+    _resolve_value_handler,
+    _wrap_value_serializer,
+)
+
+
+def value_handler(value: Any) -> Serializer:
+    """Return the value-conversion handler ``make_serializable`` uses."""
+    return _value_dispatcher.lookup(value)
+
+
+def make_serializable(value: Any) -> Any:
+    """Convert a value to a JSON-serializable form.
+
+    None, str, int, float and bool are kept; bytes become hex; NumPy arrays
+    and other buffers become their compact tagged encoding; protobuf
+    messages follow ``configure_protobuf``; dict keys
+    become strings; lists and tuples become lists; objects with
+    ``isoformat`` or ``__float__`` use them; anything else falls back to
+    ``str(value)``.  Registered serializers take precedence over every rule
+    except the JSON-native types.
+    """
+    handler = _value_dispatcher.handlers.get(type(value))
+    if handler is None:
+        handler = _value_dispatcher.lookup(value)
+    return handler(value)
@@ -1,20 +1,27 @@
 from .record_sink import RecordSink
 from .in_memory_buffer import InMemoryBuffer, DropPolicy
+from .sharded_buffer import ShardedBuffer
 from .agent_sink import AgentSink
 from .agent_client import AgentHttpClient, AgentUnavailableError
+from .local_agent import LocalAgentServer
 from .sender_worker import SenderWorker
 from .sender_metrics import SenderMetrics
+from .overhead_metrics import OverheadMetrics, get_overhead_metrics
 from .envelope import EventEnvelope, BatchRequest, BatchResponse, fixture_to_envelope
 
 __all__ = [
     'RecordSink',
     'InMemoryBuffer',
     'DropPolicy',
+    'ShardedBuffer',
     'AgentSink',
     'AgentHttpClient',
     'AgentUnavailableError',
+    'LocalAgentServer',
     'SenderWorker',
     'SenderMetrics',
+    'OverheadMetrics',
+    'get_overhead_metrics',
     'EventEnvelope',
     'BatchRequest',
     'BatchResponse',
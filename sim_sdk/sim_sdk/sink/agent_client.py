@@ -1,22 +1,93 @@
 """
 HTTP client for sending event batches to the local record-agent.
 
-Uses only urllib.request from the standard library — no third-party
+Uses only http.client from the standard library — no third-party
 HTTP dependencies (requests, httpx, etc. are banned in the SDK).
+
+The client keeps one persistent HTTP/1.1 connection to the agent and sends
+every batch over it, instead of connecting and tearing down a TCP socket per
+POST (which leaves a TIME_WAIT socket behind for each batch).  The agent may
+close an idle keep-alive connection at any time.  When a request on a
+connection that already carried one fails in a way that shows the agent
+cannot have received it (the connection was reset while the request was
+being sent, or closed before any byte of a response came back), the client
+reconnects and sends the batch once more.  Any other failure is reported
+as AgentUnavailableError without a resend, and left to the sender's retry
+policy, so a batch the agent may have ingested is not sent twice.
+
+With ``compression="gzip"`` or ``"deflate"``, batch bodies of at least
+*compress_min_bytes* are compressed.  Agents that accept compressed bodies
+list the encodings in an ``Accept-Encoding`` header on their responses; the
+client compresses only once the agent has advertised its encoding, so the
+first batch, and every batch to an older agent, is sent as plain JSON.  An
+agent answering 415 to a compressed body gets it again uncompressed, and no
+further compressed bodies.
+
+Batches holding stubs spilled to disk (see sim_sdk.stub_arena) are streamed
+with chunked transfer encoding, and compressed as they are sent, so the
+body is never held in memory whole.
 """
 
 from __future__ import annotations
 
+import functools
+import gzip
+import http.client
+import io
 import json
 import logging
+import socket
+import threading
+import time
 import urllib.error
-import urllib.request
-from typing import List
+import urllib.parse
+import zlib
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from .envelope import BatchRequest, BatchResponse, EventEnvelope
 
+if TYPE_CHECKING:
+    from .sender_metrics import SenderMetrics
+
 logger = logging.getLogger(__name__)
 
+# status, reason, headers, body
+_Response = Tuple[int, str, http.client.HTTPMessage, bytes]
+
+# A request body, or a function starting a fresh stream of body chunks
+_Body = Union[bytes, Callable[[], Iterable[bytes]]]
+
+# Content-Encodings the client can produce
+ENCODINGS = ("gzip", "deflate")
+
+# Bodies smaller than this are sent uncompressed by default
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+# Level 1 gets most of the size reduction on repetitive batch JSON at a
+# fraction of the CPU time of higher levels
+DEFAULT_COMPRESSION_LEVEL = 1
+
+
+def compress_body(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress *body* for the given Content-Encoding.
+
+    ``deflate`` is the zlib format, as HTTP defines it.
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
 
 class AgentUnavailableError(Exception):
     """Raised when the agent endpoint cannot be reached."""
@@ -26,7 +97,11 @@ class AgentHttpClient:
     """Sends event batches to the local record-agent via HTTP POST.
 
     Targets POST /v1/events with a JSON body matching the agent's
-    ingest.IngestRequest schema (PascalCase field names).
+    ingest.IngestRequest schema (PascalCase field names).  Batches share
+    one keep-alive connection, opened on first use and reopened after a
+    failure; close() releases it.  Safe to call from several threads;
+    requests are serialized on the connection.  Given *metrics*, the size
+    and time of each compression are recorded there.
     """
 
     def __init__(
@@ -34,9 +109,47 @@ class AgentHttpClient:
         agent_url: str = "http://localhost:9700",
         *,
         timeout_s: float = 5.0,
+        compression: Optional[str] = None,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+        metrics: Optional[SenderMetrics] = None,
     ):
+        if compression is not None and compression not in ENCODINGS:
+            raise ValueError(
+                f"compression must be one of {ENCODINGS} or None, got {compression!r}"
+            )
+        if not 0 <= compression_level <= 9:
+            raise ValueError(
+                f"compression_level must be between 0 and 9, got {compression_level}"
+            )
         self._endpoint = f"{agent_url.rstrip('/')}/v1/events"
         self._timeout_s = timeout_s
+        self._compression = compression
+        self._compression_level = compression_level
+        self._compress_min_bytes = compress_min_bytes
+        self._metrics = metrics
+        # Encodings the agent advertised on its last response, and those it
+        # refused despite that
+        self._accepted_encodings: FrozenSet[str] = frozenset()
+        self._rejected_encodings: Set[str] = set()
+
+        parts = urllib.parse.urlsplit(self._endpoint)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"agent_url must be an http(s) URL, got {agent_url!r}")
+        self._conn_class = (
+            http.client.HTTPSConnection if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path
+
+        self._lock = threading.Lock()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        # Requests completed on the current connection
+        self._conn_requests = 0
+        # Connections opened over the client's lifetime
+        self.connections = 0
 
     def post_batch(self, envelopes: List[EventEnvelope]) -> BatchResponse:
         """POST a batch of envelopes to the agent.
@@ -46,32 +159,167 @@ class AgentHttpClient:
 
         Raises:
             AgentUnavailableError: Agent not reachable (connection refused,
-                DNS failure, timeout).
+                DNS failure, timeout, connection lost mid-request).
             urllib.error.HTTPError: Agent returned an HTTP error status.
         """
         batch = BatchRequest(envelopes=envelopes)
-        body = batch.serialize()
+        body: _Body
+        payload: _Body
+        if batch.streams:
+            # Spilled stubs: stream the body from disk with chunked encoding
+            body = batch.serialize_chunks
+            encoding = self._encoding_for(None)
+            payload = (
+                functools.partial(self._compress_stream, body, encoding) if encoding
+                else body
+            )
+        else:
+            body = batch.serialize()
+            encoding = self._encoding_for(body)
+            payload = self._compress(body, encoding) if encoding else body
 
-        req = urllib.request.Request(
-            self._endpoint,
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+        with self._lock:
+            status, reason, headers, resp_body = self._send(payload, encoding)
+            if status == 415 and encoding:
+                # Advertised but refused (e.g. by a proxy in between)
+                logger.warning(
+                    "Agent refused %s request bodies; sending uncompressed", encoding,
+                )
+                self._rejected_encodings.add(encoding)
+                status, reason, headers, resp_body = self._send(body, None)
+            self._accepted_encodings = _parse_accept_encoding(headers)
 
-        try:
-            with urllib.request.urlopen(req, timeout=self._timeout_s) as resp:
-                resp_body = resp.read().decode("utf-8")
-                return BatchResponse.from_wire(json.loads(resp_body))
-
-        except urllib.error.HTTPError as exc:
+        if status >= 400:
             logger.warning(
-                "Agent returned HTTP %d for POST %s", exc.code, self._endpoint,
+                "Agent returned HTTP %d for POST %s", status, self._endpoint,
+            )
+            raise urllib.error.HTTPError(
+                self._endpoint, status, reason, headers, io.BytesIO(resp_body),
+            )
+        return BatchResponse.from_wire(json.loads(resp_body.decode("utf-8")))
+
+    def close(self) -> None:
+        """Close the keep-alive connection, if open."""
+        with self._lock:
+            self._disconnect()
+
+    # -- internals -----------------------------------------------------------
+
+    def _encoding_for(self, body: Optional[bytes]) -> Optional[str]:
+        """Encoding for *body* (None: a streamed body, taken as large)."""
+        encoding = self._compression
+        if (
+            encoding is None
+            or (body is not None and len(body) < self._compress_min_bytes)
+            or encoding not in self._accepted_encodings
+            or encoding in self._rejected_encodings
+        ):
+            return None
+        return encoding
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        start = time.perf_counter_ns()
+        payload = compress_body(body, encoding, self._compression_level)
+        if self._metrics is not None:
+            self._metrics.record_compression(
+                len(body), len(payload), time.perf_counter_ns() - start,
+            )
+        return payload
+
+    def _compress_stream(
+        self, chunks: Callable[[], Iterable[bytes]], encoding: str,
+    ) -> Iterator[bytes]:
+        """Compress a chunk stream as it is sent; recorded once complete."""
+        wbits = 31 if encoding == "gzip" else 15
+        compressor = zlib.compressobj(self._compression_level, zlib.DEFLATED, wbits)
+        in_bytes = out_bytes = elapsed = 0
+        for chunk in chunks():
+            start = time.perf_counter_ns()
+            data = compressor.compress(chunk)
+            elapsed += time.perf_counter_ns() - start
+            in_bytes += len(chunk)
+            out_bytes += len(data)
+            if data:
+                yield data
+        start = time.perf_counter_ns()
+        data = compressor.flush()
+        elapsed += time.perf_counter_ns() - start
+        out_bytes += len(data)
+        if self._metrics is not None:
+            self._metrics.record_compression(in_bytes, out_bytes, elapsed)
+        yield data
+
+    def _send(self, body: _Body, encoding: Optional[str]) -> _Response:
+        while True:
+            reused = self._conn is not None and self._conn_requests > 0
+            try:
+                conn = self._request(body, encoding)
+            except (http.client.HTTPException, OSError) as exc:
+                self._disconnect()
+                if reused and isinstance(exc, (ConnectionResetError, BrokenPipeError)):
+                    # The agent closed the idle connection before taking the
+                    # request; retry once on a fresh one, which will not take
+                    # this branch again
+                    logger.debug("Agent connection lost (%s), reconnecting", exc)
+                    continue
+                raise AgentUnavailableError(
+                    f"Agent unreachable at {self._endpoint}: {exc}"
+                ) from exc
+            try:
+                return self._response(conn)
+            except (http.client.HTTPException, OSError) as exc:
+                self._disconnect()
+                if reused and isinstance(exc, http.client.RemoteDisconnected):
+                    # Closed without a byte of response: the agent dropped
+                    # the idle connection rather than handle the request
+                    logger.debug("Agent connection lost (%s), reconnecting", exc)
+                    continue
+                raise AgentUnavailableError(
+                    f"Agent unreachable at {self._endpoint}: {exc}"
+                ) from exc
+
+    def _request(self, body: _Body, encoding: Optional[str]) -> http.client.HTTPConnection:
+        conn = self._conn
+        if conn is None:
+            conn = self._conn = self._conn_class(
+                self._host, self._port, timeout=self._timeout_s,
             )
-            raise
+            self._conn_requests = 0
+            self.connections += 1
+        headers = {"Content-Type": "application/json"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        # A callable body is a chunk stream, started afresh for each attempt;
+        # http.client sends it with Transfer-Encoding: chunked
+        data = body() if callable(body) else body
+        conn.request("POST", self._path, body=data, headers=headers)
+        return conn
 
-        except (urllib.error.URLError, OSError) as exc:
-            reason = getattr(exc, "reason", str(exc))
-            raise AgentUnavailableError(
-                f"Agent unreachable at {self._endpoint}: {reason}"
-            ) from exc
+    def _response(self, conn: http.client.HTTPConnection) -> _Response:
+        resp = conn.getresponse()
+        # Read the whole body so the connection can carry the next request
+        resp_body = resp.read()
+        self._conn_requests += 1
+        if resp.will_close:
+            self._disconnect()
+        return resp.status, resp.reason, resp.headers, resp_body
+
+    def _disconnect(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _parse_accept_encoding(headers: http.client.HTTPMessage) -> FrozenSet[str]:
+    """Encodings an Accept-Encoding header accepts (those not given q=0)."""
+    accepted = set()
+    for token in (headers.get("Accept-Encoding") or "").split(","):
+        name, _, param = token.partition(";")
+        name, param = name.strip().lower(), param.replace(" ", "").lower()
+        try:
+            refused = param.startswith("q=") and float(param[2:]) == 0
+        except ValueError:
+            refused = False
+        if name and not refused:
+            accepted.add(name)
+    return frozenset(accepted)
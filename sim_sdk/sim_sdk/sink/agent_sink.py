@@ -1,7 +1,7 @@
 """
 AgentSink — concrete RecordSink that ships events to the local record-agent.
 
-Wires together InMemoryBuffer + SenderWorker + AgentHttpClient.
+Wires together ShardedBuffer + InMemoryBuffer + SenderWorker + AgentHttpClient.
 The background sender thread is started automatically on construction
 and stopped on close().
 """
@@ -9,15 +9,22 @@ and stopped on close().
 from __future__ import annotations
 
 import logging
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING, Union
 
-from .agent_client import AgentHttpClient
+from .agent_client import (
+    DEFAULT_COMPRESS_MIN_BYTES,
+    DEFAULT_COMPRESSION_LEVEL,
+    AgentHttpClient,
+)
 from .in_memory_buffer import DropPolicy
+from .overhead_metrics import OverheadMetrics, get_overhead_metrics
 from .record_sink import RecordSink
 from .sender_metrics import SenderMetrics
 from .sender_worker import SenderWorker
+from .sharded_buffer import ShardedBuffer
 
 if TYPE_CHECKING:
+    from ..deferred import DeferredEvent
     from ..fixture.schema import FixtureEvent
 
 logger = logging.getLogger(__name__)
@@ -26,12 +33,25 @@ logger = logging.getLogger(__name__)
 class AgentSink(RecordSink):
     """RecordSink that sends events to the local dopl record-agent.
 
-    Events flow:  emit() → InMemoryBuffer → SenderWorker → AgentHttpClient.
+    Events flow:  emit() → ShardedBuffer → InMemoryBuffer → SenderWorker
+    → AgentHttpClient.
 
     The worker runs in a daemon thread and sends batches best-effort.
     If the agent is down the worker retries once, then drops the batch
     and increments failure counters.
 
+    With ``defer_serialization=True`` the record-mode primitives emit
+    DeferredEvents holding raw references, and the worker thread does all
+    serialization and fingerprinting (see sim_sdk.deferred).
+    ``copy_mutable=True`` shallow-copies top-level list/dict/set/bytearray
+    values on the request thread so later mutation does not leak into the
+    recording.  ``stub_refs=True`` replaces payloads in the ``stubs`` of
+    enclosing @sim_trace events with content-hash references to the events
+    that already carry them (see sim_sdk.stub_refs).  ``compression``
+    ("gzip" or "deflate") compresses batch bodies of at least
+    *compress_min_bytes* at *compression_level*, once the agent advertises
+    support for it (see AgentHttpClient).
+
     Usage::
 
         sink = AgentSink(agent_url="http://localhost:9700", service="my-app")
@@ -51,14 +71,31 @@ class AgentSink(RecordSink):
         max_retries: int = 1,
         http_timeout_s: float = 5.0,
         drop_policy: DropPolicy = DropPolicy.DROP_OLDEST,
+        defer_serialization: bool = False,
+        copy_mutable: bool = False,
+        stub_refs: bool = False,
+        compression: Optional[str] = None,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
     ):
         super().__init__(
             max_buffer_bytes=max_buffer_bytes,
             max_batch_events=max_batch_events,
             drop_policy=drop_policy,
         )
-        self._metrics = SenderMetrics()
-        self._client = AgentHttpClient(agent_url, timeout_s=http_timeout_s)
+        self.defer_serialization = defer_serialization
+        self.copy_mutable = copy_mutable
+        self.stub_refs = stub_refs
+        self._buffer = ShardedBuffer(self._buffer)  # type: ignore[assignment]
+        self._metrics = SenderMetrics(self._buffer)  # type: ignore[arg-type]
+        self._client = AgentHttpClient(
+            agent_url,
+            timeout_s=http_timeout_s,
+            compression=compression,
+            compression_level=compression_level,
+            compress_min_bytes=compress_min_bytes,
+            metrics=self._metrics,
+        )
         self._worker = SenderWorker(
             self._buffer,
             self._client,
@@ -72,15 +109,15 @@ class AgentSink(RecordSink):
 
     # -- RecordSink overrides ------------------------------------------------
 
-    def emit(self, event: FixtureEvent) -> None:
+    def emit(self, event: Union[FixtureEvent, DeferredEvent]) -> None:
         """Buffer an event and notify the worker if threshold reached.
 
-        Non-blocking: never sends on the caller's thread.
+        Non-blocking: never sends on the caller's thread, and takes no
+        shared lock unless the thread's stage is full (see ShardedBuffer).
         """
-        self._buffer.append(event)
-        self._metrics.record_buffer(1)
-        if len(self._buffer) >= self._max_batch_events:
+        if self._buffer.append(event) and len(self._buffer) >= self._max_batch_events:
             self._worker.notify()
+        self._metrics.record_buffer(1)
 
     def flush(self) -> None:
         """Drain the buffer and wait for the in-flight batch to complete."""
@@ -89,6 +126,7 @@ class AgentSink(RecordSink):
     def close(self) -> None:
         """Flush remaining events and stop the background worker."""
         self._worker.stop()
+        self._client.close()
         logger.debug("AgentSink closed — %s", self._metrics)
 
     def _persist_batch(self, batch: List[FixtureEvent]) -> None:
@@ -100,3 +138,8 @@ class AgentSink(RecordSink):
     def metrics(self) -> SenderMetrics:
         """Access the sender pipeline counters."""
         return self._metrics
+
+    @property
+    def overhead(self) -> OverheadMetrics:
+        """Access the process-wide SDK overhead histograms."""
+        return get_overhead_metrics()
@@ -3,20 +3,35 @@ Wire-format types matching the agent's POST /v1/events contract.
 
 The Go agent uses PascalCase JSON keys (default Go encoding, no struct
 tags), so all serialization here must emit PascalCase field names.
+
+Envelopes built from events whose stubs were spilled to disk (see
+sim_sdk.stub_arena) keep the SpilledStubs in their payload.  BatchRequest
+streams those stubs into the body one block at a time
+(serialize_chunks()), so sending a stub-heavy trace never holds all of its
+stubs in memory again.
 """
 
 from __future__ import annotations
 
 import json
+import re
 import time
+import uuid
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+from ..stub_arena import SpilledStubs
 
 if TYPE_CHECKING:
     from ..fixture.schema import FixtureEvent
 
 SCHEMA_VERSION = 1
 
+_SEPARATORS = (",", ":")
+
+# Approximate size of the body chunks yielded while streaming spilled stubs
+CHUNK_BYTES = 64 * 1024
+
 
 @dataclass
 class EventEnvelope:
@@ -54,10 +69,62 @@ class BatchRequest:
     def to_wire(self) -> Dict[str, Any]:
         return {"Events": [e.to_wire() for e in self.envelopes]}
 
+    @property
+    def streams(self) -> bool:
+        """True if any payload holds spilled stubs to stream from disk."""
+        return any(
+            isinstance(e.payload.get("stubs"), SpilledStubs) for e in self.envelopes
+        )
+
     def serialize(self) -> bytes:
-        return json.dumps(
-            self.to_wire(), separators=(",", ":"), default=str,
-        ).encode("utf-8")
+        if not self.streams:
+            return json.dumps(
+                self.to_wire(), separators=_SEPARATORS, default=str,
+            ).encode("utf-8")
+        return b"".join(self.serialize_chunks())
+
+    def serialize_chunks(self) -> Iterator[bytes]:
+        """The serialized body in chunks, streaming spilled stubs from disk.
+
+        Everything but the spilled stubs is encoded at once, with a unique
+        placeholder string for each spilled ``stubs`` array; the placeholders
+        are then replaced by the stubs, read back and encoded one block at a
+        time.  Each call starts a fresh stream.
+        """
+        wire = self.to_wire()
+        spilled: Dict[str, SpilledStubs] = {}
+        token = uuid.uuid4().hex
+        for i, envelope in enumerate(wire["Events"]):
+            stubs = envelope["Payload"].get("stubs")
+            if isinstance(stubs, SpilledStubs):
+                marker = f"\x00spilled-stubs:{token}:{i}"
+                envelope["Payload"] = dict(envelope["Payload"], stubs=marker)
+                spilled[json.dumps(marker)] = stubs
+        body = json.dumps(wire, separators=_SEPARATORS, default=str)
+        if not spilled:
+            yield body.encode("utf-8")
+            return
+        pos = 0
+        for match in re.finditer("|".join(map(re.escape, spilled)), body):
+            yield body[pos:match.start()].encode("utf-8")
+            yield from _stream_array(spilled[match.group()])
+            pos = match.end()
+        yield body[pos:].encode("utf-8")
+
+
+def _stream_array(stubs: SpilledStubs) -> Iterator[bytes]:
+    """Encode *stubs* as a JSON array, in chunks of about CHUNK_BYTES."""
+    parts = ["["]
+    size = 1
+    for i, stub in enumerate(stubs):
+        part = json.dumps(stub, separators=_SEPARATORS, default=str)
+        parts.append("," + part if i else part)
+        size += len(part) + 1
+        if size >= CHUNK_BYTES:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    parts.append("]")
+    yield "".join(parts).encode("utf-8")
 
 
 @dataclass
@@ -84,20 +151,23 @@ def fixture_to_envelope(
     *,
     service: str = "",
     session_id: str = "",
+    timestamp_ms: Optional[int] = None,
 ) -> EventEnvelope:
     """Convert an SDK FixtureEvent into a wire-format EventEnvelope.
 
     Maps run_id → SessionID and qualname → Trace.
     The full FixtureEvent dict is placed inside Payload as an opaque blob
     so the agent stores it without needing to understand the schema.
+    *timestamp_ms* defaults to now; batch senders pass one value for the
+    whole batch.
     """
     return EventEnvelope(
         schema_version=SCHEMA_VERSION,
         fixture_id=event.fixture_id,
         session_id=session_id or event.run_id,
         event_type=event.event_type,
-        timestamp_ms=int(time.time() * 1000),
-        payload=event.to_dict(),
+        timestamp_ms=time.time_ns() // 1_000_000 if timestamp_ms is None else timestamp_ms,
+        payload=event.to_dict(stream_stubs=True),
         service=service,
         trace=event.qualname,
     )
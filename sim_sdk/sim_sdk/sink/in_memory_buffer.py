@@ -3,19 +3,29 @@ In-memory buffer for FixtureEvent objects with bounded size and drop policies.
 
 Thread-safe: all mutations are protected by an internal lock so the
 buffer can be shared between the emitting thread and the sender worker.
+
+Memory is accounted per event: estimate_event_size() (sim_sdk.sizing)
+walks an event's payload once at enqueue (sampling large containers), and
+the buffer keeps a running total that drop policies act on.
 """
 
 from __future__ import annotations
 
+import itertools
 import random
 import sys
 import threading
 from enum import Enum
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from ..sizing import estimate_event_size
 
 if TYPE_CHECKING:
     from ..fixture.schema import FixtureEvent
 
+# Dropped slots kept before InMemoryBuffer compacts its event list
+_COMPACT_MIN = 64
+
 
 class DropPolicy(Enum):
     DROP_OLDEST = "DROP_OLDEST"
@@ -27,44 +37,131 @@ class DropPolicy(Enum):
 class InMemoryBuffer:
     """Bounded in-memory queue of FixtureEvent objects.
 
-    Tracks approximate memory usage and drops events according to the
-    configured DropPolicy when the buffer exceeds max_buffer_bytes.
+    Each event's size is estimated once, on append, and a running total of
+    the buffered events' sizes is kept.  When an append would take the
+    buffer past max_buffer_bytes, events are dropped according to the
+    configured DropPolicy until it fits; an event larger than the whole
+    budget is dropped itself.  DROP_NONE never drops.
+
+    Every drop is O(1) under the lock: events live in a list read from a
+    head offset, so the oldest is cleared by advancing the head, the
+    newest is popped, and a random one is replaced by a tombstone (None).
+    Tombstones are compacted away once they outnumber the buffered events.
+    drain() swaps the list out under the lock and filters it after
+    releasing it.
     """
 
     def __init__(self, max_buffer_bytes: int, drop_policy: DropPolicy = DropPolicy.DROP_OLDEST):
         self._lock = threading.Lock()
-        self.buffer: List[FixtureEvent] = []
+        self._events: List[Optional[FixtureEvent]] = []
+        # Estimated size of each slot in _events
+        self._sizes: List[int] = []
+        # Slots before _head are dropped; _count is the live events after it
+        self._head = 0
+        self._count = 0
+        self._bytes = 0
         self.max_buffer_bytes = max_buffer_bytes
         self.drop_policy = drop_policy
+        # Events dropped over the buffer's lifetime
+        self.dropped = 0
+
+    @property
+    def buffer(self) -> List[FixtureEvent]:
+        """A copy of the buffered events, oldest first."""
+        with self._lock:
+            return [e for e in self._events[self._head:] if e is not None]
 
     def __len__(self) -> int:
         with self._lock:
-            return len(self.buffer)
+            return self._count
 
     def memory_usage(self) -> int:
+        """Estimated bytes held: the buffered events plus the queue itself."""
+        with self._lock:
+            return self._memory_usage_unlocked()
+
+    def append(self, event: FixtureEvent) -> int:
+        """Buffer *event*; returns the number of events dropped to make room."""
+        size = estimate_event_size(event)
         with self._lock:
-            return sys.getsizeof(self.buffer)
+            return self._add(event, size)
+
+    def extend(self, items: Iterable[Tuple[FixtureEvent, int]]) -> int:
+        """Buffer (event, estimated size) pairs in order under one lock acquisition.
 
-    def append(self, event: FixtureEvent) -> None:
+        Returns the number of events dropped to make room.
+        """
         with self._lock:
-            if self._memory_usage_unlocked() >= self.max_buffer_bytes and self.buffer:
+            dropped = 0
+            for event, size in items:
+                dropped += self._add(event, size)
+            return dropped
+
+    def _add(self, event: FixtureEvent, size: int) -> int:
+        dropped = 0
+        if self.drop_policy != DropPolicy.DROP_NONE:
+            if size > self.max_buffer_bytes:
+                self.dropped += 1
+                return 1
+            while self._count and self._bytes + size > self.max_buffer_bytes:
                 self._drop()
-            self.buffer.append(event)
+                dropped += 1
+            if dropped:
+                self.dropped += dropped
+                self._maybe_compact()
+        self._events.append(event)
+        self._sizes.append(size)
+        self._count += 1
+        self._bytes += size
+        return dropped
 
     def drain(self) -> List[FixtureEvent]:
         """Remove and return all buffered events."""
         with self._lock:
-            batch = list(self.buffer)
-            self.buffer.clear()
-            return batch
+            events, head, count = self._events, self._head, self._count
+            self._events = []
+            self._sizes = []
+            self._head = 0
+            self._count = 0
+            self._bytes = 0
+        if len(events) - head == count:
+            return events[head:] if head else events  # type: ignore[return-value]
+        return [e for e in itertools.islice(events, head, None) if e is not None]
 
     def _memory_usage_unlocked(self) -> int:
-        return sys.getsizeof(self.buffer)
+        return sys.getsizeof(self._events) + sys.getsizeof(self._sizes) + self._bytes
 
     def _drop(self) -> None:
+        events = self._events
         if self.drop_policy == DropPolicy.DROP_OLDEST:
-            self.buffer.pop(0)
+            head = self._head
+            while events[head] is None:
+                head += 1
+            events[head] = None
+            self._bytes -= self._sizes[head]
+            self._head = head + 1
         elif self.drop_policy == DropPolicy.DROP_NEWEST:
-            self.buffer.pop()
-        elif self.drop_policy == DropPolicy.DROP_RANDOM:
-            self.buffer.pop(random.randint(0, len(self.buffer) - 1))
+            while events[-1] is None:
+                events.pop()
+                self._sizes.pop()
+            events.pop()
+            self._bytes -= self._sizes.pop()
+        else:
+            # Tombstones are at most half the slots, so this retries rarely
+            while True:
+                index = random.randrange(self._head, len(events))
+                if events[index] is not None:
+                    break
+            events[index] = None
+            self._bytes -= self._sizes[index]
+        self._count -= 1
+
+    def _maybe_compact(self) -> None:
+        events = self._events
+        if len(events) - self._count <= max(self._count, _COMPACT_MIN):
+            return
+        sizes = self._sizes
+        live = [i for i in range(self._head, len(events)) if events[i] is not None]
+        self._events = [events[i] for i in live]
+        self._sizes = [sizes[i] for i in live]
+        self._head = 0
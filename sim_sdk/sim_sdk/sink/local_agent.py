@@ -0,0 +1,187 @@
+"""
+In-process stand-in for the record-agent, for tests and throughput runs.
+
+LocalAgentServer answers POST /v1/events the way the agent does (an
+ingest.IngestResponse with PascalCase fields, or a JSON error with status
+400/404/415) over HTTP/1.1 keep-alive, reading Content-Length or chunked
+bodies, and counts the connections, requests, events and body bytes it
+received.  It accepts every valid batch and stores nothing.  Like the
+agent, it decompresses gzip and deflate bodies and advertises them in
+``Accept-Encoding``; pass ``encodings=()`` to stand in for an agent that
+predates compression.
+
+    with LocalAgentServer() as agent:
+        sink = AgentSink(agent_url=agent.url)
+        ...
+        sink.close()
+        assert agent.events == expected
+
+drop_connections() closes every open client connection from the server
+side, as an agent restart or idle timeout would.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: gzip, http.server, json, socket, threading, typing, zlib
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import socket
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Sequence, Set
+
+_DECOMPRESS = {"gzip": gzip.decompress, "deflate": zlib.decompress}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; like the agent (Go sets
+    # TCP_NODELAY), do not let Nagle hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.agent._connected(self.connection)
+
+    def finish(self) -> None:
+        try:
+            super().finish()
+        finally:
+            self.server.agent._disconnected(self.connection)
+
+    def do_POST(self) -> None:
+        agent = self.server.agent
+        body = self._read_body()
+        if self.path.rstrip("/") != "/v1/events":
+            self._reply(404, {"error": "not found"})
+            return
+        encoding = (self.headers.get("Content-Encoding") or "identity").strip().lower()
+        if encoding != "identity" and encoding not in agent.encodings:
+            if agent.encodings:
+                self._reply(415, {"error": f"unsupported Content-Encoding {encoding!r}"})
+                return
+            # An agent without compression support reads the body as JSON
+            encoding = "identity"
+        try:
+            raw = body if encoding == "identity" else _DECOMPRESS[encoding](body)
+            events = json.loads(raw)["Events"]
+        except (ValueError, KeyError, TypeError, EOFError, OSError, zlib.error) as exc:
+            self._reply(400, {"error": f"invalid JSON: {exc}"})
+            return
+        agent._received(len(events), len(body))
+        self._reply(200, {"Accepted": len(events), "Dropped": 0,
+                          "DroppedByReason": {}, "Invalid": 0})
+
+    def _read_body(self) -> bytes:
+        if "chunked" not in (self.headers.get("Transfer-Encoding") or "").lower():
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                # Skip trailers up to the blank line ending the body
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.server.agent.encodings:
+            self.send_header("Accept-Encoding", ", ".join(self.server.agent.encodings))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    agent: LocalAgentServer
+
+
+class LocalAgentServer:
+    """Record-agent stand-in listening on 127.0.0.1 (an ephemeral port by default)."""
+
+    def __init__(self, port: int = 0, *, encodings: Sequence[str] = ("gzip", "deflate")):
+        unknown = set(encodings) - set(_DECOMPRESS)
+        if unknown:
+            raise ValueError(f"unsupported encodings: {sorted(unknown)}")
+        self.encodings = tuple(encodings)
+        self._lock = threading.Lock()
+        self._sockets: Set[socket.socket] = set()
+        self.connections = 0
+        self.requests = 0
+        self.events = 0
+        # Request body bytes as received, before decompression
+        self.bytes_received = 0
+        self._server = _Server(("127.0.0.1", port), _Handler)
+        self._server.agent = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as ``agent_url``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> LocalAgentServer:
+        """Serve on a daemon thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                name="dopl-local-agent", daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def drop_connections(self) -> None:
+        """Close every open client connection from the server side."""
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Stop serving and close the listening socket and open connections."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.drop_connections()
+        self._server.server_close()
+
+    def __enter__(self) -> LocalAgentServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- handler callbacks ---------------------------------------------------
+
+    def _connected(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._sockets.add(sock)
+            self.connections += 1
+
+    def _disconnected(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def _received(self, events: int, body_bytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.events += events
+            self.bytes_received += body_bytes
@@ -0,0 +1,203 @@
+"""
+Self-measured SDK overhead, per qualname and phase.
+
+The record paths time their own work with ``time.perf_counter_ns`` and add
+each measurement to a log-bucketed histogram keyed by (qualname, phase):
+
+    bind         @sim_trace argument binding
+    fingerprint  input conversion + hashing (@sim_trace args, sim_db query,
+                 sim_http request)
+    serialize    output conversion and FixtureEvent / stub construction
+    enqueue      RecordSink.emit()
+    intercept    DBProxy / HTTPProxy time per call, excluding the real call
+    total        @sim_trace time per call, excluding the wrapped function
+    resolve      deferred events serialized on the sender thread
+
+Qualnames are the fixture qualnames: the @sim_trace name, ``db:<name>``,
+``http:<name>`` and ``capture:<label>``.
+
+Histogram buckets split each power of two into four, so any reported
+quantile is within 25% of the true value.  Each thread records into
+histograms of its own, without taking a lock, so recording is a dict lookup
+and a few integer updates, cheap enough to leave on in production from any
+number of request threads; snapshot() merges them.  ``enabled = False``
+turns it off.
+
+Alongside the histograms, named counters record discrete events such as
+the OverheadBudget's level changes (``budget.full->sampled``).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Tuple
+
+from .thread_cells import ThreadCells
+
+_SUB_BUCKETS = 4  # per power of two
+_QUANTILES = (("p50_ns", 0.50), ("p90_ns", 0.90), ("p99_ns", 0.99))
+
+
+def _bucket_index(ns: int) -> int:
+    """Map a duration to its bucket: 0..3 exact, then 4 buckets per octave."""
+    if ns < _SUB_BUCKETS:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return _SUB_BUCKETS * (bits - 2) + ((ns >> (bits - 3)) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_lower(index: int) -> int:
+    if index < _SUB_BUCKETS:
+        return index
+    octave, sub = divmod(index, _SUB_BUCKETS)
+    return (_SUB_BUCKETS + sub) << (octave - 1)
+
+
+def _bucket_upper(index: int) -> int:
+    return _bucket_lower(index + 1)
+
+
+class _Histogram:
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, ns: int) -> None:
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        index = _bucket_index(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: _Histogram) -> None:
+        self.count += other.count
+        self.total_ns += other.total_ns
+        if other.max_ns > self.max_ns:
+            self.max_ns = other.max_ns
+        for index, n in list(other.buckets.items()):
+            self.buckets[index] = self.buckets.get(index, 0) + n
+
+    def quantile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-quantile, capped at max."""
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns // self.count if self.count else 0,
+            "max_ns": self.max_ns,
+        }
+        for key, q in _QUANTILES:
+            data[key] = self.quantile(q)
+        data["buckets"] = [
+            [_bucket_lower(i), self.buckets[i]] for i in sorted(self.buckets)
+        ]
+        return data
+
+
+# Histograms recorded by one thread
+_Cell = Dict[Tuple[str, str], _Histogram]
+
+
+class OverheadMetrics:
+    """Thread-safe per-(qualname, phase) histograms of SDK overhead in ns.
+
+    record() adds to histograms owned by the calling thread, without taking
+    a lock; snapshot() merges every thread's histograms, folding those of
+    finished threads into a shared set.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Histograms of each thread that recorded; finished threads' are
+        # merged into _histograms when read
+        self._cells: ThreadCells[_Cell] = ThreadCells(dict)
+        self._histograms: _Cell = {}
+        self._counters: Dict[str, int] = {}
+        self.enabled: bool = True
+
+    def record(self, qualname: str, phase: str, elapsed_ns: int) -> None:
+        if not self.enabled:
+            return
+        cell = self._cells.get()
+        key = (qualname, phase)
+        hist = cell.get(key)
+        if hist is None:
+            hist = cell[key] = _Histogram()
+        hist.add(elapsed_ns)
+
+    def increment(self, name: str, n: int = 1) -> None:
+        """Add *n* to the named counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def counters(self) -> Dict[str, int]:
+        """Return a point-in-time copy of the named counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return {qualname: {phase: summary}} as a point-in-time copy.
+
+        Each summary has count, total_ns, mean_ns, max_ns, p50_ns, p90_ns,
+        p99_ns and buckets ([lower_bound_ns, count] pairs).
+        """
+        with self._lock:
+            merged = self._merged_unlocked()
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (qualname, phase), hist in sorted(merged.items()):
+            result.setdefault(qualname, {})[phase] = hist.to_dict()
+        return result
+
+    def _merged_unlocked(self) -> _Cell:
+        for cell in self._cells.remove_finished():
+            _merge_into(self._histograms, cell)
+        merged: _Cell = {}
+        _merge_into(merged, self._histograms)
+        for cell in self._cells.values():
+            _merge_into(merged, cell)
+        return merged
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            for cell in self._cells.values():
+                cell.clear()
+            self._counters.clear()
+
+    def __repr__(self) -> str:
+        with self._lock:
+            keys = len(self._merged_unlocked())
+        return f"OverheadMetrics(histograms={keys}, enabled={self.enabled})"
+
+
+def _merge_into(target: _Cell, cell: _Cell) -> None:
+    # list() copies the items in one step while the owning thread may be
+    # adding keys
+    for key, hist in list(cell.items()):
+        merged = target.get(key)
+        if merged is None:
+            merged = target[key] = _Histogram()
+        merged.merge(hist)
+
+
+_overhead_metrics = OverheadMetrics()
+
+
+def get_overhead_metrics() -> OverheadMetrics:
+    """Return the process-wide OverheadMetrics the record paths report to."""
+    return _overhead_metrics
@@ -48,6 +48,10 @@ class RecordSink(ABC):
     def close(self) -> None:
         self.flush()
 
+    def queue_pressure(self) -> float:
+        """Buffer fill ratio (0.0–1.0), polled by OverheadBudget."""
+        return min(self._buffer.memory_usage() / self._buffer.max_buffer_bytes, 1.0)
+
     @abstractmethod
     def _persist_batch(self, batch: List[FixtureEvent]) -> None:
         """Write a batch of events to the backing store."""
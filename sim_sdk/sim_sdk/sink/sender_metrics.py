@@ -5,28 +5,64 @@ Thread-safe counters for the sender pipeline.
 from __future__ import annotations
 
 import threading
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .thread_cells import ThreadCells
+
+if TYPE_CHECKING:
+    from .in_memory_buffer import InMemoryBuffer
+
+
+class _Cell:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
 
 
 class SenderMetrics:
     """Atomic counters tracking sender pipeline health.
 
-    All mutators acquire an internal lock, so they are safe to call from
-    both the emitting thread and the background sender thread.
+    All mutators are safe to call from both the emitting threads and the
+    background sender thread.  record_buffer(), called on every emit, adds
+    to a counter owned by the calling thread without taking a lock; the
+    per-thread counters are summed when read.  The other mutators acquire
+    an internal lock.  Given the sink's *buffer*, snapshot() also reports
+    its current byte level and includes the events it dropped.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, buffer: Optional[InMemoryBuffer] = None) -> None:
         self._lock = threading.Lock()
-        self.buffered: int = 0
+        self._buffer = buffer
+        # Counter of each thread that emitted; finished threads' are folded
+        # into _buffered_base when read
+        self._buffered_cells: ThreadCells[_Cell] = ThreadCells(_Cell)
+        self._buffered_base = 0
         self.sent: int = 0
         self.dropped: int = 0
         self.failures: int = 0
         self.batches: int = 0
         self.agent_unavailable: int = 0
+        # Batch bodies compressed, their total size before and after, and
+        # the time spent compressing them
+        self.compressed_batches: int = 0
+        self.compress_in_bytes: int = 0
+        self.compress_out_bytes: int = 0
+        self.compress_ns: int = 0
 
     def record_buffer(self, count: int) -> None:
+        self._buffered_cells.get().value += count
+
+    @property
+    def buffered(self) -> int:
+        """Events emitted into the buffer, summed over threads."""
         with self._lock:
-            self.buffered += count
+            return self._buffered_unlocked()
+
+    def _buffered_unlocked(self) -> int:
+        cells = self._buffered_cells
+        self._buffered_base += sum(c.value for c in cells.remove_finished())
+        return self._buffered_base + sum(c.value for c in cells.values())
 
     def record_send(self, accepted: int, dropped: int) -> None:
         with self._lock:
@@ -38,6 +74,13 @@ class SenderMetrics:
         with self._lock:
             self.dropped += count
 
+    def record_compression(self, in_bytes: int, out_bytes: int, elapsed_ns: int) -> None:
+        with self._lock:
+            self.compressed_batches += 1
+            self.compress_in_bytes += in_bytes
+            self.compress_out_bytes += out_bytes
+            self.compress_ns += elapsed_ns
+
     def record_failure(self) -> None:
         with self._lock:
             self.failures += 1
@@ -47,16 +90,35 @@ class SenderMetrics:
             self.agent_unavailable += 1
             self.failures += 1
 
-    def snapshot(self) -> Dict[str, int]:
-        """Return a point-in-time copy of all counters."""
+    def snapshot(self) -> Dict[str, float]:
+        """Return a point-in-time copy of all counters and the buffer level.
+
+        ``dropped`` counts events dropped by the buffer on overflow as well
+        as those dropped by the sender.  ``compression_ratio`` is the
+        uncompressed over the compressed size of the compressed batch
+        bodies (0.0 before any), and ``compress_ms`` the total time spent
+        compressing them.
+        """
+        buffer: Any = self._buffer
+        buffer_bytes = buffer.memory_usage() if buffer is not None else 0
+        buffer_dropped = buffer.dropped if buffer is not None else 0
         with self._lock:
             return {
-                "buffered": self.buffered,
+                "buffered": self._buffered_unlocked(),
                 "sent": self.sent,
-                "dropped": self.dropped,
+                "dropped": self.dropped + buffer_dropped,
                 "failures": self.failures,
                 "batches": self.batches,
                 "agent_unavailable": self.agent_unavailable,
+                "buffer_bytes": buffer_bytes,
+                "compressed_batches": self.compressed_batches,
+                "compress_in_bytes": self.compress_in_bytes,
+                "compress_out_bytes": self.compress_out_bytes,
+                "compression_ratio": (
+                    self.compress_in_bytes / self.compress_out_bytes
+                    if self.compress_out_bytes else 0.0
+                ),
+                "compress_ms": self.compress_ns / 1e6,
             }
 
     def __repr__(self) -> str:
@@ -5,6 +5,9 @@ to the local record-agent.
 Runs as a daemon thread so it does not prevent interpreter shutdown.
 Best-effort: on failure it retries once briefly, then drops the batch
 and increments failure counters.
+
+DeferredEvents (emitted when the sink defers serialization) are resolved
+into FixtureEvents here, on the worker thread, right before sending.
 """
 
 from __future__ import annotations
@@ -14,8 +17,10 @@ import threading
 import time
 from typing import TYPE_CHECKING, List, Optional
 
+from ..deferred import DeferredEvent
 from .agent_client import AgentHttpClient, AgentUnavailableError
 from .envelope import fixture_to_envelope
+from .overhead_metrics import get_overhead_metrics
 from .sender_metrics import SenderMetrics
 
 if TYPE_CHECKING:
@@ -142,8 +147,13 @@ class SenderWorker:
             self._send_chunk(chunk)
 
     def _send_chunk(self, events: List[FixtureEvent]) -> None:
+        events = self._resolve_deferred(events)
+        if not events:
+            return
+        now_ms = time.time_ns() // 1_000_000
         envelopes = [
-            fixture_to_envelope(e, service=self._service) for e in events
+            fixture_to_envelope(e, service=self._service, timestamp_ms=now_ms)
+            for e in events
         ]
 
         for attempt in range(1 + self._max_retries):
@@ -177,6 +187,23 @@ class SenderWorker:
                 )
                 return
 
+    def _resolve_deferred(self, events: List[object]) -> List[FixtureEvent]:
+        """Serialize DeferredEvents; events that fail to serialize are dropped."""
+        resolved = []
+        overhead = get_overhead_metrics()
+        for e in events:
+            if isinstance(e, DeferredEvent):
+                start = time.perf_counter_ns()
+                try:
+                    e = e.resolve()
+                except Exception:
+                    self._metrics.record_drop(1)
+                    logger.warning("Failed to serialize deferred event — dropped", exc_info=True)
+                    continue
+                overhead.record(e.qualname, "resolve", time.perf_counter_ns() - start)
+            resolved.append(e)
+        return resolved
+
     def _rate_limited_warn(self, msg: str, *args: object) -> None:
         now = time.monotonic()
         if now - self._last_warn_ts >= _WARN_INTERVAL_S:
@@ -0,0 +1,140 @@
+"""
+Per-thread staging in front of the sink's InMemoryBuffer.
+
+AgentSink.emit() runs on every application thread that records.  Appending
+straight to the InMemoryBuffer takes its lock for every event, so threads
+recording in parallel serialize on it.  ShardedBuffer gives each thread a
+shard of its own: a deque it appends to without taking any shared lock.
+A shard's events are moved into the InMemoryBuffer with one extend() when
+STAGE_EVENTS have accumulated, by the thread itself, and whenever the
+SenderWorker drains, so events of idle threads are not held back.
+
+Staged events are only ever popped inside InMemoryBuffer.extend(), under
+the buffer's lock, so each thread's events reach the buffer in emission
+order (deferred ordinals are assigned in that order), and the worker
+harvests every shard with one lock acquisition.  The byte budget and drop
+policy are applied by the InMemoryBuffer as events are moved in.  Staged
+events count against that budget: a thread moves its stage in once it
+holds STAGE_EVENTS events or more than its share (room left in the buffer
+divided by the number of shards) of the budget, so buffered and staged
+bytes together stay within it, and a thread stages nothing while the
+buffer is full.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: collections, itertools, typing, sim_sdk.sizing
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Iterator, List, Tuple
+
+from ..sizing import estimate_event_size
+from .in_memory_buffer import InMemoryBuffer
+from .thread_cells import ThreadCells
+
+if TYPE_CHECKING:
+    from ..fixture.schema import FixtureEvent
+
+# Events a thread stages before moving them into the shared buffer
+STAGE_EVENTS = 32
+
+
+class _Shard:
+    """One thread's staged (event, estimated size) pairs."""
+
+    __slots__ = ("events", "staged_bytes", "moved_bytes")
+
+    def __init__(self) -> None:
+        self.events: Deque[Tuple[FixtureEvent, int]] = deque()
+        # staged_bytes is written by the owning thread, moved_bytes under
+        # the buffer's lock
+        self.staged_bytes = 0
+        self.moved_bytes = 0
+
+    def take(self) -> Iterator[Tuple[FixtureEvent, int]]:
+        """Pop the staged pairs, oldest first; consumed under the buffer's lock."""
+        events = self.events
+        for _ in range(len(events)):
+            item = events.popleft()
+            self.moved_bytes += item[1]
+            yield item
+
+
+class ShardedBuffer:
+    """InMemoryBuffer front with lock-free per-thread appends.
+
+    Offers the InMemoryBuffer interface the sink, SenderWorker and
+    SenderMetrics use (append, drain, len, memory_usage, max_buffer_bytes,
+    dropped), so it can stand in for the buffer it wraps.
+    """
+
+    def __init__(self, buffer: InMemoryBuffer, stage_events: int = STAGE_EVENTS):
+        if stage_events < 1:
+            raise ValueError(f"stage_events must be at least 1, got {stage_events}")
+        self._buffer = buffer
+        self._stage_events = stage_events
+        self._shards: ThreadCells[_Shard] = ThreadCells(_Shard)
+
+    @property
+    def max_buffer_bytes(self) -> int:
+        return self._buffer.max_buffer_bytes
+
+    @max_buffer_bytes.setter
+    def max_buffer_bytes(self, value: int) -> None:
+        self._buffer.max_buffer_bytes = value
+
+    @property
+    def dropped(self) -> int:
+        """Events the wrapped buffer dropped over its lifetime."""
+        return self._buffer.dropped
+
+    def __len__(self) -> int:
+        buffer = self._buffer
+        # Under the buffer's lock no staged event is midway into it
+        with buffer._lock:
+            return buffer._count + sum(len(s.events) for s in self._shards.values())
+
+    def memory_usage(self) -> int:
+        """Estimated bytes held by the buffer and the staged events."""
+        buffer = self._buffer
+        with buffer._lock:
+            return buffer._memory_usage_unlocked() + self._staged_bytes()
+
+    def append(self, event: FixtureEvent) -> int:
+        """Stage *event* in the calling thread's shard.
+
+        Returns the number of events moved into the shared buffer: 0 unless
+        this event filled the stage or took it past its share of the byte
+        budget.
+        """
+        shard = self._shards.get()
+        size = estimate_event_size(event)
+        shard.staged_bytes += size
+        events = shard.events
+        events.append((event, size))
+        buffer = self._buffer
+        # This thread's share of the room left in the buffer (an unlocked
+        # read of its total; the buffer rechecks under its lock)
+        share = (buffer.max_buffer_bytes - buffer._bytes) // len(self._shards)
+        if len(events) >= self._stage_events or shard.staged_bytes - shard.moved_bytes > share:
+            staged = len(events)
+            buffer.extend(shard.take())
+            return staged
+        return 0
+
+    def drain(self) -> List[FixtureEvent]:
+        """Move every thread's staged events into the buffer, then drain it."""
+        self._buffer.extend(self._take_all())
+        # A finished thread may still have staged after the harvest
+        self._shards.remove_finished(keep=lambda s: bool(s.events))
+        return self._buffer.drain()
+
+    def _take_all(self) -> Iterator[Tuple[FixtureEvent, int]]:
+        # One lock acquisition for all shards; popping under the buffer's
+        # lock keeps each thread's events in order against its own moves.
+        return itertools.chain.from_iterable(s.take() for s in self._shards.values())
+
+    def _staged_bytes(self) -> int:
+        return sum(s.staged_bytes - s.moved_bytes for s in self._shards.values())
@@ -0,0 +1,91 @@
+"""
+Per-thread values owned by one object.
+
+The sink's hot paths (ShardedBuffer staging, OverheadMetrics histograms,
+SenderMetrics' buffered counter) give every recording thread a value of
+its own so that it can be updated without taking a shared lock, and read
+all of them from another thread.  ThreadCells keeps those values in a dict
+owned by the object, keyed by threading.get_ident(), rather than in a
+threading.local(), which Zone 1 does not allow and which cannot be
+enumerated anyway.
+
+Thread idents are reused once a thread has finished, so each value also
+records the Thread it belongs to: a new thread that inherits an ident gets
+a fresh value, and the finished thread's value stays with the owner until
+it is collected with remove_finished().
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: threading, typing
+"""
+
+import threading
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_get_ident = threading.get_ident
+
+
+class ThreadCells(Generic[T]):
+    """A value per thread, created by *factory* on the thread's first get().
+
+    get() reads a copy-on-write dict without a lock; registering a thread
+    and removing finished ones take an internal lock.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._lock = threading.Lock()
+        # ident → (owning thread, value)
+        self._cells: Dict[int, Tuple[threading.Thread, T]] = {}
+        # Entries of finished threads whose ident a new thread took over
+        self._displaced: List[Tuple[threading.Thread, T]] = []
+
+    def get(self) -> T:
+        """The calling thread's value."""
+        entry = self._cells.get(_get_ident())
+        if entry is not None and entry[0] is threading.current_thread():
+            return entry[1]
+        return self._register()
+
+    def values(self) -> List[T]:
+        """Every thread's value."""
+        return [value for _, value in self._displaced + list(self._cells.values())]
+
+    def remove_finished(self, keep: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """Forget the values of finished threads and return them.
+
+        Values for which *keep* returns True stay, e.g. until they are
+        emptied.
+        """
+        if not self._displaced and all(t.is_alive() for t, _ in self._cells.values()):
+            return []
+        removed: List[T] = []
+
+        def alive(entry: Tuple[threading.Thread, T]) -> bool:
+            thread, value = entry
+            if thread.is_alive() or (keep is not None and keep(value)):
+                return True
+            removed.append(value)
+            return False
+
+        with self._lock:
+            self._displaced = [e for e in self._displaced if alive(e)]
+            self._cells = {i: e for i, e in self._cells.items() if alive(e)}
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._displaced) + len(self._cells)
+
+    def _register(self) -> T:
+        value = self._factory()
+        ident = _get_ident()
+        with self._lock:
+            cells = dict(self._cells)
+            previous = cells.get(ident)
+            if previous is not None:
+                # The ident belonged to a thread that has finished
+                self._displaced = self._displaced + [previous]
+            cells[ident] = (threading.current_thread(), value)
+            self._cells = cells
+        return value
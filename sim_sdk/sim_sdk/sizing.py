@@ -0,0 +1,119 @@
+"""
+Sampled estimates of the memory held by recorded payloads.
+
+The record buffers charge each queued event its estimated size, the
+per-trace stub arenas measure their collected stubs, and StubStoreCache
+charges each parsed fixture.  All of them need a figure that is cheap and
+bounded on the request thread rather than exact: sys.getsizeof is summed
+over an object and the containers below it, only the first few elements of
+a long container are measured and the total extrapolated, and the walk
+stops descending after a fixed number of objects.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: functools, itertools, sys, typing
+"""
+
+import functools
+import itertools
+import sys
+from typing import Any, List, Tuple
+
+# Elements of a container measured before extrapolating to its length
+_SAMPLE = 4
+# Objects measured per value before the rest are counted shallowly
+_MAX_NODES = 256
+
+# Compact ASCII str header; non-ASCII strings take more per character
+_STR_SIZE = sys.getsizeof("")
+# Singletons and small numbers: shared or fixed-size
+_FIXED_SIZES = {
+    type(None): 0,
+    bool: 0,
+    int: sys.getsizeof(1),
+    float: sys.getsizeof(1.0),
+}
+_SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+_getsizeof = sys.getsizeof
+
+# DeferredEvent slots holding an OrdinalSlot, which references the
+# request-wide ordinal counters and slot queue (see sim_sdk.deferred); the
+# raw values it encodes are also kept on the event and measured there
+_SHARED_SLOTS = frozenset({"_slot"})
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls: type) -> Tuple[str, ...]:
+    names: List[str] = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(n for n in slots if n not in _SHARED_SLOTS and n != "__weakref__")
+    return tuple(names)
+
+
+def estimate_event_size(event: Any) -> int:
+    """Approximate bytes of memory an event (FixtureEvent or DeferredEvent) holds.
+
+    Sums sys.getsizeof over the event's attributes and the containers
+    below them.  Of a container longer than a few elements only the first
+    ones are measured and the total is extrapolated, and the walk stops
+    descending after a fixed number of objects, so the cost is bounded
+    regardless of payload size.  Objects other than builtin containers
+    are counted shallowly.
+    """
+    budget = [_MAX_NODES]
+    size = _getsizeof(event)
+    attrs = getattr(event, "__dict__", None)
+    if attrs is not None:
+        size += _estimate(attrs, budget)
+    for name in _slot_names(type(event)):
+        value = getattr(event, name, None)
+        cls = type(value)
+        # Scalars inline: most of an event's attributes are short strings
+        if cls is str:
+            size += _STR_SIZE + len(value)
+        elif cls in _FIXED_SIZES:
+            size += _FIXED_SIZES[cls]
+        else:
+            size += _estimate(value, budget)
+    return size
+
+
+def _estimate(obj: Any, budget: List[int]) -> int:
+    cls = type(obj)
+    if cls is str:
+        return _STR_SIZE + len(obj)
+    size = _FIXED_SIZES.get(cls)
+    if size is not None:
+        return size
+    size = _getsizeof(obj)
+    if budget[0] <= 0:
+        return size
+    budget[0] -= 1
+    if isinstance(obj, dict):
+        n = len(obj)
+        if n:
+            sampled = 0
+            for k, v in itertools.islice(obj.items(), _SAMPLE):
+                sampled += _STR_SIZE + len(k) if type(k) is str else _estimate(k, budget)
+                sampled += _STR_SIZE + len(v) if type(v) is str else _estimate(v, budget)
+            size += sampled * n // min(n, _SAMPLE)
+    elif isinstance(obj, _SEQUENCE_TYPES):
+        n = len(obj)
+        if n:
+            sampled = 0
+            for v in itertools.islice(obj, _SAMPLE):
+                sampled += _STR_SIZE + len(v) if type(v) is str else _estimate(v, budget)
+            size += sampled * n // min(n, _SAMPLE)
+    elif cls is not bytes:
+        attrs = getattr(obj, "__dict__", None)
+        if attrs is not None:
+            size += _getsizeof(attrs)
+    return size
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate bytes of memory a JSON-shaped value (dict, list, scalar) holds."""
+    return _estimate(value, [_MAX_NODES])
@@ -0,0 +1,191 @@
+"""
+Per-trace stub arenas with a memory budget.
+
+Every @sim_trace frame collects the stubs of the sim_db / sim_http /
+sim_capture calls and nested traces made under it, and emits them in its
+event's ``stubs`` list.  A batch job running thousands of queries under one
+traced function would hold all of them for the whole call.
+
+Each frame therefore collects into its own StubArena (swapped in as
+``ctx.collected_stubs`` for the duration of the call, so nested frames
+never slice a shared list).  The arena estimates the memory its stubs hold
+(sampled, see sim_sdk.sizing) in blocks of MEASURE_EVERY; once they exceed
+the budget (``SimContext.stub_budget_bytes``,
+``init_sim(stub_budget_bytes=...)``) they are written as JSON lines to an anonymous temporary file and dropped
+from memory, and from then on each block is written as soon as it fills.
+When the frame ends, take() hands the event either the arena itself
+(nothing spilled: a plain list, the common case) or a SpilledStubs that
+streams the stubs back from the file when the event is serialized.
+
+Arenas of deferred traces (see sim_sdk.deferred) collect DeferredEvents,
+which share their raw payloads with the events queued in the sink and are
+resolved on the sink's thread; those arenas are never measured or spilled.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: json, logging, tempfile, typing, sim_sdk.sizing
+"""
+
+import json
+import logging
+import tempfile
+from typing import Any, Dict, IO, Iterator, List, Optional, Union
+
+from .sizing import estimate_size
+
+logger = logging.getLogger(__name__)
+
+# Default per-frame budget for collected stubs (estimated memory bytes)
+DEFAULT_STUB_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Stubs appended between two size measurements
+MEASURE_EVERY = 64
+
+_SEPARATORS = (",", ":")
+
+
+class _SpillFile:
+    """Anonymous append-only file of JSON-lines stubs."""
+
+    __slots__ = ("_file", "count", "size")
+
+    def __init__(self) -> None:
+        self._file: IO[bytes] = tempfile.TemporaryFile(prefix="sim-stubs-")
+        self.count = 0
+        self.size = 0
+
+    def write(self, stubs: List[Dict[str, Any]]) -> None:
+        data = "".join(
+            json.dumps(s, separators=_SEPARATORS, default=str) + "\n" for s in stubs
+        ).encode("utf-8")
+        self._file.seek(self.size)
+        try:
+            self._file.write(data)
+        except OSError:
+            # Keep the file to whole lines so read() stays in step with count
+            self._file.truncate(self.size)
+            raise
+        self.count += len(stubs)
+        self.size += len(data)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        self._file.flush()
+        self._file.seek(0)
+        for _ in range(self.count):
+            yield json.loads(self._file.readline())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SpilledStubs:
+    """The stubs of a frame that spilled: the file's stubs, then the in-memory tail.
+
+    Iterating streams the spilled stubs back from the file, one at a time;
+    AgentHttpClient sends them that way (see BatchRequest.serialize_chunks).
+    """
+
+    __slots__ = ("_spill", "_tail")
+
+    def __init__(self, spill: _SpillFile, tail: List[Dict[str, Any]]):
+        self._spill = spill
+        self._tail = tail
+
+    @property
+    def spilled(self) -> int:
+        """Number of stubs read back from the spill file."""
+        return self._spill.count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from self._spill.read()
+        yield from self._tail
+
+    def __len__(self) -> int:
+        return self._spill.count + len(self._tail)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, SpilledStubs)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def close(self) -> None:
+        """Delete the spill file (also done when this object is collected)."""
+        self._spill.close()
+
+    def __repr__(self) -> str:
+        return f"SpilledStubs(spilled={self._spill.count}, in_memory={len(self._tail)})"
+
+
+class StubArena(list):
+    """The stubs collected under one @sim_trace frame.
+
+    A list that holds the stubs appended since the last spill.  With a
+    *max_bytes* budget of None it is never measured or spilled.
+    """
+
+    __slots__ = ("_max_bytes", "_measured", "_mem_bytes", "_spill")
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        super().__init__()
+        self._max_bytes = max_bytes
+        # Stubs at the front of the list already counted in _mem_bytes
+        self._measured = 0
+        self._mem_bytes = 0
+        self._spill: Optional[_SpillFile] = None
+
+    def append(self, stub: Any) -> None:
+        list.append(self, stub)
+        if self._max_bytes is not None and len(self) - self._measured >= MEASURE_EVERY:
+            self._measure()
+
+    @property
+    def spilled(self) -> int:
+        """Number of stubs written to the spill file so far."""
+        return self._spill.count if self._spill is not None else 0
+
+    def _measure(self) -> None:
+        block = self[self._measured:]
+        self._measured = len(self)
+        if any(type(s) is not dict for s in block):
+            # DeferredEvents: the sink owns their payloads and resolves them
+            self._max_bytes = None
+            return
+        if self._spill is not None:
+            # Already past the budget: stream each block out as it fills
+            self._spill_all()
+            return
+        # Each stub on its own: one large result among small ones still counts
+        self._mem_bytes += sum(estimate_size(s) for s in block)
+        if self._mem_bytes > self._max_bytes:  # type: ignore[operator]
+            self._spill_all()
+
+    def _spill_all(self) -> None:
+        try:
+            if self._spill is None:
+                self._spill = _SpillFile()
+            self._spill.write(self)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(
+                "Could not spill %d collected stubs, keeping them in memory: %s",
+                len(self), e,
+            )
+            self._max_bytes = None
+            return
+        del self[:]
+        self._measured = 0
+        self._mem_bytes = 0
+
+    def take(self) -> Union["StubArena", SpilledStubs]:
+        """The frame's stubs, in order, for its FixtureEvent."""
+        if self._spill is None:
+            return self
+        return SpilledStubs(self._spill, list(self))
+
+    def clear(self) -> None:
+        list.clear(self)
+        self._measured = 0
+        self._mem_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
@@ -0,0 +1,106 @@
+"""
+Content-hash references between recorded events.
+
+Every sim_db / sim_http / sim_capture call and every nested @sim_trace is
+emitted to the sink as an event of its own, and its payload is also
+collected into the enclosing @sim_trace event's ``stubs`` list, so the same
+rows travel to the agent once per trace level.
+
+When the sink sets ``stub_refs`` (``AgentSink(stub_refs=True)``), a
+collected stub carries ``{"__stub_ref__": <hash>}`` in place of an output
+(db rows, http response, capture result, nested trace return value) that
+was emitted in its own event.  The hash is that event's
+``output_fingerprint``, so whoever holds the session's events resolves the
+references with resolve_stub_refs().  StubStore does this when it loads a
+fixture.
+
+A reference plus the fingerprint it needs on the emitted event costs about
+a hundred bytes, so payloads whose canonical JSON is smaller than
+MIN_REF_BYTES stay inline, as do trace arguments.  References are only
+written for payloads emitted to a sink; with a stub_dir or no sink,
+collected stubs keep their payloads.
+
+Zero framework dependencies (Zone 1 compliant):
+  imports: typing, sim_sdk.canonical
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .canonical import canonical_encode_sized
+from .deferred import _sink_flag
+
+STUB_REF_TAG = "__stub_ref__"
+
+# Payloads smaller than this (canonical JSON bytes) are not referenced
+MIN_REF_BYTES = 256
+
+_MISSING = object()
+
+
+def uses_stub_refs(ctx: Any) -> bool:
+    """True if stubs collected under *ctx* should reference emitted payloads."""
+    sink = ctx.sink
+    return sink is not None and _sink_flag(sink, "stub_refs")
+
+
+def encode_for_ref(value: Any) -> Tuple[Any, str]:
+    """Serialize *value* and fingerprint it if it is large enough to reference.
+
+    Returns:
+        Tuple of (serializable copy of value, fingerprint or "" if the
+        payload should stay inline)
+    """
+    data, content_hash, size = canonical_encode_sized(value)
+    return data, content_hash if size >= MIN_REF_BYTES else ""
+
+
+def stub_ref(content_hash: str) -> Dict[str, str]:
+    """The reference stored in place of a payload with fingerprint *content_hash*."""
+    return {STUB_REF_TAG: content_hash}
+
+
+def is_stub_ref(value: Any) -> bool:
+    return type(value) is dict and len(value) == 1 and STUB_REF_TAG in value
+
+
+def build_ref_index(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map output fingerprints to outputs for recorded event dicts.
+
+    Metadata events carry fingerprints without payloads and are skipped.
+    """
+    index: Dict[str, Any] = {}
+    for event in events:
+        event_type = event.get("event_type")
+        if event_type != "Stub" and event_type != "Output":
+            continue
+        output_fp = event.get("output_fingerprint")
+        if output_fp:
+            index.setdefault(output_fp, event.get("output"))
+    return index
+
+
+def resolve_stub_refs(events: List[Dict[str, Any]]) -> int:
+    """Replace references in each event's ``stubs`` with the referenced payloads.
+
+    *events* are FixtureEvent dicts from one recording session; they are
+    updated in place.  Resolved payloads are shared with the event they
+    came from, not copied.
+
+    Returns:
+        The number of references left unresolved because the referenced
+        event is not among *events* (e.g. it was dropped by the sink).
+    """
+    index = build_ref_index(events)
+    missing = 0
+    for event in events:
+        for stub in event.get("stubs") or ():
+            if type(stub) is not dict:
+                continue
+            for key, value in stub.items():
+                if is_stub_ref(value):
+                    payload = index.get(value[STUB_REF_TAG], _MISSING)
+                    if payload is _MISSING:
+                        missing += 1
+                    else:
+                        stub[key] = payload
+    return missing
@@ -22,16 +22,62 @@ Only entries with ``event_type == "Stub"`` are indexed.  The top-level
 ``golden_output`` (``event_type == "Output"``) is not part of the stubs array
 and is never indexed here.
 
-Lookup methods return None on miss — adapters decide miss behavior.
+Lookup methods return None on miss — adapters decide miss behavior.  On a
+hit they return a fresh copy of the recorded payload, so a caller mutating
+the rows or output it got back cannot change what later requests replay.
+
+Encoded NumPy arrays, buffers and binary protobuf messages
+(``{"__ndarray__": ...}``, ``{"__protobuf__": ...}``) are rebuilt while
+parsing, so replay returns real arrays and messages.
+
+Stubs nested in recorded events may hold content-hash references to
+payloads emitted in other events (``{"__stub_ref__": ...}``, see
+sim_sdk.stub_refs); they are resolved against the fixture's events while
+loading, and unresolvable references are logged and left in place.
+
+Each stub records the hash behind its fingerprints in
+``fingerprint_algorithm`` (absent means SHA-256).  Stubs recorded with an
+algorithm other than the active one are re-fingerprinted from their recorded
+``input`` at load time, so corpora mixing algorithms keep replaying.  A
+stub is only re-keyed if its recorded input still hashes to its recorded
+fingerprint; inputs stored in a form that hashes differently from the live
+value (protobuf messages stored as ``MessageToDict`` output) cannot be, and
+keep their stored key, with a warning.
+
+A StubStore is immutable once built, so indexed stores are shared across
+requests through StubStoreCache: a process-wide, thread-safe LRU keyed on
+(resolved path, mtime, size, fingerprint algorithm) with a budget on the
+estimated memory of the parsed stores.  ReplayContext fetches its store
+from the cache and keeps only the per-request ordinal counters.
 
 Zero framework dependencies (Zone 1 compliant):
-  imports: json, pathlib, typing
+  imports: copy, json, logging, os, pathlib, threading, collections, typing,
+           sim_sdk.canonical, sim_sdk.serialization, sim_sdk.sizing,
+           sim_sdk.stub_refs
 """
 
+import copy
 import json
+import logging
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from .canonical import (
+    DEFAULT_FINGERPRINT_ALGORITHM,
+    canonical_encode,
+    canonical_fingerprint,
+    fingerprint_sql,
+    get_fingerprint_algorithm,
+)
+from .serialization import ENCODED_TAGS, restore_encoded
+from .sizing import estimate_event_size
+from .stub_refs import STUB_REF_TAG, resolve_stub_refs
+
+logger = logging.getLogger(__name__)
+
 _DB_PREFIX = "db:"
 _CAPTURE_PREFIX = "capture:"
 _HTTP_PREFIX = "http:"
@@ -47,6 +93,8 @@ class StubStore:
         self._http: Dict[Tuple[str, int], Tuple[int, Dict, Dict]] = {}
         # (input_fingerprint, ordinal) → Dict
         self._trace: Dict[Tuple[str, int], Dict] = {}
+        # Stubs recorded under another algorithm that could not be re-keyed
+        self._not_rekeyed = 0
 
     # ------------------------------------------------------------------
     # Construction
@@ -71,10 +119,25 @@ class StubStore:
             raise FileNotFoundError(f"Fixture not found: {path}")
 
         with open(fixture_path, "r", encoding="utf-8") as fh:
-            try:
-                data: Dict[str, Any] = json.load(fh)
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"Invalid JSON in fixture {path}: {exc}") from exc
+            text = fh.read()
+        # Only pay for the object hook when the fixture holds encoded values.
+        hook = restore_encoded if any(tag in text for tag in ENCODED_TAGS) else None
+        try:
+            data: Dict[str, Any] = json.loads(text, object_hook=hook)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON in fixture {path}: {exc}") from exc
+
+        golden_output = data.get("golden_output")
+        if STUB_REF_TAG in text:
+            events = list(data.get("stubs", []))
+            if golden_output is not None:
+                events.append(golden_output)
+            missing = resolve_stub_refs(events)
+            if missing:
+                logger.warning(
+                    "Fixture %s: %d stub reference(s) not found among its events",
+                    path, missing,
+                )
 
         store = cls()
         store._index_stubs(data.get("stubs", []))
@@ -82,10 +145,17 @@ class StubStore:
         # The top-level golden_output holds the recorded return value of the
         # root @sim_trace function.  Index it into _trace so get_trace_stub()
         # can serve it during replay.
-        golden_output = data.get("golden_output")
         if golden_output is not None:
             store._index_fixture_event(golden_output)
 
+        if store._not_rekeyed:
+            logger.warning(
+                "Fixture %s: %d stub(s) recorded under another fingerprint algorithm "
+                "could not be re-keyed (their recorded input does not reproduce "
+                "their fingerprint, e.g. protobuf arguments stored as dicts; "
+                "record with configure_protobuf(store_binary=True)) and will not match",
+                path, store._not_rekeyed,
+            )
         return store
 
     # ------------------------------------------------------------------
@@ -103,7 +173,7 @@ class StubStore:
         ordinal: int = stub.get("ordinal", 0)
 
         if qualname.startswith(_DB_PREFIX):
-            fp: str = stub.get("input_fingerprint", "")
+            fp: str = self._input_fingerprint(stub, is_db=True)
             output = stub.get("output", [])
             # Normalize null output to [] so None unambiguously signals a miss
             # in get_db_stub (which uses dict.get() returning None on miss).
@@ -127,9 +197,16 @@ class StubStore:
 
         else:
             # Nested @sim_trace or other trace events.
-            fp = stub.get("input_fingerprint", "")
+            fp = self._input_fingerprint(stub, is_db=False)
             self._trace[(fp, ordinal)] = stub
 
+    def _input_fingerprint(self, stub: Dict[str, Any], is_db: bool) -> str:
+        fp = _active_input_fingerprint(stub, is_db)
+        if fp is None:
+            self._not_rekeyed += 1
+            return stub.get("input_fingerprint", "")
+        return fp
+
     # ------------------------------------------------------------------
     # Public lookup API — returns None on miss, adapters decide behavior
     # ------------------------------------------------------------------
@@ -145,7 +222,8 @@ class StubStore:
         Returns:
             List of row dicts as recorded, or None on miss.
         """
-        return self._db.get((fp, ordinal))
+        rows = self._db.get((fp, ordinal))
+        return None if rows is None else _copy_payload(rows)
 
     def get_http_stub(self, fp: str, ordinal: int) -> Optional[Tuple[int, Dict, Dict]]:
         """Return recorded HTTP/capture response, or None if not found.
@@ -158,11 +236,19 @@ class StubStore:
         Returns:
             ``(status, body, headers)`` tuple as recorded, or None on miss.
         """
-        return self._http.get((fp, ordinal))
+        entry = self._http.get((fp, ordinal))
+        if entry is None:
+            return None
+        status, body, headers = entry
+        return status, _copy_payload(body), _copy_payload(headers)
 
     def get_trace_stub(self, fp: str, ordinal: int) -> Optional[Any]:
         """Return recorded internal trace payload, or None if not found.
 
+        Only ``output``, the value replay hands back to the caller, is
+        copied; the other fields are shared with the cached store and must
+        not be mutated.
+
         Args:
             fp: ``input_fingerprint`` from the FixtureEvent.
             ordinal: 0-based call ordinal for this fingerprint.
@@ -170,7 +256,17 @@ class StubStore:
         Returns:
             Full FixtureEvent stub dict, or None on miss.
         """
-        return self._trace.get((fp, ordinal))
+        stub = self._trace.get((fp, ordinal))
+        if stub is None:
+            return None
+        stub = dict(stub)
+        if "output" in stub:
+            stub["output"] = _copy_payload(stub["output"])
+        return stub
+
+    def estimated_bytes(self) -> int:
+        """Approximate memory held by the parsed indexes (see sim_sdk.sizing)."""
+        return estimate_event_size(self)
 
     # ------------------------------------------------------------------
     # Available fingerprint inspection
@@ -187,3 +283,194 @@ class StubStore:
     def available_trace_fingerprints(self) -> List[str]:
         """Return the unique fingerprints present in the trace index."""
         return list({fp for fp, _ in self._trace})
+
+
+_IMMUTABLE_TYPES = frozenset({str, int, float, bool, type(None), bytes})
+
+
+def _copy_payload(value: Any) -> Any:
+    """Deep copy of a stub payload; JSON-shaped data is copied without deepcopy."""
+    cls = type(value)
+    if cls in _IMMUTABLE_TYPES:
+        return value
+    if cls is dict:
+        return {k: _copy_payload(v) for k, v in value.items()}
+    if cls is list:
+        return [_copy_payload(v) for v in value]
+    # Rebuilt buffers and arrays are read-only and can be shared as they are
+    if cls is memoryview and value.readonly:
+        return value
+    flags = getattr(value, "flags", None)
+    if flags is not None and getattr(flags, "writeable", True) is False:
+        return value
+    # Protobuf messages and other rebuilt objects
+    return copy.deepcopy(value)
+
+
+def _active_input_fingerprint(stub: Dict[str, Any], is_db: bool) -> Optional[str]:
+    """Return the stub's input fingerprint under the active algorithm.
+
+    Stubs recorded with the active algorithm (or without a recorded
+    ``input``) keep their stored fingerprint.  Others are recomputed the way
+    the adapters compute them at replay time: ``fingerprint_sql(sql)`` and
+    the canonical_encode fingerprint of the params, truncated to 16 chars,
+    for DB stubs, and that of ``{"qualname", "args"}`` for trace stubs.
+
+    Returns None if the recorded input, hashed with the recorded algorithm,
+    does not give the stored fingerprint: it was stored in a form the
+    adapters do not hash (a protobuf message as ``MessageToDict`` output is
+    hashed from its binary encoding), so recomputing would give a key that
+    replay never looks up.
+    """
+    fp: str = stub.get("input_fingerprint", "")
+    recorded = stub.get("fingerprint_algorithm") or DEFAULT_FINGERPRINT_ALGORITHM
+    data = stub.get("input")
+    if recorded == get_fingerprint_algorithm() or not isinstance(data, dict):
+        return fp
+    if is_db:
+        params = data.get("params")
+        hashed: Any = "" if params is None else params
+        stored = fp.partition(":")[2]
+    else:
+        hashed = {"qualname": stub.get("qualname", ""), "args": data}
+        stored = fp
+    try:
+        reproduced = canonical_fingerprint(hashed, recorded)
+    except ValueError:
+        # Recorded algorithm unavailable here (xxhash missing): cannot check
+        reproduced = stored
+    if stored and reproduced[:len(stored)] != stored:
+        return None
+    if is_db:
+        sql_fp = fingerprint_sql(data.get("sql", ""))
+        return f"{sql_fp[:16]}:{canonical_encode(hashed)[1][:16]}"
+    return canonical_encode(hashed)[1]
+
+
+# ---------------------------------------------------------------------------
+# StubStoreCache — process-wide LRU of indexed stores
+# ---------------------------------------------------------------------------
+
+_DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# (resolved path, st_mtime_ns, st_size, fingerprint algorithm)
+_CacheKey = Tuple[str, int, int, str]
+
+
+class StubStoreCache:
+    """Thread-safe LRU cache of indexed StubStore objects.
+
+    Entries are keyed on the resolved fixture path plus the file's mtime and
+    size, so an edited fixture is re-parsed on next access and the stale
+    entry is evicted.  The active fingerprint algorithm is part of the key
+    because stores are re-keyed to it at load time.  The cost of an entry is
+    the estimated memory of its parsed store (StubStore.estimated_bytes(),
+    several times the file size for typical JSON); least-recently-used
+    entries are evicted once the total exceeds ``max_bytes``.  A fixture larger than the whole budget is parsed and
+    returned without being cached.
+
+    Cached stores are shared between requests; their lookups hand out
+    copies, so requests never see each other's changes to replayed data.
+
+    Args:
+        max_bytes: Memory budget, in bytes, for all cached stores combined.
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_CACHE_MAX_BYTES) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_CacheKey, Tuple[StubStore, int]]" = OrderedDict()
+        # resolved path → current key, so a changed file replaces its old entry
+        self._keys_by_path: Dict[str, _CacheKey] = {}
+        self.max_bytes = max_bytes
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, path: str) -> StubStore:
+        """Return the indexed StubStore for ``path``, loading it on a miss.
+
+        Raises:
+            FileNotFoundError: If ``path`` does not exist.
+            ValueError: If the file is not valid JSON.
+        """
+        resolved = str(Path(path).resolve())
+        try:
+            st = os.stat(resolved)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Fixture not found: {path}") from None
+        key: _CacheKey = (
+            resolved, st.st_mtime_ns, st.st_size, get_fingerprint_algorithm(),
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so a slow load never blocks hits on other
+        # fixtures.  Concurrent misses on the same key may both parse; the
+        # second insert simply replaces the first.  A load of an older
+        # version of the file that finishes after a newer one is returned
+        # without being cached, so it cannot evict the newer entry.
+        store = StubStore.from_fixture(resolved)
+        size = store.estimated_bytes()
+
+        with self._lock:
+            current = self._keys_by_path.get(resolved)
+            if current is not None and current != key:
+                if current[1] > key[1]:
+                    return store
+                self._remove_unlocked(current)
+            if size > self.max_bytes:
+                return store
+            if key in self._entries:
+                self._remove_unlocked(key)
+            self._entries[key] = (store, size)
+            self._keys_by_path[resolved] = key
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove_unlocked(oldest)
+                self.evictions += 1
+        return store
+
+    def clear(self) -> None:
+        """Drop every cached store.  Counters are left untouched."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_path.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return a point-in-time copy of cache counters and occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove_unlocked(self, key: _CacheKey) -> None:
+        _, size = self._entries.pop(key)
+        self.current_bytes -= size
+        if self._keys_by_path.get(key[0]) == key:
+            del self._keys_by_path[key[0]]
+
+
+_default_cache = StubStoreCache()
+
+
+def get_stub_store_cache() -> StubStoreCache:
+    """Return the process-wide StubStoreCache used by ReplayContext."""
+    return _default_cache
@@ -7,7 +7,22 @@ collect all stubs from inner sim_capture/sim_db calls, emit fixture.
 Replay mode: compute fingerprint from input args, look up recorded
 golden output, return it WITHOUT executing the function body.
 
-Off mode: execute function normally with zero overhead.
+Off mode: execute function normally with zero overhead.  While the
+process mode is OFF at decoration time, the decorator returns a copy of the
+function that costs exactly as much to call as the original, and is patched
+in place to dispatch to the full wrapper when the process mode switches on.
+
+Sampling: with a SamplingPolicy on the context, root calls the policy
+rejects run like off mode, together with everything nested inside them.
+
+Overhead budget: with an OverheadBudget on the context, root calls are
+recorded in full, sampled, as fingerprints only, or not at all, depending
+on the measured SDK overhead (see budget.py).
+
+Deferred: when the sink sets defer_serialization, record mode only binds
+the arguments and reserves an ordinal slot; serialization, fingerprinting
+and the ordinal happen when the sink resolves the emitted DeferredEvent
+(see deferred.py).
 
 Fingerprint = qualname + canonical(args) + canonical(kwargs).
 Supports both sync and async functions.
@@ -17,15 +32,35 @@ import functools
 import inspect
 import json
 import logging
+import threading
 import time
-import uuid
-from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+import types
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 
+from . import context as _context
+from .budget import RecordLevel
 from .context import SimContext, SimMode, get_context
-from .canonical import canonicalize_json, fingerprint
+from .canonical import (
+    canonical_encode,
+    canonical_encode_sized,
+    canonicalize_json,
+    fingerprint,
+)
+from .deferred import (
+    DeferredEvent,
+    OrdinalSlot,
+    defers_serialization,
+    resolve_stubs,
+    snapshot,
+    snapshot_args,
+)
 from .fixture.schema import FixtureEvent
 from .replay_context import get_replay_context
+from .sink.overhead_metrics import get_overhead_metrics
+from .serialization import make_serializable as _make_serializable
+from .stub_arena import StubArena
+from .stub_refs import MIN_REF_BYTES, stub_ref, uses_stub_refs
 
 logger = logging.getLogger(__name__)
 
@@ -43,45 +78,393 @@ def _compute_fingerprint(qualname: str, args_data: Dict[str, Any]) -> str:
 
 def _bind_args(func: Callable, args: tuple, kwargs: dict) -> Dict[str, Any]:
     """Bind function args/kwargs into a serializable dict."""
+    return {k: _make_serializable(v) for k, v in _bind_raw(func, args, kwargs).items()}
+
+
+def _bind_raw(func: Callable, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """Bind function args/kwargs (with defaults applied) without converting them."""
     sig = inspect.signature(func)
     bound = sig.bind(*args, **kwargs)
     bound.apply_defaults()
-    return {k: _make_serializable(v) for k, v in bound.arguments.items()}
+    return dict(bound.arguments)
+
+
+_Binder = Callable[[tuple, dict], Dict[str, Any]]
+
+_POSITIONAL_KINDS = (
+    inspect.Parameter.POSITIONAL_ONLY,
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+)
+_VARIADIC_KINDS = (
+    inspect.Parameter.VAR_POSITIONAL,
+    inspect.Parameter.VAR_KEYWORD,
+)
+
 
+def _make_binder(func: Callable) -> _Binder:
+    """Build a binder equivalent to _bind_raw(func, ...) with the signature precomputed.
 
-def _make_serializable(value: Any) -> Any:
-    """Convert a value to a JSON-serializable form."""
-    if value is None:
+    Called once at decoration time.  For signatures without *args/**kwargs the
+    returned binder maps arguments to names directly, with fast paths for
+    exact positional calls, keyword-only calls and functions without defaults.
+    Anything unusual (missing or unexpected arguments, a duplicated name) is
+    handed to Signature.bind so errors are raised exactly as before.  The
+    result is ordered like BoundArguments.arguments.
+    """
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        # No introspectable signature (some builtins): bind on each call
+        return lambda args, kwargs: _bind_raw(func, args, kwargs)
+
+    def bind_slow(args: tuple, kwargs: dict) -> Dict[str, Any]:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    params = list(sig.parameters.values())
+    if any(p.kind in _VARIADIC_KINDS for p in params):
+        return bind_slow
+
+    names = tuple(p.name for p in params)
+    n_params = len(names)
+    n_positional = sum(1 for p in params if p.kind in _POSITIONAL_KINDS)
+    positional_only = frozenset(
+        p.name for p in params if p.kind is inspect.Parameter.POSITIONAL_ONLY
+    )
+    defaults = {
+        p.name: p.default for p in params if p.default is not inspect.Parameter.empty
+    }
+
+    if not defaults:
+        def bind(args: tuple, kwargs: dict) -> Dict[str, Any]:
+            n_args = len(args)
+            if n_args <= n_positional:
+                if not kwargs:
+                    if n_args == n_params:
+                        return dict(zip(names, args))
+                elif n_args + len(kwargs) == n_params and not positional_only:
+                    bound = dict(zip(names, args))
+                    try:
+                        for name in names[n_args:]:
+                            bound[name] = kwargs[name]
+                    except KeyError:
+                        return bind_slow(args, kwargs)
+                    return bound
+            return bind_slow(args, kwargs)
+
+        return bind
+
+    def bind(args: tuple, kwargs: dict) -> Dict[str, Any]:
+        n_args = len(args)
+        if n_args > n_positional:
+            return bind_slow(args, kwargs)
+        if not kwargs:
+            if n_args == n_params:
+                return dict(zip(names, args))
+            bound = dict(zip(names, args))
+            try:
+                for name in names[n_args:]:
+                    bound[name] = defaults[name]
+            except KeyError:
+                return bind_slow(args, kwargs)
+            return bound
+
+        bound = dict(zip(names, args))
+        used = 0
+        for name in names[n_args:]:
+            if name in kwargs and name not in positional_only:
+                bound[name] = kwargs[name]
+                used += 1
+            elif name in defaults:
+                bound[name] = defaults[name]
+            else:
+                return bind_slow(args, kwargs)
+        if used != len(kwargs):
+            return bind_slow(args, kwargs)
+        return bound
+
+    return bind
+
+
+def _make_projection(
+    func: Callable,
+    qualname: str,
+    ignore: Optional[Iterable[str]],
+    include: Optional[Iterable[str]],
+    key: Optional[Callable[[Dict[str, Any]], Any]],
+) -> Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]:
+    """Validate sim_trace's ignore/include/key and build the argument projection.
+
+    Called once at decoration time.  Returns None when no option is given.
+
+    Raises:
+        ValueError: If options are combined, or ignore/include name
+            something that is not a parameter of *func*.
+        TypeError: If key is not callable.
+    """
+    if ignore is None and include is None and key is None:
         return None
-    if isinstance(value, (str, int, float, bool)):
-        return value
-    if isinstance(value, bytes):
-        return value.hex()
-    if isinstance(value, dict):
-        return {str(k): _make_serializable(v) for k, v in value.items()}
-    if isinstance(value, (list, tuple)):
-        return [_make_serializable(item) for item in value]
-    if hasattr(value, "isoformat"):
-        return value.isoformat()
-    if hasattr(value, "__float__"):
-        return float(value)
-    return str(value)
+    if sum(option is not None for option in (ignore, include, key)) > 1:
+        raise ValueError(
+            f"sim_trace({qualname!r}): ignore, include and key are mutually exclusive"
+        )
+
+    if key is not None:
+        if not callable(key):
+            raise TypeError(f"sim_trace({qualname!r}): key must be callable, got {key!r}")
+
+        def project_key(bound: Dict[str, Any]) -> Dict[str, Any]:
+            projected = key(bound)
+            return projected if isinstance(projected, dict) else {"key": projected}
+
+        return project_key
+
+    names = ignore if ignore is not None else include
+    selected = frozenset([names] if isinstance(names, str) else names)
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"sim_trace({qualname!r}): ignore/include need an introspectable signature"
+        ) from None
+    unknown = sorted(selected.difference(params))
+    if unknown:
+        raise ValueError(
+            f"sim_trace({qualname!r}): {', '.join(unknown)} not in the signature "
+            f"({', '.join(params)})"
+        )
+
+    if ignore is not None:
+        return lambda bound: {k: v for k, v in bound.items() if k not in selected}
+    return lambda bound: {k: v for k, v in bound.items() if k in selected}
 
 
 def _prepare_input(
-    func: Callable, qualname: str, args: tuple, kwargs: dict,
+    binder: _Binder, qualname: str, args: tuple, kwargs: dict,
 ) -> tuple:
     """Compute args_data and input_fp for a traced call.
 
     Ordinal is NOT computed here — record path calls ctx.next_ordinal();
     replay path calls replay_ctx.next_trace_ordinal().
 
+    The args are converted and fingerprinted in one canonical_encode pass;
+    the result is identical to _compute_fingerprint(qualname, _bind_args(...)).
+
     Returns:
         (args_data, input_fp)
     """
-    args_data = _bind_args(func, args, kwargs)
-    input_fp = _compute_fingerprint(qualname, args_data)
-    return args_data, input_fp
+    t0 = time.perf_counter_ns()
+    raw_args = binder(args, kwargs)
+    t1 = time.perf_counter_ns()
+    encoded, input_fp = canonical_encode({"qualname": qualname, "args": raw_args})
+    overhead = get_overhead_metrics()
+    overhead.record(qualname, "bind", t1 - t0)
+    overhead.record(qualname, "fingerprint", time.perf_counter_ns() - t1)
+    return encoded["args"], input_fp
+
+
+# -- Off-mode trampolines ---------------------------------------------------
+
+def _dispatch(*args: Any, _sim_target: Any = None, **kwargs: Any) -> Any:
+    return _sim_target(*args, **kwargs)
+
+
+async def _dispatch_async(*args: Any, _sim_target: Any = None, **kwargs: Any) -> Any:
+    return await _sim_target(*args, **kwargs)
+
+
+# trampoline -> (original code, dispatch code)
+_trampolines: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_trampolines_lock = threading.Lock()
+
+
+def _make_trampoline(f: Callable, wrapper: Callable) -> Optional[Callable]:
+    """Copy *f* into a function whose code can be switched to call *wrapper*.
+
+    The copy shares f's code, globals and defaults, so while the process is
+    off a call costs the same as calling f.  Switching modes only replaces
+    ``__code__``; ``_sim_target`` sits in ``__kwdefaults__`` throughout,
+    where f's own code ignores it.  Functions with a closure cannot take
+    the closure-free dispatch code and get None (the caller keeps the
+    wrapper).
+    """
+    if not isinstance(f, types.FunctionType) or f.__closure__:
+        return None
+    dispatch = _dispatch_async if inspect.iscoroutinefunction(f) else _dispatch
+    trampoline = types.FunctionType(
+        f.__code__, f.__globals__, f.__name__, f.__defaults__,
+    )
+    trampoline.__kwdefaults__ = {**(f.__kwdefaults__ or {}), "_sim_target": wrapper}
+    functools.update_wrapper(trampoline, f)
+    with _trampolines_lock:
+        _trampolines[trampoline] = (f.__code__, dispatch.__code__)
+        if not _context._process_off:
+            trampoline.__code__ = dispatch.__code__
+    return trampoline
+
+
+def _retarget_trampolines(mode: SimMode) -> None:
+    """Patch every trampoline for the new process mode."""
+    with _trampolines_lock:
+        for trampoline, (off_code, on_code) in list(_trampolines.items()):
+            trampoline.__code__ = off_code if mode is SimMode.OFF else on_code
+
+
+_context._add_process_mode_listener(_retarget_trampolines)
+
+
+# -- Sampling ---------------------------------------------------------------
+
+def _skip_before_input(ctx: SimContext, qualname: str) -> bool:
+    """Sampling decision for a root trace, made before any argument work."""
+    return (
+        ctx.trace_depth == 0
+        and ctx.is_recording
+        and not ctx.sampling.should_sample(qualname)
+    )
+
+
+def _skip_after_input(ctx: SimContext, qualname: str, input_fp: str) -> bool:
+    """first_unique decision for a root trace, once its input is fingerprinted."""
+    sampling = ctx.sampling
+    return (
+        sampling.needs_fingerprint
+        and ctx.trace_depth == 0
+        and ctx.is_recording
+        and not sampling.admit(qualname, input_fp)
+    )
+
+
+def _call_sampled_out(ctx: SimContext, f: Callable, args: tuple, kwargs: dict) -> Any:
+    """Run an unsampled root call; nested primitives see an inactive context."""
+    ctx.sampled_out = True
+    try:
+        return f(*args, **kwargs)
+    finally:
+        ctx.sampled_out = False
+
+
+async def _call_sampled_out_async(
+    ctx: SimContext, f: Callable, args: tuple, kwargs: dict,
+) -> Any:
+    """Async variant of _call_sampled_out."""
+    ctx.sampled_out = True
+    try:
+        return await f(*args, **kwargs)
+    finally:
+        ctx.sampled_out = False
+
+
+# -- Overhead budget --------------------------------------------------------
+
+def _budget_level(ctx: SimContext) -> Optional[RecordLevel]:
+    """Budget decision for a root trace in record mode; None if not governed."""
+    if ctx.trace_depth != 0 or not ctx.is_recording:
+        return None
+    return ctx.budget.decide(ctx.sink)
+
+
+def _begin_fingerprint_only(
+    ctx: SimContext, binder: _Binder, qualname: str, args: tuple, kwargs: dict,
+) -> Tuple[str, int]:
+    """Fingerprint the input and mark nested primitives inactive."""
+    _, input_fp = _prepare_input(binder, qualname, args, kwargs)
+    ordinal = ctx.next_ordinal(input_fp)
+    ctx.sampled_out = True
+    return input_fp, ordinal
+
+
+def _finish_fingerprint_only(
+    qualname: str,
+    ctx: SimContext,
+    input_fp: str,
+    ordinal: int,
+    output: Any,
+    error_msg: Optional[str],
+    enter_ns: int,
+    call_ns: int,
+    return_ns: int,
+) -> None:
+    """Emit a payload-free "Metadata" event and report the call to the budget."""
+    ctx.sampled_out = False
+    event = FixtureEvent(
+        qualname=qualname,
+        run_id=ctx.run_id,
+        input_fingerprint=input_fp,
+        output_fingerprint=_output_fingerprint(qualname, output),
+        duration_ms=round((return_ns - call_ns) / 1e6, 2),
+        error=error_msg,
+        ordinal=ordinal,
+        event_type="Metadata",
+    )
+    if ctx.sink is not None:
+        ctx.sink.emit(event)
+
+    end_ns = time.perf_counter_ns()
+    own_ns = (call_ns - enter_ns) + (end_ns - return_ns)
+    get_overhead_metrics().record(qualname, "total", own_ns)
+    ctx.budget.observe(own_ns, end_ns - enter_ns, ctx.sink)
+
+
+def _output_fingerprint(qualname: str, output: Any) -> str:
+    """The output fingerprint _build_record would record; "" if it cannot be computed.
+
+    Runs on the caller's thread after the wrapped function returned, so no
+    SDK error may escape.
+    """
+    if output is None:
+        return ""
+    try:
+        return canonical_encode(output)[1]
+    except Exception:
+        logger.warning(
+            "sim_trace: could not fingerprint output of %r — recorded without it",
+            qualname, exc_info=True,
+        )
+        return ""
+
+
+def _call_fingerprint_only(
+    ctx: SimContext, f: Callable, binder: _Binder, qualname: str,
+    args: tuple, kwargs: dict,
+) -> Any:
+    """Run a root call at the FINGERPRINT_ONLY budget level."""
+    enter_ns = time.perf_counter_ns()
+    input_fp, ordinal = _begin_fingerprint_only(ctx, binder, qualname, args, kwargs)
+    output = None
+    error_msg = None
+    call_ns = time.perf_counter_ns()
+    try:
+        output = f(*args, **kwargs)
+        return output
+    except Exception as e:
+        error_msg = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _finish_fingerprint_only(qualname, ctx, input_fp, ordinal, output, error_msg,
+                                 enter_ns, call_ns, time.perf_counter_ns())
+
+
+async def _call_fingerprint_only_async(
+    ctx: SimContext, f: Callable, binder: _Binder, qualname: str,
+    args: tuple, kwargs: dict,
+) -> Any:
+    """Async variant of _call_fingerprint_only."""
+    enter_ns = time.perf_counter_ns()
+    input_fp, ordinal = _begin_fingerprint_only(ctx, binder, qualname, args, kwargs)
+    output = None
+    error_msg = None
+    call_ns = time.perf_counter_ns()
+    try:
+        output = await f(*args, **kwargs)
+        return output
+    except Exception as e:
+        error_msg = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _finish_fingerprint_only(qualname, ctx, input_fp, ordinal, output, error_msg,
+                                 enter_ns, call_ns, time.perf_counter_ns())
 
 
 # -- Replay helpers ---------------------------------------------------------
@@ -134,26 +517,37 @@ def _replay(
 
 # -- Record emission --------------------------------------------------------
 
-def _emit_record(
+def _build_record(
     qualname: str,
-    ctx: SimContext,
+    run_id: str,
     args_data: Dict[str, Any],
     input_fp: str,
     ordinal: int,
     output: Any,
     error_msg: Optional[str],
     duration_ms: float,
-    inner_stubs: List[Dict[str, Any]],
-) -> None:
-    """Build a FixtureEvent and emit it through the configured sink."""
-    output_data = _make_serializable(output)
-    output_fp = fingerprint(output_data) if output is not None else ""
+    inner_stubs: Iterable[Dict[str, Any]],
+    recorded_ns: Optional[int] = None,
+    stub_refs: bool = False,
+) -> Tuple[FixtureEvent, Dict[str, Any]]:
+    """Serialize the output and build the FixtureEvent plus the parent's stub.
+
+    With *stub_refs* the parent's stub references a large enough output by
+    fingerprint instead of repeating it.
+    """
+    if stub_refs:
+        output_data, output_fp, size = canonical_encode_sized(output)
+        ref_fp = output_fp if size >= MIN_REF_BYTES else ""
+    else:
+        output_data, output_fp = canonical_encode(output)
+        ref_fp = ""
+    if output is None:
+        output_fp = ref_fp = ""
 
     event = FixtureEvent(
-        fixture_id=str(uuid.uuid4())[:8],
         qualname=qualname,
-        run_id=ctx.run_id,
-        recorded_at=datetime.now(timezone.utc).isoformat(),
+        run_id=run_id,
+        recorded_ns=recorded_ns,
         input=args_data,
         input_fingerprint=input_fp,
         output=output_data,
@@ -164,19 +558,111 @@ def _emit_record(
         ordinal=ordinal,
         event_type="Output",
     )
+    stub = {
+        "qualname": qualname,
+        "input": args_data,
+        "output": stub_ref(ref_fp) if ref_fp else output_data,
+        "source": "record",
+    }
+    return event, stub
+
+
+def _emit_record(
+    qualname: str,
+    ctx: SimContext,
+    args_data: Dict[str, Any],
+    input_fp: str,
+    ordinal: int,
+    output: Any,
+    error_msg: Optional[str],
+    duration_ms: float,
+    inner_stubs: Iterable[Dict[str, Any]],
+) -> None:
+    """Build a FixtureEvent and emit it through the configured sink."""
+    t0 = time.perf_counter_ns()
+    event, stub = _build_record(
+        qualname, ctx.run_id, args_data, input_fp, ordinal, output, error_msg,
+        duration_ms, inner_stubs, stub_refs=uses_stub_refs(ctx),
+    )
+    t1 = time.perf_counter_ns()
+    overhead = get_overhead_metrics()
+    overhead.record(qualname, "serialize", t1 - t0)
 
     if ctx.sink is not None:
         ctx.sink.emit(event)
+        overhead.record(qualname, "enqueue", time.perf_counter_ns() - t1)
     else:
         logger.debug("No sink configured — fixture %s discarded", event.fixture_id)
 
     if ctx.trace_depth > 0:
-        ctx.collected_stubs.append({
-            "qualname": qualname,
-            "input": args_data,
-            "output": output_data,
-            "source": "record",
-        })
+        ctx.collected_stubs.append(stub)
+
+
+class _DeferredTrace(DeferredEvent):
+    """A recorded @sim_trace call, serialized and fingerprinted on resolve()."""
+
+    __slots__ = (
+        "_qualname", "_run_id", "_slot", "_args", "_output", "_error", "_duration_ms", "_stubs",
+    )
+
+    def __init__(
+        self,
+        qualname: str,
+        ctx: SimContext,
+        slot: OrdinalSlot,
+        raw_args: Dict[str, Any],
+        output: Any,
+        error_msg: Optional[str],
+        duration_ms: float,
+        inner_stubs: List[Any],
+    ):
+        super().__init__(time.time_ns(), uses_stub_refs(ctx))
+        self._qualname = qualname
+        self._run_id = ctx.run_id
+        self._slot = slot
+        # Encoded by the slot; kept here so buffers can measure it
+        self._args = raw_args
+        self._output = snapshot(output, ctx)
+        self._error = error_msg
+        self._duration_ms = duration_ms
+        self._stubs = inner_stubs
+
+    def _build(self) -> Tuple[FixtureEvent, Dict[str, Any]]:
+        encoded, input_fp, ordinal = self._slot.resolve()
+        return _build_record(
+            self._qualname, self._run_id, encoded["args"], input_fp,
+            ordinal, self._output, self._error,
+            self._duration_ms, resolve_stubs(self._stubs),
+            recorded_ns=self._recorded_ns, stub_refs=self._stub_refs,
+        )
+
+
+def _reserve_slot(qualname: str, ctx: SimContext, raw_args: Dict[str, Any]) -> OrdinalSlot:
+    """Queue the call's ordinal slot on entry, before the function runs."""
+    return OrdinalSlot(
+        ctx, functools.partial(canonical_encode, {"qualname": qualname, "args": raw_args}),
+    )
+
+
+def _emit_deferred(
+    qualname: str,
+    ctx: SimContext,
+    slot: OrdinalSlot,
+    raw_args: Dict[str, Any],
+    output: Any,
+    error_msg: Optional[str],
+    duration_ms: float,
+    inner_stubs: List[Any],
+) -> None:
+    """Hand the sink a _DeferredTrace instead of a serialized FixtureEvent."""
+    t0 = time.perf_counter_ns()
+    pending = _DeferredTrace(
+        qualname, ctx, slot, raw_args, output, error_msg, duration_ms, inner_stubs,
+    )
+    ctx.sink.emit(pending)
+    get_overhead_metrics().record(qualname, "enqueue", time.perf_counter_ns() - t0)
+    if ctx.trace_depth > 0:
+        ctx.collected_stubs.append(pending)
 
 
 # ---------------------------------------------------------------------------
@@ -187,6 +673,9 @@ def sim_trace(
     func: Optional[F] = None,
     *,
     name: Optional[str] = None,
+    ignore: Optional[Iterable[str]] = None,
+    include: Optional[Iterable[str]] = None,
+    key: Optional[Callable[[Dict[str, Any]], Any]] = None,
 ) -> Union[F, Callable[[F], F]]:
     """
     Decorator to mark a function as a sim-traced boundary.
@@ -194,11 +683,26 @@ def sim_trace(
     In record mode the function executes normally and a fixture event is
     emitted with {input, output, stubs}.  In replay mode the function body
     is skipped entirely and the recorded output is returned.  In off mode
-    the function runs with zero overhead.
+    the function runs with zero overhead: decorated while the process mode
+    is off, a plain function is returned as a trampoline that calls like
+    the original until the mode is switched on.  In record mode a SamplingPolicy
+    on the context (``init_sim(sampling=...)``) picks which root calls are
+    recorded, and an OverheadBudget (``init_sim(budget=...)``) degrades
+    recording when the SDK's own overhead grows too large.
 
     Args:
         func: The function to decorate (when used without parentheses).
         name: Custom qualname override for the fixture key.
+        ignore: Parameter names left out of the recorded input and the
+            fingerprint (``self``, sessions, clients, caches).
+        include: Parameter names to keep; every other argument is left out.
+        key: Callable taking the bound arguments (a dict, defaults applied)
+            and returning what to record and fingerprint in their place.
+            A dict result is used as the input; anything else is recorded
+            as ``{"key": result}``.
+
+    ignore, include and key are mutually exclusive and checked against the
+    function's signature at decoration time.
 
     Usage::
 
@@ -209,29 +713,71 @@ def sim_trace(
         @sim_trace(name="pricing.quote")
         def calculate(user_id, items):
             ...
+
+        @sim_trace(ignore=["self", "session"])
+        def lookup(self, session, user_id):
+            ...
     """
 
     def decorator(f: F) -> F:
         qualname = name or f.__qualname__
+        binder = _make_binder(f)
+        projection = _make_projection(f, qualname, ignore, include, key)
+        if projection is not None:
+            bind_all = binder
+
+            def binder(args: tuple, kwargs: dict) -> Dict[str, Any]:
+                return projection(bind_all(args, kwargs))
 
         if inspect.iscoroutinefunction(f):
             @functools.wraps(f)
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _context._process_off:
+                    return await f(*args, **kwargs)
                 ctx = get_context()
                 if not ctx.is_active:
                     return await f(*args, **kwargs)
 
-                args_data, input_fp = _prepare_input(f, qualname, args, kwargs)
-
-                if ctx.is_replaying:
-                    return _replay(qualname, input_fp, args_data, ctx)
+                budget_level = None
+                if ctx.budget is not None:
+                    budget_level = _budget_level(ctx)
+                    if budget_level is RecordLevel.OFF:
+                        return await _call_sampled_out_async(ctx, f, args, kwargs)
+                    if budget_level is RecordLevel.FINGERPRINT_ONLY:
+                        return await _call_fingerprint_only_async(ctx, f, binder, qualname, args, kwargs)
+                    if budget_level is not None:
+                        ctx.overhead_ns = 0
+
+                if ctx.sampling is not None and _skip_before_input(ctx, qualname):
+                    return await _call_sampled_out_async(ctx, f, args, kwargs)
+
+                enter_ns = time.perf_counter_ns()
+                raw_args = None
+                if ctx.is_recording and defers_serialization(ctx):
+                    raw_args = snapshot_args(binder(args, kwargs), ctx)
+                    slot = _reserve_slot(qualname, ctx, raw_args)
+                    get_overhead_metrics().record(
+                        qualname, "bind", time.perf_counter_ns() - enter_ns,
+                    )
+                else:
+                    args_data, input_fp = _prepare_input(binder, qualname, args, kwargs)
+
+                    if ctx.is_replaying:
+                        return _replay(qualname, input_fp, args_data, ctx)
+
+                    if ctx.sampling is not None and _skip_after_input(ctx, qualname, input_fp):
+                        return await _call_sampled_out_async(ctx, f, args, kwargs)
+
+                    ordinal = ctx.next_ordinal(input_fp)
 
-                ordinal = ctx.next_ordinal(input_fp)
                 ctx.trace_depth += 1
-                stubs_snapshot = len(ctx.collected_stubs)
-                start = time.time()
+                parent_stubs = ctx.collected_stubs
+                ctx.collected_stubs = StubArena(
+                    ctx.stub_budget_bytes if raw_args is None else None
+                )
                 error_msg = None
                 output = None
+                call_ns = time.perf_counter_ns()
                 try:
                     output = await f(*args, **kwargs)
                     return output
@@ -239,33 +785,75 @@ def sim_trace(
                     error_msg = f"{type(e).__name__}: {e}"
                     raise
                 finally:
-                    duration_ms = (time.time() - start) * 1000
+                    return_ns = time.perf_counter_ns()
+                    duration_ms = (return_ns - call_ns) / 1e6
                     ctx.trace_depth -= 1
-                    inner_stubs = list(ctx.collected_stubs[stubs_snapshot:])
-                    del ctx.collected_stubs[stubs_snapshot:]
-                    _emit_record(qualname, ctx, args_data, input_fp, ordinal,
-                                 output, error_msg, duration_ms, inner_stubs)
-
-            return async_wrapper  # type: ignore[return-value]
+                    inner_stubs = ctx.collected_stubs.take()
+                    ctx.collected_stubs = parent_stubs
+                    if raw_args is not None:
+                        _emit_deferred(qualname, ctx, slot, raw_args, output,
+                                       error_msg, duration_ms, inner_stubs)
+                    else:
+                        _emit_record(qualname, ctx, args_data, input_fp, ordinal,
+                                     output, error_msg, duration_ms, inner_stubs)
+                    end_ns = time.perf_counter_ns()
+                    own_ns = (call_ns - enter_ns) + (end_ns - return_ns)
+                    get_overhead_metrics().record(qualname, "total", own_ns)
+                    ctx.overhead_ns += own_ns
+                    if budget_level is not None:
+                        ctx.budget.observe(ctx.overhead_ns, end_ns - enter_ns, ctx.sink)
+
+            wrapper = async_wrapper
 
         else:
             @functools.wraps(f)
             def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _context._process_off:
+                    return f(*args, **kwargs)
                 ctx = get_context()
                 if not ctx.is_active:
                     return f(*args, **kwargs)
 
-                args_data, input_fp = _prepare_input(f, qualname, args, kwargs)
+                budget_level = None
+                if ctx.budget is not None:
+                    budget_level = _budget_level(ctx)
+                    if budget_level is RecordLevel.OFF:
+                        return _call_sampled_out(ctx, f, args, kwargs)
+                    if budget_level is RecordLevel.FINGERPRINT_ONLY:
+                        return _call_fingerprint_only(ctx, f, binder, qualname, args, kwargs)
+                    if budget_level is not None:
+                        ctx.overhead_ns = 0
+
+                if ctx.sampling is not None and _skip_before_input(ctx, qualname):
+                    return _call_sampled_out(ctx, f, args, kwargs)
+
+                enter_ns = time.perf_counter_ns()
+                raw_args = None
+                if ctx.is_recording and defers_serialization(ctx):
+                    raw_args = snapshot_args(binder(args, kwargs), ctx)
+                    slot = _reserve_slot(qualname, ctx, raw_args)
+                    get_overhead_metrics().record(
+                        qualname, "bind", time.perf_counter_ns() - enter_ns,
+                    )
+                else:
+                    args_data, input_fp = _prepare_input(binder, qualname, args, kwargs)
+
+                    if ctx.is_replaying:
+                        return _replay(qualname, input_fp, args_data, ctx)
+
+                    if ctx.sampling is not None and _skip_after_input(ctx, qualname, input_fp):
+                        return _call_sampled_out(ctx, f, args, kwargs)
+
+                    ordinal = ctx.next_ordinal(input_fp)
 
-                if ctx.is_replaying:
-                    return _replay(qualname, input_fp, args_data, ctx)
-
-                ordinal = ctx.next_ordinal(input_fp)
                 ctx.trace_depth += 1
-                stubs_snapshot = len(ctx.collected_stubs)
-                start = time.time()
+                parent_stubs = ctx.collected_stubs
+                ctx.collected_stubs = StubArena(
+                    ctx.stub_budget_bytes if raw_args is None else None
+                )
                 error_msg = None
                 output = None
+                call_ns = time.perf_counter_ns()
                 try:
                     output = f(*args, **kwargs)
                     return output
@@ -273,14 +861,31 @@ def sim_trace(
                     error_msg = f"{type(e).__name__}: {e}"
                     raise
                 finally:
-                    duration_ms = (time.time() - start) * 1000
+                    return_ns = time.perf_counter_ns()
+                    duration_ms = (return_ns - call_ns) / 1e6
                     ctx.trace_depth -= 1
-                    inner_stubs = list(ctx.collected_stubs[stubs_snapshot:])
-                    del ctx.collected_stubs[stubs_snapshot:]
-                    _emit_record(qualname, ctx, args_data, input_fp, ordinal,
-                                 output, error_msg, duration_ms, inner_stubs)
-
-            return sync_wrapper  # type: ignore[return-value]
+                    inner_stubs = ctx.collected_stubs.take()
+                    ctx.collected_stubs = parent_stubs
+                    if raw_args is not None:
+                        _emit_deferred(qualname, ctx, slot, raw_args, output,
+                                       error_msg, duration_ms, inner_stubs)
+                    else:
+                        _emit_record(qualname, ctx, args_data, input_fp, ordinal,
+                                     output, error_msg, duration_ms, inner_stubs)
+                    end_ns = time.perf_counter_ns()
+                    own_ns = (call_ns - enter_ns) + (end_ns - return_ns)
+                    get_overhead_metrics().record(qualname, "total", own_ns)
+                    ctx.overhead_ns += own_ns
+                    if budget_level is not None:
+                        ctx.budget.observe(ctx.overhead_ns, end_ns - enter_ns, ctx.sink)
+
+            wrapper = sync_wrapper
+
+        if _context._process_off:
+            trampoline = _make_trampoline(f, wrapper)
+            if trampoline is not None:
+                return trampoline  # type: ignore[return-value]
+        return wrapper  # type: ignore[return-value]
 
     # Support both @sim_trace and @sim_trace() syntax
     if func is not None:
@@ -0,0 +1,282 @@
+"""
+Tests for the agent HTTP client (sim_sdk.sink.agent_client) against the
+in-process LocalAgentServer.
+
+Covers:
+1. Batches are POSTed over one keep-alive connection
+2. A connection closed by the agent is reopened and the batch resent, but
+   only when the agent cannot have received it
+3. Unreachable agents raise AgentUnavailableError, HTTP errors HTTPError
+4. AgentSink delivers every event and closes the connection on close()
+5. Bodies are compressed only once the agent advertises the encoding,
+   fall back on 415, and record ratio and time in SenderMetrics
+"""
+
+import gzip
+import http.client
+import socket
+import urllib.error
+import zlib
+from unittest.mock import MagicMock
+
+import pytest
+
+from sim_sdk.fixture.schema import FixtureEvent
+from sim_sdk.sink.agent_client import AgentHttpClient, AgentUnavailableError, compress_body
+from sim_sdk.sink.agent_sink import AgentSink
+from sim_sdk.sink.envelope import BatchRequest, fixture_to_envelope
+from sim_sdk.sink.local_agent import LocalAgentServer
+from sim_sdk.sink.sender_metrics import SenderMetrics
+
+
+def envelopes(n: int = 3):
+    return [fixture_to_envelope(FixtureEvent(qualname=f"q{i}", output=i)) for i in range(n)]
+
+
+def db_envelopes(n: int = 20):
+    rows = [{"id": i, "email": f"user{i}@example.com", "status": "active"} for i in range(50)]
+    return [
+        fixture_to_envelope(FixtureEvent(
+            qualname="orders.load", event_type="Stub",
+            input={"sql": "SELECT id, email, status FROM users WHERE org_id = %s"},
+            output=rows,
+        ))
+        for _ in range(n)
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def agent():
+    with LocalAgentServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(agent):
+    c = AgentHttpClient(agent.url, timeout_s=2.0)
+    yield c
+    c.close()
+
+
+class TestKeepAlive:
+    def test_batches_share_connection(self, agent, client):
+        for _ in range(5):
+            resp = client.post_batch(envelopes(3))
+            assert resp.accepted == 3
+        assert agent.requests == 5
+        assert agent.events == 15
+        assert agent.connections == 1
+        assert client.connections == 1
+
+    def test_reconnects_after_agent_closes(self, agent, client):
+        client.post_batch(envelopes())
+        agent.drop_connections()
+        assert client.post_batch(envelopes()).accepted == 3
+        assert agent.connections == 2
+        assert agent.requests == 2
+
+    def test_reconnects_after_agent_restart(self):
+        port = free_port()
+        with LocalAgentServer(port) as first:
+            client = AgentHttpClient(first.url, timeout_s=2.0)
+            client.post_batch(envelopes())
+        with LocalAgentServer(port) as second:
+            assert client.post_batch(envelopes()).accepted == 3
+            assert second.requests == 1
+        client.close()
+
+    def test_close_then_reuse(self, agent, client):
+        client.post_batch(envelopes())
+        client.close()
+        client.post_batch(envelopes())
+        assert agent.connections == 2
+
+
+def ok_response() -> MagicMock:
+    resp = MagicMock(status=200, reason="OK", will_close=False)
+    resp.headers = http.client.HTTPMessage()
+    resp.read.return_value = b'{"Accepted": 3, "Dropped": 0}'
+    return resp
+
+
+class ScriptedConnections:
+    """Stands in for HTTPConnection: the first request on the first
+    connection succeeds, the second raises *error* from *phase*."""
+
+    def __init__(self, error: BaseException, phase: str):
+        self.error = error
+        self.phase = phase
+        self.opened: list = []
+
+    def __call__(self, host, port, timeout):
+        conn = MagicMock()
+        if not self.opened:
+            if self.phase == "request":
+                conn.request.side_effect = [None, self.error]
+                conn.getresponse.side_effect = [ok_response()]
+            else:
+                conn.getresponse.side_effect = [ok_response(), self.error]
+        else:
+            conn.getresponse.side_effect = [ok_response()]
+        self.opened.append(conn)
+        return conn
+
+    @property
+    def requests(self) -> int:
+        return sum(c.request.call_count for c in self.opened)
+
+
+class TestResend:
+    @pytest.mark.parametrize("error, phase", [
+        (BrokenPipeError(), "request"),
+        (ConnectionResetError(), "request"),
+        (http.client.RemoteDisconnected("closed"), "response"),
+    ])
+    def test_resent_when_agent_cannot_have_it(self, error, phase):
+        client = AgentHttpClient(timeout_s=1.0)
+        client._conn_class = conns = ScriptedConnections(error, phase)
+        client.post_batch(envelopes())
+        assert client.post_batch(envelopes()).accepted == 3
+        assert conns.requests == 3
+        assert client.connections == 2
+
+    @pytest.mark.parametrize("error, phase", [
+        (socket.timeout("timed out"), "response"),
+        (ConnectionResetError(), "response"),
+        (http.client.IncompleteRead(b"{"), "response"),
+        (socket.timeout("timed out"), "request"),
+    ])
+    def test_not_resent_when_agent_may_have_it(self, error, phase):
+        client = AgentHttpClient(timeout_s=1.0)
+        client._conn_class = conns = ScriptedConnections(error, phase)
+        client.post_batch(envelopes())
+        with pytest.raises(AgentUnavailableError):
+            client.post_batch(envelopes())
+        assert conns.requests == 2
+        assert client._conn is None
+
+    def test_fresh_connection_not_resent(self):
+        client = AgentHttpClient(timeout_s=1.0)
+        conn = MagicMock()
+        conn.getresponse.side_effect = http.client.RemoteDisconnected("closed")
+        client._conn_class = MagicMock(return_value=conn)
+        with pytest.raises(AgentUnavailableError):
+            client.post_batch(envelopes())
+        assert conn.request.call_count == 1
+
+
+class TestErrors:
+    def test_unreachable(self):
+        client = AgentHttpClient(f"http://127.0.0.1:{free_port()}", timeout_s=1.0)
+        with pytest.raises(AgentUnavailableError, match="unreachable"):
+            client.post_batch(envelopes())
+        assert client._conn is None
+
+    def test_http_error_keeps_connection(self, agent):
+        client = AgentHttpClient(agent.url + "/wrong", timeout_s=2.0)
+        with pytest.raises(urllib.error.HTTPError) as info:
+            client.post_batch(envelopes())
+        assert info.value.code == 404
+        with pytest.raises(urllib.error.HTTPError):
+            client.post_batch(envelopes())
+        assert agent.connections == 1
+        client.close()
+
+    def test_invalid_url(self):
+        with pytest.raises(ValueError, match="agent_url"):
+            AgentHttpClient("localhost:9700")
+
+
+class TestAgentSink:
+    def test_delivers_over_one_connection(self, agent):
+        sink = AgentSink(agent.url, max_batch_events=10, flush_interval_s=60)
+        for i in range(100):
+            sink.emit(FixtureEvent(qualname=f"q{i}", output=i))
+        sink.flush()
+        sink.close()
+        assert agent.events == 100
+        assert agent.connections == 1
+        assert sink._client._conn is None
+
+
+class TestCompression:
+    def client(self, agent, **kwargs):
+        kwargs.setdefault("compression", "gzip")
+        return AgentHttpClient(agent.url, timeout_s=2.0, **kwargs)
+
+    @pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+    def test_compresses_after_agent_advertises(self, agent, encoding):
+        metrics = SenderMetrics()
+        client = self.client(agent, compression=encoding, metrics=metrics)
+        client.post_batch(db_envelopes())
+        plain = agent.bytes_received
+        assert metrics.compressed_batches == 0
+
+        batch = db_envelopes()
+        assert client.post_batch(batch).accepted == 20
+        assert agent.events == 40
+        assert agent.bytes_received - plain < plain / 5
+        snap = metrics.snapshot()
+        assert snap["compressed_batches"] == 1
+        assert snap["compress_in_bytes"] == len(BatchRequest(batch).serialize())
+        assert snap["compression_ratio"] > 5
+        assert snap["compress_ms"] > 0
+        client.close()
+
+    def test_older_agent_gets_plain_json(self):
+        with LocalAgentServer(encodings=()) as old_agent:
+            metrics = SenderMetrics()
+            client = self.client(old_agent, metrics=metrics)
+            for _ in range(3):
+                assert client.post_batch(db_envelopes()).accepted == 20
+            assert metrics.compressed_batches == 0
+            assert metrics.snapshot()["compression_ratio"] == 0.0
+            client.close()
+
+    def test_falls_back_on_415(self):
+        with LocalAgentServer(encodings=("deflate",)) as agent:
+            client = self.client(agent)
+            # Pretend the agent advertised gzip
+            client.post_batch(envelopes())
+            client._accepted_encodings = frozenset({"gzip"})
+            assert client.post_batch(db_envelopes()).accepted == 20
+            assert client._encoding_for(b"x" * 10_000) is None
+            assert agent.events == 23
+            client.close()
+
+    def test_small_bodies_not_compressed(self, agent):
+        metrics = SenderMetrics()
+        client = self.client(agent, metrics=metrics, compress_min_bytes=10**6)
+        for _ in range(3):
+            client.post_batch(db_envelopes())
+        assert metrics.compressed_batches == 0
+        client.close()
+
+    def test_compress_body_formats(self):
+        body = b'{"Events":[]}' * 100
+        assert gzip.decompress(compress_body(body, "gzip", 6)) == body
+        assert zlib.decompress(compress_body(body, "deflate", 1)) == body
+        # Deterministic: no timestamp in the gzip header
+        assert compress_body(body, "gzip", 6) == compress_body(body, "gzip", 6)
+
+    def test_options_validated(self):
+        with pytest.raises(ValueError, match="compression"):
+            AgentHttpClient(compression="br")
+        with pytest.raises(ValueError, match="compression_level"):
+            AgentHttpClient(compression="gzip", compression_level=12)
+
+    def test_sink_compresses(self, agent):
+        sink = AgentSink(agent.url, max_batch_events=10, flush_interval_s=60,
+                         compression="gzip", compress_min_bytes=0)
+        for i in range(100):
+            sink.emit(FixtureEvent(qualname=f"q{i}", output=list(range(50))))
+        sink.flush()
+        sink.close()
+        assert agent.events == 100
+        assert sink.metrics.snapshot()["compressed_batches"] > 0
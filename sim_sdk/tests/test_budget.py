@@ -0,0 +1,354 @@
+"""
+Tests for the overhead budget circuit breaker (OverheadBudget + @sim_trace).
+
+Covers:
+1. Step-down on overhead fraction, p99 and sink queue pressure
+2. Hysteresis on recovery
+3. Level changes reported through OverheadMetrics counters
+4. @sim_trace behaviour at each level (full, sampled, fingerprint-only, off)
+5. Root calls report nested primitive overhead to the budget
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from sim_sdk.budget import OverheadBudget, RecordLevel
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.serialization import register_serializer, unregister_serializer
+from sim_sdk.sink.overhead_metrics import get_overhead_metrics
+from sim_sdk.sink.record_sink import RecordSink
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self, pressure: float = 0.0):
+        self.events: list = []
+        self.pressure = pressure
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+    def queue_pressure(self) -> float:
+        return self.pressure
+
+
+class FakeDB:
+    def __init__(self):
+        self.calls = 0
+
+    def query(self, sql, params=None):
+        self.calls += 1
+        return [{"id": 1}]
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    clear_context()
+    get_overhead_metrics().reset()
+    yield
+    clear_context()
+    get_overhead_metrics().reset()
+
+
+def make_ctx(budget, sink=None) -> SimContext:
+    ctx = SimContext(
+        mode=SimMode.RECORD, run_id="test-run",
+        sink=sink if sink is not None else CollectSink(), budget=budget,
+    )
+    set_context(ctx)
+    return ctx
+
+
+# Overhead fraction 10%, well above the default 2%
+OVER = (100_000, 1_000_000)
+# Overhead fraction 0.1% and p99 1µs, below half of every default limit
+HEALTHY = (1_000, 1_000_000)
+# Overhead fraction 1.5%: within budget but not healthy enough to recover
+MARGINAL = (15_000, 1_000_000)
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+class TestValidation:
+    @pytest.mark.parametrize("kwargs", [
+        {"max_fraction": 0},
+        {"max_p99_us": -1},
+        {"max_queue_fill": 0},
+        {"window": 0},
+        {"recover_windows": 0},
+        {"recover_ratio": 1.5},
+        {"sampled_rate": -0.1},
+    ])
+    def test_invalid_settings_rejected(self, kwargs):
+        with pytest.raises(ValueError):
+            OverheadBudget(**kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Stepping down
+# ---------------------------------------------------------------------------
+
+class TestStepDown:
+    def test_one_level_per_window(self):
+        budget = OverheadBudget(window=2)
+        budget.observe(*OVER)
+        assert budget.level is RecordLevel.FULL
+
+        budget.observe(*OVER)
+        assert budget.level is RecordLevel.SAMPLED
+
+        for _ in range(6):
+            budget.observe(*OVER)
+        assert budget.level is RecordLevel.OFF
+        assert budget.stats() == {"level": "off", "step_downs": 3, "step_ups": 0}
+
+    def test_p99_limit(self):
+        budget = OverheadBudget(max_fraction=None, max_p99_us=500, window=1)
+        budget.observe(400_000, 10**12)
+        assert budget.level is RecordLevel.FULL
+        budget.observe(600_000, 10**12)
+        assert budget.level is RecordLevel.SAMPLED
+
+    def test_queue_pressure(self):
+        budget = OverheadBudget(window=1)
+        budget.observe(*HEALTHY, sink=CollectSink(pressure=0.9))
+        assert budget.level is RecordLevel.SAMPLED
+
+    def test_sink_without_pressure_ignored(self):
+        budget = OverheadBudget(window=1)
+        budget.observe(*HEALTHY, sink=MagicMock())
+        assert budget.level is RecordLevel.FULL
+
+    def test_disabled_limits(self):
+        budget = OverheadBudget(
+            max_fraction=None, max_p99_us=None, max_queue_fill=None, window=1,
+        )
+        budget.observe(10**9, 10**9)
+        assert budget.level is RecordLevel.FULL
+
+
+# ---------------------------------------------------------------------------
+# Recovery
+# ---------------------------------------------------------------------------
+
+class TestRecovery:
+    def test_needs_consecutive_healthy_windows(self):
+        budget = OverheadBudget(window=1, recover_windows=3)
+        budget.observe(*OVER)
+        assert budget.level is RecordLevel.SAMPLED
+
+        budget.observe(*HEALTHY)
+        budget.observe(*HEALTHY)
+        budget.observe(*MARGINAL)  # resets the streak
+        budget.observe(*HEALTHY)
+        budget.observe(*HEALTHY)
+        assert budget.level is RecordLevel.SAMPLED
+
+        budget.observe(*HEALTHY)
+        assert budget.level is RecordLevel.FULL
+        assert budget.stats()["step_ups"] == 1
+
+    def test_off_probes_back_up(self):
+        budget = OverheadBudget(window=1, recover_windows=2)
+        budget._level = RecordLevel.OFF
+
+        assert budget.decide() is RecordLevel.OFF
+        assert budget.decide() is RecordLevel.OFF
+        assert budget.level is RecordLevel.FINGERPRINT_ONLY
+
+    def test_reset(self):
+        budget = OverheadBudget(window=1)
+        budget.observe(*OVER)
+        budget.reset()
+        assert budget.stats() == {"level": "full", "step_downs": 0, "step_ups": 0}
+
+
+class TestMetrics:
+    def test_level_changes_counted(self):
+        budget = OverheadBudget(window=1, recover_windows=1)
+        budget.observe(*OVER)
+        budget.observe(*HEALTHY)
+
+        assert get_overhead_metrics().counters() == {
+            "budget.step_down": 1,
+            "budget.full->sampled": 1,
+            "budget.step_up": 1,
+            "budget.sampled->full": 1,
+        }
+
+
+# ---------------------------------------------------------------------------
+# @sim_trace at each level
+# ---------------------------------------------------------------------------
+
+@sim_trace(name="lookup")
+def lookup(db, user_id):
+    with sim_db(db, name="pg") as conn:
+        return conn.query("SELECT * FROM users WHERE id = %s", [user_id])
+
+
+class TestTraceLevels:
+    def test_full_records_and_reports_nested_overhead(self):
+        budget = MagicMock()
+        budget.decide.return_value = RecordLevel.FULL
+        ctx = make_ctx(budget)
+        lookup(FakeDB(), 1)
+
+        assert [e.qualname for e in ctx.sink.events] == ["db:pg", "lookup"]
+        overhead_ns, elapsed_ns, sink = budget.observe.call_args.args
+        snap = get_overhead_metrics().snapshot()
+        nested_ns = snap["db:pg"]["intercept"]["total_ns"]
+        assert overhead_ns == nested_ns + snap["lookup"]["total"]["total_ns"]
+        assert elapsed_ns >= overhead_ns
+        assert sink is ctx.sink
+
+    def test_sampled_level_uses_random_draw(self):
+        budget = OverheadBudget(sampled_rate=0.5)
+        budget._level = RecordLevel.SAMPLED
+        budget._random = iter([0.1, 0.9]).__next__
+        ctx = make_ctx(budget)
+        db = FakeDB()
+        lookup(db, 1)
+        lookup(db, 2)
+
+        assert [e.qualname for e in ctx.sink.events] == ["db:pg", "lookup"]
+        assert db.calls == 2
+
+    def test_fingerprint_only_drops_payloads(self):
+        db = FakeDB()
+        full_ctx = make_ctx(None)
+        lookup(db, 1)
+        full = full_ctx.sink.events[-1]
+
+        budget = OverheadBudget()
+        budget._level = RecordLevel.FINGERPRINT_ONLY
+        ctx = make_ctx(budget)
+        assert lookup(db, 1) == [{"id": 1}]
+
+        [event] = ctx.sink.events
+        assert event.event_type == "Metadata"
+        assert event.input == {}
+        assert event.output is None
+        assert event.stubs == []
+        assert event.input_fingerprint == full.input_fingerprint
+        assert event.output_fingerprint == full.output_fingerprint
+        assert db.calls == 2
+        assert not ctx.sampled_out
+
+    def test_fingerprint_only_matches_full_for_non_json_outputs(self):
+        class Slotted:
+            __slots__ = ("a",)
+
+            def __init__(self):
+                self.a = 1
+
+        @sim_trace(name="raw")
+        def raw(kind):
+            return b"\x00\x01" if kind == "bytes" else Slotted()
+
+        full_ctx = make_ctx(None)
+        raw("bytes")
+        full_fp = full_ctx.sink.events[-1].output_fingerprint
+
+        budget = OverheadBudget()
+        budget._level = RecordLevel.FINGERPRINT_ONLY
+        ctx = make_ctx(budget)
+        assert raw("bytes") == b"\x00\x01"
+        assert isinstance(raw("slotted"), Slotted)
+
+        bytes_event, slotted_event = ctx.sink.events
+        assert bytes_event.output_fingerprint == full_fp
+        assert slotted_event.event_type == "Metadata"
+        assert not ctx.sampled_out
+
+    def test_fingerprint_only_never_raises(self):
+        class Odd:
+            pass
+
+        def broken(value):
+            raise TypeError("cannot serialize")
+
+        @sim_trace(name="odd")
+        def odd():
+            return Odd()
+
+        budget = OverheadBudget()
+        budget._level = RecordLevel.FINGERPRINT_ONLY
+        ctx = make_ctx(budget)
+        register_serializer(Odd, broken)
+        try:
+            assert isinstance(odd(), Odd)
+        finally:
+            unregister_serializer(Odd)
+        assert ctx.sink.events[0].output_fingerprint == ""
+
+    def test_fingerprint_only_records_error(self):
+        @sim_trace(name="boom")
+        def boom():
+            raise ValueError("bad")
+
+        budget = OverheadBudget()
+        budget._level = RecordLevel.FINGERPRINT_ONLY
+        ctx = make_ctx(budget)
+        with pytest.raises(ValueError):
+            boom()
+
+        assert ctx.sink.events[0].error == "ValueError: bad"
+        assert not ctx.sampled_out
+
+    def test_fingerprint_only_async(self):
+        @sim_trace(name="afetch")
+        async def afetch(x):
+            return x * 2
+
+        budget = OverheadBudget()
+        budget._level = RecordLevel.FINGERPRINT_ONLY
+        ctx = make_ctx(budget)
+        assert asyncio.run(afetch(2)) == 4
+        assert ctx.sink.events[0].event_type == "Metadata"
+
+    def test_off_records_nothing(self):
+        budget = OverheadBudget()
+        budget._level = RecordLevel.OFF
+        ctx = make_ctx(budget)
+        db = FakeDB()
+        assert lookup(db, 1) == [{"id": 1}]
+
+        assert ctx.sink.events == []
+        assert db.calls == 1
+
+    def test_replay_ignores_budget(self):
+        budget = MagicMock()
+        set_context(SimContext(mode=SimMode.REPLAY, run_id="r", budget=budget))
+        lookup(FakeDB(), 1)
+        budget.decide.assert_not_called()
+
+    def test_budget_steps_down_under_heavy_recording(self):
+        @sim_trace(name="cheap")
+        def cheap(rows):
+            return rows
+
+        budget = OverheadBudget(window=5)
+        ctx = make_ctx(budget)
+        rows = [{"id": i, "name": "x" * 50} for i in range(200)]
+        for _ in range(5):
+            cheap(rows)
+
+        assert budget.level is RecordLevel.SAMPLED
+        assert len(ctx.sink.events) == 5
+
+
+class TestRecordSinkPressure:
+    def test_buffer_fill_ratio(self):
+        class ListSink(RecordSink):
+            def _persist_batch(self, batch):
+                pass
+
+        sink = ListSink(max_buffer_bytes=10**9, max_batch_events=1000)
+        assert 0.0 < sink.queue_pressure() < 0.01
+        assert ListSink(max_buffer_bytes=1).queue_pressure() == 1.0
@@ -2,13 +2,28 @@
 Tests for JSON canonicalization and fingerprinting.
 """
 
+import enum
+import hashlib
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
 import pytest
 from sim_sdk.canonical import (
+    canonical_encode,
+    canonical_fingerprint,
     canonicalize_json,
+    configure_sql_cache,
+    sql_cache_info,
     fingerprint,
     fingerprint_short,
     normalize_sql,
     fingerprint_sql,
+    get_fingerprint_algorithm,
+    set_fingerprint_algorithm,
+    DEFAULT_FINGERPRINT_ALGORITHM,
+    _normalize_sql_basic,
+    _normalize_sql_regex,
 )
 
 
@@ -255,3 +270,362 @@ def test_fingerprint_sql_with_parameters():
     # This is correct behavior - we want to distinguish between queries
     # with different parameter values for proper fixture matching
     assert fp1 != fp2
+
+
+# ---------------------------------------------------------------------------
+# canonical_encode — single-pass convert + fingerprint
+# ---------------------------------------------------------------------------
+
+class _Color(enum.IntEnum):
+    RED = 1
+
+
+class _Tag(str):
+    pass
+
+
+_Point = namedtuple("_Point", "x y")
+
+
+class _Opaque:
+    def __str__(self):
+        return "opaque"
+
+
+_ENCODE_CORPUS = [
+    None,
+    "",
+    "héllo \"quoted\" \n",
+    0,
+    -7,
+    2 ** 70,
+    3.5,
+    -0.0,
+    float("nan"),
+    float("inf"),
+    True,
+    False,
+    [],
+    {},
+    (1, "a", None),
+    b"\x00\xffbytes",
+    {"b": 1, "a": [1, 2, {"z": None, "y": True}]},
+    {10: "ten", 9: "nine", "8": "eight"},
+    {1: "int", "1": "str"},
+    {"ts": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "d": date(2024, 1, 2)},
+    {"price": Decimal("19.99"), "color": _Color.RED, "tag": _Tag("vip")},
+    OrderedDict([("b", 2), ("a", 1)]),
+    _Point(1, 2),
+    {"set": {3, 1, 2}, "obj": _Opaque()},
+    {"rows": [{"id": i, "name": f"n{i}", "price": i * 1.5} for i in range(20)]},
+]
+
+
+@pytest.mark.parametrize("value", _ENCODE_CORPUS, ids=lambda v: type(v).__name__)
+def test_canonical_encode_matches_two_pass_pipeline(value):
+    """canonical_encode must equal _make_serializable + fingerprint exactly."""
+    from sim_sdk.trace import _make_serializable
+
+    expected_value = _make_serializable(value)
+    encoded, fp = canonical_encode(value)
+
+    assert canonicalize_json(encoded) == canonicalize_json(expected_value)
+    assert fp == fingerprint(expected_value)
+
+
+def test_canonical_encode_returns_copy():
+    payload = {"items": [{"qty": 1}]}
+    encoded, _ = canonical_encode(payload)
+    payload["items"][0]["qty"] = 99
+    assert encoded == {"items": [{"qty": 1}]}
+
+
+def test_canonical_encode_preserves_insertion_order():
+    encoded, _ = canonical_encode({"z": 1, "a": 2})
+    assert list(encoded) == ["z", "a"]
+
+
+# ---------------------------------------------------------------------------
+# Streaming fingerprint — must stay byte-identical to hashing the full string
+# ---------------------------------------------------------------------------
+
+def _full_string_digest(obj):
+    import hashlib
+    return hashlib.sha256(canonicalize_json(obj).encode("utf-8")).hexdigest()
+
+
+_LARGE_ROWS = [
+    {"id": i, "name": f"row-{i}", "price": i * 1.25, "blob": b"\x01\x02", "ok": i % 2 == 0}
+    for i in range(1000)
+]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        _LARGE_ROWS,
+        tuple(_LARGE_ROWS),
+        {"rows": _LARGE_ROWS, "count": 1000, "meta": {"table": "products"}},
+        {"outer": {"rows": _LARGE_ROWS}, "empty": [], "also_empty": {}},
+        {i: f"v{i}" for i in range(600)},
+        {f"k{i}": [i, {i}, None] for i in range(600)},
+        [list(range(300)) for _ in range(3)],
+        [[], {}, "x"] * 300,
+    ],
+    ids=[
+        "row-list", "row-tuple", "dict-of-rows", "nested-rows",
+        "int-keys", "str-keys", "list-of-large-lists", "mixed-small",
+    ],
+)
+def test_fingerprint_streaming_matches_full_string(value):
+    assert fingerprint(value) == _full_string_digest(value)
+
+
+def test_fingerprint_streaming_preserves_key_sort_errors():
+    """Unorderable keys must still fail the same way json.dumps does."""
+    value = {**{f"k{i}": i for i in range(300)}, 1: "int"}
+    with pytest.raises(TypeError):
+        canonicalize_json(value)
+    with pytest.raises(TypeError):
+        fingerprint(value)
+
+
+def test_canonical_encode_large_payload_matches_fingerprint():
+    encoded, fp = canonical_encode({"rows": _LARGE_ROWS * 5})
+    assert fp == fingerprint(encoded)
+
+
+# ---------------------------------------------------------------------------
+# SQL normalization cache
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def fresh_sql_cache():
+    configure_sql_cache()
+    yield
+    configure_sql_cache()
+
+
+def test_sql_cache_hits_on_repeated_statement(fresh_sql_cache):
+    q = "select  *  from users where id=1"
+    first = fingerprint_sql(q)
+    assert fingerprint_sql(q) == first
+    assert normalize_sql(q) == normalize_sql("SELECT * FROM users WHERE id = 1")
+
+    info = sql_cache_info()
+    assert info["hits"] == 2
+    assert info["misses"] == 2
+    assert info["hit_rate"] == 0.5
+
+
+def test_sql_cache_results_match_uncached(fresh_sql_cache):
+    q = "SELECT id FROM t -- trailing\nWHERE x = 1"
+    cached_fp = fingerprint_sql(q)
+    cached_norm = normalize_sql(q, strip_comments=False)
+    configure_sql_cache(0)
+    assert fingerprint_sql(q) == cached_fp
+    assert normalize_sql(q, strip_comments=False) == cached_norm
+    assert fingerprint_sql(q) == fingerprint(normalize_sql(q))
+
+
+def test_sql_cache_respects_size_cap(fresh_sql_cache):
+    configure_sql_cache(4)
+    for i in range(10):
+        fingerprint_sql(f"SELECT {i}")
+    info = sql_cache_info()
+    assert info["size"] == 4
+    assert info["max_size"] == 4
+
+
+def test_sql_cache_skips_very_long_statements(fresh_sql_cache):
+    q = "INSERT INTO t VALUES " + ",".join(["(1)"] * 5000)
+    fingerprint_sql(q)
+    fingerprint_sql(q)
+    assert sql_cache_info()["size"] == 0
+
+
+def test_configure_sql_cache_rejects_negative():
+    with pytest.raises(ValueError):
+        configure_sql_cache(-1)
+
+
+# ---------------------------------------------------------------------------
+# Fallback SQL normalizer — tokenizer vs. the previous regex passes
+# ---------------------------------------------------------------------------
+
+# Statements without string literals or quoted identifiers: the tokenizer
+# must reproduce the old output exactly so recorded fingerprints stay valid.
+_SQL_CORPUS = [
+    "SELECT * FROM users WHERE id = 1",
+    "select  *  from users where id=1",
+    "SELECT   *\nFROM\n  users\nWHERE id = 1",
+    "SELECT * FROM t WHERE id = $1",
+    "SELECT * FROM orders WHERE order_id = %s",
+    "SELECT region FROM users WHERE id = ?",
+    "INSERT INTO quotes (quote_id, user_id, subtotal, tax, total) VALUES (?, ?, ?, ?, ?)",
+    "insert into t values (1)",
+    "UPDATE users SET active = true WHERE id = 1",
+    "delete from users where id=1",
+    "WITH cte AS (SELECT 1) INSERT INTO t SELECT * FROM cte",
+    "select a from t where a!=1 and b<>2 or c<=3 and d>=4 and e<5 and f>6",
+    "SELECT a != b, a! = b, a=b=c, x<=>y FROM t",
+    "select count(o.id) as n, sum(o.total) from orders o left join users u on u.id=o.user_id",
+    "SELECT u.id, u.name FROM users u GROUP BY u.id, u.name HAVING count(*)>1 ORDER BY u.name DESC LIMIT 10 OFFSET 20",
+    "select case when x is null then 0 else x end from t",
+    "create table t (id int primary key, ref int references other(id))",
+    "alter table t add column c int; drop index idx",
+    "SELECT orders, order_by, by_x, selected, t.select, _from, from_1 FROM t",
+    "SELECT\t*\r\nFROM t\n\n\nWHERE  a\t=\tb",
+    "SELECT * FROM users -- trailing comment",
+    "SELECT id FROM t -- trailing\nWHERE x = 1",
+    "SELECT * /* inline */ FROM t /* multi\nline */ WHERE a = 1",
+    "SELECT a/*joined*/b FROM t",
+    "  select 1  ",
+    "=1",
+    "SELECT café, naïve FROM données WHERE prix >= 10",
+]
+
+
+@pytest.mark.parametrize("query", _SQL_CORPUS)
+def test_normalize_sql_basic_matches_regex_normalizer(query):
+    assert _normalize_sql_basic(query, True) == _normalize_sql_regex(query, True)
+
+
+@pytest.mark.parametrize(
+    "query", [q for q in _SQL_CORPUS if "--" not in q and "/*" not in q]
+)
+def test_normalize_sql_basic_matches_regex_normalizer_keeping_comments(query):
+    assert _normalize_sql_basic(query, False) == _normalize_sql_regex(query, False)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("select 'a=b  -- not a comment' from t",
+         "SELECT 'a=b  -- not a comment' FROM t"),
+        ("select 'It''s from /* here */' from t",
+         "SELECT 'It''s from /* here */' FROM t"),
+        ('select "Order", "from" from "select"',
+         'SELECT "Order", "from" FROM "select"'),
+        ("select `where` from `t  1`", "SELECT `where` FROM `t  1`"),
+        ("select $$ where a=b $$, $fn$ from x $fn$", "SELECT $$ where a=b $$, $fn$ from x $fn$"),
+        ("select 'unterminated where", "SELECT 'unterminated where"),
+    ],
+)
+def test_normalize_sql_basic_leaves_literals_untouched(query, expected):
+    assert _normalize_sql_basic(query, True) == expected
+
+
+def test_normalize_sql_basic_preserves_comments_verbatim():
+    query = "select 1 -- keep  this select\nfrom t /* and   this */"
+    assert _normalize_sql_basic(query, False) == (
+        "SELECT 1 -- keep this select FROM t /* and this */"
+    )
+    assert _normalize_sql_basic(query, True) == "SELECT 1 FROM t"
+
+
+# ---------------------------------------------------------------------------
+# Fingerprint hash algorithm
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def blake2b_fingerprints():
+    set_fingerprint_algorithm("blake2b-128")
+    yield
+    set_fingerprint_algorithm(DEFAULT_FINGERPRINT_ALGORITHM)
+
+
+def test_default_fingerprint_algorithm_is_sha256():
+    assert get_fingerprint_algorithm() == "sha256"
+    assert fingerprint({"a": 1}) == hashlib.sha256(b'{"a":1}').hexdigest()
+
+
+def test_blake2b_fingerprint_matches_hashlib(blake2b_fingerprints):
+    expected = hashlib.blake2b(b'{"a":1}', digest_size=16).hexdigest()
+    assert get_fingerprint_algorithm() == "blake2b-128"
+    assert fingerprint({"a": 1}) == expected
+    assert len(expected) == 32
+
+
+def test_blake2b_applies_to_streaming_and_single_pass_paths(blake2b_fingerprints):
+    expected = hashlib.blake2b(
+        canonicalize_json(_LARGE_ROWS).encode("utf-8"), digest_size=16,
+    ).hexdigest()
+    assert fingerprint(_LARGE_ROWS) == expected
+    encoded, fp = canonical_encode({"x": [1, 2.5, "y"]})
+    assert fp == fingerprint(encoded)
+    assert len(fp) == 32
+
+
+def test_switching_algorithm_invalidates_sql_cache(fresh_sql_cache):
+    q = "SELECT * FROM users WHERE id = 1"
+    sha_fp = fingerprint_sql(q)
+    set_fingerprint_algorithm("blake2b-128")
+    try:
+        assert fingerprint_sql(q) == fingerprint(normalize_sql(q))
+        assert fingerprint_sql(q) != sha_fp
+    finally:
+        set_fingerprint_algorithm(DEFAULT_FINGERPRINT_ALGORITHM)
+    assert fingerprint_sql(q) == sha_fp
+
+
+def test_canonical_fingerprint_under_other_algorithm():
+    import array
+    obj = {"x": [1, 2.5, "y"], "buf": array.array("d", [1.0, 2.0])}
+    sha_fp = canonical_encode(obj)[1]
+    assert canonical_fingerprint(obj, "sha256") == sha_fp
+    set_fingerprint_algorithm("blake2b-128")
+    try:
+        blake_fp = canonical_encode(obj)[1]
+        # Nested buffer digests use the requested algorithm too
+        assert canonical_fingerprint(obj, "sha256") == sha_fp
+    finally:
+        set_fingerprint_algorithm(DEFAULT_FINGERPRINT_ALGORITHM)
+    assert canonical_fingerprint(obj, "blake2b-128") == blake_fp
+    with pytest.raises(ValueError, match="md5"):
+        canonical_fingerprint(obj, "md5")
+
+
+def test_unknown_fingerprint_algorithm_rejected():
+    with pytest.raises(ValueError, match="md5"):
+        set_fingerprint_algorithm("md5")
+    assert get_fingerprint_algorithm() == "sha256"
+
+
+# ---------------------------------------------------------------------------
+# Arrays and buffers — fingerprinted from the raw buffer
+# ---------------------------------------------------------------------------
+
+def test_buffer_fingerprint_hashes_raw_bytes():
+    import array
+    buf = array.array("d", [1.0, 2.0])
+    expected = {"__buffer__": {
+        "digest": hashlib.sha256(buf.tobytes()).hexdigest(),
+        "format": "d",
+        "shape": [2],
+    }}
+    assert canonicalize_json(buf) == canonicalize_json(expected)
+
+    encoded, fp = canonical_encode({"x": buf})
+    assert fp == fingerprint({"x": expected})
+    # The fixture copy carries the data, not the digest
+    assert "data" in encoded["x"]["__buffer__"]
+    assert fp == fingerprint({"x": buf})
+
+
+def test_buffer_fingerprint_depends_on_layout():
+    import array
+    flat = memoryview(bytearray(range(6)))
+    assert fingerprint(flat) != fingerprint(flat.cast("B", [2, 3]))
+    assert fingerprint(flat) == fingerprint(bytearray(range(6)))
+
+
+def test_numpy_fingerprint_covers_dtype_shape_and_data():
+    np = pytest.importorskip("numpy")
+    arr = np.arange(6, dtype="<f8")
+    fp = canonical_encode(arr)[1]
+    assert fp == fingerprint(arr)
+    assert fp == canonical_encode(np.asfortranarray(arr))[1]
+    assert fp != fingerprint(arr.reshape(2, 3))
+    assert fp != fingerprint(arr.astype("<f4"))
+    assert fp != fingerprint(arr + 1)
@@ -20,11 +20,12 @@ import json
 import logging
 import pytest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from sim_sdk.context import SimContext, SimMode, set_context, clear_context
 from sim_sdk.capture import sim_capture, CaptureHandle, _capture_key
 from sim_sdk.errors import SimStubMissError
+from sim_sdk.serialization import make_serializable
 
 
 # ---------------------------------------------------------------------------
@@ -566,3 +567,17 @@ class TestSinkIntegration:
         assert event.qualname == "capture:via_sink"
         assert event.output == {"routed": True}
         assert event.ordinal == 0
+
+    def test_result_serialized_once_and_shared(self):
+        """The sink event and the parent's collected stub share one serialized result."""
+        mock_sink = MagicMock()
+        ctx = SimContext(mode=SimMode.RECORD, run_id="test", sink=mock_sink)
+        set_context(ctx)
+
+        with patch("sim_sdk.capture._make_serializable", wraps=make_serializable) as ser:
+            with sim_capture("shared") as cap:
+                cap.set_result({"rate": 0.2})
+
+        assert ser.call_count == 1
+        event = mock_sink.emit.call_args[0][0]
+        assert event.output is ctx.collected_stubs[-1]["result"]
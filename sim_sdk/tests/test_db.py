@@ -22,11 +22,12 @@ import json
 import pytest
 from contextlib import contextmanager
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from sim_sdk.context import SimContext, SimMode, set_context, clear_context
 from sim_sdk.db import sim_db, SimWriteBlockedError, DBProxy, _is_write_statement, _compute_query_fingerprint
 from sim_sdk.replay_context import ReplayContext
+from sim_sdk.serialization import make_serializable
 
 
 # ---------------------------------------------------------------------------
@@ -704,6 +705,24 @@ class TestSinkIntegration:
         assert event.output == [{"one": 1}]
         assert event.input["sql"] == "SELECT 1"
 
+    def test_result_serialized_once_and_shared(self, stub_dir):
+        """The sink event and the parent's collected stub share one serialized result."""
+        mock_sink = MagicMock()
+        ctx = SimContext(mode=SimMode.RECORD, run_id="test", sink=mock_sink)
+        set_context(ctx)
+
+        fake = FakeDB()
+        fake.set_result("SELECT 1", [{"one": 1}])
+
+        with patch("sim_sdk.db._make_serializable", wraps=make_serializable) as ser:
+            with sim_db(fake, name="pg") as sdb:
+                sdb.query("SELECT * FROM t WHERE id = %s", [1])
+
+        assert ser.call_count == 1
+        event = mock_sink.emit.call_args[0][0]
+        assert event.output is ctx.collected_stubs[-1]["result"]
+        assert event.input["params"] == [1]
+
 
 # ===========================================================================
 # Async context manager
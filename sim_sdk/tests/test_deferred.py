@@ -0,0 +1,363 @@
+"""
+Tests for deferred serialization (sim_sdk.deferred).
+
+Covers:
+1. A deferring sink receives DeferredEvents; nothing is serialized or
+   hashed on the request thread
+2. Resolved events match what eager recording produces (trace, db, http,
+   capture, nested stubs)
+3. Ordinals are assigned at resolution, per request, in call-entry order
+   for nested @sim_trace calls
+4. The copy_mutable shallow-copy guard
+5. first_unique sampling disables deferral
+6. SenderWorker resolves DeferredEvents before sending
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sim_sdk.capture import sim_capture
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.deferred import DeferredEvent, OrdinalSlot
+from sim_sdk.http import sim_http
+from sim_sdk.sampling import SamplingPolicy
+from sim_sdk.sink.envelope import BatchResponse
+from sim_sdk.sink.in_memory_buffer import InMemoryBuffer
+from sim_sdk.sink.sender_metrics import SenderMetrics
+from sim_sdk.sink.sender_worker import SenderWorker
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self, defer: bool = False, copy_mutable: bool = False):
+        self.defer_serialization = defer
+        self.copy_mutable = copy_mutable
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+    def resolved(self) -> list:
+        return [e.resolve() if isinstance(e, DeferredEvent) else e for e in self.events]
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return [{"id": params[0] if params else 0, "name": "alice"}]
+
+
+class FakeResponse:
+    status_code = 200
+    text = '{"ok": true}'
+    headers = {"content-type": "application/json"}
+
+
+class FakeHTTP:
+    def post(self, url, **kwargs):
+        return FakeResponse()
+
+
+@pytest.fixture(autouse=True)
+def clean_context():
+    clear_context()
+    yield
+    clear_context()
+
+
+def make_ctx(sink, **kwargs) -> SimContext:
+    ctx = SimContext(mode=SimMode.RECORD, run_id="test-run", sink=sink, **kwargs)
+    set_context(ctx)
+    return ctx
+
+
+@sim_trace(name="lookup")
+def lookup(user_id, tags):
+    with sim_db(FakeDB(), name="pg") as db:
+        rows = db.query("SELECT * FROM users WHERE id = %s", [user_id])
+    return {"rows": rows, "tags": tags}
+
+
+@sim_trace(name="checkout")
+def checkout(user_id, items):
+    user = lookup(user_id, ["vip"])
+    with sim_http(FakeHTTP(), name="pay") as http:
+        http.post("https://pay.example.com/charge", json={"amount": sum(items)})
+    with sim_capture("tax") as cap:
+        cap.set_result(0.2)
+    return {"user": user["rows"][0]["name"], "total": sum(items)}
+
+
+_VOLATILE = ("fixture_id", "recorded_at", "duration_ms")
+
+
+def comparable(event) -> dict:
+    data = event.to_dict()
+    for key in _VOLATILE:
+        data.pop(key)
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Request thread
+# ---------------------------------------------------------------------------
+
+class TestRequestThread:
+    def test_deferred_event_is_abstract(self):
+        with pytest.raises(TypeError):
+            DeferredEvent(0)
+
+    def test_emits_deferred_events(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        checkout(7, [10, 20])
+
+        assert sink.events
+        assert all(isinstance(e, DeferredEvent) for e in sink.events)
+
+    def test_no_serialization_or_hashing_before_resolve(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        with patch("sim_sdk.trace.canonical_encode") as encode, \
+                patch("sim_sdk.db._encode_query") as db_fp, \
+                patch("sim_sdk.http._encode_http_request") as http_fp, \
+                patch("sim_sdk.capture._make_serializable") as capture_ser:
+            assert checkout(7, [10, 20]) == {"user": "alice", "total": 30}
+        encode.assert_not_called()
+        db_fp.assert_not_called()
+        http_fp.assert_not_called()
+        capture_ser.assert_not_called()
+
+    def test_collected_stubs_hold_pending_events(self):
+        sink = CollectSink(defer=True)
+        ctx = make_ctx(sink)
+        with sim_db(FakeDB(), name="pg") as db:
+            db.query("SELECT 1")
+
+        assert len(ctx.collected_stubs) == 1
+        assert ctx.collected_stubs[0] is sink.events[0]
+
+
+# ---------------------------------------------------------------------------
+# Resolution matches eager recording
+# ---------------------------------------------------------------------------
+
+class TestResolution:
+    def test_matches_eager_recording(self):
+        eager = CollectSink()
+        make_ctx(eager)
+        checkout(7, [10, 20])
+
+        deferred = CollectSink(defer=True)
+        make_ctx(deferred)
+        checkout(7, [10, 20])
+
+        assert [comparable(e) for e in deferred.resolved()] == [
+            comparable(e) for e in eager.resolved()
+        ]
+
+    def test_outer_event_resolves_nested_stubs(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        checkout(7, [10, 20])
+
+        outer = sink.events[-1].resolve()
+        assert [s.get("type", "trace") for s in outer.stubs] == [
+            "trace", "http_request", "capture",
+        ]
+        assert outer.stubs[0]["output"]["rows"][0]["id"] == 7
+
+    def test_resolve_is_memoized(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        lookup(1, [])
+
+        event = sink.events[-1]
+        assert event.resolve() is event.resolve()
+
+    def test_recorded_at_is_call_time(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        with patch("sim_sdk.trace.time.time_ns", return_value=0):
+            lookup(1, [])
+
+        assert sink.events[-1].resolve().recorded_at == "1970-01-01T00:00:00+00:00"
+
+
+# ---------------------------------------------------------------------------
+# Ordinals
+# ---------------------------------------------------------------------------
+
+class TestOrdinals:
+    def test_assigned_in_emission_order(self):
+        sink = CollectSink(defer=True)
+        ctx = make_ctx(sink)
+        lookup(1, [])
+        lookup(1, [])
+
+        assert ctx.ordinal_counters == {}
+        ordinals = [(e.qualname, e.ordinal) for e in sink.resolved()]
+        assert ordinals == [("db:pg", 0), ("lookup", 0), ("db:pg", 1), ("lookup", 1)]
+
+    def test_new_request_gets_fresh_counters(self):
+        sink = CollectSink(defer=True)
+        ctx = make_ctx(sink)
+        lookup(1, [])
+        ctx.start_new_request()
+        lookup(1, [])
+
+        assert [e.ordinal for e in sink.resolved() if e.qualname == "lookup"] == [0, 0]
+
+    def test_nested_same_fingerprint_numbered_by_entry(self):
+        calls = []
+
+        @sim_trace(name="retry")
+        def retry(job):
+            calls.append(job)
+            if len(calls) < 3:
+                retry(job)
+            return job
+
+        def ordinals(defer: bool) -> list:
+            calls.clear()
+            sink = CollectSink(defer=defer)
+            make_ctx(sink)
+            retry("j1")
+            return [e.ordinal for e in sink.resolved()]
+
+        # Emitted innermost first, numbered outermost first
+        assert ordinals(defer=False) == [2, 1, 0]
+        assert ordinals(defer=True) == [2, 1, 0]
+
+    def test_db_and_http_numbered_by_call_not_resolve(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        with sim_db(FakeDB(), name="pg") as db:
+            db.query("SELECT 1", [1])
+            db.query("SELECT 1", [1])
+        with sim_http(FakeHTTP(), name="pay") as http:
+            http.post("https://pay.example.com/charge", json={"amount": 1})
+            http.post("https://pay.example.com/charge", json={"amount": 1})
+
+        # Resolve newest first, as a draining parent or a dropped batch would
+        ordinals = [e.resolve().ordinal for e in reversed(sink.events)]
+        assert ordinals == [1, 0, 1, 0]
+
+    def test_unresolved_event_keeps_later_ordinals(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        with sim_db(FakeDB(), name="pg") as db:
+            db.query("SELECT 1", [1])
+            db.query("SELECT 1", [1])
+
+        # The first event is never resolved (e.g. dropped by the buffer)
+        assert sink.events[1].resolve().ordinal == 1
+
+    def test_mixed_eager_and_deferred_share_counters(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        with sim_db(FakeDB(), name="pg") as db:
+            db.query("SELECT 1", [1])
+            sink.defer_serialization = False
+            db.query("SELECT 1", [1])
+            sink.defer_serialization = True
+            db.query("SELECT 1", [1])
+
+        assert [e.ordinal for e in sink.resolved()] == [0, 1, 2]
+
+    def test_failed_slot_takes_no_ordinal(self):
+        ctx = make_ctx(CollectSink(defer=True))
+
+        def fail():
+            raise TypeError("unencodable")
+
+        bad = OrdinalSlot(ctx, fail)
+        good = OrdinalSlot(ctx, lambda: ({"x": 1}, "fp"))
+        assert good.resolve() == ({"x": 1}, "fp", 0)
+        with pytest.raises(TypeError, match="unencodable"):
+            bad.resolve()
+        assert not ctx.deferred_slots
+
+
+# ---------------------------------------------------------------------------
+# Shallow-copy guard
+# ---------------------------------------------------------------------------
+
+class TestCopyMutable:
+    def test_mutation_after_call_leaks_without_guard(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        tags = ["a"]
+        lookup(1, tags)
+        tags.append("b")
+
+        assert sink.events[-1].resolve().input["tags"] == ["a", "b"]
+
+    def test_guard_copies_top_level_values(self):
+        sink = CollectSink(defer=True, copy_mutable=True)
+        make_ctx(sink)
+        tags = ["a"]
+        result = lookup(1, tags)
+        tags.append("b")
+        result["tags"] = "changed"
+
+        event = sink.events[-1].resolve()
+        assert event.input["tags"] == ["a"]
+        # The output dict was copied; values nested in it are still shared
+        assert event.output["tags"] == ["a", "b"]
+
+
+class TestNotDeferred:
+    def test_first_unique_sampling_disables_deferral(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink, sampling=SamplingPolicy(first_unique=10))
+        lookup(1, [])
+
+        assert not any(isinstance(e, DeferredEvent) for e in sink.events)
+
+    def test_mock_sink_is_not_deferring(self):
+        sink = MagicMock()
+        make_ctx(sink)
+        lookup(1, [])
+
+        emitted = [c.args[0] for c in sink.emit.call_args_list]
+        assert not any(isinstance(e, DeferredEvent) for e in emitted)
+
+
+# ---------------------------------------------------------------------------
+# SenderWorker resolves before sending
+# ---------------------------------------------------------------------------
+
+class TestSenderWorker:
+    def _worker(self):
+        client = MagicMock()
+        client.post_batch.return_value = BatchResponse(accepted=1)
+        metrics = SenderMetrics()
+        worker = SenderWorker(InMemoryBuffer(1_000_000), client, metrics, max_retries=0)
+        return worker, client, metrics
+
+    def test_envelopes_built_from_resolved_events(self):
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        lookup(1, [])
+        worker, client, _ = self._worker()
+
+        worker._send_chunk(list(sink.events))
+
+        envelopes = client.post_batch.call_args.args[0]
+        assert [e.trace for e in envelopes] == ["db:pg", "lookup"]
+        assert envelopes[1].payload["output"]["rows"][0]["id"] == 1
+
+    def test_failed_resolution_dropped(self):
+        class Broken(DeferredEvent):
+            __slots__ = ()
+
+            def _build(self):
+                raise ValueError("boom")
+
+        worker, client, metrics = self._worker()
+        worker._send_chunk([Broken(0)])
+
+        client.post_batch.assert_not_called()
+        assert metrics.snapshot()["dropped"] == 1
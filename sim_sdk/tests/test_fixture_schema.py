@@ -0,0 +1,132 @@
+"""
+Tests for the FixtureEvent data model and its wire envelope.
+
+Covers:
+1. Generated fixture ids are unique, monotonic within a process, and valid
+   agent FixtureIDs
+2. fixture_id / recorded_at are formatted lazily from the sequence number
+   and recorded_ns, and explicit values win
+3. to_dict() keeps the established keys and order
+4. fixture_to_envelope() maps the event onto the agent's wire format
+"""
+
+import re
+from datetime import datetime, timezone
+
+from sim_sdk.fixture.schema import FixtureEvent, format_timestamp_ns
+from sim_sdk.sink.envelope import SCHEMA_VERSION, fixture_to_envelope
+
+
+# The agent rejects FixtureIDs outside this charset (spool.validateID)
+AGENT_ID = re.compile(r"^[a-zA-Z0-9_-]{1,128}$")
+
+
+class TestFixtureId:
+    def test_unique_and_monotonic(self):
+        ids = [FixtureEvent().fixture_id for _ in range(100)]
+        assert len(set(ids)) == 100
+        prefixes = {i.split("-")[0] for i in ids}
+        assert len(prefixes) == 1
+        seqs = [int(i.split("-")[1], 16) for i in ids]
+        assert seqs == sorted(seqs)
+
+    def test_valid_agent_id(self):
+        assert AGENT_ID.match(FixtureEvent().fixture_id)
+
+    def test_formatted_once(self):
+        event = FixtureEvent()
+        assert event.fixture_id is event.fixture_id
+
+    def test_explicit_id(self):
+        event = FixtureEvent(fixture_id="abc")
+        assert event.fixture_id == "abc"
+        event.fixture_id = "def"
+        assert event.fixture_id == "def"
+
+
+class TestRecordedAt:
+    def test_formatted_from_recorded_ns(self):
+        event = FixtureEvent(recorded_ns=1_700_000_000_123_456_789)
+        assert event.recorded_at == "2023-11-14T22:13:20.123456+00:00"
+
+    def test_matches_datetime_isoformat(self):
+        ns = 1_773_016_821_245_972_000
+        expected = datetime.fromtimestamp(ns / 1e9, timezone.utc).isoformat()
+        assert format_timestamp_ns(ns) == expected
+        assert format_timestamp_ns(0) == "1970-01-01T00:00:00+00:00"
+
+    def test_defaults_to_now(self):
+        before = datetime.now(timezone.utc)
+        recorded = datetime.fromisoformat(FixtureEvent().recorded_at)
+        assert abs((recorded - before).total_seconds()) < 5
+
+    def test_explicit_recorded_at(self):
+        event = FixtureEvent(recorded_at="2026-03-09T00:40:21+00:00")
+        assert event.recorded_ns is None
+        assert event.recorded_at == "2026-03-09T00:40:21+00:00"
+
+
+class TestToDict:
+    def test_keys_and_values(self):
+        event = FixtureEvent(
+            fixture_id="f1", qualname="q", run_id="r", recorded_ns=0,
+            input={"x": 1}, input_fingerprint="in", output=2, output_fingerprint="out",
+            duration_ms=1.5, ordinal=3, event_type="Output",
+            fingerprint_algorithm="sha256",
+        )
+        assert event.to_dict() == {
+            "fixture_id": "f1",
+            "qualname": "q",
+            "run_id": "r",
+            "recorded_at": "1970-01-01T00:00:00+00:00",
+            "input": {"x": 1},
+            "input_fingerprint": "in",
+            "output": 2,
+            "output_fingerprint": "out",
+            "stubs": [],
+            "duration_ms": 1.5,
+            "error": None,
+            "ordinal": 3,
+            "storage_key": None,
+            "event_type": "Output",
+            "fingerprint_algorithm": "sha256",
+        }
+
+    def test_defaults_not_shared(self):
+        a, b = FixtureEvent(), FixtureEvent()
+        a.input["x"] = 1
+        a.stubs.append({})
+        assert b.input == {} and b.stubs == []
+
+    def test_slotted(self):
+        assert not hasattr(FixtureEvent(), "__dict__")
+
+    def test_equality(self):
+        assert FixtureEvent(fixture_id="a", recorded_ns=0) == FixtureEvent(
+            fixture_id="a", recorded_ns=0,
+        )
+        assert FixtureEvent(fixture_id="a", recorded_ns=0) != FixtureEvent(
+            fixture_id="b", recorded_ns=0,
+        )
+
+
+class TestEnvelope:
+    def test_wire(self):
+        event = FixtureEvent(qualname="pricing.quote", run_id="run-1", event_type="Output")
+        wire = fixture_to_envelope(event, service="svc", timestamp_ms=42).to_wire()
+
+        assert wire == {
+            "SchemaVersion": SCHEMA_VERSION,
+            "FixtureID": event.fixture_id,
+            "SessionID": "run-1",
+            "EventType": "Output",
+            "TimestampMs": 42,
+            "Payload": event.to_dict(),
+            "Service": "svc",
+            "Trace": "pricing.quote",
+        }
+
+    def test_timestamp_defaults_to_now(self):
+        envelope = fixture_to_envelope(FixtureEvent())
+        now_ms = datetime.now(timezone.utc).timestamp() * 1000
+        assert abs(envelope.timestamp_ms - now_ms) < 5000
@@ -26,8 +26,9 @@ import inspect
 import json
 import pytest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+from sim_sdk.canonical import canonical_encode
 from sim_sdk.context import SimContext, SimMode, set_context, clear_context
 from sim_sdk.http import (
     sim_http,
@@ -931,6 +932,25 @@ class TestSinkIntegration:
         assert event.input["method"] == "POST"
         assert event.input["url"] == "https://api.stripe.com/v1/charges"
 
+    def test_body_encoded_once_and_response_shared(self):
+        """The request body is walked once; the event and the parent stub share the response."""
+        mock_sink = MagicMock()
+        ctx = SimContext(mode=SimMode.RECORD, run_id="test", sink=mock_sink)
+        set_context(ctx)
+
+        client = FakeHTTPClient()
+        client.set_response("POST", "https://api.stripe.com/v1/charges",
+                            FakeClientResponse(200, '{"id": "ch_1234"}'))
+
+        with patch("sim_sdk.http.canonical_encode", wraps=canonical_encode) as encode:
+            with sim_http(client, name="stripe") as s:
+                s.post("https://api.stripe.com/v1/charges", json={"amount": 100})
+
+        encode.assert_called_once_with({"amount": 100})
+        event = mock_sink.emit.call_args[0][0]
+        assert event.input["body"] == {"amount": 100}
+        assert event.output is ctx.collected_stubs[-1]["response"]
+
 
 # ===========================================================================
 # 14. Async Context Manager
@@ -0,0 +1,231 @@
+"""
+Tests for the sink's InMemoryBuffer and its memory accounting.
+
+Covers:
+1. estimate_event_size() grows with the payload, extrapolates sampled
+   containers, and stays bounded for huge payloads
+2. The buffer keeps a running byte total through append, drop and drain
+3. Drop policies evict until an event fits; oversized events are dropped
+4. Drops leave the buffer consistent over long runs (order, count,
+   bytes, compaction), and drain() hands back the list without copying
+5. AgentSink reports overflow drops and the byte level in SenderMetrics
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from sim_sdk.context import SimContext
+from sim_sdk.deferred import DeferredEvent, OrdinalSlot
+from sim_sdk.fixture.schema import FixtureEvent
+from sim_sdk.sink.agent_sink import AgentSink
+from sim_sdk.sink.in_memory_buffer import DropPolicy, InMemoryBuffer, estimate_event_size
+from sim_sdk.sink.sharded_buffer import STAGE_EVENTS
+
+
+def rows(n: int) -> list:
+    return [{"id": i, "name": f"user-{i}", "note": "x" * 100} for i in range(n)]
+
+
+def event(n: int = 10, qualname: str = "q") -> FixtureEvent:
+    return FixtureEvent(qualname=qualname, input={"n": n}, output=rows(n))
+
+
+class _Deferred(DeferredEvent):
+    __slots__ = ("_slot", "_result")
+
+    def __init__(self, result, ctx):
+        super().__init__(0)
+        self._slot = OrdinalSlot(ctx, lambda: (None, "key"))
+        self._result = result
+
+    def _build(self):
+        raise AssertionError("not resolved")
+
+
+# ---------------------------------------------------------------------------
+# estimate_event_size
+# ---------------------------------------------------------------------------
+
+class TestEstimate:
+    def test_grows_with_payload(self):
+        small, large = estimate_event_size(event(1)), estimate_event_size(event(100))
+        assert large > small * 20
+
+    def test_counts_payload_bytes(self):
+        # 100 rows each holding a 100-char string cannot take less than 10 KB
+        assert estimate_event_size(event(100)) > 100 * 100
+
+    def test_extrapolates_long_containers(self):
+        one = estimate_event_size(event(1000))
+        ten = estimate_event_size(event(10_000))
+        assert 8 < ten / one < 12
+
+    def test_bounded_cost(self):
+        huge = FixtureEvent(output=[rows(50) for _ in range(2000)])
+        start = time.perf_counter()
+        estimate_event_size(huge)
+        assert time.perf_counter() - start < 0.05
+
+    def test_deferred_event_raw_payload(self):
+        ctx = SimContext()
+        ctx.ordinal_counters = {f"fp{i}": i for i in range(10_000)}
+        small = estimate_event_size(_Deferred([], ctx))
+        large = estimate_event_size(_Deferred(rows(100), ctx))
+        # The request-wide ordinal counters are not charged to each event
+        assert small < 1000
+        assert large > small + 100 * 100
+
+
+# ---------------------------------------------------------------------------
+# InMemoryBuffer
+# ---------------------------------------------------------------------------
+
+class TestAccounting:
+    def test_running_total(self):
+        buf = InMemoryBuffer(10**9)
+        empty = buf.memory_usage()
+        events = [event(i) for i in range(1, 6)]
+        for e in events:
+            assert buf.append(e) == 0
+        assert buf.memory_usage() >= empty + sum(estimate_event_size(e) for e in events)
+
+        assert buf.drain() == events
+        assert buf.memory_usage() == empty
+        assert len(buf) == 0
+
+    def test_budget_is_real_bytes(self):
+        size = estimate_event_size(event(50))
+        buf = InMemoryBuffer(max_buffer_bytes=size * 3 + size // 2)
+        dropped = sum(buf.append(event(50)) for _ in range(10))
+        assert len(buf) == 3
+        assert dropped == 7
+        assert buf.memory_usage() <= buf.max_buffer_bytes + 1000
+
+
+class TestDropPolicies:
+    def fill(self, policy: DropPolicy) -> InMemoryBuffer:
+        size = estimate_event_size(event(20, "a"))
+        buf = InMemoryBuffer(max_buffer_bytes=size * 3, drop_policy=policy)
+        for name in "abc":
+            buf.append(event(20, name))
+        return buf
+
+    def test_drop_oldest(self):
+        buf = self.fill(DropPolicy.DROP_OLDEST)
+        assert buf.append(event(20, "d")) == 1
+        assert [e.qualname for e in buf.drain()] == ["b", "c", "d"]
+
+    def test_drop_newest(self):
+        buf = self.fill(DropPolicy.DROP_NEWEST)
+        assert buf.append(event(20, "d")) == 1
+        assert [e.qualname for e in buf.drain()] == ["a", "b", "d"]
+
+    def test_drop_random(self):
+        buf = self.fill(DropPolicy.DROP_RANDOM)
+        assert buf.append(event(20, "d")) == 1
+        names = [e.qualname for e in buf.drain()]
+        assert len(names) == 3 and names[-1] == "d"
+
+    def test_drop_none_keeps_everything(self):
+        buf = self.fill(DropPolicy.DROP_NONE)
+        assert buf.append(event(20, "d")) == 0
+        assert len(buf) == 4
+
+    def test_large_event_evicts_several(self):
+        buf = self.fill(DropPolicy.DROP_OLDEST)
+        assert buf.append(event(30, "big")) == 2
+        assert [e.qualname for e in buf.drain()] == ["c", "big"]
+
+    def test_oversized_event_dropped(self):
+        buf = self.fill(DropPolicy.DROP_OLDEST)
+        assert buf.append(event(500, "huge")) == 1
+        assert [e.qualname for e in buf.drain()] == ["a", "b", "c"]
+
+
+class TestLongRuns:
+    def run(self, policy: DropPolicy, n: int = 2000):
+        size = estimate_event_size(event(5, "e0000"))
+        buf = InMemoryBuffer(max_buffer_bytes=size * 50, drop_policy=policy)
+        dropped = 0
+        for i in range(n):
+            dropped += buf.append(event(5, f"e{i:04d}"))
+        return buf, dropped
+
+    @pytest.mark.parametrize("policy", [
+        DropPolicy.DROP_OLDEST, DropPolicy.DROP_NEWEST, DropPolicy.DROP_RANDOM,
+    ])
+    def test_consistent(self, policy):
+        random.seed(7)
+        buf, dropped = self.run(policy)
+        assert len(buf) + dropped == 2000
+        assert buf.memory_usage() <= buf.max_buffer_bytes + 4096
+        # Slots never pile up beyond the compaction bound
+        assert len(buf._events) <= 2 * len(buf) + 64
+
+        names = [e.qualname for e in buf.drain()]
+        assert names == sorted(names)
+        assert len(names) + dropped == 2000
+        assert len(buf) == 0 and buf._bytes == 0
+
+    def test_drop_oldest_keeps_latest(self):
+        buf, _ = self.run(DropPolicy.DROP_OLDEST)
+        names = [e.qualname for e in buf.buffer]
+        assert names[-1] == "e1999"
+        assert names == [f"e{i:04d}" for i in range(2000 - len(names), 2000)]
+
+    def test_drain_without_drops_returns_list(self):
+        buf = InMemoryBuffer(10**9)
+        for i in range(10):
+            buf.append(event(1, str(i)))
+        events = buf._events
+        assert buf.drain() is events
+
+    def test_concurrent_producers(self):
+        buf = InMemoryBuffer(
+            estimate_event_size(event(2)) * 100, DropPolicy.DROP_RANDOM,
+        )
+        drained, dropped = [], []
+
+        def produce():
+            dropped.append(sum(buf.append(event(2)) for _ in range(500)))
+
+        threads = [threading.Thread(target=produce) for _ in range(8)]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            drained.extend(buf.drain())
+        for t in threads:
+            t.join()
+        drained.extend(buf.drain())
+        assert len(drained) + sum(dropped) == 8 * 500
+
+
+# ---------------------------------------------------------------------------
+# AgentSink metrics
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def sink():
+    s = AgentSink("http://127.0.0.1:1", max_buffer_bytes=10**9,
+                  max_batch_events=10**6, flush_interval_s=60)
+    yield s
+    s._buffer.drain()
+    s.close()
+
+
+class TestSinkMetrics:
+    def test_buffer_bytes_reported(self, sink):
+        before = sink.metrics.snapshot()["buffer_bytes"]
+        sink.emit(event(100))
+        assert sink.metrics.snapshot()["buffer_bytes"] > before + 100 * 100
+
+    def test_overflow_drops_counted(self, sink):
+        sink._buffer.max_buffer_bytes = estimate_event_size(event(10)) * 2
+        for _ in range(STAGE_EVENTS):
+            sink.emit(event(10))
+        snap = sink.metrics.snapshot()
+        assert snap["buffered"] == STAGE_EVENTS
+        assert snap["dropped"] == STAGE_EVENTS - 2
@@ -0,0 +1,188 @@
+"""
+Tests for the process-level off mode (set_process_mode + trampolines).
+
+Covers:
+1. @sim_trace decorated while the process is off returns a plain function
+   running the original code, without a context lookup
+2. The trampoline is patched in place when the process mode switches on
+   (set_context, init_sim, set_process_mode) and restored when it goes off
+3. Closures fall back to the wrapper, which also skips the context lookup
+4. sim_db / sim_http / sim_capture skip the context lookup
+"""
+
+import asyncio
+import inspect
+from unittest.mock import patch
+
+import pytest
+
+from sim_sdk.capture import sim_capture
+from sim_sdk.context import (
+    SimContext,
+    SimMode,
+    clear_context,
+    get_process_mode,
+    init_sim,
+    set_context,
+    set_process_mode,
+)
+from sim_sdk.db import sim_db
+from sim_sdk.http import sim_http
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self):
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+
+def quote(user_id, items=(), *, currency="USD"):
+    return (user_id, tuple(items), currency)
+
+
+async def aquote(user_id):
+    return user_id * 2
+
+
+@pytest.fixture(autouse=True)
+def process_off():
+    previous = get_process_mode()
+    set_process_mode(SimMode.OFF)
+    clear_context()
+    yield
+    set_process_mode(previous)
+    clear_context()
+
+
+def record_ctx() -> SimContext:
+    return SimContext(mode=SimMode.RECORD, run_id="test-run", sink=CollectSink())
+
+
+# ---------------------------------------------------------------------------
+# Trampolines
+# ---------------------------------------------------------------------------
+
+class TestTrampoline:
+    def test_runs_original_code_without_context_lookup(self):
+        traced = sim_trace(quote)
+
+        assert traced.__code__ is quote.__code__
+        assert traced.__wrapped__ is quote
+        assert traced.__name__ == "quote"
+        assert inspect.signature(traced) == inspect.signature(quote)
+        with patch("sim_sdk.trace.get_context") as get_ctx:
+            assert traced(1, [2], currency="EUR") == (1, (2,), "EUR")
+        get_ctx.assert_not_called()
+
+    def test_set_context_switches_on(self):
+        traced = sim_trace(quote)
+        ctx = record_ctx()
+        set_context(ctx)
+
+        assert traced.__code__ is not quote.__code__
+        assert traced(1) == (1, (), "USD")
+        assert [e.qualname for e in ctx.sink.events] == ["quote"]
+        assert ctx.sink.events[0].input == {"user_id": 1, "items": [], "currency": "USD"}
+
+    def test_switching_back_off_restores_code(self):
+        traced = sim_trace(quote)
+        set_context(record_ctx())
+        set_process_mode(SimMode.OFF)
+
+        assert traced.__code__ is quote.__code__
+        assert traced(3, currency="GBP") == (3, (), "GBP")
+
+    def test_init_sim_switches_mode(self):
+        traced = sim_trace(quote)
+        ctx = init_sim(mode=SimMode.RECORD, sink=CollectSink())
+        traced(1)
+        assert len(ctx.sink.events) == 1
+
+        init_sim(mode=SimMode.OFF)
+        assert get_process_mode() is SimMode.OFF
+        assert traced.__code__ is quote.__code__
+
+    def test_off_context_keeps_process_off(self):
+        traced = sim_trace(quote)
+        set_context(SimContext(mode=SimMode.OFF))
+
+        assert get_process_mode() is SimMode.OFF
+        assert traced.__code__ is quote.__code__
+
+    def test_async(self):
+        traced = sim_trace(aquote)
+        assert inspect.iscoroutinefunction(traced)
+        assert asyncio.run(traced(2)) == 4
+
+        ctx = record_ctx()
+        set_context(ctx)
+        assert asyncio.run(traced(3)) == 6
+        assert ctx.sink.events[0].output == 6
+
+    def test_method(self):
+        class Pricing:
+            @sim_trace
+            def total(self, x):
+                return x + 1
+
+        assert Pricing().total(1) == 2
+        set_context(record_ctx())
+        assert Pricing().total(2) == 3
+
+    def test_decorated_while_on_returns_wrapper(self):
+        set_process_mode(SimMode.RECORD)
+        traced = sim_trace(quote)
+        assert traced.__code__ is not quote.__code__
+
+        set_context(SimContext(mode=SimMode.OFF))
+        assert traced(1) == (1, (), "USD")
+
+
+class TestClosureFallback:
+    def test_wrapper_skips_context_lookup(self):
+        scale = 3
+
+        @sim_trace
+        def scaled(x):
+            return x * scale
+
+        assert scaled.__code__ is not scaled.__wrapped__.__code__
+        with patch("sim_sdk.trace.get_context") as get_ctx:
+            assert scaled(2) == 6
+        get_ctx.assert_not_called()
+
+        ctx = record_ctx()
+        set_context(ctx)
+        assert scaled(2) == 6
+        assert len(ctx.sink.events) == 1
+
+
+# ---------------------------------------------------------------------------
+# Proxies
+# ---------------------------------------------------------------------------
+
+class TestProxies:
+    def test_sim_db_returns_raw_object(self):
+        db = object()
+        with patch("sim_sdk.db.get_context") as get_ctx:
+            with sim_db(db) as conn:
+                assert conn is db
+        get_ctx.assert_not_called()
+
+    def test_sim_http_returns_raw_object(self):
+        session = object()
+        with patch("sim_sdk.http.get_context") as get_ctx:
+            with sim_http(session) as http:
+                assert http is session
+        get_ctx.assert_not_called()
+
+    def test_sim_capture_inert_handle(self):
+        with patch("sim_sdk.capture.get_context") as get_ctx:
+            with sim_capture("tax") as cap:
+                assert not cap.replaying
+                cap.set_result(0.2)
+                assert cap.result == 0.2
+        get_ctx.assert_not_called()
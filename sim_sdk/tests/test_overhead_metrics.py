@@ -0,0 +1,246 @@
+"""
+Tests for self-measured SDK overhead (sim_sdk.sink.overhead_metrics).
+
+Covers:
+1. Log-bucket boundaries and quantile estimates
+2. Snapshot layout and reset / enabled switch; per-thread histograms are
+   recorded without the lock and merged on snapshot
+3. @sim_trace, sim_db and sim_http report their phases per qualname
+4. Deferred events report "resolve" from the sender worker
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.http import sim_http
+from sim_sdk.sink.envelope import BatchResponse
+from sim_sdk.sink.in_memory_buffer import InMemoryBuffer
+from sim_sdk.sink.overhead_metrics import (
+    OverheadMetrics,
+    _bucket_index,
+    _bucket_lower,
+    _bucket_upper,
+    get_overhead_metrics,
+)
+from sim_sdk.sink.sender_metrics import SenderMetrics
+from sim_sdk.sink.sender_worker import SenderWorker
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self, defer: bool = False):
+        self.defer_serialization = defer
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return [{"id": 1}]
+
+
+class FakeResponse:
+    status_code = 200
+    text = "ok"
+    headers = {}
+
+
+class FakeHTTP:
+    def get(self, url, **kwargs):
+        return FakeResponse()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    clear_context()
+    get_overhead_metrics().reset()
+    yield
+    clear_context()
+    get_overhead_metrics().reset()
+
+
+def make_ctx(sink) -> SimContext:
+    ctx = SimContext(mode=SimMode.RECORD, run_id="test-run", sink=sink)
+    set_context(ctx)
+    return ctx
+
+
+# ---------------------------------------------------------------------------
+# Histogram
+# ---------------------------------------------------------------------------
+
+class TestBuckets:
+    @pytest.mark.parametrize("ns", [0, 1, 3, 4, 7, 8, 15, 16, 999, 1_000_000, 2**40 + 5])
+    def test_value_within_its_bucket(self, ns):
+        index = _bucket_index(ns)
+        assert _bucket_lower(index) <= ns < _bucket_upper(index)
+
+    def test_bucket_width_at_most_quarter_octave(self):
+        for index in range(4, 120):
+            lower, upper = _bucket_lower(index), _bucket_upper(index)
+            assert upper > lower
+            assert (upper - lower) / lower <= 0.25
+
+    def test_quantiles(self):
+        metrics = OverheadMetrics()
+        for _ in range(99):
+            metrics.record("q", "total", 1_000)
+        metrics.record("q", "total", 1_000_000)
+
+        summary = metrics.snapshot()["q"]["total"]
+        assert summary["count"] == 100
+        assert summary["max_ns"] == 1_000_000
+        assert 1_000 <= summary["p50_ns"] <= 1_250
+        assert 1_000 <= summary["p99_ns"] <= 1_250
+        assert summary["mean_ns"] == (99 * 1_000 + 1_000_000) // 100
+        assert sum(count for _, count in summary["buckets"]) == 100
+
+
+class TestMetrics:
+    def test_snapshot_groups_by_qualname_and_phase(self):
+        metrics = OverheadMetrics()
+        metrics.record("a", "bind", 10)
+        metrics.record("a", "total", 20)
+        metrics.record("db:pg", "intercept", 30)
+
+        snap = metrics.snapshot()
+        assert set(snap) == {"a", "db:pg"}
+        assert set(snap["a"]) == {"bind", "total"}
+
+    def test_disabled_records_nothing(self):
+        metrics = OverheadMetrics()
+        metrics.enabled = False
+        metrics.record("a", "bind", 10)
+        assert metrics.snapshot() == {}
+
+    def test_reset(self):
+        metrics = OverheadMetrics()
+        metrics.record("a", "bind", 10)
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_threads_merged_on_snapshot(self):
+        metrics = OverheadMetrics()
+        metrics.record("a", "bind", 5)
+        start = threading.Barrier(4)
+        hold = threading.Event()
+
+        def work(ns):
+            start.wait()
+            for _ in range(1000):
+                metrics.record("a", "bind", ns)
+            if ns == 100:
+                hold.wait()
+
+        threads = [
+            threading.Thread(target=work, args=(ns,)) for ns in (10, 100, 1000, 10000)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads[:1] + threads[2:]:
+            t.join()
+
+        summary = metrics.snapshot()["a"]["bind"]
+        assert summary["count"] == 4001
+        assert summary["max_ns"] == 10000
+        assert summary["total_ns"] == 5 + 1000 * (10 + 100 + 1000 + 10000)
+        # Finished threads are folded into the shared histograms
+        assert len(metrics._cells) == 2
+
+        hold.set()
+        threads[1].join()
+        assert metrics.snapshot()["a"]["bind"]["count"] == 4001
+
+    def test_record_takes_no_lock(self):
+        metrics = OverheadMetrics()
+        metrics.record("a", "bind", 10)
+        metrics._lock = MagicMock()
+        metrics.record("a", "bind", 20)
+        metrics.record("a", "total", 30)
+        metrics._lock.__enter__.assert_not_called()
+
+    def test_reset_clears_live_threads(self):
+        metrics = OverheadMetrics()
+        recorded = threading.Event()
+        done = threading.Event()
+
+        def work():
+            metrics.record("a", "bind", 10)
+            recorded.set()
+            done.wait()
+            metrics.record("a", "bind", 20)
+
+        t = threading.Thread(target=work)
+        t.start()
+        recorded.wait()
+        metrics.reset()
+        assert metrics.snapshot() == {}
+        done.set()
+        t.join()
+        assert metrics.snapshot()["a"]["bind"]["count"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Record paths report their phases
+# ---------------------------------------------------------------------------
+
+class TestRecordPaths:
+    def test_trace_phases(self):
+        @sim_trace(name="quote")
+        def quote(x):
+            return x
+
+        make_ctx(CollectSink())
+        quote(1)
+        quote(2)
+
+        phases = get_overhead_metrics().snapshot()["quote"]
+        assert set(phases) == {"bind", "fingerprint", "serialize", "enqueue", "total"}
+        assert all(p["count"] == 2 for p in phases.values())
+
+    def test_total_excludes_function_body(self):
+        import time
+
+        @sim_trace(name="slow")
+        def slow():
+            time.sleep(0.02)
+
+        make_ctx(CollectSink())
+        slow()
+
+        total = get_overhead_metrics().snapshot()["slow"]["total"]
+        assert total["max_ns"] < 20_000_000
+
+    def test_proxy_phases(self):
+        make_ctx(CollectSink())
+        with sim_db(FakeDB(), name="pg") as db:
+            db.query("SELECT 1")
+        with sim_http(FakeHTTP(), name="api") as http:
+            http.get("https://example.com/x")
+
+        snap = get_overhead_metrics().snapshot()
+        assert set(snap["db:pg"]) == {"fingerprint", "serialize", "enqueue", "intercept"}
+        assert set(snap["http:api"]) == {"fingerprint", "serialize", "enqueue", "intercept"}
+
+    def test_deferred_phases(self):
+        @sim_trace(name="quote")
+        def quote(x):
+            return x
+
+        sink = CollectSink(defer=True)
+        make_ctx(sink)
+        quote(1)
+        assert set(get_overhead_metrics().snapshot()["quote"]) == {"bind", "enqueue", "total"}
+
+        client = MagicMock()
+        client.post_batch.return_value = BatchResponse(accepted=1)
+        worker = SenderWorker(InMemoryBuffer(1_000_000), client, SenderMetrics())
+        worker._send_chunk(sink.events)
+
+        assert get_overhead_metrics().snapshot()["quote"]["resolve"]["count"] == 1
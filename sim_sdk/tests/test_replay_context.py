@@ -24,6 +24,7 @@ from sim_sdk.replay_context import (
     clear_replay_context,
 )
 from sim_sdk.errors import SimStubMissError
+from sim_sdk.stub_store import StubStoreCache
 
 FIXTURE_DIR = str(Path(__file__).parent / "fixtures")
 FIXTURE_ID = "calculate_quote"
@@ -190,6 +191,19 @@ class TestOrdinalResetBetweenRequests:
         assert ctx2.next_http_ordinal("tax_service") == 0
 
 
+    def test_contexts_share_cached_store_but_not_ordinals(self, tmp_path):
+        fixture_id, fixture_dir = _write_fixture(tmp_path, "minimal", _MINIMAL_FIXTURE)
+        cache = StubStoreCache()
+
+        ctx1 = ReplayContext(fixture_id=fixture_id, fixture_dir=fixture_dir, cache=cache)
+        ctx1.next_db_ordinal("aabb:1122")
+        ctx2 = ReplayContext(fixture_id=fixture_id, fixture_dir=fixture_dir, cache=cache)
+
+        assert ctx2.stub_store is ctx1.stub_store
+        assert ctx2.next_db_ordinal("aabb:1122") == 0
+        assert cache.snapshot()["hits"] == 1
+
+
 # ---------------------------------------------------------------------------
 # ContextVar — get / set / clear
 # ---------------------------------------------------------------------------
@@ -0,0 +1,316 @@
+"""
+Tests for record-mode sampling (SamplingPolicy + @sim_trace).
+
+Covers:
+1. Global and per-qualname rates
+2. Token-bucket caps per second (with an injected clock)
+3. First-N-unique-fingerprints mode
+4. Unsampled calls skip argument binding / fingerprinting
+5. Nested sim_trace / sim_db / sim_capture inherit the root decision
+6. Replay is never sampled
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from sim_sdk.capture import sim_capture
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.sampling import SamplingPolicy
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self):
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+
+class FakeDB:
+    def __init__(self):
+        self.calls = 0
+
+    def query(self, sql, params=None):
+        self.calls += 1
+        return [{"id": 1}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clean_context():
+    clear_context()
+    yield
+    clear_context()
+
+
+def make_record_ctx(policy: SamplingPolicy, tmp_path=None):
+    sink = CollectSink()
+    ctx = SimContext(
+        mode=SimMode.RECORD, run_id="test-run", sink=sink,
+        stub_dir=tmp_path, sampling=policy,
+    )
+    set_context(ctx)
+    return ctx, sink
+
+
+# ---------------------------------------------------------------------------
+# Policy validation
+# ---------------------------------------------------------------------------
+
+class TestPolicyValidation:
+    @pytest.mark.parametrize("kwargs", [
+        {"rate": 1.5},
+        {"rate": -0.1},
+        {"rates": {"f": 2.0}},
+        {"max_per_second": 0},
+        {"caps": {"f": -1}},
+        {"first_unique": -1},
+    ])
+    def test_invalid_settings_rejected(self, kwargs):
+        with pytest.raises(ValueError):
+            SamplingPolicy(**kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Rates
+# ---------------------------------------------------------------------------
+
+class TestRates:
+    def test_rate_zero_records_nothing(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        _, sink = make_record_ctx(SamplingPolicy(rate=0.0))
+        assert [f(i) for i in range(5)] == [0, 1, 2, 3, 4]
+        assert sink.events == []
+
+    def test_default_policy_records_everything(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        policy = SamplingPolicy()
+        _, sink = make_record_ctx(policy)
+        for i in range(5):
+            f(i)
+
+        assert len(sink.events) == 5
+        assert policy.stats() == {"sampled": 5, "dropped": 0}
+
+    def test_partial_rate_uses_random_draw(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        policy = SamplingPolicy(rate=0.5)
+        policy._random = iter([0.1, 0.9, 0.4, 0.7]).__next__
+        _, sink = make_record_ctx(policy)
+        for i in range(4):
+            f(i)
+
+        assert [e.input["x"] for e in sink.events] == [0, 2]
+
+    def test_per_qualname_rate_overrides_global(self):
+        @sim_trace(name="hot")
+        def hot(x):
+            return x
+
+        @sim_trace(name="rare")
+        def rare(x):
+            return x
+
+        _, sink = make_record_ctx(SamplingPolicy(rate=1.0, rates={"hot": 0.0}))
+        hot(1)
+        rare(2)
+
+        assert [e.qualname for e in sink.events] == ["rare"]
+
+
+# ---------------------------------------------------------------------------
+# Token-bucket caps
+# ---------------------------------------------------------------------------
+
+class TestCaps:
+    def test_cap_limits_calls_per_second(self):
+        @sim_trace(name="q")
+        def q(x):
+            return x
+
+        clock = FakeClock()
+        _, sink = make_record_ctx(SamplingPolicy(max_per_second=2, clock=clock))
+        for i in range(5):
+            q(i)
+        assert len(sink.events) == 2
+
+        clock.now += 0.5  # one token refilled
+        q(10)
+        q(11)
+        assert [e.input["x"] for e in sink.events] == [0, 1, 10]
+
+    def test_caps_are_per_qualname(self):
+        @sim_trace(name="a")
+        def a():
+            return 1
+
+        @sim_trace(name="b")
+        def b():
+            return 2
+
+        policy = SamplingPolicy(max_per_second=1, caps={"b": 3}, clock=FakeClock())
+        _, sink = make_record_ctx(policy)
+        for _ in range(4):
+            a()
+            b()
+
+        names = [e.qualname for e in sink.events]
+        assert names.count("a") == 1
+        assert names.count("b") == 3
+
+
+# ---------------------------------------------------------------------------
+# First N unique input fingerprints
+# ---------------------------------------------------------------------------
+
+class TestFirstUnique:
+    def test_repeats_and_overflow_dropped(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        policy = SamplingPolicy(first_unique=2)
+        _, sink = make_record_ctx(policy)
+        for x in [1, 1, 2, 1, 3, 2]:
+            f(x)
+
+        assert [e.input["x"] for e in sink.events] == [1, 2]
+        assert policy.stats() == {"sampled": 2, "dropped": 4}
+
+    def test_full_qualname_skips_fingerprinting(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        _, sink = make_record_ctx(SamplingPolicy(first_unique=1))
+        f(1)
+
+        with patch("sim_sdk.trace._prepare_input") as prepare:
+            assert f(2) == 2
+        prepare.assert_not_called()
+
+    def test_reset_forgets_seen(self):
+        @sim_trace
+        def f(x):
+            return x
+
+        policy = SamplingPolicy(first_unique=1)
+        _, sink = make_record_ctx(policy)
+        f(1)
+        policy.reset()
+        f(1)
+
+        assert len(sink.events) == 2
+
+
+# ---------------------------------------------------------------------------
+# Unsampled calls: cheap, and inherited by nested primitives
+# ---------------------------------------------------------------------------
+
+class TestInheritance:
+    def test_unsampled_call_skips_input_work(self):
+        @sim_trace
+        def f(x):
+            return x * 2
+
+        make_record_ctx(SamplingPolicy(rate=0.0))
+        with patch("sim_sdk.trace._prepare_input") as prepare:
+            assert f(21) == 42
+        prepare.assert_not_called()
+
+    def test_nested_primitives_inherit_drop(self, tmp_path):
+        db = FakeDB()
+
+        @sim_trace(name="inner")
+        def inner(x):
+            return x
+
+        @sim_trace(name="outer")
+        def outer(x):
+            assert not ctx.is_recording
+            with sim_db(db, name="pg") as sdb:
+                assert sdb is db
+                sdb.query("SELECT 1")
+            with sim_capture("tax") as cap:
+                cap.set_result(0.1)
+            return inner(x)
+
+        ctx, sink = make_record_ctx(SamplingPolicy(rates={"outer": 0.0}), tmp_path)
+        assert outer(5) == 5
+
+        assert sink.events == []
+        assert ctx.collected_stubs == []
+        assert db.calls == 1
+        assert not ctx.sampled_out
+        assert ctx.is_recording
+
+    def test_nested_traces_of_sampled_root_always_recorded(self):
+        @sim_trace(name="inner")
+        def inner(x):
+            return x
+
+        @sim_trace(name="outer")
+        def outer(x):
+            return inner(x) + inner(x + 1)
+
+        _, sink = make_record_ctx(SamplingPolicy(rates={"inner": 0.0}))
+        outer(1)
+
+        assert len(sink.events) == 3
+        assert len(sink.events[-1].stubs) == 2
+
+    def test_flag_cleared_when_unsampled_call_raises(self):
+        @sim_trace
+        def boom():
+            raise RuntimeError("x")
+
+        ctx, _ = make_record_ctx(SamplingPolicy(rate=0.0))
+        with pytest.raises(RuntimeError):
+            boom()
+        assert not ctx.sampled_out
+
+    def test_async_unsampled(self):
+        @sim_trace
+        async def f(x):
+            return x
+
+        ctx, sink = make_record_ctx(SamplingPolicy(rate=0.0))
+        assert asyncio.run(f(3)) == 3
+        assert sink.events == []
+        assert not ctx.sampled_out
+
+
+class TestReplayNotSampled:
+    def test_replay_ignores_policy(self):
+        calls = []
+
+        @sim_trace
+        def f(x):
+            calls.append(x)
+            return x
+
+        policy = SamplingPolicy(rate=0.0)
+        set_context(SimContext(mode=SimMode.REPLAY, run_id="r", sampling=policy))
+        assert f(1) is None  # replay path, no ReplayContext
+        assert calls == []
+        assert policy.stats() == {"sampled": 0, "dropped": 0}
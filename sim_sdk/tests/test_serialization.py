@@ -0,0 +1,273 @@
+"""
+Tests for the type-dispatch serializer registry.
+"""
+
+import array
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from sim_sdk import serialization
+from sim_sdk.canonical import canonical_encode, canonicalize_json, fingerprint
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.serialization import (
+    configure_protobuf,
+    get_serializer,
+    make_serializable,
+    register_serializer,
+    restore_encoded,
+    unregister_serializer,
+)
+from sim_sdk.trace import sim_trace
+
+
+class Money:
+    def __init__(self, amount, ccy):
+        self.amount = amount
+        self.ccy = ccy
+
+
+class Euro(Money):
+    pass
+
+
+class Shape:
+    pass
+
+
+class Circle(Shape):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    yield
+    for cls in list(serialization._custom):
+        unregister_serializer(cls)
+    clear_context()
+
+
+def _money(m):
+    return {"amount": str(m.amount), "ccy": m.ccy}
+
+
+def test_builtin_conversions_unchanged():
+    when = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    value = {1: (b"\x01", when, 2.5, None), "s": [True, "x"]}
+    assert make_serializable(value) == {
+        "1": ["01", when.isoformat(), 2.5, None],
+        "s": [True, "x"],
+    }
+    assert make_serializable(object()).startswith("<object object")
+
+
+def test_custom_serializer_applies_to_every_path():
+    register_serializer(Money, _money)
+    value = {"price": Money(10, "USD")}
+
+    expected = {"price": {"amount": "10", "ccy": "USD"}}
+    assert make_serializable(value) == expected
+    encoded, fp = canonical_encode(value)
+    assert encoded == expected
+    assert fp == fingerprint(expected)
+    assert canonicalize_json(value) == canonicalize_json(expected)
+
+
+def test_subclasses_resolve_through_mro():
+    register_serializer(Money, _money)
+    assert make_serializable(Euro(5, "EUR")) == {"amount": "5", "ccy": "EUR"}
+
+    register_serializer(Euro, lambda e: f"EUR {e.amount}")
+    assert get_serializer(Euro)(Euro(5, "EUR")) == "EUR 5"
+    assert make_serializable(Euro(5, "EUR")) == "EUR 5"
+    assert make_serializable(Money(5, "USD")) == {"amount": "5", "ccy": "USD"}
+
+
+def test_registration_after_use_invalidates_cache():
+    before = make_serializable(Circle())
+    assert before.startswith("<")
+
+    register_serializer(Shape, lambda s: type(s).__name__)
+    assert make_serializable(Circle()) == "Circle"
+
+    unregister_serializer(Shape)
+    assert make_serializable(Circle()).startswith("<")
+
+
+def test_custom_result_is_converted_further():
+    register_serializer(Money, lambda m: (m.amount, b"\xff"))
+    assert make_serializable(Money(1, "USD")) == [1, "ff"]
+    encoded, _ = canonical_encode(Money(1, "USD"))
+    assert encoded == [1, "ff"]
+
+
+def test_bytes_can_be_overridden_and_restored():
+    register_serializer(bytes, lambda b: len(b))
+    assert make_serializable(b"abc") == 3
+    assert canonicalize_json({"b": b"abc"}) == '{"b":3}'
+
+    unregister_serializer(bytes)
+    assert make_serializable(b"abc") == "616263"
+    assert canonicalize_json({"b": b"abc"}) == '{"b":{"__bytes__":"YWJj"}}'
+
+
+@pytest.mark.parametrize("cls", [str, int, float, bool, type(None), dict, list, tuple])
+def test_json_native_types_cannot_be_overridden(cls):
+    with pytest.raises(ValueError):
+        register_serializer(cls, repr)
+
+
+def test_invalid_registration_rejected():
+    with pytest.raises(TypeError):
+        register_serializer(Money(1, "USD"), _money)
+    with pytest.raises(TypeError):
+        register_serializer(Money, "not callable")
+
+
+def test_dynamic_attribute_types_resolved_per_instance():
+    class Proxy:
+        def __init__(self, target):
+            self._target = target
+
+        def __getattr__(self, name):
+            return getattr(self._target, name)
+
+    when = datetime(2026, 1, 2)
+    assert make_serializable(Proxy(when)) == when.isoformat()
+    assert make_serializable(Proxy("x")).startswith("<")
+    assert Proxy not in serialization._value_dispatcher.handlers
+
+
+def test_sim_trace_records_custom_types():
+    register_serializer(Money, _money)
+    events = []
+
+    class Sink:
+        def emit(self, event):
+            events.append(event)
+
+    set_context(SimContext(mode=SimMode.RECORD, run_id="r", sink=Sink()))
+
+    @sim_trace
+    def charge(price):
+        return Money(price.amount * 2, price.ccy)
+
+    charge(Money(3, "USD"))
+    assert events[0].input == {"price": {"amount": "3", "ccy": "USD"}}
+    assert events[0].output == {"amount": "6", "ccy": "USD"}
+
+
+# ---------------------------------------------------------------------------
+# Arrays and buffer-protocol objects
+# ---------------------------------------------------------------------------
+
+def _roundtrip(value):
+    return json.loads(json.dumps(make_serializable(value)), object_hook=restore_encoded)
+
+
+def test_buffers_stored_compactly_and_restored():
+    buf = array.array("d", [1.5, -2.0, 3.25])
+    encoded = make_serializable(buf)
+    assert encoded == {"__buffer__": {
+        "format": "d", "shape": [3],
+        "data": base64.b64encode(buf.tobytes()).decode("ascii"),
+    }}
+    restored = _roundtrip(buf)
+    assert isinstance(restored, memoryview)
+    assert restored.tolist() == [1.5, -2.0, 3.25]
+
+    assert _roundtrip(bytearray(b"\x00\xff")).tobytes() == b"\x00\xff"
+    grid = memoryview(bytearray(range(6))).cast("B", [2, 3])
+    assert _roundtrip(grid).tolist() == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_non_contiguous_buffer_encoded_in_c_order():
+    view = memoryview(bytearray(range(10)))[::2]
+    assert _roundtrip(view).tolist() == [0, 2, 4, 6, 8]
+
+
+def test_bytes_keep_hex_encoding():
+    assert make_serializable(b"\x01\x02") == "0102"
+
+
+def test_numpy_arrays_roundtrip():
+    np = pytest.importorskip("numpy")
+    arr = np.arange(6, dtype="<i4").reshape(2, 3)
+    encoded = make_serializable(arr)
+    assert encoded["__ndarray__"]["dtype"] == "<i4"
+    assert encoded["__ndarray__"]["shape"] == [2, 3]
+
+    restored = _roundtrip(arr)
+    assert isinstance(restored, np.ndarray)
+    assert restored.dtype == arr.dtype
+    np.testing.assert_array_equal(restored, arr)
+    assert not restored.flags.writeable
+
+    fortran = np.asfortranarray(arr.astype("<f8"))
+    np.testing.assert_array_equal(_roundtrip(fortran), fortran)
+    when = np.array(["2026-01-01"], dtype="M8[ns]")
+    np.testing.assert_array_equal(_roundtrip(when), when)
+
+
+def test_numpy_object_arrays_fall_back_to_lists():
+    np = pytest.importorskip("numpy")
+    arr = np.array([{"a": 1}, None], dtype=object)
+    assert make_serializable(arr) == [{"a": 1}, None]
+
+
+# ---------------------------------------------------------------------------
+# Protobuf messages
+# ---------------------------------------------------------------------------
+
+@pytest.fixture()
+def struct_pb2():
+    pytest.importorskip("google.protobuf")
+    from google.protobuf import struct_pb2
+    yield struct_pb2
+    configure_protobuf(store_binary=False)
+
+
+def _struct(struct_pb2, items):
+    msg = struct_pb2.Struct()
+    for k, v in items:
+        msg[k] = v
+    return msg
+
+
+def test_protobuf_fingerprint_hashes_deterministic_bytes(struct_pb2):
+    msg = _struct(struct_pb2, [("b", 1.0), ("a", "x")])
+    expected = {"__protobuf__": {
+        "type": "google.protobuf.Struct",
+        "digest": hashlib.sha256(msg.SerializeToString(deterministic=True)).hexdigest(),
+    }}
+    assert canonicalize_json(msg) == canonicalize_json(expected)
+    assert canonical_encode({"m": msg})[1] == fingerprint({"m": expected})
+
+    reordered = _struct(struct_pb2, [("a", "x"), ("b", 1.0)])
+    assert fingerprint(reordered) == fingerprint(msg)
+
+
+def test_protobuf_stored_as_dict_by_default(struct_pb2):
+    msg = _struct(struct_pb2, [("a", "x")])
+    assert make_serializable(msg) == {"a": "x"}
+    encoded, _ = canonical_encode(msg)
+    assert encoded == {"a": "x"}
+
+
+def test_protobuf_binary_storage_roundtrip(struct_pb2):
+    configure_protobuf(store_binary=True)
+    msg = _struct(struct_pb2, [("a", "x"), ("n", 2.0)])
+    encoded = make_serializable(msg)
+    assert encoded["__protobuf__"]["type"] == "google.protobuf.Struct"
+
+    restored = json.loads(json.dumps(encoded), object_hook=restore_encoded)
+    assert isinstance(restored, struct_pb2.Struct)
+    assert restored == msg
+
+
+def test_unknown_protobuf_type_left_encoded(struct_pb2):
+    encoded = {"__protobuf__": {"type": "no.such.Message", "data": ""}}
+    assert restore_encoded(dict(encoded)) == encoded
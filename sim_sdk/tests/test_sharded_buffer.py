@@ -0,0 +1,215 @@
+"""
+Tests for per-thread emit staging (sim_sdk.sink.sharded_buffer) and the
+per-thread SenderMetrics counters.
+
+Covers:
+1. Events are staged per thread and moved into the buffer when a stage
+   fills or the buffer is drained, in each thread's emission order
+2. Staging takes no shared lock; len/memory_usage include staged events,
+   read under the buffer's lock, and staged bytes count against its budget
+3. Many threads emitting concurrently lose nothing
+4. Shards and counters of finished threads are folded away; a thread
+   reusing a finished thread's ident gets a value of its own
+5. SenderMetrics sums per-thread buffered counts and buffer drops
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from sim_sdk.fixture.schema import FixtureEvent
+from sim_sdk.sink.in_memory_buffer import DropPolicy, InMemoryBuffer, estimate_event_size
+from sim_sdk.sink.sender_metrics import SenderMetrics
+from sim_sdk.sink.sharded_buffer import STAGE_EVENTS, ShardedBuffer
+from sim_sdk.sink.thread_cells import ThreadCells
+
+
+def event(name: str = "q") -> FixtureEvent:
+    return FixtureEvent(qualname=name, input={"x": 1}, output=[1, 2, 3])
+
+
+def run_in_thread(fn) -> None:
+    t = threading.Thread(target=fn)
+    t.start()
+    t.join()
+
+
+@pytest.fixture
+def sharded():
+    return ShardedBuffer(InMemoryBuffer(10**9))
+
+
+class TestStaging:
+    def test_staged_until_stage_fills(self, sharded):
+        for i in range(STAGE_EVENTS - 1):
+            assert sharded.append(event(str(i))) == 0
+        assert len(sharded._buffer) == 0
+        assert len(sharded) == STAGE_EVENTS - 1
+
+        assert sharded.append(event("last")) == STAGE_EVENTS
+        assert len(sharded._buffer) == STAGE_EVENTS
+
+    def test_memory_usage_includes_staged(self, sharded):
+        before = sharded.memory_usage()
+        e = event()
+        sharded.append(e)
+        assert sharded.memory_usage() == before + estimate_event_size(e)
+
+    def test_drain_harvests_other_threads(self, sharded):
+        run_in_thread(lambda: [sharded.append(event(f"t{i}")) for i in range(3)])
+        sharded.append(event("main"))
+        names = [e.qualname for e in sharded.drain()]
+        assert sorted(names) == ["main", "t0", "t1", "t2"]
+        assert names.index("t0") < names.index("t1") < names.index("t2")
+        assert len(sharded) == 0
+
+    def test_stage_takes_no_shared_lock(self, sharded):
+        staged = []
+        with sharded._buffer._lock:
+            t = threading.Thread(target=lambda: staged.append(sharded.append(event())))
+            t.start()
+            t.join(timeout=2)
+            assert not t.is_alive()
+        assert staged == [0]
+
+    def test_stage_events_validated(self):
+        with pytest.raises(ValueError, match="stage_events"):
+            ShardedBuffer(InMemoryBuffer(100), stage_events=0)
+
+    def test_drop_policy_applied_on_move(self):
+        size = estimate_event_size(event("e0"))
+        sharded = ShardedBuffer(InMemoryBuffer(size * 4, DropPolicy.DROP_OLDEST), stage_events=10)
+        for i in range(10):
+            sharded.append(event(f"e{i}"))
+        assert sharded.dropped == 6
+        assert [e.qualname for e in sharded.drain()] == ["e6", "e7", "e8", "e9"]
+
+    def test_staged_bytes_count_against_budget(self):
+        size = estimate_event_size(event("e0"))
+        sharded = ShardedBuffer(InMemoryBuffer(size * 4, DropPolicy.DROP_OLDEST))
+        for i in range(10):
+            sharded.append(event(f"e{i}"))
+        assert sharded.dropped == 6
+        assert len(sharded) == 4
+
+    def test_stage_limited_to_share_of_budget(self):
+        size = estimate_event_size(event("e0"))
+        sharded = ShardedBuffer(InMemoryBuffer(size * 4, DropPolicy.DROP_OLDEST))
+        run_in_thread(lambda: sharded.append(event("t0")))
+        # Two shards: each may stage half the room left
+        assert sharded.append(event("m0")) == 0
+        assert sharded.append(event("m1")) == 0
+        assert sharded.append(event("m2")) == 3
+        assert sharded.dropped == 0
+        assert sharded.memory_usage() - sharded._buffer.memory_usage() == size
+
+    def test_len_and_memory_usage_wait_for_moves(self, sharded):
+        sharded.append(event())
+        results = []
+        with sharded._buffer._lock:
+            t = threading.Thread(
+                target=lambda: results.extend([len(sharded), sharded.memory_usage()]),
+            )
+            t.start()
+            t.join(timeout=0.1)
+            assert t.is_alive()
+        t.join()
+        assert results[0] == 1
+
+
+class TestConcurrency:
+    def test_no_events_lost(self, sharded):
+        n, per_thread = 16, 500
+        drained = []
+        stop = threading.Event()
+
+        def produce(t):
+            for i in range(per_thread):
+                sharded.append(event(f"{t}:{i}"))
+
+        def consume():
+            while not stop.is_set():
+                drained.extend(sharded.drain())
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        producers = [threading.Thread(target=produce, args=(t,)) for t in range(n)]
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join()
+        stop.set()
+        consumer.join()
+        drained.extend(sharded.drain())
+
+        assert len(drained) == n * per_thread
+        for t in range(n):
+            seq = [int(e.qualname.split(":")[1]) for e in drained
+                   if e.qualname.startswith(f"{t}:")]
+            assert seq == list(range(per_thread))
+
+    def test_finished_threads_pruned(self, sharded):
+        for _ in range(5):
+            run_in_thread(lambda: sharded.append(event()))
+        assert len(sharded._shards) == 5
+        assert len(sharded.drain()) == 5
+        assert len(sharded._shards) == 0
+
+
+class TestThreadCells:
+    def test_value_per_thread(self):
+        cells = ThreadCells(list)
+        cells.get().append("main")
+        run_in_thread(lambda: cells.get().append("worker"))
+        assert sorted(v[0] for v in cells.values()) == ["main", "worker"]
+        assert cells.get() == ["main"]
+
+    def test_reused_ident_gets_fresh_value(self):
+        cells = ThreadCells(list)
+        with patch("sim_sdk.sink.thread_cells._get_ident", return_value=1):
+            run_in_thread(lambda: cells.get().append("first"))
+            run_in_thread(lambda: cells.get().append("second"))
+        assert sorted(v[0] for v in cells.values()) == ["first", "second"]
+        assert sorted(v[0] for v in cells.remove_finished()) == ["first", "second"]
+        assert len(cells) == 0
+
+    def test_remove_finished_keeps_busy_values(self):
+        cells = ThreadCells(list)
+        run_in_thread(lambda: cells.get().append("pending"))
+        run_in_thread(cells.get)
+        assert cells.remove_finished(keep=bool) == [[]]
+        assert cells.values() == [["pending"]]
+
+
+class TestSenderMetrics:
+    def test_buffered_summed_over_threads(self):
+        metrics = SenderMetrics()
+        barrier = threading.Barrier(4)
+
+        def emit():
+            for _ in range(1000):
+                metrics.record_buffer(1)
+            barrier.wait()
+
+        threads = [threading.Thread(target=emit) for _ in range(3)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        assert metrics.snapshot()["buffered"] == 3000
+        for t in threads:
+            t.join()
+
+        assert metrics.buffered == 3000
+        assert len(metrics._buffered_cells) == 0
+        metrics.record_buffer(2)
+        assert metrics.snapshot()["buffered"] == 3002
+
+    def test_includes_buffer_drops(self):
+        size = estimate_event_size(event())
+        sharded = ShardedBuffer(InMemoryBuffer(size, DropPolicy.DROP_OLDEST), stage_events=1)
+        metrics = SenderMetrics(sharded)
+        for _ in range(3):
+            sharded.append(event())
+        metrics.record_drop(5)
+        assert metrics.snapshot()["dropped"] == 7
@@ -0,0 +1,311 @@
+"""
+Tests for per-trace stub arenas (sim_sdk.stub_arena).
+
+Covers:
+1. StubArena stays an unspilled list under its budget and spills whole
+   blocks to a temporary file past it
+2. SpilledStubs streams the stubs back in order, spilled first
+3. @sim_trace collects into an arena per frame and restores the parent's
+   collector afterwards, also when the function raises
+4. A spilled recording serializes exactly like an unspilled one
+5. Deferred stubs are never spilled; spill failures keep stubs in memory
+6. Sending a spilled event streams its stubs into the batch body without
+   reading them all back into memory
+"""
+
+import gzip
+import json
+import logging
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from sim_sdk.context import SimContext, SimMode, clear_context, get_context, init_sim, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.deferred import DeferredEvent
+from sim_sdk.fixture.schema import FixtureEvent
+from sim_sdk.sink.agent_client import AgentHttpClient
+from sim_sdk.sink.envelope import BatchRequest, fixture_to_envelope
+from sim_sdk.sink.local_agent import LocalAgentServer
+from sim_sdk.stub_arena import MEASURE_EVERY, SpilledStubs, StubArena
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self, defer: bool = False):
+        self.defer_serialization = defer
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+    def dicts(self) -> list:
+        return [
+            (e.resolve() if isinstance(e, DeferredEvent) else e).to_dict()
+            for e in self.events
+        ]
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return [{"id": params[0], "payload": "x" * 40}]
+
+
+@pytest.fixture(autouse=True)
+def clean_context():
+    clear_context()
+    yield
+    clear_context()
+
+
+def stubs(n: int) -> list:
+    return [{"type": "capture", "label": f"s{i}", "result": "x" * 100} for i in range(n)]
+
+
+@sim_trace(name="batch")
+def batch(n):
+    with sim_db(FakeDB(), name="pg") as db:
+        for i in range(n):
+            db.query("SELECT * FROM jobs WHERE id = %s", [i])
+    return n
+
+
+def record(n: int, budget, defer: bool = False) -> CollectSink:
+    sink = CollectSink(defer=defer)
+    set_context(SimContext(
+        mode=SimMode.RECORD, run_id="r", sink=sink, stub_budget_bytes=budget,
+    ))
+    batch(n)
+    return sink
+
+
+_VOLATILE = ("fixture_id", "recorded_at", "duration_ms")
+
+
+def comparable(events: list) -> list:
+    return [{k: v for k, v in e.items() if k not in _VOLATILE} for e in events]
+
+
+# ---------------------------------------------------------------------------
+# StubArena
+# ---------------------------------------------------------------------------
+
+class TestStubArena:
+    def test_under_budget_is_plain_list(self):
+        arena = StubArena(max_bytes=1 << 20)
+        for s in stubs(MEASURE_EVERY * 2):
+            arena.append(s)
+        assert arena.spilled == 0
+        assert arena.take() is arena
+        assert arena == stubs(MEASURE_EVERY * 2)
+
+    def test_measuring_does_not_serialize(self):
+        arena = StubArena(max_bytes=1 << 20)
+        with patch("sim_sdk.stub_arena.json.dumps") as dumps:
+            for s in stubs(MEASURE_EVERY * 2):
+                arena.append(s)
+        dumps.assert_not_called()
+        assert arena._mem_bytes > 0
+
+    def test_one_large_stub_in_a_block_counts(self):
+        arena = StubArena(max_bytes=100_000)
+        block = stubs(MEASURE_EVERY)
+        block[-1] = {"type": "capture", "label": "big", "result": "x" * 200_000}
+        for s in block:
+            arena.append(s)
+        assert arena.spilled == MEASURE_EVERY
+
+    def test_spills_past_budget(self):
+        arena = StubArena(max_bytes=1000)
+        for s in stubs(MEASURE_EVERY + 3):
+            arena.append(s)
+        assert arena.spilled == MEASURE_EVERY
+        assert len(arena) == 3
+
+        taken = arena.take()
+        assert isinstance(taken, SpilledStubs)
+        assert len(taken) == MEASURE_EVERY + 3
+        assert list(taken) == stubs(MEASURE_EVERY + 3)
+
+    def test_spills_repeatedly(self):
+        arena = StubArena(max_bytes=1000)
+        for s in stubs(MEASURE_EVERY * 3):
+            arena.append(s)
+        assert arena.spilled == MEASURE_EVERY * 3
+        taken = arena.take()
+        assert taken == stubs(MEASURE_EVERY * 3)
+        assert list(taken) == list(taken)
+
+    def test_unlimited_never_measured(self):
+        arena = StubArena()
+        with patch("sim_sdk.stub_arena.json.dumps") as dumps:
+            for s in stubs(MEASURE_EVERY * 2):
+                arena.append(s)
+        dumps.assert_not_called()
+        assert arena.take() is arena
+
+    def test_non_dict_stubs_not_spilled(self):
+        arena = StubArena(max_bytes=10)
+        marker = object()
+        arena.append(marker)
+        for s in stubs(MEASURE_EVERY * 2):
+            arena.append(s)
+        assert arena.spilled == 0
+        assert arena[0] is marker
+
+    def test_clear_drops_spill(self):
+        arena = StubArena(max_bytes=1000)
+        for s in stubs(MEASURE_EVERY):
+            arena.append(s)
+        arena.clear()
+        assert arena == [] and arena.spilled == 0
+        assert arena.take() is arena
+
+    def test_spill_failure_keeps_stubs(self, caplog):
+        arena = StubArena(max_bytes=1000)
+        with patch("sim_sdk.stub_arena.tempfile.TemporaryFile", side_effect=OSError("full")):
+            with caplog.at_level(logging.WARNING, logger="sim_sdk.stub_arena"):
+                for s in stubs(MEASURE_EVERY * 2):
+                    arena.append(s)
+        assert "Could not spill" in caplog.text
+        assert arena.take() == stubs(MEASURE_EVERY * 2)
+
+
+# ---------------------------------------------------------------------------
+# @sim_trace
+# ---------------------------------------------------------------------------
+
+class TestTraceArenas:
+    def test_frame_collects_into_own_arena(self):
+        seen = []
+
+        @sim_trace(name="inner")
+        def inner():
+            seen.append(get_context().collected_stubs)
+
+        @sim_trace(name="outer")
+        def outer():
+            seen.append(get_context().collected_stubs)
+            inner()
+
+        ctx = SimContext(mode=SimMode.RECORD, run_id="r", sink=CollectSink())
+        set_context(ctx)
+        base = ctx.collected_stubs
+        outer()
+
+        assert all(isinstance(a, StubArena) for a in seen)
+        assert seen[0] is not seen[1]
+        assert ctx.collected_stubs is base and base == []
+
+    def test_collector_restored_on_error(self):
+        @sim_trace(name="boom")
+        def boom():
+            raise RuntimeError("x")
+
+        ctx = SimContext(mode=SimMode.RECORD, run_id="r", sink=CollectSink())
+        set_context(ctx)
+        base = ctx.collected_stubs
+        with pytest.raises(RuntimeError):
+            boom()
+        assert ctx.collected_stubs is base
+
+    def test_spilled_recording_matches_unspilled(self):
+        n = MEASURE_EVERY * 4 + 5
+        spilled = record(n, budget=2000)
+        kept = record(n, budget=None)
+
+        assert isinstance(spilled.events[-1].stubs, SpilledStubs)
+        assert isinstance(kept.events[-1].stubs, list)
+        assert comparable(spilled.dicts()) == comparable(kept.dicts())
+        assert json.dumps(spilled.events[-1].to_dict()["stubs"]) == json.dumps(
+            kept.events[-1].to_dict()["stubs"]
+        )
+
+    def test_deferred_recording_not_spilled(self):
+        sink = record(MEASURE_EVERY * 2, budget=10, defer=True)
+        root = sink.events[-1].resolve()
+        assert isinstance(root.stubs, list)
+        assert len(root.stubs) == MEASURE_EVERY * 2
+
+    def test_init_sim_budget(self):
+        ctx = init_sim(mode=SimMode.RECORD, sink=CollectSink(), stub_budget_bytes=None)
+        try:
+            assert ctx.stub_budget_bytes is None
+        finally:
+            init_sim(mode=SimMode.OFF)
+
+
+# ---------------------------------------------------------------------------
+# Sending spilled events
+# ---------------------------------------------------------------------------
+
+def spilled_event(n: int) -> FixtureEvent:
+    arena = StubArena(max_bytes=1000)
+    for s in stubs(n):
+        arena.append(s)
+    event = FixtureEvent(qualname="batch", stubs=arena.take(), fixture_id="f1",
+                         recorded_at="t")
+    assert isinstance(event.stubs, SpilledStubs)
+    return event
+
+
+class TestSpilledSend:
+    def test_envelope_keeps_stubs_spilled(self):
+        envelope = fixture_to_envelope(spilled_event(MEASURE_EVERY + 3))
+        assert isinstance(envelope.payload["stubs"], SpilledStubs)
+        assert BatchRequest([envelope]).streams
+
+    def test_streamed_body_matches_unspilled(self):
+        n = MEASURE_EVERY * 3 + 7
+        event = spilled_event(n)
+        kept = FixtureEvent(qualname="batch", stubs=stubs(n), fixture_id="f1",
+                            recorded_at="t")
+        spilled_batch = BatchRequest([fixture_to_envelope(event, timestamp_ms=1),
+                                      fixture_to_envelope(event, timestamp_ms=1)])
+        kept_batch = BatchRequest([fixture_to_envelope(kept, timestamp_ms=1),
+                                   fixture_to_envelope(kept, timestamp_ms=1)])
+
+        assert not kept_batch.streams
+        assert spilled_batch.serialize() == kept_batch.serialize()
+        # Each call starts a fresh stream, as a resend needs
+        assert b"".join(spilled_batch.serialize_chunks()) == kept_batch.serialize()
+
+    def test_serialize_peak_memory_bounded(self):
+        event = spilled_event(20_000)
+        batch = BatchRequest([fixture_to_envelope(event)])
+
+        tracemalloc.start()
+        try:
+            total = 0
+            for chunk in batch.serialize_chunks():
+                total += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Reading the stubs back into a list would take several times the body
+        assert total > 2_000_000
+        assert peak < total // 4
+
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_client_streams_spilled_event(self, compression):
+        n = MEASURE_EVERY * 3 + 7
+        with LocalAgentServer() as agent:
+            client = AgentHttpClient(agent.url, compression=compression)
+            try:
+                # The first response advertises the agent's encodings
+                client.post_batch([fixture_to_envelope(spilled_event(MEASURE_EVERY + 1))])
+                resp = client.post_batch([fixture_to_envelope(spilled_event(n))])
+            finally:
+                client.close()
+        assert resp.accepted == 1
+        assert agent.events == 2
+        assert agent.connections == 1
+
+    def test_compressed_stream_decodes_to_body(self):
+        event = spilled_event(MEASURE_EVERY * 3 + 7)
+        batch = BatchRequest([fixture_to_envelope(event, timestamp_ms=1)])
+        client = AgentHttpClient(compression="gzip")
+        data = b"".join(client._compress_stream(batch.serialize_chunks, "gzip"))
+        assert gzip.decompress(data) == batch.serialize()
@@ -0,0 +1,218 @@
+"""
+Tests for content-hash stub references (sim_sdk.stub_refs).
+
+Covers:
+1. With a stub_refs sink, collected stubs reference emitted outputs
+   instead of repeating them (db, http, capture, nested trace)
+2. Small outputs and trace arguments stay inline
+3. Resolving the references reproduces what recording without them emits,
+   for eager and deferred recording
+4. Without the flag, stubs keep their payloads
+5. StubStore resolves references when loading a fixture
+"""
+
+import json
+import logging
+
+import pytest
+
+from sim_sdk.capture import sim_capture
+from sim_sdk.context import SimContext, SimMode, clear_context, set_context
+from sim_sdk.db import sim_db
+from sim_sdk.deferred import DeferredEvent
+from sim_sdk.http import sim_http
+from sim_sdk.stub_refs import STUB_REF_TAG, is_stub_ref, resolve_stub_refs, stub_ref
+from sim_sdk.stub_store import StubStore
+from sim_sdk.trace import sim_trace
+
+
+class CollectSink:
+    def __init__(self, stub_refs: bool = False, defer: bool = False):
+        self.stub_refs = stub_refs
+        self.defer_serialization = defer
+        self.events: list = []
+
+    def emit(self, event) -> None:
+        self.events.append(event)
+
+    def dicts(self) -> list:
+        return [
+            (e.resolve() if isinstance(e, DeferredEvent) else e).to_dict()
+            for e in self.events
+        ]
+
+
+ROWS = [{"id": i, "name": f"user-{i}", "region": "eu-west"} for i in range(20)]
+
+
+class FakeDB:
+    def query(self, sql, params=None):
+        return ROWS
+
+
+class FakeResponse:
+    status_code = 200
+    text = json.dumps({"charges": [{"id": f"ch_{i}", "amount": i} for i in range(20)]})
+    headers = {"content-type": "application/json"}
+
+
+class FakeHTTP:
+    def post(self, url, **kwargs):
+        return FakeResponse()
+
+
+@pytest.fixture(autouse=True)
+def clean_context():
+    clear_context()
+    yield
+    clear_context()
+
+
+@sim_trace(name="lookup")
+def lookup(user_id):
+    with sim_db(FakeDB(), name="pg") as db:
+        return db.query("SELECT * FROM users WHERE id = %s", [user_id])
+
+
+@sim_trace(name="checkout")
+def checkout(user_id):
+    rows = lookup(user_id)
+    with sim_http(FakeHTTP(), name="pay") as http:
+        http.post("https://pay.example.com/charge", json={"amount": 3})
+    with sim_capture("tax") as cap:
+        cap.set_result({"rates": {f"region-{i}": i / 100 for i in range(20)}})
+    with sim_capture("flag") as cap:
+        cap.set_result(True)
+    return rows[0]["name"]
+
+
+def record(sink) -> list:
+    set_context(SimContext(mode=SimMode.RECORD, run_id="test-run", sink=sink))
+    checkout(7)
+    return sink.dicts()
+
+
+_VOLATILE = ("fixture_id", "recorded_at", "duration_ms", "output_fingerprint")
+
+
+def comparable(events: list) -> list:
+    return [{k: v for k, v in e.items() if k not in _VOLATILE} for e in events]
+
+
+def refs_in(stubs: list) -> list:
+    return [k for s in stubs for k, v in s.items() if is_stub_ref(v)]
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class TestRecording:
+    def test_root_stubs_hold_references(self):
+        events = record(CollectSink(stub_refs=True))
+        root = events[-1]
+
+        assert root["qualname"] == "checkout"
+        assert refs_in(root["stubs"]) == ["output", "response", "result"]
+        lookup_event = next(e for e in events if e["qualname"] == "lookup")
+        assert refs_in(lookup_event["stubs"]) == ["result"]
+
+    def test_small_payloads_and_arguments_inline(self):
+        events = record(CollectSink(stub_refs=True))
+        root_stubs = events[-1]["stubs"]
+
+        assert root_stubs[0]["input"] == {"user_id": 7}
+        flag = next(s for s in root_stubs if s.get("label") == "flag")
+        assert flag["result"] is True
+        flag_event = next(e for e in events if e["qualname"] == "capture:flag")
+        assert flag_event["output_fingerprint"] == ""
+
+    def test_referenced_events_carry_output_fingerprint(self):
+        events = record(CollectSink(stub_refs=True))
+        fingerprints = {e["output_fingerprint"] for e in events}
+        for event in events:
+            for stub in event["stubs"]:
+                for value in stub.values():
+                    if is_stub_ref(value):
+                        assert value[STUB_REF_TAG] in fingerprints
+
+    @pytest.mark.parametrize("defer", [False, True])
+    def test_resolves_to_unreferenced_recording(self, defer):
+        plain = record(CollectSink(defer=defer))
+        referenced = record(CollectSink(stub_refs=True, defer=defer))
+
+        assert resolve_stub_refs(referenced) == 0
+        assert comparable(referenced) == comparable(plain)
+
+    def test_referenced_payload_is_smaller(self):
+        plain = json.dumps(record(CollectSink()))
+        referenced = json.dumps(record(CollectSink(stub_refs=True)))
+        assert len(referenced) < len(plain)
+
+    def test_without_flag_keeps_payloads(self):
+        events = record(CollectSink())
+        assert STUB_REF_TAG not in json.dumps(events)
+
+    def test_sink_flag_must_be_true(self):
+        sink = CollectSink()
+        sink.stub_refs = "yes"
+        assert STUB_REF_TAG not in json.dumps(record(sink))
+
+    def test_no_output_stays_inline(self):
+        @sim_trace(name="noop")
+        def noop():
+            return None
+
+        @sim_trace(name="outer")
+        def outer():
+            noop()
+
+        sink = CollectSink(stub_refs=True)
+        set_context(SimContext(mode=SimMode.RECORD, run_id="r", sink=sink))
+        outer()
+        [stub] = sink.events[-1].stubs
+        assert stub["output"] is None
+
+
+# ---------------------------------------------------------------------------
+# Resolution
+# ---------------------------------------------------------------------------
+
+class TestResolve:
+    def test_missing_reference_left_in_place(self):
+        events = [{"event_type": "Output", "stubs": [{"result": stub_ref("nope")}]}]
+        assert resolve_stub_refs(events) == 1
+        assert events[0]["stubs"][0]["result"] == stub_ref("nope")
+
+    def test_metadata_events_not_indexed(self):
+        events = [
+            {"event_type": "Metadata", "output_fingerprint": "fp", "output": None},
+            {"event_type": "Output", "stubs": [{"output": stub_ref("fp")}]},
+        ]
+        assert resolve_stub_refs(events) == 1
+
+
+class TestStubStore:
+    def test_resolves_on_load(self, tmp_path):
+        events = record(CollectSink(stub_refs=True))
+        path = tmp_path / "fixture.json"
+        path.write_text(json.dumps({
+            "schema_version": 1,
+            "stubs": events[:-1],
+            "golden_output": events[-1],
+        }))
+
+        store = StubStore.from_fixture(str(path))
+        golden = store.get_trace_stub(events[-1]["input_fingerprint"], 0)
+        assert STUB_REF_TAG not in json.dumps(golden)
+        pay = next(s for s in golden["stubs"] if s.get("type") == "http_request")
+        assert pay["response"]["status_code"] == 200
+
+    def test_logs_unresolved(self, tmp_path, caplog):
+        events = record(CollectSink(stub_refs=True))
+        path = tmp_path / "fixture.json"
+        path.write_text(json.dumps({"schema_version": 1, "golden_output": events[-1]}))
+
+        with caplog.at_level(logging.WARNING, logger="sim_sdk.stub_store"):
+            StubStore.from_fixture(str(path))
+        assert "stub reference(s) not found" in caplog.text
@@ -6,11 +6,16 @@ All tests against real recorded data load from the canonical fixture file:
 """
 
 import json
+import os
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
-from sim_sdk.stub_store import StubStore
+from sim_sdk.canonical import canonical_encode, fingerprint, set_fingerprint_algorithm
+from sim_sdk.db import _compute_query_fingerprint
+from sim_sdk.replay_context import ReplayContext
+from sim_sdk.stub_store import StubStore, StubStoreCache
 
 FIXTURE_PATH = Path(__file__).parent / "fixtures" / "calculate_quote.json"
 
@@ -242,3 +247,291 @@ class TestAvailableFingerprints:
     def test_available_http_fingerprints_from_real_fixture(self):
         store = StubStore.from_fixture(str(FIXTURE_PATH))
         assert "tax_service" in store.available_http_fingerprints()
+
+
+# ---------------------------------------------------------------------------
+# StubStoreCache — shared, parsed-once stores
+# ---------------------------------------------------------------------------
+
+_SMALL_FIXTURE = {
+    "schema_version": 1,
+    "stubs": [
+        {
+            "qualname": "db:users",
+            "input_fingerprint": "aabb:1122",
+            "output": [{"id": 1}],
+            "ordinal": 0,
+            "event_type": "Stub",
+        },
+    ],
+}
+
+
+class TestStubStoreCache:
+
+    def test_second_get_returns_same_store(self, tmp_path):
+        cache = StubStoreCache()
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        first = cache.get(path)
+        assert cache.get(path) is first
+        snap = cache.snapshot()
+        assert snap["hits"] == 1
+        assert snap["misses"] == 1
+        assert snap["entries"] == 1
+
+    def test_equivalent_paths_share_entry(self, tmp_path):
+        cache = StubStoreCache()
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        first = cache.get(path)
+        assert cache.get(str(tmp_path / "." / "a.json")) is first
+
+    def test_modified_file_is_reloaded(self, tmp_path):
+        cache = StubStoreCache()
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        first = cache.get(path)
+
+        data = json.loads(json.dumps(_SMALL_FIXTURE))
+        data["stubs"][0]["output"] = [{"id": 1}, {"id": 2}]
+        _write_fixture(tmp_path, "a.json", data)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = cache.get(path)
+        assert second is not first
+        assert second.get_db_stub("aabb:1122", 0) == [{"id": 1}, {"id": 2}]
+        assert len(cache) == 1
+
+    def test_late_load_of_older_version_keeps_newer_entry(self, tmp_path):
+        cache = StubStoreCache()
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        load = StubStore.from_fixture
+        newer = {}
+
+        def slow_load(p):
+            store = load(p)
+            if "store" not in newer:
+                newer["store"] = None
+                # While the old version parses, the file changes and another
+                # request loads the new version first
+                data = json.loads(json.dumps(_SMALL_FIXTURE))
+                data["stubs"][0]["output"] = [{"id": 2}]
+                _write_fixture(tmp_path, "a.json", data)
+                st = os.stat(path)
+                os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+                newer["store"] = cache.get(path)
+            return store
+
+        with mock.patch.object(StubStore, "from_fixture", side_effect=slow_load):
+            old = cache.get(path)
+
+        assert old.get_db_stub("aabb:1122", 0) == [{"id": 1}]
+        assert len(cache) == 1
+        assert cache.get(path) is newer["store"]
+        assert cache.get(path).get_db_stub("aabb:1122", 0) == [{"id": 2}]
+
+    def test_lru_eviction_respects_byte_budget(self, tmp_path):
+        path_a = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        path_b = _write_fixture(tmp_path, "b.json", _SMALL_FIXTURE)
+        path_c = _write_fixture(tmp_path, "c.json", _SMALL_FIXTURE)
+        size = StubStore.from_fixture(path_a).estimated_bytes()
+        cache = StubStoreCache(max_bytes=2 * size)
+
+        cache.get(path_a)
+        cache.get(path_b)
+        cache.get(path_a)  # a is now most recently used
+        cache.get(path_c)  # evicts b
+
+        snap = cache.snapshot()
+        assert snap["evictions"] == 1
+        assert snap["entries"] == 2
+        assert snap["bytes"] == 2 * size
+
+        cache.get(path_a)
+        assert cache.snapshot()["hits"] == 2
+        cache.get(path_b)
+        assert cache.snapshot()["misses"] == 4
+
+    def test_budget_counts_parsed_size_not_file_size(self, tmp_path):
+        data = json.loads(json.dumps(_SMALL_FIXTURE))
+        data["stubs"][0]["output"] = [{"id": i, "name": f"user{i}"} for i in range(500)]
+        path = _write_fixture(tmp_path, "a.json", data)
+        cache = StubStoreCache()
+
+        store = cache.get(path)
+        assert cache.snapshot()["bytes"] == store.estimated_bytes()
+        assert store.estimated_bytes() > os.path.getsize(path)
+
+    def test_oversized_fixture_is_not_cached(self, tmp_path):
+        cache = StubStoreCache(max_bytes=1)
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        store = cache.get(path)
+        assert store.get_db_stub("aabb:1122", 0) == [{"id": 1}]
+        assert len(cache) == 0
+
+    def test_missing_file_raises(self, tmp_path):
+        cache = StubStoreCache()
+        with pytest.raises(FileNotFoundError, match="Fixture not found"):
+            cache.get(str(tmp_path / "missing.json"))
+
+    def test_invalid_json_is_not_cached(self, tmp_path):
+        cache = StubStoreCache()
+        bad = tmp_path / "bad.json"
+        bad.write_text("not json {{{", encoding="utf-8")
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            cache.get(str(bad))
+        assert len(cache) == 0
+
+    def test_mutated_result_does_not_leak_between_requests(self, tmp_path):
+        cache = StubStoreCache()
+        data = json.loads(json.dumps(_SMALL_FIXTURE))
+        data["stubs"] += [
+            {"qualname": "capture:tax", "output": {"rate": 0.1}, "headers": {},
+             "ordinal": 0, "event_type": "Stub"},
+            {"qualname": "app.fn", "input_fingerprint": "ff", "output": {"n": [1]},
+             "ordinal": 0, "event_type": "Stub"},
+        ]
+        _write_fixture(tmp_path, "fix.json", data)
+
+        first = ReplayContext("fix", str(tmp_path), cache=cache)
+        rows = first.stub_store.get_db_stub("aabb:1122", 0)
+        rows[0]["id"] = 999
+        rows.append({"x": 1})
+        first.stub_store.get_http_stub("tax", 0)[1]["rate"] = 0.5
+        first.stub_store.get_trace_stub("ff", 0)["output"]["n"].append(2)
+
+        second = ReplayContext("fix", str(tmp_path), cache=cache)
+        assert second.stub_store is first.stub_store
+        assert second.stub_store.get_db_stub("aabb:1122", 0) == [{"id": 1}]
+        assert second.stub_store.get_http_stub("tax", 0)[1] == {"rate": 0.1}
+        assert second.stub_store.get_trace_stub("ff", 0)["output"] == {"n": [1]}
+
+    def test_trace_stub_copies_only_output(self, tmp_path):
+        data = json.loads(json.dumps(_SMALL_FIXTURE))
+        data["stubs"].append(
+            {"qualname": "app.fn", "input_fingerprint": "ff", "input": {"x": [1]},
+             "output": {"n": [1]}, "ordinal": 0, "event_type": "Stub"},
+        )
+        store = StubStore.from_fixture(_write_fixture(tmp_path, "fix.json", data))
+
+        first, second = store.get_trace_stub("ff", 0), store.get_trace_stub("ff", 0)
+        assert first["output"] is not second["output"]
+        assert first["input"] is second["input"]
+
+    def test_clear_drops_entries(self, tmp_path):
+        cache = StubStoreCache()
+        cache.get(_write_fixture(tmp_path, "a.json", _SMALL_FIXTURE))
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.snapshot()["bytes"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Fingerprint algorithm — stubs are re-keyed to the active algorithm
+# ---------------------------------------------------------------------------
+
+class TestFingerprintAlgorithm:
+
+    @pytest.fixture()
+    def blake2b(self):
+        set_fingerprint_algorithm("blake2b-128")
+        yield
+        set_fingerprint_algorithm("sha256")
+
+    def _db_fp(self, sql, params):
+        sql_fp, params_fp = _compute_query_fingerprint(sql, params)
+        return f"{sql_fp[:16]}:{params_fp[:16]}"
+
+    def test_unstamped_sha256_fixture_rekeyed_on_load(self, blake2b):
+        store = StubStore.from_fixture(str(FIXTURE_PATH))
+        fp = self._db_fp("SELECT region FROM users WHERE id = ?", [1])
+        assert fp != "8e2da4922ec2cc96:080a9ed428559ef6"
+        assert store.get_db_stub(fp, 0) == [{"region": "US-CA"}]
+
+    def test_mixed_algorithms_in_one_fixture(self, tmp_path, blake2b):
+        args = {"x": 1}
+        blake_fp = fingerprint({"qualname": "new_fn", "args": args})
+        set_fingerprint_algorithm("sha256")
+        sha_fp = fingerprint({"qualname": "old_fn", "args": args})
+        set_fingerprint_algorithm("blake2b-128")
+        data = {"stubs": [
+            {"qualname": "old_fn", "input": args, "input_fingerprint": sha_fp,
+             "output": "old", "ordinal": 0, "event_type": "Stub",
+             "fingerprint_algorithm": "sha256"},
+            {"qualname": "new_fn", "input": args, "input_fingerprint": blake_fp,
+             "output": "new", "ordinal": 0, "event_type": "Stub",
+             "fingerprint_algorithm": "blake2b-128"},
+        ]}
+        store = StubStore.from_fixture(_write_fixture(tmp_path, "mixed.json", data))
+        old_fp = fingerprint({"qualname": "old_fn", "args": args})
+        assert store.get_trace_stub(old_fp, 0)["output"] == "old"
+        assert store.get_trace_stub(blake_fp, 0)["output"] == "new"
+
+    def test_input_not_reproducing_fingerprint_not_rekeyed(self, tmp_path, blake2b, caplog):
+        # What a protobuf argument records by default: the fingerprint hashes
+        # the message's binary encoding, the input keeps MessageToDict output
+        set_fingerprint_algorithm("sha256")
+        sha_fp = fingerprint({"qualname": "quote", "args": {"req": {"__protobuf__": {
+            "type": "pkg.QuoteRequest", "digest": "ab" * 32,
+        }}}})
+        set_fingerprint_algorithm("blake2b-128")
+        args = {"req": {"sku": "A-1"}}
+        data = {"stubs": [
+            {"qualname": "quote", "input": args, "input_fingerprint": sha_fp,
+             "output": "old", "ordinal": 0, "event_type": "Stub",
+             "fingerprint_algorithm": "sha256"},
+        ]}
+        with caplog.at_level("WARNING", logger="sim_sdk.stub_store"):
+            store = StubStore.from_fixture(_write_fixture(tmp_path, "pb.json", data))
+
+        assert store.get_trace_stub(fingerprint({"qualname": "quote", "args": args}), 0) is None
+        assert store.get_trace_stub(sha_fp, 0)["output"] == "old"
+        assert "1 stub(s) recorded under another fingerprint algorithm" in caplog.text
+
+    @pytest.mark.parametrize("store_binary", [False, True])
+    def test_protobuf_arg_rekeyed_only_when_stored_binary(
+        self, tmp_path, caplog, store_binary,
+    ):
+        pytest.importorskip("google.protobuf")
+        from google.protobuf import struct_pb2
+        from sim_sdk.serialization import configure_protobuf
+
+        req = struct_pb2.Struct()
+        req["sku"] = "A-1"
+        configure_protobuf(store_binary=store_binary)
+        try:
+            encoded, sha_fp = canonical_encode({"qualname": "quote", "args": {"req": req}})
+        finally:
+            configure_protobuf(store_binary=False)
+        data = {"stubs": [
+            {"qualname": "quote", "input": encoded["args"], "input_fingerprint": sha_fp,
+             "output": "old", "ordinal": 0, "event_type": "Stub",
+             "fingerprint_algorithm": "sha256"},
+        ]}
+        path = _write_fixture(tmp_path, "pb.json", data)
+
+        set_fingerprint_algorithm("blake2b-128")
+        try:
+            with caplog.at_level("WARNING", logger="sim_sdk.stub_store"):
+                store = StubStore.from_fixture(path)
+            live_fp = canonical_encode({"qualname": "quote", "args": {"req": req}})[1]
+        finally:
+            set_fingerprint_algorithm("sha256")
+
+        stub = store.get_trace_stub(live_fp, 0)
+        if store_binary:
+            assert stub["output"] == "old"
+            assert "could not be re-keyed" not in caplog.text
+        else:
+            assert stub is None
+            assert "could not be re-keyed" in caplog.text
+
+    def test_cache_keys_on_active_algorithm(self, tmp_path):
+        cache = StubStoreCache()
+        path = _write_fixture(tmp_path, "a.json", _SMALL_FIXTURE)
+        first = cache.get(path)
+        set_fingerprint_algorithm("blake2b-128")
+        try:
+            assert cache.get(path) is not first
+        finally:
+            set_fingerprint_algorithm("sha256")
+        assert len(cache) == 1
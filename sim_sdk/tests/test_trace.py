@@ -20,12 +20,15 @@ from pathlib import Path
 
 import pytest
 
+from sim_sdk.canonical import set_fingerprint_algorithm
 from sim_sdk.context import SimContext, SimMode, get_context, set_context, clear_context
 from sim_sdk.fixture.schema import FixtureEvent
 from sim_sdk.replay_context import ReplayContext
 from sim_sdk.trace import (
     sim_trace,
+    _bind_raw,
     _compute_fingerprint,
+    _make_binder,
     _make_serializable,
 )
 
@@ -548,6 +551,36 @@ class TestFingerprinting:
         assert ordinals == [0, 0, 1]
 
 
+    def test_event_stamped_with_fingerprint_algorithm(self):
+        @sim_trace
+        def add(a, b):
+            return a + b
+
+        ctx, sink = make_record_ctx()
+        add(1, 2)
+        assert sink.events[0].fingerprint_algorithm == "sha256"
+        assert sink.events[0].to_dict()["fingerprint_algorithm"] == "sha256"
+
+    def test_replay_under_new_algorithm_hits_old_fixture(self, tmp_path):
+        """Fixtures recorded with SHA-256 replay after switching algorithms."""
+        @sim_trace
+        def add(a, b):
+            return {"sum": a + b}
+
+        ctx, sink = make_record_ctx()
+        add(2, 3)
+        sink.to_fixture_json(tmp_path, "fix")
+
+        clear_context()
+        make_replay_sim_ctx()
+        set_fingerprint_algorithm("blake2b-128")
+        try:
+            with ReplayContext(fixture_id="fix", fixture_dir=str(tmp_path)):
+                assert add(2, 3) == {"sum": 5}
+        finally:
+            set_fingerprint_algorithm("sha256")
+
+
 # ---------------------------------------------------------------------------
 # AC9: Zero framework imports
 # ---------------------------------------------------------------------------
@@ -620,6 +653,210 @@ class TestDecoratorBehavior:
         assert inspect.iscoroutinefunction(my_async)
 
 
+# ---------------------------------------------------------------------------
+# Argument binding (signature precomputed at decoration time)
+# ---------------------------------------------------------------------------
+
+def _plain(a, b, c):
+    pass
+
+
+def _defaults(a, b=2, *, scale=1.0, label="x"):
+    pass
+
+
+def _kw_only(*, user_id, region):
+    pass
+
+
+def _pos_only(a, b=2, /, c=3):
+    pass
+
+
+def _variadic(a, *rest, flag=False, **extra):
+    pass
+
+
+_BINDING_CASES = [
+    (_plain, (1, 2, 3), {}),
+    (_plain, (1,), {"c": 3, "b": 2}),
+    (_plain, (), {"a": 1, "b": 2, "c": 3}),
+    (_defaults, (1,), {}),
+    (_defaults, (1, 5), {"label": "y"}),
+    (_defaults, (), {"label": "y", "a": 1}),
+    (_kw_only, (), {"region": "eu", "user_id": 7}),
+    (_pos_only, (1,), {}),
+    (_pos_only, (1, 4), {"c": 9}),
+    (_variadic, (1, 2, 3), {"k": "v", "flag": True}),
+]
+
+_BINDING_ERRORS = [
+    (_plain, (1, 2), {}),
+    (_plain, (1, 2, 3, 4), {}),
+    (_plain, (1, 2), {"a": 1}),
+    (_plain, (1, 2, 3), {"d": 4}),
+    (_defaults, (1, 2, 3), {}),
+    (_kw_only, (7, "eu"), {}),
+    (_kw_only, (), {"user_id": 7}),
+    (_pos_only, (), {"a": 1}),
+    (_pos_only, (1,), {"b": 2}),
+]
+
+
+class TestArgumentBinding:
+    @pytest.mark.parametrize("func,args,kwargs", _BINDING_CASES)
+    def test_binder_matches_signature_bind(self, func, args, kwargs):
+        """Precomputed binder gives the same mapping, in the same order."""
+        expected = _bind_raw(func, args, kwargs)
+        got = _make_binder(func)(args, kwargs)
+        assert got == expected
+        assert list(got) == list(expected)
+
+    @pytest.mark.parametrize("func,args,kwargs", _BINDING_ERRORS)
+    def test_binder_raises_like_signature_bind(self, func, args, kwargs):
+        """Bad calls raise the same TypeError as Signature.bind."""
+        with pytest.raises(TypeError) as expected:
+            _bind_raw(func, args, kwargs)
+        with pytest.raises(TypeError) as got:
+            _make_binder(func)(args, kwargs)
+        assert str(got.value) == str(expected.value)
+
+    def test_signature_computed_once(self, monkeypatch):
+        """inspect.signature runs at decoration time, not per call."""
+        @sim_trace
+        def add(a, b=1):
+            return a + b
+
+        make_record_ctx()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("signature computed per call")
+
+        monkeypatch.setattr(inspect, "signature", fail)
+        assert add(1) == 2
+        assert add(1, b=5) == 6
+
+    def test_fingerprint_independent_of_call_style(self):
+        """Positional and keyword calls to the same args share a fingerprint."""
+        @sim_trace
+        def quote(user_id, region="eu"):
+            return user_id
+
+        ctx, sink = make_record_ctx()
+        quote(7)
+        quote(7, "eu")
+        quote(user_id=7, region="eu")
+
+        assert len({e.input_fingerprint for e in sink.events}) == 1
+
+
+# ---------------------------------------------------------------------------
+# Argument projection: ignore / include / key
+# ---------------------------------------------------------------------------
+
+class Session:
+    """Stand-in for a client whose str() embeds a memory address."""
+
+
+class TestArgumentProjection:
+    def test_ignore_drops_arguments(self):
+        @sim_trace(ignore=["session"])
+        def lookup(session, user_id, region="eu"):
+            return user_id
+
+        ctx, sink = make_record_ctx()
+        lookup(Session(), 7)
+        lookup(Session(), user_id=7)
+
+        assert sink.events[0].input == {"user_id": 7, "region": "eu"}
+        assert len({e.input_fingerprint for e in sink.events}) == 1
+
+    def test_ignore_self(self):
+        class Repo:
+            @sim_trace(ignore="self")
+            def get(self, user_id):
+                return user_id
+
+        ctx, sink = make_record_ctx()
+        Repo().get(1)
+        Repo().get(1)
+
+        assert sink.events[0].input == {"user_id": 1}
+        assert sink.events[0].input_fingerprint == sink.events[1].input_fingerprint
+
+    def test_include_keeps_only_listed(self):
+        @sim_trace(include=["user_id", "region"])
+        def lookup(session, cache, user_id, region):
+            return user_id
+
+        ctx, sink = make_record_ctx()
+        lookup(Session(), {}, 7, "us")
+
+        assert sink.events[0].input == {"user_id": 7, "region": "us"}
+
+    def test_key_projection(self):
+        @sim_trace(key=lambda bound: {"user": bound["user"]["id"]})
+        def greet(user, session):
+            return "hi"
+
+        ctx, sink = make_record_ctx()
+        greet({"id": 3, "name": "a"}, Session())
+        greet({"id": 3, "name": "b"}, Session())
+
+        assert sink.events[0].input == {"user": 3}
+        assert sink.events[0].input_fingerprint == sink.events[1].input_fingerprint
+
+    def test_key_non_dict_result(self):
+        @sim_trace(key=lambda bound: bound["order_id"])
+        def ship(order_id, carrier):
+            return order_id
+
+        ctx, sink = make_record_ctx()
+        ship(12, Session())
+        assert sink.events[0].input == {"key": 12}
+
+    def test_async_projection(self):
+        @sim_trace(ignore=["session"])
+        async def fetch(session, x):
+            return x
+
+        ctx, sink = make_record_ctx()
+        asyncio.run(fetch(Session(), 2))
+        assert sink.events[0].input == {"x": 2}
+
+    def test_replay_uses_projection(self, tmp_path):
+        @sim_trace(ignore=["session"])
+        def lookup(session, user_id):
+            return {"id": user_id}
+
+        ctx, sink = make_record_ctx()
+        lookup(Session(), 5)
+        sink.to_fixture_json(tmp_path, "fix")
+
+        clear_context()
+        make_replay_sim_ctx()
+        with ReplayContext(fixture_id="fix", fixture_dir=str(tmp_path)):
+            assert lookup(Session(), 5) == {"id": 5}
+
+    @pytest.mark.parametrize("options,error", [
+        ({"ignore": ["nope"]}, ValueError),
+        ({"include": ["user_id", "missing"]}, ValueError),
+        ({"ignore": ["user_id"], "include": ["user_id"]}, ValueError),
+        ({"ignore": ["user_id"], "key": lambda b: b}, ValueError),
+        ({"key": "user_id"}, TypeError),
+    ])
+    def test_validated_at_decoration(self, options, error):
+        def lookup(session, user_id):
+            return user_id
+
+        with pytest.raises(error):
+            sim_trace(**options)(lookup)
+
+    def test_unintrospectable_signature_rejected(self):
+        with pytest.raises(ValueError):
+            sim_trace(ignore=["name"])(getattr)
+
+
 # ---------------------------------------------------------------------------
 # Integration: record → replay round-trip via ReplayContext
 # ---------------------------------------------------------------------------
@@ -686,3 +923,71 @@ class TestRoundtrip:
 
         assert r1 == 1
         assert r2 == 2
+
+    def test_array_args_and_output_replay_as_arrays(self, tmp_path):
+        """Array inputs match by buffer content; outputs come back as arrays."""
+        np = pytest.importorskip("numpy")
+
+        @sim_trace
+        def scale(prices, factor):
+            return prices * factor
+
+        prices = np.array([1.5, 2.5, 4.0])
+        ctx, sink = make_record_ctx()
+        scale(prices, 2)
+        assert sink.events[0].output["__ndarray__"]["dtype"] == "<f8"
+        sink.to_fixture_json(tmp_path, "fix")
+
+        clear_context()
+        make_replay_sim_ctx()
+        with ReplayContext(fixture_id="fix", fixture_dir=str(tmp_path)):
+            result = scale(prices.copy(), 2)
+
+        assert isinstance(result, np.ndarray)
+        np.testing.assert_array_equal(result, prices * 2)
+
+    def test_buffer_output_replays_as_memoryview(self, tmp_path):
+        import array
+
+        @sim_trace
+        def weights(n):
+            return array.array("d", [0.5] * n)
+
+        ctx, sink = make_record_ctx()
+        weights(3)
+        sink.to_fixture_json(tmp_path, "fix")
+
+        clear_context()
+        make_replay_sim_ctx()
+        with ReplayContext(fixture_id="fix", fixture_dir=str(tmp_path)):
+            result = weights(3)
+
+        assert result.tolist() == [0.5, 0.5, 0.5]
+
+    def test_binary_protobuf_output_replays_as_message(self, tmp_path):
+        pytest.importorskip("google.protobuf")
+        from google.protobuf import struct_pb2
+        from sim_sdk.serialization import configure_protobuf
+
+        @sim_trace
+        def quote(sku):
+            msg = struct_pb2.Struct()
+            msg["sku"] = sku
+            msg["price"] = 9.5
+            return msg
+
+        configure_protobuf(store_binary=True)
+        try:
+            ctx, sink = make_record_ctx()
+            expected = quote("A-1")
+            sink.to_fixture_json(tmp_path, "fix")
+
+            clear_context()
+            make_replay_sim_ctx()
+            with ReplayContext(fixture_id="fix", fixture_dir=str(tmp_path)):
+                result = quote("A-1")
+        finally:
+            configure_protobuf(store_binary=False)
+
+        assert isinstance(result, struct_pb2.Struct)
+        assert result == expected